@@ -0,0 +1,217 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+class AccessLogWriter:
+    """
+    접속 로그 전용 writer - 요청 스레드는 큐에 넣기만 하고,
+    단일 백그라운드 스레드가 배치로 모아서 파일에 기록합니다.
+    """
+
+    _STOP = object()  # 종료 신호용 센티널
+
+    def __init__(self, log_path, batch_size=500, flush_interval=1.0, fsync_interval=5.0,
+                 max_bytes=100 * 1024 * 1024, rotate_daily=True, max_queue=100000):
+        self.log_path = log_path
+        self.batch_size = batch_size          # 한 번에 기록할 최대 로그 수
+        self.flush_interval = flush_interval  # 최대 대기 시간 (초) - 이 시간마다 강제 기록
+        self.fsync_interval = fsync_interval  # fsync 주기 (초)
+        self.max_bytes = max_bytes            # 이 크기를 넘으면 로테이션
+        self.rotate_daily = rotate_daily      # 날짜가 바뀌면 로테이션
+
+        # 최대 큐 길이 (SimpleQueue는 무제한이므로 qsize로 근사 제한)
+        self.max_queue = max_queue
+        self._queue = queue.SimpleQueue()
+
+        self._file = None
+        self._file_day = None
+        self._last_fsync = time.time()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        # 기록된 배치를 추가로 전달받을 콜백 목록 (예: 트래픽 집계)
+        self._sinks = []
+
+        # 통계 (writer 스레드에서만 갱신, dropped만 요청 스레드에서 갱신)
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    # ---------- 요청 스레드용 API ----------
+
+    def write(self, line):
+        """로그 한 줄을 큐에 추가 (파일 I/O, 스레드 생성 없음)"""
+        if self._thread is None:
+            self.start()
+
+        if self._stopped.is_set() or self._queue.qsize() >= self.max_queue:
+            with self._drop_lock:
+                self.dropped += 1
+            return False
+
+        self._queue.put_nowait(line)
+        return True
+
+    def add_sink(self, sink):
+        """기록된 로그 배치를 전달받을 콜백 등록 - writer 스레드에서 sink(lines)로 호출됨"""
+        self._sinks.append(sink)
+
+    def stats(self):
+        """writer 상태 (모니터링용)"""
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'rotations': self.rotations,
+            'errors': self.errors,
+            'running': self._thread is not None and self._thread.is_alive()
+        }
+
+    # ---------- 라이프사이클 ----------
+
+    def start(self):
+        """writer 스레드 시작 (여러 번 호출해도 한 번만 시작)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='access-log-writer', daemon=True)
+            self._thread.start()
+
+    def close(self, timeout=5.0):
+        """남은 로그를 모두 기록하고 writer 스레드 종료"""
+        if self._thread is None or self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    # ---------- writer 스레드 ----------
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_fsync()
+                continue
+
+            batch = []
+            stop = first is self._STOP
+            if not stop:
+                batch.append(first)
+
+            # 큐에 쌓인 로그를 batch_size까지 한 번에 꺼냄
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            if batch:
+                self._write_batch(batch)
+
+            if stop:
+                # 종료 전 남은 로그 모두 기록
+                remaining = []
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is not self._STOP:
+                        remaining.append(item)
+                if remaining:
+                    self._write_batch(remaining)
+                self._close_file(fsync=True)
+                return
+
+    def _write_batch(self, batch):
+        try:
+            self._maybe_rotate()
+            f = self._open_file()
+            f.writelines(batch)
+            f.flush()
+            self.written += len(batch)
+            self.batches += 1
+            self._maybe_fsync()
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] 로그 파일 쓰기 실패: {e}")
+
+        for sink in self._sinks:
+            try:
+                sink(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] 로그 sink 처리 실패: {e}")
+
+    def _open_file(self):
+        if self._file is None:
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+            self._file_day = datetime.now().strftime('%Y%m%d')
+        return self._file
+
+    def _close_file(self, fsync=False):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+        except Exception as e:
+            print(f"[ERROR] 로그 파일 닫기 실패: {e}")
+        self._file = None
+
+    def _maybe_fsync(self):
+        if self._file is None:
+            return
+        current_time = time.time()
+        if current_time - self._last_fsync >= self.fsync_interval:
+            try:
+                os.fsync(self._file.fileno())
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] 로그 fsync 실패: {e}")
+            self._last_fsync = current_time
+
+    def _maybe_rotate(self):
+        """크기 초과 또는 날짜 변경 시 로그 파일 로테이션"""
+        if self._file is None:
+            if not os.path.exists(self.log_path):
+                return
+            # 재시작 직후: 기존 파일의 수정 날짜 기준으로 판단
+            file_day = datetime.fromtimestamp(os.path.getmtime(self.log_path)).strftime('%Y%m%d')
+            size = os.path.getsize(self.log_path)
+        else:
+            file_day = self._file_day
+            size = self._file.tell()
+
+        today = datetime.now().strftime('%Y%m%d')
+        day_changed = self.rotate_daily and file_day != today
+        too_big = self.max_bytes and size >= self.max_bytes
+        if not (day_changed or too_big):
+            return
+
+        self._close_file(fsync=True)
+
+        # access_log.txt -> access_log.txt.20260101 (같은 날 여러 번이면 .1, .2 ...)
+        rotated = f"{self.log_path}.{file_day}"
+        suffix = 1
+        while os.path.exists(rotated):
+            rotated = f"{self.log_path}.{file_day}.{suffix}"
+            suffix += 1
+        os.replace(self.log_path, rotated)
+        self.rotations += 1
+        print(f"[로그] 로테이션 완료: {rotated}")
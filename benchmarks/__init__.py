@@ -0,0 +1 @@
+# 성능 측정/회귀 확인용 스크립트 모음 (python -m benchmarks.<모듈> 로 실행)
@@ -0,0 +1,154 @@
+"""
+리더보드 행 렌더링 micro-benchmark
+
+    python -m benchmarks.bench_leaderboard_rows --rows 5000 --repeat 5
+
+기존 행 단위 함수(generate_row_html + itertuples)와 leaderboard_renderer의
+컬럼 단위 렌더링을 같은 데이터로 비교하고 rows/sec를 출력합니다.
+두 결과의 HTML이 (공백 제외) 같은지도 함께 확인합니다.
+"""
+import argparse
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+import leaderboard_renderer
+
+def make_compare_data(rows, seed=42):
+    """compare_leaderboards 결과와 같은 형태의 가짜 데이터 (NEW/OUT/상승/하락/변화 없음 섞어서 생성)"""
+    rng = np.random.default_rng(seed)
+    prev_rank = rng.integers(1, 1000, rows)
+    curr_rank = rng.integers(1, 1000, rows)
+    prev_rank[rng.random(rows) < 0.1] = 9999
+    curr_rank[rng.random(rows) < 0.1] = 9999
+    same = rng.random(rows) < 0.05
+    curr_rank[same] = prev_rank[same]
+    prev_ms = np.round(rng.random(rows), 6)
+    curr_ms = np.round(rng.random(rows), 6)
+    # outer merge + fillna(9999)를 거치므로 실제 compare_leaderboards 결과의 순위는 float
+    return pd.DataFrame({
+        'username': [f'user{i}' for i in range(rows)],
+        'displayName': [f'User {i}' for i in range(rows)],
+        'profileImageUrl': [f'https://img.example/{i}.png' for i in range(rows)],
+        'prev_rank': prev_rank.astype(float),
+        'curr_rank': curr_rank.astype(float),
+        'prev_mindshare': prev_ms,
+        'curr_mindshare': curr_ms,
+        'rank_change': np.where(np.abs(prev_rank - curr_rank) > 500, 0, prev_rank - curr_rank).astype(float),
+        'mindshare_change': np.where((prev_rank == 9999) | (curr_rank == 9999), 0, curr_ms - prev_ms)
+    })
+
+def legacy_rows(compare_data, projectname):
+    """기존 main.project_leaderboard의 행 생성 방식 (비교 기준)"""
+    compare_data = compare_data.copy()
+    compare_data['rank_change_display'] = compare_data['rank_change'].apply(
+        lambda x: f"{x}" if x > 0 else (f"{x}" )
+    )
+    compare_data['mindshare_change_display'] = compare_data['mindshare_change'].apply(
+        lambda x: f"{x:.4f}" if x > 0 else (f"{x:.4f}" )
+    )
+
+    def generate_row_html(row):
+        prev_rank = row.prev_rank
+        curr_rank = row.curr_rank
+        prev_mindshare_value = getattr(row, 'prev_mindshare')
+        curr_mindshare_value = getattr(row, 'curr_mindshare')
+        mindshare_change_value = getattr(row, 'mindshare_change')
+
+        if prev_rank == 9999 and curr_rank != 9999:
+            rank_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
+            mindshare_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
+        elif prev_rank != 9999 and curr_rank == 9999:
+            rank_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
+            mindshare_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
+        elif prev_rank != 9999 and curr_rank != 9999:
+            change = prev_rank - curr_rank
+            if change > 0:
+                rank_change_html = f'<span class="text-success" data-order="{change}">↑ {change}</span>'
+            elif change < 0:
+                rank_change_html = f'<span class="text-danger" data-order="{change}">↓ {abs(change)}</span>'
+            else:
+                rank_change_html = '<span class="text-muted" data-order="0">-</span>'
+
+            if mindshare_change_value > 0:
+                mindshare_change_html = f'<span class="text-success" data-order="{mindshare_change_value:.4f}">+{mindshare_change_value:.4f}</span>'
+            elif mindshare_change_value < 0:
+                mindshare_change_html = f'<span class="text-danger" data-order="{mindshare_change_value:.4f}">{mindshare_change_value:.4f}</span>'
+            else:
+                mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
+        else:
+            rank_change_html = '<span class="text-muted" data-order="0">-</span>'
+            mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
+
+        return f"""
+                    <tr>
+                        <td>
+                            <div class="d-flex align-items-center">
+                                <img src="{row.profileImageUrl}" alt="{row.displayName}" class="me-2" style="width:32px;height:32px;border-radius:50%;">
+                                <div>
+                                    <strong>{row.displayName}</strong><br>
+                                    <small class="text-muted">@{row.username}</small><a href="/cookie/{projectname}/user/{row.username}" class="user-link" title="유저 분석">🔍</a>
+                                </div>
+                            </div>
+                        </td>
+                        <td>{int(prev_rank) if prev_rank != 9999 else '-'}</td>
+                        <td>{int(curr_rank) if curr_rank != 9999 else '-'}</td>
+                        <td>{rank_change_html}</td>
+                        <td>{prev_mindshare_value:.4f}</td>
+                        <td>{curr_mindshare_value:.4f}</td>
+                        <td>{mindshare_change_html}</td>
+                    </tr>"""
+
+    return ''.join([generate_row_html(row) for row in compare_data.itertuples()])
+
+def vectorized_rows(compare_data, projectname):
+    users = leaderboard_renderer.user_cells(compare_data['displayName'], compare_data['username'],
+                                            compare_data['profileImageUrl'], f"/cookie/{projectname}/user/")
+    return leaderboard_renderer.render_rows(
+        users, compare_data['prev_rank'], compare_data['curr_rank'],
+        leaderboard_renderer.format_fixed(compare_data['prev_mindshare']),
+        leaderboard_renderer.format_fixed(compare_data['curr_mindshare']),
+        compare_data['mindshare_change'])
+
+def measure(func, compare_data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(compare_data, 'bench-en')
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(rows=5000, repeat=5):
+    compare_data = make_compare_data(rows)
+
+    # 기존 방식은 float 순위를 '↑ 3.0'처럼 출력하므로 HTML 비교는 정수 순위 데이터로 수행
+    int_ranks = compare_data.astype({'prev_rank': int, 'curr_rank': int})
+    normalize = lambda html: re.sub(r'>\s+<', '><', re.sub(r'\s+', ' ', html)).strip()
+    parity = normalize(legacy_rows(int_ranks, 'bench-en')) == normalize(vectorized_rows(int_ranks, 'bench-en'))
+
+    legacy = measure(legacy_rows, compare_data, repeat)
+    vectorized = measure(vectorized_rows, compare_data, repeat)
+    return {
+        'rows': rows,
+        'parity': parity,
+        'legacy_rows_per_sec': rows / legacy,
+        'vectorized_rows_per_sec': rows / vectorized,
+        'speedup': legacy / vectorized
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='리더보드 행 렌더링 벤치마크')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    result = run(args.rows, args.repeat)
+    print(f"rows: {result['rows']:,}  (HTML 일치: {'OK' if result['parity'] else 'MISMATCH'})")
+    print(f"  기존 (행 단위)    : {result['legacy_rows_per_sec']:>12,.0f} rows/sec")
+    print(f"  벡터화 (컬럼 단위): {result['vectorized_rows_per_sec']:>12,.0f} rows/sec")
+    print(f"  속도 향상         : x{result['speedup']:.1f}")
+
+if __name__ == '__main__':
+    main()
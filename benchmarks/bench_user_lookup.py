@@ -0,0 +1,230 @@
+"""
+유저 전체 순위 조회 benchmark - 글로벌 DB(materialized) vs 메모리 인덱스 vs FederatedLookup(ATTACH)
+
+    python -m benchmarks.bench_user_lookup --cookie 30 --wallchain 10 --users 3000 --lookups 300
+
+임시 디렉토리에 Cookie/Wallchain 프로젝트 DB와 Kaito DB를 만들고
+- 글로벌 DB: 전 프로젝트 최신 순위를 모아 global_rankings.db를 재구성하는 시간 + 유저 조회 시간
+- 메모리 인덱스: 재구성된 글로벌 DB로 GlobalIndex를 만드는 시간 + 유저 조회 시간 (결과가 글로벌 DB와 완전히 같은지 확인)
+- Federated: 재구성 없이 프로젝트 DB를 묶음 단위로 ATTACH해서 조회하는 시간
+을 비교합니다. 두 경로의 순위 결과(프로젝트/타임프레임/순위/마쉐)가 같은지도 확인합니다.
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+
+from data_processor import DataProcessor
+from data_processor_wallchain import DataProcessorWallchain
+from data_processor_kaito import DataProcessorKaito
+from global_data_manager import GlobalDataManager
+from global_index import GlobalIndex
+from federated_lookup import FederatedLookup
+
+TIMESTAMPS = ['2025-01-01 00:00:00', '2025-01-01 12:00:00', '2025-01-02 00:00:00']
+COOKIE_TIMEFRAMES = ['7D', '30D', 'TOTAL']
+WALLCHAIN_TIMEFRAMES = ['7d', 'epoch-2']
+KAITO_TIMEFRAMES = ['7D', '30D']
+
+
+def _members(rng, users, ratio=0.3):
+    """프로젝트마다 전체 유저 중 일부만 참여"""
+    return rng.sample(range(users), max(1, int(users * ratio)))
+
+
+def build_sources(root, cookie, wallchain, kaito, users, seed=11):
+    rng = random.Random(seed)
+    sources = []
+
+    for p in range(cookie):
+        path = os.path.join(root, f'cookie{p}')
+        os.makedirs(path)
+        dp = DataProcessor(path)
+        members = _members(rng, users)
+        rows = [(tf, f'user{u}', f'User {u}', rank + 1, rank + 1, rng.random(), rng.random(),
+                 rng.randint(0, 50000), rng.randint(0, 500), ts, f'https://img.example/{u}.png')
+                for ts in TIMESTAMPS for tf in COOKIE_TIMEFRAMES for rank, u in enumerate(members)]
+        with sqlite3.connect(dp.db_path) as conn:
+            conn.execute("ALTER TABLE snaps ADD COLUMN snapsPercentRank TEXT")
+            conn.executemany("""
+                INSERT INTO snaps (timeframe, username, displayName, snapsPercentRank, cSnapsPercentRank,
+                                   snapsPercent, cSnapsPercent, followers, smartFollowers, timestamp, profileImageUrl)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        sources.append(('cookie', f'cookie{p}-en', dp.db_path, tuple(COOKIE_TIMEFRAMES), 1))
+
+    for p in range(wallchain):
+        path = os.path.join(root, f'wallchain{p}')
+        os.makedirs(path)
+        dp = DataProcessorWallchain(path)
+        members = _members(rng, users)
+        rows = [(f'User {u}', f'user{u}', f'https://img.example/{u}.png', rng.randint(0, 1000), rng.random(),
+                 rank + 1, rng.randint(-5, 5), tf, ts)
+                for ts in TIMESTAMPS for tf in WALLCHAIN_TIMEFRAMES for rank, u in enumerate(members)]
+        with sqlite3.connect(dp.db_path) as conn:
+            conn.executemany("""
+                INSERT INTO leaderboard (name, username, imageUrl, score, mindsharePercentage,
+                                         position, positionChange, timeframe, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        sources.append(('wallchain', f'wallchain-w{p}', dp.db_path, tuple(WALLCHAIN_TIMEFRAMES), 1))
+
+    if kaito:
+        kp = DataProcessorKaito(os.path.join(root, 'kaito', 'kaito_projects.db'))
+        rows = []
+        for p in range(kaito):
+            members = _members(rng, users)
+            rows += [(f'k{p}', tf, ts, rank + 1, f'user{u}', f'User {u}', str(u), f'{rng.random():.2f}%',
+                      f'{rng.randint(0, 900):,}', f'{rng.randint(0, 90000):,}')
+                     for ts in TIMESTAMPS for tf in KAITO_TIMEFRAMES for rank, u in enumerate(members)]
+        with sqlite3.connect(kp.db_path) as conn:
+            conn.executemany("""
+                INSERT INTO rankings (projectName, timeframe, timestamp, rank, handle, displayName,
+                                      imageId, mindshare, smartFollower, follower)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        sources.append(('kaito', 'kaito', kp.db_path, (), 0))
+    return sources
+
+
+def rebuild_global(manager, sources):
+    """update_global_rankings와 같은 방식으로 최신 순위를 모아 global DB 재구성 (순위 테이블만)"""
+    rankings = []
+    users = {}
+    for kind, project_name, db_path, timeframes, _ in sources:
+        with sqlite3.connect(db_path, timeout=30.0) as conn:
+            if kind == 'kaito':
+                rows = conn.execute('''
+                    SELECT r.handle, 'kaito-' || r.projectName, r.timeframe, r.rank, r.mindshare
+                    FROM rankings r
+                    INNER JOIN (SELECT projectName, timeframe, MAX(timestamp) AS latest_ts
+                                FROM rankings GROUP BY projectName, timeframe) latest
+                    ON r.projectName = latest.projectName AND r.timeframe = latest.timeframe
+                       AND r.timestamp = latest.latest_ts
+                ''').fetchall()
+                for handle, project, tf, rank, mindshare in rows:
+                    users.setdefault(handle, (handle, None, None, None, None, None, None))
+                    rankings.append((handle, project, tf, rank, None, float(mindshare.rstrip('%')), None, None))
+                continue
+            table = 'snaps' if kind == 'cookie' else 'leaderboard'
+            for tf in timeframes:
+                latest = conn.execute(f"SELECT MAX(timestamp) FROM {table} WHERE timeframe = ?", (tf,)).fetchone()[0]
+                if kind == 'cookie':
+                    rows = conn.execute('''
+                        SELECT username, snapsPercentRank, cSnapsPercentRank, snapsPercent, cSnapsPercent, NULL
+                        FROM snaps WHERE timestamp = ? AND timeframe = ?''', (latest, tf)).fetchall()
+                else:
+                    rows = conn.execute('''
+                        SELECT username, position, NULL, mindsharePercentage, NULL, positionChange
+                        FROM leaderboard WHERE timestamp = ? AND timeframe = ?''', (latest, tf)).fetchall()
+                for username, ms_rank, cms_rank, ms, cms, change in rows:
+                    users.setdefault(username, (username, None, None, None, None, None, None))
+                    rankings.append((username, project_name, tf, ms_rank, cms_rank, ms, cms, change))
+
+    manager.begin_batch_update()
+    manager.batch_insert_users(list(users.values()))
+    manager.batch_insert_rankings(rankings)
+    manager.commit_batch_update()
+    return len(rankings)
+
+
+def _ranking_key(data):
+    out = set()
+    for group in ('cookie_projects', 'wallchain_projects', 'kaito_projects'):
+        for project, rankings in data[group].items():
+            for r in rankings:
+                ms = None if r['ms'] is None else round(float(r['ms']), 6)
+                out.add((project, r['timeframe'], r['msRank'], r['cmsRank'], ms))
+    return out
+
+
+def measure(func, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    return (time.perf_counter() - start) / len(names)
+
+
+def full_scans(federated, sources, name='user0'):
+    """
+    소스별 실시간 조회 쿼리의 EXPLAIN QUERY PLAN에서 테이블 전체 스캔(SCAN 테이블) 찾기
+    username = ? COLLATE NOCASE는 NOCASE 인덱스가 없으면 BINARY 인덱스를 못 써서 전체 스캔이 됨
+    """
+    scans = []
+    for source in sources:
+        conn = federated._connection((source[2],))
+        sql, params = federated._select(conn, 'p0', source, name)
+        for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params):
+            if re.match(r'SCAN (\w+\.)?(snaps|leaderboard|rankings)\b', row[3]):
+                scans.append(f'{source[1]}: {row[3]}')
+    return scans
+
+
+def run(cookie=30, wallchain=10, kaito=20, users=3000, lookups=300, seed=11):
+    with tempfile.TemporaryDirectory() as root:
+        sources = build_sources(root, cookie, wallchain, kaito, users, seed)
+        manager = GlobalDataManager(os.path.join(root, 'global_rankings.db'))
+        federated = FederatedLookup(lambda: sources)
+
+        start = time.perf_counter()
+        ranking_rows = rebuild_global(manager, sources)
+        rebuild_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = GlobalIndex.from_db(manager.db_path)
+        index_build_sec = time.perf_counter() - start
+
+        names = [f'user{i}' for i in random.Random(seed).sample(range(users), min(lookups, users))]
+        mismatches = []
+        for name in names[:50]:
+            materialized, live = manager.get_user_data(name), federated.get_user_data(name)
+            if (materialized is None) != (live is None) or (live and _ranking_key(materialized) != _ranking_key(live)):
+                mismatches.append(name)
+            if index.get_user_data(name.upper()) != materialized:
+                mismatches.append(f'{name} (index)')
+
+        plan_scans = full_scans(federated, sources)
+        federated.get_user_data(names[0])  # 연결/최신 타임스탬프 캐시 준비
+        result = {
+            'projects': len(sources),
+            'ranking_rows': ranking_rows,
+            'rebuild_sec': rebuild_sec,
+            'index_build_sec': index_build_sec,
+            'index_bytes': index.memory_usage()['total'],
+            'global_lookup_ms': measure(manager.get_user_data, names) * 1000,
+            'index_lookup_ms': measure(index.get_user_data, names) * 1000,
+            'federated_lookup_ms': measure(federated.get_user_data, names) * 1000,
+            'mismatches': mismatches,
+            'plan_scans': plan_scans
+        }
+        federated.close()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='글로벌 DB vs ATTACH 기반 유저 조회 벤치마크')
+    parser.add_argument('--cookie', type=int, default=30)
+    parser.add_argument('--wallchain', type=int, default=10)
+    parser.add_argument('--kaito', type=int, default=20, help='Kaito DB 안의 프로젝트 수')
+    parser.add_argument('--users', type=int, default=3000)
+    parser.add_argument('--lookups', type=int, default=300)
+    args = parser.parse_args()
+
+    r = run(args.cookie, args.wallchain, args.kaito, args.users, args.lookups)
+    print(f"프로젝트 DB: {r['projects']}개, 글로벌 순위 행: {r['ranking_rows']:,}  "
+          f"(결과 일치: {'OK' if not r['mismatches'] else 'MISMATCH ' + ', '.join(r['mismatches'][:5])})")
+    print(f"  글로벌 DB 재구성     : {r['rebuild_sec']:8.2f} s (조회 결과는 재구성 주기만큼 늦음)")
+    print(f"  글로벌 DB 조회       : {r['global_lookup_ms']:8.2f} ms/유저")
+    print(f"  메모리 인덱스 생성   : {r['index_build_sec']:8.2f} s ({r['index_bytes'] / 1024 / 1024:.1f} MB)")
+    print(f"  메모리 인덱스 조회   : {r['index_lookup_ms']:8.3f} ms/유저")
+    print(f"  Federated(ATTACH) 조회: {r['federated_lookup_ms']:8.2f} ms/유저 (항상 최신)")
+    for scan in r['plan_scans'][:5]:
+        print(f"  [전체 스캔] {scan}")
+    raise SystemExit(1 if r['mismatches'] or r['plan_scans'] else 0)
+
+
+if __name__ == '__main__':
+    main()
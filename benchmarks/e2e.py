@@ -0,0 +1,273 @@
+"""
+End-to-end 벤치마크 - 가짜 데이터로 초기 적재 / 신규 스냅샷 반영 / 글로벌 DB 갱신 / 주요 라우트 응답 시간 측정
+
+    python -m benchmarks.e2e --workdir /tmp/sharkapp-e2e --users 5000 --report e2e.json
+    python -m benchmarks.e2e --workdir /tmp/sharkapp-e2e --report e2e.json --baseline e2e-before.json
+
+workdir에 static/views 링크와 data/를 만들고 그 안에서 main을 import 합니다 (main의 경로는 모두 ./data 기준).
+로더 스레드는 띄우지 않고 같은 처리를 순서대로 직접 호출하므로 시나리오별 시간을 따로 잴 수 있습니다.
+Kaito 유저 페이지는 외부 YAPS API를 호출하므로 라우트 목록에서 제외합니다.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+from benchmarks import report, synth
+
+# main.start_kaito_data_loader와 같은 timeframe 목록
+KAITO_LOADER_TIMEFRAMES = ['7D', '30D', '90D', '180D', '360D']
+
+
+def prepare_workdir(workdir):
+    """workdir 생성 + static/views 링크 (이미 데이터가 있으면 중단 - 이전 결과와 섞이지 않도록)"""
+    if os.path.exists(os.path.join(workdir, 'data')):
+        raise SystemExit(f"{workdir}/data 가 이미 있습니다. 빈 디렉토리를 지정하세요.")
+    os.makedirs(workdir, exist_ok=True)
+    for name in ('static', 'views'):
+        link = os.path.join(workdir, name)
+        if not os.path.exists(link):
+            os.symlink(os.path.join(report.REPO_ROOT, name), link)
+
+
+def quiet():
+    """main/프로세서의 진행 로그 숨김"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def wsgi_get(app, path, query='', headers=None):
+    """WSGI 앱 직접 호출 -> (status, headers, body)"""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'bench', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr
+    }
+    environ.update(headers or {})
+    captured = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        captured['status'] = status
+        captured['headers'] = response_headers
+
+    result = app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return captured['status'], dict(captured['headers']), body
+
+
+def load_kaito(main):
+    """Kaito 신규 파일 적재 (start_kaito_data_loader의 한 주기와 같은 처리) -> 파일 수"""
+    kp = main.kaito_processor
+    projects = kp.scan_projects()
+    batch = []
+    for project in projects:
+        for timeframe in KAITO_LOADER_TIMEFRAMES:
+            for path in kp.check_new_files(project, timeframe):
+                data = kp.load_json_file(path)
+                if data:
+                    timestamp = os.path.basename(path).replace('.json', '').replace('_', '-')
+                    batch.append((project, timeframe, timestamp, data))
+    if batch:
+        kp.insert_data_batch(batch)
+    main.refresh_kaito_projects(projects)
+    return len(batch)
+
+
+def ingest(main):
+    """모든 소스의 신규 파일 적재 -> {소스: 파일 수}"""
+    files = {'cookie': 0, 'wallchain': 0, 'kaito': 0}
+    for kind, instances in (('cookie', main.project_instances), ('wallchain', main.wallchain_instances)):
+        for dp in instances.values():
+            new_files = dp.check_for_new_data()
+            files[kind] += sum(len(v) for v in new_files.values())
+            if new_files:
+                dp.load_data(files_to_load=new_files)
+    files['kaito'] = load_kaito(main)
+    return files
+
+
+def scenario_backfill(main):
+    start = time.perf_counter()
+    with quiet():
+        main.load_cookie_config()
+        main.init_projects_on_startup(start_loaders=False)
+        main.init_wallchain_on_startup(start_loaders=False)
+        main.init_kaito_on_startup()
+        register_sec = time.perf_counter() - start
+        files = ingest(main)
+        for dp in main.project_instances.values():
+            dp.get_user_languages()
+    total = time.perf_counter() - start
+    return {
+        'projects': len(main.project_instances) + len(main.wallchain_instances) + len(main.get_cached_kaito_projects()),
+        'files': sum(files.values()),
+        'register_sec': register_sec,
+        'total_sec': total,
+        'files_per_sec': sum(files.values()) / total if total else 0.0
+    }
+
+
+def scenario_ingest(main, args):
+    """스냅샷 1회분 추가 후 적재 (정상 운영 중 30초 주기 로더가 하는 일)"""
+    stats = synth.generate(args.workdir, args.cookie, args.wallchain, args.kaito, args.users,
+                           snapshots=1, first_snapshot=args.snapshots, seed=args.seed)
+    start = time.perf_counter()
+    with quiet():
+        files = ingest(main)
+    total = time.perf_counter() - start
+    return {
+        'files': sum(files.values()),
+        'records': stats['records'],
+        'total_sec': total,
+        'records_per_sec': stats['records'] / total if total else 0.0
+    }
+
+
+def scenario_global_update(main):
+    start = time.perf_counter()
+    with quiet():
+        main.update_global_rankings()
+    total = time.perf_counter() - start
+    index = main.GLOBAL_INDEX
+    return {
+        'total_sec': total,
+        'users': len(index) if index is not None else 0,
+        'index_bytes': index.memory_usage()['total'] if index is not None else 0
+    }
+
+
+def _sample_user(db_path, table):
+    with sqlite3.connect(db_path, timeout=30.0) as conn:
+        row = conn.execute(f"SELECT username FROM {table} ORDER BY rowid LIMIT 1").fetchone()
+    return row[0] if row else 'user1'
+
+
+def route_list(main):
+    cookie = sorted(main.project_instances)
+    wallchain = sorted(main.wallchain_instances)
+    kaito = sorted(main.get_cached_kaito_projects())
+    routes = []
+    if cookie:
+        en = next((p for p in cookie if p.endswith('-en')), cookie[0])
+        user = _sample_user(main.project_instances[en].db_path, 'snaps')
+        routes += [
+            ('cookie_leaderboard', f'/{en}/leaderboard', ''),
+            ('cookie_leaderboard_cms', f'/{en}/leaderboard', 'metric=cSnapsPercent'),
+            ('cookie_user', f'/{en}/user/{user}', ''),
+            ('user_search', '/api/user-search', f'q={user[:5]}'),
+            ('user_data', f'/api/user-data/{user}', ''),
+            ('user_data_live', f'/api/user-data/{user}', 'source=live'),
+        ]
+        lang = next((p for p in cookie if not p.endswith('-en')), None)
+        if lang:
+            routes.append(('cookie_leaderboard_lang', f'/{lang}/leaderboard', ''))
+    if wallchain:
+        dp = main.wallchain_instances[wallchain[0]]
+        name = wallchain[0].replace('wallchain-', '')
+        routes += [
+            ('wallchain_leaderboard', f'/wallchain/{name}/leaderboard', ''),
+            ('wallchain_user', f'/wallchain/{name}/user/{_sample_user(dp.db_path, "leaderboard")}', ''),
+        ]
+    if kaito:
+        routes.append(('kaito_leaderboard', f'/kaito/{kaito[0]}/leaderboard', ''))
+    return routes
+
+
+def scenario_routes(main, repeat):
+    """라우트별 cold(페이지/응답 캐시 비움) / warm(캐시 적중) 응답 시간 중앙값"""
+    app = main.build_wsgi_app()
+    results = {}
+    for name, path, query in route_list(main):
+        cold, warm = [], []
+        with quiet():
+            for _ in range(repeat):
+                main.PAGE_CACHE.clear()
+                main.USER_DATA_CACHE.clear()
+                start = time.perf_counter()
+                status, headers, body = wsgi_get(app, path, query)
+                cold.append(time.perf_counter() - start)
+            for _ in range(repeat):
+                start = time.perf_counter()
+                wsgi_get(app, path, query)
+                warm.append(time.perf_counter() - start)
+        results[name] = {
+            'path': path + (f'?{query}' if query else ''),
+            'status': int(status[:3]),
+            'bytes': len(body),
+            'cold_ms': statistics.median(cold) * 1000,
+            'warm_ms': statistics.median(warm) * 1000
+        }
+    return results
+
+
+def run(args):
+    prepare_workdir(args.workdir)
+    gen_start = time.perf_counter()
+    stats = synth.generate(args.workdir, args.cookie, args.wallchain, args.kaito, args.users,
+                           args.snapshots, seed=args.seed)
+    generate_sec = time.perf_counter() - gen_start
+
+    os.chdir(args.workdir)
+    sys.path.insert(0, report.REPO_ROOT)
+    with quiet():
+        main = importlib.import_module('main')
+
+    scenarios = {'generate': dict(stats, total_sec=generate_sec)}
+    scenarios['backfill'] = scenario_backfill(main)
+    scenarios['global_update'] = scenario_global_update(main)
+    scenarios['ingest'] = scenario_ingest(main, args)
+    scenarios['global_update_after_ingest'] = scenario_global_update(main)
+    scenarios['routes'] = scenario_routes(main, args.repeat)
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가짜 데이터 기반 end-to-end 벤치마크')
+    parser.add_argument('--workdir', required=True, help='데이터를 만들 빈 디렉토리')
+    parser.add_argument('--cookie', type=int, default=4)
+    parser.add_argument('--wallchain', type=int, default=2)
+    parser.add_argument('--kaito', type=int, default=4)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--snapshots', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5, help='라우트별 반복 횟수')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--report', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+    args.workdir = os.path.abspath(args.workdir)
+    report_path = os.path.abspath(args.report) if args.report else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    params = {k: v for k, v in vars(args).items() if k not in ('report', 'baseline', 'threshold')}
+    result = report.make_report(run(args), params)
+
+    for name, metrics in result['scenarios'].items():
+        if name == 'routes':
+            for route, r in metrics.items():
+                print(f"  {route:26s} {r['status']}  cold {r['cold_ms']:8.1f} ms  warm {r['warm_ms']:7.2f} ms  "
+                      f"{r['bytes']:>9,} B  {r['path']}")
+        else:
+            print(f"{name:28s} " + '  '.join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                                             for k, v in metrics.items()))
+
+    if report_path:
+        report.save(result, report_path)
+        print(f"결과 저장: {report_path}")
+    if baseline_path:
+        rows = report.compare(report.load(baseline_path), result, args.threshold)
+        report.print_comparison(rows)
+        raise SystemExit(1 if any(r[4] for r in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""
+Waitress 스레드 수 / 연결 수 튜닝용 부하 테스트 (asyncio HTTP 클라이언트, 외부 서비스 없음)
+
+    python -m benchmarks.loadtest --workdir /tmp/sharkapp-load --threads 4,8,16 --connection-limit 100,500 \\
+        --concurrency 8,32,128 --duration 10 --report load.json
+
+workdir에 가짜 데이터를 만들고(이미 있으면 재사용), 서버 설정 조합마다 서버 프로세스를 새로 띄운 뒤
+실제 트래픽과 비슷한 비율의 요청(리더보드 / 유저 페이지 / 유저 검색 / 유저 데이터 API / Kaito 이미지)을
+동시 연결 수를 바꿔 가며 보내서 처리량과 p50 / p90 / p99 응답 시간을 측정합니다.
+클라이언트도 같은 머신의 CPU를 쓰므로 결과는 코어 수를 감안해서 해석하세요.
+측정한 값은 main의 SHARKAPP_THREADS / SHARKAPP_CONNECTION_LIMIT / SHARKAPP_REQUEST_LOOKAHEAD로 적용합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+from benchmarks import e2e, report, synth
+
+# 요청 종류별 비율 (접속 로그 기준 대략적인 비율)
+REQUEST_MIX = {
+    'leaderboard': 30,
+    'user_page': 15,
+    'user_lookup': 5,
+    'user_search': 10,
+    'user_data': 25,
+    'kaito_img': 15,
+}
+SAMPLE_USERS = 200
+READY_TIMEOUT = 600
+
+
+def _percentile(values, ratio):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def _users(db_path, table, limit):
+    with sqlite3.connect(db_path, timeout=30.0) as conn:
+        return [r[0] for r in conn.execute(f"SELECT DISTINCT username FROM {table} LIMIT ?", (limit,))]
+
+
+# ---------- 서버 프로세스 ----------
+
+def prepare_workdir(args):
+    """가짜 데이터 생성 (처음 한 번) + static은 실제 디렉토리로 (Kaito 이미지 캐시를 저장소 static에 쓰지 않도록)"""
+    os.makedirs(args.workdir, exist_ok=True)
+    if not os.path.exists(os.path.join(args.workdir, 'data')):
+        print(f"가짜 데이터 생성 중... ({args.workdir})")
+        synth.generate(args.workdir, args.cookie, args.wallchain, args.kaito, args.users, args.snapshots,
+                       seed=args.seed)
+    static = os.path.join(args.workdir, 'static')
+    if not os.path.exists(static):
+        os.makedirs(static)
+        repo_static = os.path.join(report.REPO_ROOT, 'static')
+        for name in os.listdir(repo_static):
+            if name != 'kaito':
+                os.symlink(os.path.join(repo_static, name), os.path.join(static, name))
+    views = os.path.join(args.workdir, 'views')
+    if not os.path.exists(views):
+        os.symlink(os.path.join(report.REPO_ROOT, 'views'), views)
+
+
+def build_targets(main):
+    """요청 종류별 경로 목록 (유저/이미지는 DB에서 일부 추출, Kaito 이미지는 디스크 캐시에 미리 저장)"""
+    targets = {kind: [] for kind in REQUEST_MIX}
+    users = []
+    for name, dp in sorted(main.project_instances.items()):
+        targets['leaderboard'] += [f'/{name}/leaderboard', f'/{name}/leaderboard?metric=cSnapsPercent']
+        if name.endswith('-en'):
+            project_users = _users(dp.db_path, 'snaps', SAMPLE_USERS)
+            targets['user_page'] += [f'/{name}/user/{u}' for u in project_users[:SAMPLE_USERS // 4]]
+            users += project_users
+    for name, dp in sorted(main.wallchain_instances.items()):
+        short = name.replace('wallchain-', '')
+        targets['leaderboard'].append(f'/wallchain/{short}/leaderboard')
+        targets['user_page'] += [f'/wallchain/{short}/user/{u}'
+                                 for u in _users(dp.db_path, 'leaderboard', SAMPLE_USERS // 4)]
+    for name in sorted(main.get_cached_kaito_projects()):
+        targets['leaderboard'].append(f'/kaito/{name}/leaderboard')
+
+    users = sorted(set(users))
+    targets['user_lookup'] = ['/user-lookup']
+    targets['user_search'] = sorted({f'/api/user-search?q={u[:5]}' for u in users})
+    targets['user_data'] = [f'/api/user-data/{u}' for u in users]
+
+    if main.kaito_processor:
+        with sqlite3.connect(main.kaito_processor.db_path, timeout=30.0) as conn:
+            image_ids = [r[0] for r in conn.execute(
+                "SELECT DISTINCT imageId FROM rankings WHERE imageId != '' LIMIT ?", (SAMPLE_USERS,))]
+        os.makedirs('./static/kaito', exist_ok=True)
+        for image_id in image_ids:
+            path = f'./static/kaito/{image_id}.jpg'
+            if not os.path.exists(path):
+                shutil.copyfile('./static/default.png', path)
+        targets['kaito_img'] = [f'/kaito-img/{i}' for i in image_ids]
+    return {kind: paths for kind, paths in targets.items() if paths}
+
+
+def serve(args):
+    """부하 테스트 대상 서버 (드라이버가 설정 조합마다 별도 프로세스로 실행)"""
+    os.chdir(args.workdir)
+    sys.path.insert(0, report.REPO_ROOT)
+    with e2e.quiet():
+        import main
+        main.load_cookie_config()
+        main.init_projects_on_startup(start_loaders=False)
+        main.init_wallchain_on_startup(start_loaders=False)
+        main.init_kaito_on_startup()
+        e2e.ingest(main)
+        for dp in main.project_instances.values():
+            dp.get_user_languages()
+        if not main.reload_global_index() or not len(main.GLOBAL_INDEX):
+            main.update_global_rankings()
+        targets = build_targets(main)
+
+    from waitress.server import create_server
+    settings = main.waitress_settings(args.threads, args.connection_limit, args.lookahead)
+    server = create_server(main.build_wsgi_app(), host='127.0.0.1', port=args.port, **settings)
+    main.WAITRESS_DISPATCHER = server.task_dispatcher
+    with open(args.ready_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'targets': targets}, f)
+    os.replace(args.ready_file + '.tmp', args.ready_file)
+    sys.stdout = open(os.devnull, 'w')  # 요청 로그 출력 숨김
+    server.run()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, threads, connection_limit):
+    """서버 프로세스 시작 -> (process, port, {'settings', 'targets'})"""
+    port = free_port()
+    ready_file = os.path.join(args.workdir, f'.loadtest-ready-{port}.json')
+    if os.path.exists(ready_file):
+        os.remove(ready_file)
+    command = [sys.executable, '-m', 'benchmarks.loadtest', '--serve', '--workdir', args.workdir,
+               '--port', str(port), '--threads', str(threads), '--connection-limit', str(connection_limit),
+               '--lookahead', str(args.lookahead), '--ready-file', ready_file]
+    log = open(os.path.join(args.workdir, 'loadtest-server.log'), 'ab')
+    process = subprocess.Popen(command, cwd=report.REPO_ROOT, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + READY_TIMEOUT
+    while not os.path.exists(ready_file):
+        if process.poll() is not None:
+            raise SystemExit(f"서버 시작 실패 (loadtest-server.log 참고, exit {process.returncode})")
+        if time.time() > deadline:
+            process.kill()
+            raise SystemExit("서버 시작 시간 초과")
+        time.sleep(0.2)
+    with open(ready_file, encoding='utf-8') as f:
+        info = json.load(f)
+    os.remove(ready_file)
+    return process, port, info
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ---------- asyncio 클라이언트 ----------
+
+async def read_response(reader):
+    """HTTP/1.1 응답 읽기 -> (상태 코드, 본문 크기, keep-alive 여부)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+    size = 0
+    if 'content-length' in headers:
+        size = int(headers['content-length'])
+        await reader.readexactly(size)
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            chunk = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(chunk + 2)
+            if chunk == 0:
+                break
+            size += chunk
+    else:
+        size = len(await reader.read())
+        return status, size, False
+    return status, size, headers.get('connection', '').lower() != 'close'
+
+
+async def client(port, plan, rng, start_at, stop_at, timeout, samples):
+    """연결 하나를 유지하며 stop_at까지 요청 반복 -> samples에 (시작 시각, 종류, 응답 시간, 상태 코드)"""
+    kinds = list(plan)
+    weights = [REQUEST_MIX[k] for k in kinds]
+    reader = writer = None
+    while time.perf_counter() < stop_at:
+        kind = rng.choices(kinds, weights)[0]
+        path = rng.choice(plan[kind])
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            writer.write((f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n'
+                          f'Accept-Encoding: gzip\r\nUser-Agent: sharkapp-loadtest\r\n\r\n').encode())
+            status, _, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            status = 0
+            if writer is not None:
+                writer.close()
+                writer = None
+        if started >= start_at:
+            samples.append((started, kind, time.perf_counter() - started, status))
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(port, plan, concurrency, warmup, duration, timeout, seed):
+    samples = []
+    now = time.perf_counter()
+    start_at, stop_at = now + warmup, now + warmup + duration
+    await asyncio.gather(*(client(port, plan, random.Random(f'{seed}-{i}'), start_at, stop_at, timeout, samples)
+                           for i in range(concurrency)))
+    return samples
+
+
+def summarize(samples, duration):
+    ok = [s for s in samples if 200 <= s[3] < 400 or s[3] == 404]
+    latencies = [s[2] for s in ok]
+    result = {
+        'requests': len(samples),
+        'errors': len(samples) - len(ok),
+        'not_found': sum(1 for s in ok if s[3] == 404),
+        'requests_per_sec': len(ok) / duration,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p90_ms': _percentile(latencies, 0.90) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies) * 1000 if latencies else 0.0,
+        'by_kind': {}
+    }
+    for kind in sorted({s[1] for s in ok}):
+        values = [s[2] for s in ok if s[1] == kind]
+        result['by_kind'][kind] = {'requests': len(values),
+                                   'p50_ms': _percentile(values, 0.50) * 1000,
+                                   'p99_ms': _percentile(values, 0.99) * 1000}
+    return result
+
+
+# ---------- 스윕 ----------
+
+def _int_list(text):
+    return [int(v) for v in text.split(',') if v.strip()]
+
+
+def sweep(args):
+    prepare_workdir(args)
+    scenarios = {}
+    for threads in _int_list(args.threads):
+        for connection_limit in _int_list(args.connection_limit):
+            name = f'threads{threads}_conn{connection_limit}'
+            print(f"\n[{name}] 서버 시작...")
+            process, port, info = start_server(args, threads, connection_limit)
+            try:
+                scenarios[name] = {}
+                for concurrency in _int_list(args.concurrency):
+                    samples = asyncio.run(run_load(port, info['targets'], concurrency, args.warmup, args.duration,
+                                                   args.timeout, args.seed))
+                    result = summarize(samples, args.duration)
+                    scenarios[name][f'c{concurrency}'] = result
+                    print(f"  동시 연결 {concurrency:4d}: {result['requests_per_sec']:8.1f} req/s  "
+                          f"p50 {result['p50_ms']:7.1f} ms  p90 {result['p90_ms']:7.1f} ms  "
+                          f"p99 {result['p99_ms']:8.1f} ms  오류 {result['errors']}")
+            finally:
+                stop_server(process)
+    return scenarios
+
+
+def recommend(scenarios, p99_budget_ms):
+    """동시 연결 수별로 p99 예산 안에서 오류 없이 처리량이 가장 높은 설정"""
+    best = {}
+    for name, levels in scenarios.items():
+        for level, r in levels.items():
+            if r['errors'] or r['p99_ms'] > p99_budget_ms:
+                continue
+            if level not in best or r['requests_per_sec'] > best[level][1]['requests_per_sec']:
+                best[level] = (name, r)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Waitress 스레드/연결 수 부하 테스트')
+    parser.add_argument('--workdir', required=True, help='가짜 데이터/DB를 둘 디렉토리 (재사용 가능)')
+    parser.add_argument('--threads', default='4,8,16', help='Waitress 스레드 수 목록 (쉼표 구분)')
+    parser.add_argument('--connection-limit', default='100', help='Waitress connection_limit 목록')
+    parser.add_argument('--lookahead', type=int, default=10, help='channel_request_lookahead')
+    parser.add_argument('--concurrency', default='8,32,128', help='동시 연결 수 목록')
+    parser.add_argument('--duration', type=float, default=10.0, help='측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='측정 전 예열 시간 (초)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='요청 타임아웃 (초, 초과 시 오류)')
+    parser.add_argument('--p99-budget-ms', type=float, default=500.0, help='추천 설정의 p99 상한')
+    parser.add_argument('--cookie', type=int, default=4)
+    parser.add_argument('--wallchain', type=int, default=2)
+    parser.add_argument('--kaito', type=int, default=4)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--snapshots', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--report', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    # 내부용 - 드라이버가 띄우는 서버 프로세스
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--ready-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.workdir = os.path.abspath(args.workdir)
+
+    if args.serve:
+        args.threads, args.connection_limit = int(args.threads), int(args.connection_limit)
+        serve(args)
+        return
+
+    report_path = os.path.abspath(args.report) if args.report else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    params = {k: v for k, v in vars(args).items()
+              if k not in ('report', 'baseline', 'threshold', 'serve', 'port', 'ready_file')}
+    params['cpu_count'] = os.cpu_count()
+    scenarios = sweep(args)
+
+    print(f"\n추천 설정 (p99 <= {args.p99_budget_ms:.0f} ms, 오류 없음, 처리량 최대):")
+    for level, (name, r) in sorted(recommend(scenarios, args.p99_budget_ms).items(), key=lambda x: int(x[0][1:])):
+        print(f"  동시 연결 {level[1:]:>4s}: {name:24s} {r['requests_per_sec']:8.1f} req/s  p99 {r['p99_ms']:.1f} ms")
+
+    result = report.make_report(scenarios, params)
+    if report_path:
+        report.save(result, report_path)
+        print(f"결과 저장: {report_path}")
+    if baseline_path:
+        rows = report.compare(report.load(baseline_path), result, args.threshold)
+        report.print_comparison(rows)
+        raise SystemExit(1 if any(r[4] for r in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+"""
+핫 함수 회귀 방지 micro-benchmark (함수별 시간 / 최대 메모리 예산 검사)
+
+    python -m benchmarks.micro                                  # 기본 크기, 예산 초과 / 예산 없는 항목이 있으면 exit 1
+    python -m benchmarks.micro --sizes 1000x100,10000x1000 --repeat 7 --report micro.json
+    python -m benchmarks.micro --sizes all --update-budgets     # 현재 측정값 x 여유율로 예산 다시 기록
+
+고정 seed로 만든 가짜 DB(유저 수 x 스냅샷 수)를 --cache-dir에 한 번 만들어 두고 재사용합니다.
+- Cookie / Wallchain / Kaito: 스냅샷마다 유저의 90%가 참여 (진입/이탈 포함), timeframe 1개
+- 글로벌 DB: 유저 수만큼 users 행 (search_users용)
+- Cookie / Wallchain은 적재 때처럼 최근 스냅샷 공유 파일(snapshot_store)도 기록
+측정 대상은 compare_leaderboards(3종, Cookie / Wallchain은 스냅샷 파일 버전과 SQL 버전),
+get_user_history(Cookie/Wallchain), Kaito get_user_data,
+GlobalDataManager.search_users이고, 시간은 repeat회 중 중앙값, 메모리는 tracemalloc 최대값(Python 할당 기준,
+SQLite 내부 캐시는 포함되지 않음)입니다. 예산은 benchmarks/budgets.json에 "함수@유저x스냅샷" 키로 기록합니다.
+예산이 없는 항목도 실패로 처리합니다 (--allow-missing으로 경고만 출력).
+--sizes all은 예산이 있는 크기 전부이고, 100000 유저 크기는 측정 환경에서 돌릴 수 없어 예산 없이 뺐습니다
+(이유는 UNBUDGETED_SIZES, budgets.json meta에도 기록).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import time
+import tracemalloc
+
+import query_profiler
+from benchmarks import report, synth
+from data_processor import DataProcessor
+from data_processor_wallchain import DataProcessorWallchain
+from data_processor_kaito import DataProcessorKaito
+from global_data_manager import GlobalDataManager
+
+DEFAULT_SIZES = '1000x100,1000x1000,10000x100'
+ALL_SIZES = '1000x100,1000x1000,10000x100,10000x1000'
+# 예산을 기록하지 않는 크기 -> 이유 (budgets.json meta에 같이 기록)
+UNBUDGETED_SIZES = {
+    '100000x100': 'kaito.compare_leaderboards(FULL OUTER JOIN)가 유저 수 제곱으로 느려져 1회 약 940초 (10000x1000은 8.4초)',
+    '100000x1000': '소스당 약 9천만 행, 가짜 DB 약 50GB라 측정 환경에서 만들 수 없음',
+}
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+FIXTURE_VERSION = 2  # 가짜 DB 구성이 바뀌면 올려서 캐시 무효화
+PRESENT_RATIO = 0.9
+INSERT_CHUNK = 200000
+
+COOKIE_TF = 'TOTAL'
+WALLCHAIN_TF = 'epoch-2'
+KAITO_PROJECT = 'bench'
+KAITO_TF = '30D'
+
+
+def parse_sizes(text):
+    if text == 'all':
+        text = ALL_SIZES
+    sizes = []
+    for part in text.split(','):
+        users, _, snapshots = part.strip().partition('x')
+        sizes.append((int(users), int(snapshots)))
+    return sizes
+
+
+def cookie_ts(i):
+    return synth.snapshot_time(i).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def kaito_ts(i):
+    return synth.snapshot_time(i).strftime('%Y%m%d_%H%M%S')
+
+
+# ---------- 가짜 DB ----------
+
+def _snapshots(rng, users, snapshots):
+    """스냅샷마다 (번호, [(순위, 유저, 마쉐)]) - 유저별 기본 점수에 노이즈를 더해 순위가 조금씩 바뀜"""
+    base = [rng.paretovariate(1.5) for _ in range(users)]
+    for i in range(snapshots):
+        scored = [(u, base[u] * rng.uniform(0.7, 1.3)) for u in range(users) if rng.random() < PRESENT_RATIO]
+        scored.sort(key=lambda x: -x[1])
+        total = sum(s for _, s in scored) or 1.0
+        yield i, [(rank, u, s / total * 100) for rank, (u, s) in enumerate(scored, 1)]
+
+
+def _insert(db_path, sql, rows):
+    with sqlite3.connect(db_path, timeout=30.0) as conn:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= INSERT_CHUNK:
+                conn.executemany(sql, batch)
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+
+
+def build_fixture(root, users, snapshots, seed):
+    """root 아래에 Cookie / Wallchain / Kaito / 글로벌 DB 생성"""
+    rng = random.Random(seed)
+    for name in ('cookie', 'wallchain'):
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+
+    cookie = DataProcessor(os.path.join(root, 'cookie'))
+    with sqlite3.connect(cookie.db_path, timeout=30.0) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(snaps)")}
+        for col in ('snapsPercentRank', 'primaryLanguage'):
+            if col not in columns:
+                conn.execute(f"ALTER TABLE snaps ADD COLUMN '{col}' TEXT")  # load_data와 같이 TEXT로 추가됨
+    langs = [rng.choice(synth.USER_LANGS) for _ in range(users)]
+    _insert(cookie.db_path, """
+        INSERT INTO snaps (timeframe, username, displayName, snapsPercentRank, cSnapsPercentRank, snapsPercent,
+                           cSnapsPercent, followers, smartFollowers, timestamp, profileImageUrl, primaryLanguage)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((COOKIE_TF, synth.handle(u), f'User {u}', rank, rank, share, share, u * 37 % 90000, u * 13 % 900,
+           cookie_ts(i), f'https://img.example/{u}.png', langs[u])
+          for i, rows in _snapshots(rng, users, snapshots) for rank, u, share in rows))
+
+    wallchain = DataProcessorWallchain(os.path.join(root, 'wallchain'))
+    _insert(wallchain.db_path, """
+        INSERT INTO leaderboard (name, username, imageUrl, rank, score, mindsharePercentage, position,
+                                 positionChange, timeframe, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((f'User {u}', synth.handle(u), f'https://img.example/{u}.png', rank, u % 1000, share, rank, 0,
+           WALLCHAIN_TF, cookie_ts(i))
+          for i, rows in _snapshots(rng, users, snapshots) for rank, u, share in rows))
+
+    cookie.publish_snapshots()
+    wallchain.publish_snapshots()
+
+    kaito = DataProcessorKaito(os.path.join(root, 'kaito', 'kaito_projects.db'))
+    _insert(kaito.db_path, """
+        INSERT INTO rankings (projectName, timeframe, timestamp, rank, handle, displayName, imageId,
+                              mindshare, smartFollower, follower)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, ((KAITO_PROJECT, KAITO_TF, kaito_ts(i), rank, synth.handle(u), f'User {u}', str(1000000 + u),
+           f'{share:.2f}%', f'{u * 13 % 900:,}', f'{u * 37 % 90000 + 100:,}')
+          for i, rows in _snapshots(rng, users, snapshots) for rank, u, share in rows))
+
+    manager = GlobalDataManager(os.path.join(root, 'global_rankings.db'))
+    manager.begin_batch_update()
+    manager.batch_insert_users([(synth.handle(u), f'User {u}', f'https://img.example/{u}.png', u % 1000,
+                                 u * 13 % 900, None, u * 37 % 90000) for u in range(users)])
+    manager.commit_batch_update()
+
+    for path in (cookie.db_path, wallchain.db_path, kaito.db_path):
+        with sqlite3.connect(path, timeout=30.0) as conn:
+            conn.execute('ANALYZE')
+
+
+def fixture(cache_dir, users, snapshots, seed):
+    """캐시된 가짜 DB 경로 (없거나 만들다 중단됐으면 새로 생성)"""
+    root = os.path.join(cache_dir, f'v{FIXTURE_VERSION}-{users}x{snapshots}-s{seed}')
+    done = os.path.join(root, '.complete')
+    if not os.path.exists(done):
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        print(f"가짜 DB 생성 중: {users:,} 유저 x {snapshots:,} 스냅샷 ...", flush=True)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # 프로세서/글로벌 DB 초기화 로그 숨김
+            build_fixture(root, users, snapshots, seed)
+        open(done, 'w').close()
+        print(f"  완료 ({time.perf_counter() - start:.1f}초)", flush=True)
+    return root
+
+
+# ---------- 측정 ----------
+
+def cases(root, users, snapshots, seed):
+    """[(이름, 호출 함수)] - 비교 대상은 마지막 두 스냅샷, 유저는 seed로 고정"""
+    cookie = DataProcessor(os.path.join(root, 'cookie'))
+    wallchain = DataProcessorWallchain(os.path.join(root, 'wallchain'))
+    kaito = DataProcessorKaito(os.path.join(root, 'kaito', 'kaito_projects.db'))
+    manager = GlobalDataManager(os.path.join(root, 'global_rankings.db'))
+
+    prev, curr = max(0, snapshots - 2), snapshots - 1
+    rng = random.Random(seed)
+    names = [synth.handle(u) for u in rng.sample(range(users), min(20, users))]
+    queries = [synth.handle(users // 7)[:6], f'User {users // 3}', 'nobody-matches']
+    cycle = {'history': 0}
+
+    def next_name():
+        cycle['history'] += 1
+        return names[cycle['history'] % len(names)]
+
+    return [
+        ('cookie.compare_leaderboards',
+         lambda: cookie.compare_leaderboards(cookie_ts(prev), cookie_ts(curr), COOKIE_TF)),
+        ('cookie.compare_leaderboards_cms',
+         lambda: cookie.compare_leaderboards(cookie_ts(prev), cookie_ts(curr), COOKIE_TF, 'cSnapsPercent')),
+        ('cookie.compare_leaderboards_sql',
+         lambda: cookie.compare_leaderboards_sql(cookie_ts(prev), cookie_ts(curr), COOKIE_TF)),
+        ('cookie.get_user_history', lambda: cookie.get_user_history(next_name(), COOKIE_TF)),
+        ('wallchain.compare_leaderboards',
+         lambda: wallchain.compare_leaderboards(cookie_ts(prev), cookie_ts(curr), WALLCHAIN_TF)),
+        ('wallchain.compare_leaderboards_sql',
+         lambda: wallchain.compare_leaderboards_sql(cookie_ts(prev), cookie_ts(curr), WALLCHAIN_TF)),
+        ('wallchain.get_user_history', lambda: wallchain.get_user_history(next_name(), WALLCHAIN_TF)),
+        ('kaito.compare_leaderboards',
+         lambda: kaito.compare_leaderboards(KAITO_PROJECT, kaito_ts(prev), kaito_ts(curr), KAITO_TF)),
+        ('kaito.get_user_data', lambda: kaito.get_user_data(KAITO_PROJECT, next_name(), KAITO_TF)),
+        ('global.search_users', lambda: [manager.search_users(q) for q in queries]),
+    ]
+
+
+def measure(func, repeat):
+    """예열 1회 후 repeat회 실행 시간 중앙값/최소값 + tracemalloc 최대 메모리 (추적 오버헤드가 없도록 별도 1회)"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'median_ms': statistics.median(times) * 1000,
+        'best_ms': min(times) * 1000,
+        'peak_mb': peak / 1024 / 1024
+    }
+
+
+def check_budgets(results, budgets):
+    """예산 초과 목록 [(키, 지표, 측정값, 예산)] + 예산이 없는 키 목록"""
+    over, missing = [], []
+    for key, r in results.items():
+        budget = budgets.get(key)
+        if budget is None:
+            missing.append(key)
+            continue
+        if r['median_ms'] > budget['ms']:
+            over.append((key, 'ms', r['median_ms'], budget['ms']))
+        if r['peak_mb'] > budget['peak_mb']:
+            over.append((key, 'peak_mb', r['peak_mb'], budget['peak_mb']))
+    return over, missing
+
+
+def load_budgets(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('budgets', {})
+
+
+def save_budgets(path, results, time_headroom, memory_headroom):
+    """측정값 x 여유율을 예산으로 기록 (기존 키 중 이번에 측정하지 않은 크기는 유지)"""
+    budgets = load_budgets(path)
+    for key, r in results.items():
+        budgets[key] = {'ms': round(max(r['median_ms'] * time_headroom, 1.0), 1),
+                        'peak_mb': round(max(r['peak_mb'] * memory_headroom, 1.0), 1)}
+    meta = report.make_report({})['meta']
+    meta['params'] = {'time_headroom': time_headroom, 'memory_headroom': memory_headroom}
+    meta['unbudgeted_sizes'] = UNBUDGETED_SIZES
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'budgets': dict(sorted(budgets.items()))}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def run(sizes, repeat, cache_dir, seed, only=None):
+    """{'함수@유저x스냅샷': 측정값}"""
+    results = {}
+    for users, snapshots in sizes:
+        root = fixture(cache_dir, users, snapshots, seed)
+        size = f'{users}x{snapshots}'
+        print(f"\n[{size}]")
+        with contextlib.redirect_stdout(io.StringIO()):
+            size_cases = cases(root, users, snapshots, seed)
+        for name, func in size_cases:
+            if only and only not in name:
+                continue
+            r = measure(func, repeat)
+            results[f'{name}@{size}'] = r
+            print(f"  {name:34s} {r['median_ms']:9.2f} ms (best {r['best_ms']:8.2f})  peak {r['peak_mb']:7.1f} MB",
+                  flush=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='핫 함수 시간/메모리 예산 micro-benchmark')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="유저x스냅샷 목록 (쉼표 구분) 또는 'all'")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help='이름에 이 문자열이 들어간 함수만 측정')
+    parser.add_argument('--cache-dir', default=os.path.join(os.environ.get('TMPDIR', '/tmp'), 'sharkapp-micro'),
+                        help='가짜 DB 캐시 디렉토리')
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help='예산 파일')
+    parser.add_argument('--update-budgets', action='store_true', help='측정값 x 여유율로 예산 파일 갱신')
+    parser.add_argument('--time-headroom', type=float, default=3.0, help='예산 갱신 시 시간 여유율')
+    parser.add_argument('--memory-headroom', type=float, default=1.5, help='예산 갱신 시 메모리 여유율')
+    parser.add_argument('--allow-missing', action='store_true', help='예산이 없는 항목은 경고만 출력 (기본: 실패)')
+    parser.add_argument('--report', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    query_profiler.PROFILER.slow_seconds = float('inf')  # 측정 중 슬로우 쿼리 로그/EXPLAIN 생략
+    results = run(parse_sizes(args.sizes), args.repeat, args.cache_dir, args.seed, args.only)
+
+    if args.report:
+        report.save(report.make_report(results, {k: v for k, v in vars(args).items()
+                                                 if k not in ('report', 'baseline', 'threshold')}), args.report)
+        print(f"\n결과 저장: {args.report}")
+    if args.update_budgets:
+        save_budgets(args.budgets, results, args.time_headroom, args.memory_headroom)
+        print(f"\n예산 갱신: {args.budgets} ({len(results)}개)")
+        return
+
+    failed = False
+    if args.baseline:
+        current = report.make_report(results)
+        rows = report.compare(report.load(args.baseline), current, args.threshold)
+        report.print_comparison(rows)
+        failed = any(r[4] for r in rows)
+
+    over, missing = check_budgets(results, load_budgets(args.budgets))
+    if missing:
+        print(f"\n예산 없음 ({len(missing)}개): {', '.join(missing)}")
+    if over:
+        print(f"\n*** 예산 초과 {len(over)}건 ***")
+        for key, metric, value, budget in over:
+            print(f"  FAIL {key:50s} {metric:8s} {value:10.2f} > {budget:10.2f}")
+    elif not missing:
+        print("\n모든 항목이 예산 이내")
+    raise SystemExit(1 if over or failed or (missing and not args.allow_missing) else 0)
+
+
+if __name__ == '__main__':
+    main()
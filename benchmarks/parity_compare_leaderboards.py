@@ -0,0 +1,217 @@
+"""
+compare_leaderboards SQL 버전 vs 기존 pandas 버전 vs 스냅샷 파일(snapshot_store) 버전 결과 비교 (Cookie / Wallchain)
+
+    python -m benchmarks.parity_compare_leaderboards --users 5000 --repeat 3
+
+임시 DB에 가짜 스냅샷 두 개(진입/이탈, 문자열 순위, 빈 값, 500위 이상 변동 포함)를 만들고
+세 구현의 컬럼/값/정렬이 같은지 확인한 뒤, 실행 시간과 최대 메모리(tracemalloc)를 출력합니다.
+스냅샷 파일 버전은 SQL 버전과 행 순서까지 같아야 합니다.
+"""
+import argparse
+import math
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_processor import DataProcessor
+from data_processor_wallchain import DataProcessorWallchain
+
+TS1 = '2025-01-01 00:00:00'
+TS2 = '2025-01-02 00:00:00'
+LANGS = ['en', 'ko', 'zh', 'ja', None]
+
+
+def _snapshot_users(rng, users):
+    """두 스냅샷에 들어갈 유저 (10%는 이전에만, 10%는 현재에만 존재)"""
+    names = np.array([f'user{i}' for i in range(users)])
+    where = rng.random(users)
+    prev = names[where >= 0.1]
+    curr = names[(where < 0.1) | (where >= 0.2)]
+    return prev, curr
+
+
+def _fill_cookie(db_path, users, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for ts, names in zip((TS1, TS2), _snapshot_users(rng, users)):
+        n = len(names)
+        ranks = rng.permutation(n) + 1
+        c_ranks = rng.permutation(n) + 1
+        # 실제 DB처럼 일부 순위는 문자열/빈 값/None
+        rank_values = [str(r) if i % 7 == 0 else ('' if i % 97 == 0 else (None if i % 89 == 0 else int(r)))
+                       for i, r in enumerate(ranks)]
+        frames.append(pd.DataFrame({
+            'timeframe': 'TOTAL',
+            'username': names,
+            'displayName': [None if i % 50 == 0 else f'User {u}' for i, u in enumerate(names)],
+            'snapsPercentRank': rank_values,
+            'cSnapsPercentRank': c_ranks,
+            'snapsPercent': np.round(rng.random(n), 6),
+            'cSnapsPercent': np.where(rng.random(n) < 0.02, np.nan, np.round(rng.random(n), 6)),
+            'timestamp': ts,
+            'profileImageUrl': [f'https://img.example/{u}.png' for u in names],
+            'primaryLanguage': [LANGS[i % len(LANGS)] for i in range(n)],
+        }))
+
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(snaps)")}
+        for col in ('snapsPercentRank', 'primaryLanguage'):
+            if col not in columns:
+                # load_data와 같이 새 컬럼은 TEXT로 추가됨
+                conn.execute(f"ALTER TABLE snaps ADD COLUMN '{col}' TEXT")
+        pd.concat(frames).to_sql('snaps', conn, if_exists='append', index=False)
+
+
+def _fill_wallchain(db_path, users, seed):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for ts, names in zip((TS1, TS2), _snapshot_users(rng, users)):
+        n = len(names)
+        frames.append(pd.DataFrame({
+            'name': [None if i % 40 == 0 else f'User {u}' for i, u in enumerate(names)],
+            'username': names,
+            'imageUrl': [f'https://img.example/{u}.png' for u in names],
+            'mindsharePercentage': np.round(rng.random(n), 6),
+            'position': rng.permutation(n) + 1,
+            'timeframe': 'epoch-2',
+            'timestamp': ts,
+        }))
+    with sqlite3.connect(db_path) as conn:
+        pd.concat(frames).to_sql('leaderboard', conn, if_exists='append', index=False)
+
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        a = None
+    if isinstance(b, float) and math.isnan(b):
+        b = None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=0, abs_tol=1e-12)
+    return a == b
+
+
+def check_parity(legacy, result, key='username', order_by=()):
+    """컬럼 집합, 유저별 값, 정렬 키 순서가 같은지 확인 -> 틀린 항목 목록 반환"""
+    problems = []
+    if list(legacy.columns) != list(result.columns):
+        problems.append(f'columns: {list(legacy.columns)} != {list(result.columns)}')
+        return problems
+    if len(legacy) != len(result):
+        problems.append(f'rows: {len(legacy)} != {len(result)}')
+        return problems
+
+    rows = {r[key]: r for r in legacy.to_dict('records')}
+    data = result.to_dict()
+    for i, name in enumerate(data[key]):
+        expected = rows.get(name)
+        if expected is None:
+            problems.append(f'unexpected row: {name}')
+            continue
+        for col in result.columns:
+            if not _same(expected[col], data[col][i]):
+                problems.append(f'{name}.{col}: {expected[col]!r} != {data[col][i]!r}')
+
+    # pandas 정렬은 동점 순서가 정해져 있지 않으므로 정렬 키 값의 순서만 비교
+    for col in order_by:
+        if [float(v) for v in legacy[col]] != [float(v) for v in data[col]]:
+            problems.append(f'order by {col} differs')
+    return problems[:20]
+
+
+def check_identical(expected, result):
+    """행 순서까지 같은지 확인 (SQL 버전 vs 스냅샷 파일 버전) -> 틀린 항목 목록 반환"""
+    if list(expected.columns) != list(result.columns):
+        return [f'columns: {list(expected.columns)} != {list(result.columns)}']
+    problems = []
+    a, b = expected.to_dict(), result.to_dict()
+    for col in expected.columns:
+        for i, (x, y) in enumerate(zip(a[col], b[col])):
+            if not _same(x, y):
+                problems.append(f'row {i} {col}: {x!r} != {y!r}')
+                break
+    if len(expected) != len(result):
+        problems.append(f'rows: {len(expected)} != {len(result)}')
+    return problems[:20]
+
+
+def measure(func, repeat):
+    """repeat회 중 최소 시간 + tracemalloc 최대 메모리 (benchmarks.micro와 같이 추적 오버헤드가 없도록 별도 1회)"""
+    func()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run(users=5000, repeat=3, seed=7):
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        cookie_dir = os.path.join(tmp, 'cookie')
+        wall_dir = os.path.join(tmp, 'wallchain')
+        os.makedirs(cookie_dir)
+        os.makedirs(wall_dir)
+
+        dp = DataProcessor(cookie_dir)
+        _fill_cookie(dp.db_path, users, seed)
+        wp = DataProcessorWallchain(wall_dir)
+        _fill_wallchain(wp.db_path, users, seed)
+
+        cases = [
+            ('cookie snapsPercent', dp, (TS1, TS2, 'TOTAL', 'snapsPercent'), ('rank_change',)),
+            ('cookie cSnapsPercent', dp, (TS1, TS2, 'TOTAL', 'cSnapsPercent'), ('rank_change',)),
+            ('wallchain', wp, (TS1, TS2, 'epoch-2'), ('curr_position', 'prev_position')),
+        ]
+        dp.publish_snapshots()
+        wp.publish_snapshots()
+        for name, processor, args, order_by in cases:
+            legacy = processor.compare_leaderboards_pandas(*args)
+            result = processor.compare_leaderboards_sql(*args)
+            stored = processor.compare_leaderboards(*args)  # 스냅샷 파일 사용
+            legacy_time, legacy_mem = measure(lambda: processor.compare_leaderboards_pandas(*args), repeat)
+            sql_time, sql_mem = measure(lambda: processor.compare_leaderboards_sql(*args), repeat)
+            store_time, store_mem = measure(lambda: processor.compare_leaderboards(*args), repeat)
+            report[name] = {
+                'rows': len(result),
+                'problems': check_parity(legacy, result, order_by=order_by) + check_identical(result, stored),
+                'store_hits': processor.snapshots.hits,
+                'pandas_sec': legacy_time,
+                'sql_sec': sql_time,
+                'store_sec': store_time,
+                'pandas_peak_bytes': legacy_mem,
+                'sql_peak_bytes': sql_mem,
+                'store_peak_bytes': store_mem
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='compare_leaderboards SQL/pandas/스냅샷 파일 결과 비교')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    ok = True
+    for name, r in run(args.users, args.repeat).items():
+        ok = ok and not r['problems']
+        print(f"{name}: {r['rows']:,} rows  (결과 일치: {'OK' if not r['problems'] else 'MISMATCH'})")
+        for problem in r['problems']:
+            print(f"    {problem}")
+        print(f"  pandas : {r['pandas_sec'] * 1000:8.1f} ms  peak {r['pandas_peak_bytes'] / 1024 / 1024:6.1f} MB")
+        print(f"  SQL    : {r['sql_sec'] * 1000:8.1f} ms  peak {r['sql_peak_bytes'] / 1024 / 1024:6.1f} MB")
+        print(f"  store  : {r['store_sec'] * 1000:8.1f} ms  peak {r['store_peak_bytes'] / 1024 / 1024:6.1f} MB")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+벤치마크 결과 JSON 저장 / 이전 결과와 비교
+
+    python -m benchmarks.report baseline.json current.json --threshold 0.2
+
+결과 형식: {"meta": {...}, "scenarios": {"시나리오": {"지표": 값, ...}, ...}}
+지표 이름이 _sec / _ms 로 끝나면 시간(작을수록 좋음), _per_sec 로 끝나면 처리량(클수록 좋음)으로 비교합니다.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def make_report(scenarios, params=None):
+    return {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'git': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'params': params or {}
+        },
+        'scenarios': scenarios
+    }
+
+
+def save(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _metrics(scenarios, prefix=''):
+    """중첩된 시나리오 결과를 {'시나리오.지표': 값}으로 펼침 (숫자만)"""
+    flat = {}
+    for key, value in scenarios.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(_metrics(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    시간/처리량 지표 비교 -> [(지표, 이전 값, 현재 값, 변화율, 회귀 여부), ...]
+    변화율은 '나빠진 정도' 기준 (+0.3 = 30% 느려짐/처리량 감소)
+    """
+    before = _metrics(baseline.get('scenarios', {}))
+    after = _metrics(current.get('scenarios', {}))
+    rows = []
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        if name.endswith('_per_sec'):
+            change = (old - new) / old if old else 0.0
+        elif name.endswith(('_sec', '_ms')):
+            change = (new - old) / old if old else 0.0
+        else:
+            continue
+        rows.append((name, old, new, change, change > threshold))
+    return rows
+
+
+def print_comparison(rows):
+    for name, old, new, change, regressed in rows:
+        mark = 'REGRESSION' if regressed else ''
+        print(f"{name:60s} {old:12.4f} -> {new:12.4f}  {change * 100:+7.1f}%  {mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크 결과 비교')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.2, help='회귀로 볼 악화 비율 (기본 20%%)')
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.current), args.threshold)
+    print_comparison(rows)
+    raise SystemExit(1 if any(r[4] for r in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
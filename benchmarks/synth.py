@@ -0,0 +1,191 @@
+"""
+운영 환경 규모의 가짜 스냅샷 파일 생성기 (Cookie / Wallchain / Kaito)
+
+    python -m benchmarks.synth --out /tmp/sharkapp-bench --cookie 4 --wallchain 2 --kaito 4 --users 5000 --snapshots 4
+
+<out>/data 아래에 실제 수집기와 같은 폴더 구조/파일 형식으로 JSON 파일을 만듭니다.
+- Cookie   : data/cookie/<프로젝트>/<언어>/<TF>/<YYYYmmdd_HHMMSS>_snaps.json  (result.data.json.snaps / cSnaps)
+- Wallchain: data/wallchain/<프로젝트>/global/<TF>/<YYYYmmdd_HHMMSS>.json   (entries + xInfo 페이지 목록)
+- Kaito    : data/kaito/<프로젝트>/global/<TF>/<YYYYmmdd_HHMMSS>.json       (rank/handle/mindshare 목록)
+같은 seed면 같은 파일이 만들어지고, first_snapshot을 늘려 호출하면 이후 시점 스냅샷만 추가됩니다.
+"""
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+COOKIE_TIMEFRAMES = ('7D', '30D', 'TOTAL')
+COOKIE_LANGS = ('en', 'ko')
+WALLCHAIN_TIMEFRAMES = ('7d', 'epoch_2')
+KAITO_TIMEFRAMES = ('7D', '30D')
+USER_LANGS = ('en', 'ko', 'zh', 'ja', 'es', None)
+
+START = datetime(2025, 1, 1)
+STEP_HOURS = 6
+WALLCHAIN_PAGE_SIZE = 100
+
+
+def handle(i):
+    return f'user{i}'
+
+
+def snapshot_time(index):
+    return START + timedelta(hours=STEP_HOURS * index)
+
+
+def _members(rng, users, ratio):
+    """프로젝트 참여 유저 (전체 유저 중 일부, 유저마다 기본 점수 고정)"""
+    members = rng.sample(range(users), max(1, int(users * ratio)))
+    return [(u, rng.paretovariate(1.5)) for u in members]
+
+
+def _scores(rng, members):
+    """스냅샷마다 기본 점수에 노이즈를 더해 순위가 조금씩 바뀌도록"""
+    scored = [(u, base * rng.uniform(0.7, 1.3)) for u, base in members]
+    scored.sort(key=lambda x: -x[1])
+    total = sum(s for _, s in scored) or 1.0
+    return [(u, s / total * 100) for u, s in scored]
+
+
+def _write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+
+
+def cookie_snapshot(rng, members, user_langs):
+    snaps, csnaps = [], []
+    for rank, (u, share) in enumerate(_scores(rng, members), 1):
+        snaps.append({
+            'id': f'c{u}',
+            'username': handle(u),
+            'displayName': f'User {u}',
+            'profileImageUrl': f'https://pbs.example/profile/{u}.jpg',
+            'rank': rank,
+            'snapsPercentRank': rank,
+            'snapsPercent': round(share, 6),
+            'cSnapsPercent': round(share * rng.uniform(0.5, 1.5), 6),
+            'followers': u * 37 % 90000 + 100,
+            'smartFollowers': u * 13 % 900,
+            'primaryLanguage': user_langs[u],
+            'smartFollowersDetails': [{'username': handle((u + k) % len(user_langs))} for k in range(3)]
+        })
+    # cSnaps 순위는 cSnapsPercent 기준, 일부 유저는 cSnaps에만 존재
+    for rank, snap in enumerate(sorted(snaps, key=lambda s: -s['cSnapsPercent']), 1):
+        snap['cSnapsPercentRank'] = rank
+    for snap in snaps[::20]:
+        csnaps.append(dict(snap, username=snap['username'] + '_c', id=snap['id'] + '_c'))
+    return {'result': {'data': {'json': {'snaps': snaps, 'cSnaps': csnaps}}}}
+
+
+def wallchain_snapshot(rng, members):
+    entries = []
+    for position, (u, share) in enumerate(_scores(rng, members), 1):
+        entries.append({
+            'xInfo': {
+                'id': f'w{u}',
+                'name': f'User {u}',
+                'username': handle(u),
+                'imageUrl': f'https://pbs.example/profile/{u}.jpg',
+                'rank': position,
+                'score': int(share * 1000),
+                'scorePercentile': round(1 - position / len(members), 4),
+                'scoreQuantile': position * 10 // len(members)
+            },
+            'mindsharePercentage': round(share, 6),
+            'relativeMindshare': round(share * len(members) / 100, 4),
+            'appUseMultiplier': 1.0,
+            'position': position,
+            'positionChange': rng.randint(-20, 20)
+        })
+    return [{'page': i // WALLCHAIN_PAGE_SIZE + 1, 'entries': entries[i:i + WALLCHAIN_PAGE_SIZE]}
+            for i in range(0, len(entries), WALLCHAIN_PAGE_SIZE)]
+
+
+def kaito_snapshot(rng, members):
+    return [{
+        'rank': rank,
+        'handle': handle(u),
+        'displayName': f'User {u}',
+        'imageId': str(1000000 + u),
+        'mindshare': f'{share:.2f}%',
+        'smartFollower': f'{u * 13 % 900:,}',
+        'follower': f'{u * 37 % 90000 + 100:,}'
+    } for rank, (u, share) in enumerate(_scores(rng, members), 1)]
+
+
+def generate(out_dir, cookie=4, wallchain=2, kaito=4, users=5000, snapshots=4, first_snapshot=0,
+             cookie_langs=COOKIE_LANGS, cookie_timeframes=COOKIE_TIMEFRAMES,
+             wallchain_timeframes=WALLCHAIN_TIMEFRAMES, kaito_timeframes=KAITO_TIMEFRAMES, seed=1):
+    """
+    out_dir/data 아래에 스냅샷 [first_snapshot, first_snapshot + snapshots) 생성 -> 생성한 파일 수와 레코드 수
+    (프로젝트 참여 유저/언어는 seed로 고정이므로 이어서 생성해도 같은 유저 집합)
+    """
+    data_dir = os.path.join(out_dir, 'data')
+    base = random.Random(seed)
+    user_langs = [base.choice(USER_LANGS) for _ in range(users)]
+    stats = {'files': 0, 'records': 0}
+
+    def emit(path, payload, records):
+        _write(path, payload)
+        stats['files'] += 1
+        stats['records'] += records
+
+    for p in range(cookie):
+        for lang in cookie_langs:
+            members = _members(random.Random(f'{seed}-cookie-{p}-{lang}'), users, 0.4 if lang == 'en' else 0.1)
+            for tf in cookie_timeframes:
+                for i in range(first_snapshot, first_snapshot + snapshots):
+                    rng = random.Random(f'{seed}-cookie-{p}-{lang}-{tf}-{i}')
+                    name = snapshot_time(i).strftime('%Y%m%d_%H%M%S') + '_snaps.json'
+                    emit(os.path.join(data_dir, 'cookie', f'project{p}', lang, tf, name),
+                         cookie_snapshot(rng, members, user_langs), len(members))
+
+    for p in range(wallchain):
+        members = _members(random.Random(f'{seed}-wallchain-{p}'), users, 0.3)
+        for tf in wallchain_timeframes:
+            for i in range(first_snapshot, first_snapshot + snapshots):
+                rng = random.Random(f'{seed}-wallchain-{p}-{tf}-{i}')
+                name = snapshot_time(i).strftime('%Y%m%d_%H%M%S') + '.json'
+                emit(os.path.join(data_dir, 'wallchain', f'chain{p}', 'global', tf, name),
+                     wallchain_snapshot(rng, members), len(members))
+
+    for p in range(kaito):
+        members = _members(random.Random(f'{seed}-kaito-{p}'), users, 0.2)
+        for tf in kaito_timeframes:
+            for i in range(first_snapshot, first_snapshot + snapshots):
+                rng = random.Random(f'{seed}-kaito-{p}-{tf}-{i}')
+                name = snapshot_time(i).strftime('%Y%m%d_%H%M%S') + '.json'
+                emit(os.path.join(data_dir, 'kaito', f'kproject{p}', 'global', tf, name),
+                     kaito_snapshot(rng, members), len(members))
+
+    if cookie and first_snapshot == 0:
+        # 언어별 리워드 설정 (-en 리더보드 언어 제외 경로가 실행되도록)
+        _write(os.path.join(data_dir, 'cookie', 'cookie_config.json'), {
+            'snaps_reward_langs': {f'project{p}': [l for l in cookie_langs if l != 'en'] for p in range(cookie)},
+            'csnaps_reward_langs': {},
+            'ended_projects': []
+        })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가짜 Cookie/Wallchain/Kaito 스냅샷 파일 생성')
+    parser.add_argument('--out', required=True, help='출력 디렉토리 (그 아래 data/ 생성)')
+    parser.add_argument('--cookie', type=int, default=4, help='Cookie 프로젝트 수 (언어별로 en/ko 폴더)')
+    parser.add_argument('--wallchain', type=int, default=2)
+    parser.add_argument('--kaito', type=int, default=4)
+    parser.add_argument('--users', type=int, default=5000, help='전체 유저 수 (프로젝트마다 일부만 참여)')
+    parser.add_argument('--snapshots', type=int, default=4, help='timeframe별 스냅샷 수')
+    parser.add_argument('--first-snapshot', type=int, default=0, help='이어서 생성할 때 시작 스냅샷 번호')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    stats = generate(args.out, args.cookie, args.wallchain, args.kaito, args.users,
+                     args.snapshots, args.first_snapshot, seed=args.seed)
+    print(f"{stats['files']:,}개 파일, {stats['records']:,}개 레코드 생성 -> {os.path.join(args.out, 'data')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+import os
+import gzip
+import hashlib
+import mimetypes
+from email.utils import formatdate
+
+try:
+    import brotli  # 선택 의존성 (pip install brotli) - 없으면 gzip만 사용
+except ImportError:
+    brotli = None
+
+# 압축 대상 Content-Type (이미지/폰트 등 이미 압축된 형식은 제외)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+
+STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_compressible(content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding):
+    """Accept-Encoding 헤더에서 사용할 인코딩 선택 (br > gzip), 지원하지 않으면 None"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0 or (accepted.get('*', 0) > 0 and 'gzip' not in accepted):
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding, level=6):
+    if encoding == 'br':
+        return brotli.compress(body, quality=min(level, 11))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def weaken_etag(etag):
+    """압축 응답은 원본과 바이트가 다르므로 strong ETag를 weak ETag로 변경"""
+    if etag and not etag.startswith('W/'):
+        return 'W/' + etag
+    return etag
+
+
+class StaticAssetCache:
+    """
+    /static 하위 텍스트 파일(css/js/svg 등)을 시작 시 미리 압축해 메모리에 보관
+    (파일 변경은 서버 재시작 또는 reload() 호출 시 반영)
+    """
+
+    def __init__(self, static_root, min_size=1024, level=9):
+        self.static_root = static_root
+        self.min_size = min_size
+        self.level = level
+        self.entries = {}  # {상대경로: {'identity': bytes, 'gzip': bytes, 'br': bytes, ...}}
+        self.reload()
+
+    def reload(self):
+        entries = {}
+        if not os.path.isdir(self.static_root):
+            self.entries = entries
+            return
+
+        for dirpath, _, filenames in os.walk(self.static_root):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                content_type, _ = mimetypes.guess_type(filename)
+                if not is_compressible(content_type):
+                    continue
+                try:
+                    with open(file_path, 'rb') as f:
+                        raw = f.read()
+                    mtime = os.path.getmtime(file_path)
+                except OSError:
+                    continue
+
+                if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                    content_type += '; charset=UTF-8'
+
+                entry = {
+                    'content_type': content_type,
+                    'last_modified': formatdate(mtime, usegmt=True),
+                    'etag': '"%s"' % hashlib.md5(raw).hexdigest(),
+                    'identity': raw
+                }
+                # 작은 파일은 압축 이득이 없으므로 원본만 보관
+                if len(raw) >= self.min_size:
+                    entry['gzip'] = compress(raw, 'gzip', self.level)
+                    if brotli is not None:
+                        entry['br'] = compress(raw, 'br', 11)
+
+                rel_path = os.path.relpath(file_path, self.static_root).replace(os.sep, '/')
+                entries[rel_path] = entry
+
+        # 통째로 교체 (요청 스레드는 항상 완성된 dict만 봄)
+        self.entries = entries
+        total = sum(len(e['identity']) for e in entries.values())
+        compressed = sum(len(e.get('gzip', e['identity'])) for e in entries.values())
+        print(f"[정적 파일 캐시] {len(entries)}개 파일 사전 압축 ({total:,} -> {compressed:,} bytes, gzip)")
+
+    def get(self, rel_path):
+        return self.entries.get(rel_path)
+
+    def memory_bytes(self):
+        return sum(len(v) for e in self.entries.values() for k, v in e.items()
+                   if k in ('identity', 'gzip', 'br'))
+
+
+class CompressionMiddleware:
+    """
+    Bottle 앱을 감싸는 WSGI 압축 레이어
+    - Accept-Encoding 협상 후 텍스트/JSON 응답을 min_size 이상일 때만 압축
+    - /static 파일은 StaticAssetCache에서 사전 압축된 바이트를 바로 반환
+    """
+
+    def __init__(self, app, min_size=1024, level=6, static_root=None):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.static_cache = StaticAssetCache(static_root, min_size=min_size) if static_root else None
+        self.compressed_responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        method = environ.get('REQUEST_METHOD', 'GET')
+
+        if self.static_cache and method in ('GET', 'HEAD') and 'HTTP_RANGE' not in environ:
+            rel_path = self._static_rel_path(environ.get('PATH_INFO', ''))
+            entry = self.static_cache.get(rel_path) if rel_path else None
+            if entry:
+                return self._serve_static(entry, encoding, environ, start_response)
+
+        captured = {}
+        written = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            captured['exc_info'] = exc_info
+            return written.append
+
+        result = self.app(environ, capture_start_response)
+
+        status = captured.get('status')
+        headers = captured.get('headers')
+        if status is None:
+            # start_response를 나중에 호출하는 앱 대비 - 그대로 통과
+            return self._passthrough(result, start_response, captured, written)
+
+        header_map = {k.lower(): v for k, v in headers}
+        content_type = header_map.get('content-type', '')
+        compressible = is_compressible(content_type) and 'content-encoding' not in header_map
+        status_code = status[:3]
+
+        if compressible:
+            headers = self._add_vary(headers)
+
+        if (not compressible or encoding is None or method == 'HEAD'
+                or status_code in ('204', '304') or status_code.startswith('1')):
+            start_response(status, headers, captured.get('exc_info'))
+            return self._chain(written, result)
+
+        try:
+            body = b''.join(written) + b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        if len(body) < self.min_size:
+            start_response(status, headers, captured.get('exc_info'))
+            return [body]
+
+        compressed = compress(body, encoding, self.level)
+        self.compressed_responses += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+
+        new_headers = []
+        for key, value in headers:
+            lower = key.lower()
+            if lower == 'content-length':
+                continue
+            if lower == 'etag':
+                value = weaken_etag(value)
+            new_headers.append((key, value))
+        new_headers.append(('Content-Encoding', encoding))
+        new_headers.append(('Content-Length', str(len(compressed))))
+        start_response(status, new_headers, captured.get('exc_info'))
+        return [compressed]
+
+    @staticmethod
+    def _static_rel_path(path):
+        # /static/css/a.css 또는 /<project>/static/css/a.css
+        if path.startswith('/static/'):
+            return path[len('/static/'):]
+        parts = path.split('/', 3)
+        if len(parts) == 4 and parts[2] == 'static':
+            return parts[3]
+        return None
+
+    @staticmethod
+    def _add_vary(headers):
+        for i, (key, value) in enumerate(headers):
+            if key.lower() == 'vary':
+                if 'accept-encoding' not in value.lower():
+                    headers = list(headers)
+                    headers[i] = (key, value + ', Accept-Encoding')
+                return headers
+        return list(headers) + [('Vary', 'Accept-Encoding')]
+
+    def _serve_static(self, entry, encoding, environ, start_response):
+        body = entry.get(encoding) if encoding else None
+        etag = entry['etag']
+        headers = [
+            ('Content-Type', entry['content_type']),
+            ('Cache-Control', STATIC_CACHE_CONTROL),
+            ('Last-Modified', entry['last_modified']),
+            ('Vary', 'Accept-Encoding')
+        ]
+        if body is not None:
+            headers.append(('Content-Encoding', encoding))
+            etag = weaken_etag(etag)
+        else:
+            body = entry['identity']
+        headers.append(('ETag', etag))
+
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH', '')
+        if if_none_match and entry['etag'].strip('"') in if_none_match:
+            start_response('304 Not Modified', headers)
+            return [b'']
+
+        headers.append(('Content-Length', str(len(body))))
+        start_response('200 OK', headers)
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return [b'']
+        return [body]
+
+    @staticmethod
+    def _chain(written, result):
+        if not written:
+            return result
+
+        def generate():
+            try:
+                for chunk in written:
+                    yield chunk
+                for chunk in result:
+                    yield chunk
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        return generate()
+
+    def _passthrough(self, result, start_response, captured, written):
+        def generate():
+            try:
+                for chunk in result:
+                    if 'sent' not in captured:
+                        start_response(captured['status'], captured['headers'], captured.get('exc_info'))
+                        captured['sent'] = True
+                        for early in written:
+                            yield early
+                    yield chunk
+                if 'sent' not in captured and 'status' in captured:
+                    start_response(captured['status'], captured['headers'], captured.get('exc_info'))
+                    for early in written:
+                        yield early
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        return generate()
+
+    def stats(self):
+        return {
+            'compressed_responses': self.compressed_responses,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'static_files': len(self.static_cache.entries) if self.static_cache else 0,
+            'static_cache_bytes': self.static_cache.memory_bytes() if self.static_cache else 0
+        }
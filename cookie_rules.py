@@ -0,0 +1,139 @@
+"""
+cookie_config.json을 요청 처리용 조회 테이블로 컴파일
+
+- 프로젝트별 리워드 언어 -> frozenset
+- (프로젝트, 언어) -> 표시할 metric / api_user_data에서 숨길 필드
+- 설정 파일이 바뀌면 새 CookieRules를 만들어 통째로 교체 (요청 스레드는 읽기만 함)
+
+    python cookie_rules.py    # 문자열 / 리스트 형식 언어 설정 컴파일 결과 점검
+"""
+
+METRIC_SNAPS = {'value': 'snapsPercent', 'label': 'Mindshare'}
+METRIC_CSNAPS = {'value': 'cSnapsPercent', 'label': 'cMindshare'}
+ALL_METRICS = (METRIC_SNAPS, METRIC_CSNAPS)
+
+HIDE_MS = ('ms', 'msRank')
+HIDE_CMS = ('cms', 'cmsRank')
+
+EMPTY = frozenset()
+
+
+def lang_set(langs):
+    """언어 설정 값 -> frozenset ("ko,es" 문자열, ["ko", "es"] / ["ko,es"] 리스트 모두 언어 단위로 나눔)"""
+    if isinstance(langs, str):
+        langs = [langs]
+    result = set()
+    for item in langs or ():
+        if isinstance(item, str):
+            result.update(l.strip() for l in item.split(',') if l.strip())
+        elif item is not None:
+            result.add(item)
+    return frozenset(result)
+
+
+def split_project(project_name):
+    """'superform-ko' -> ('superform', 'ko'), 언어 없는 프로젝트는 (이름, None)"""
+    if '-' in project_name:
+        base, lang = project_name.rsplit('-', 1)
+        return base, lang
+    return project_name, None
+
+
+class CookieRules:
+    """컴파일된 Cookie 필터링 규칙 (불변)"""
+
+    def __init__(self, raw_config=None, version=0):
+        raw_config = raw_config or {}
+        self.version = version
+        self.snaps_reward_langs = {p: lang_set(l) for p, l in raw_config.get('snaps_reward_langs', {}).items()}
+        self.csnaps_reward_langs = {p: lang_set(l) for p, l in raw_config.get('csnaps_reward_langs', {}).items()}
+        self.default_snaps_exclude = tuple(raw_config.get('default_snaps_exclude', []))
+        self.default_csnaps_exclude = tuple(raw_config.get('default_csnaps_exclude', []))
+        self.ended_projects = frozenset(raw_config.get('ended_projects', []))
+
+        # (프로젝트, 언어) 조회 테이블 - 설정에 등장하는 조합만 만들고 나머지는 기본값
+        self._exclude = {}        # {(프로젝트, metric): frozenset(언어)}
+        self._lang_metrics = {}   # {(프로젝트, 언어): 언어별 프로젝트에서 표시할 metric}
+        self._en_metrics = {}     # {(프로젝트, 유저 언어): -en 프로젝트에서 표시할 metric}
+        self._lang_hidden = {}    # {(프로젝트, 언어): 언어별 프로젝트에서 숨길 필드}
+        self._en_hidden = {}      # {(프로젝트, 유저 언어): -en 프로젝트에서 숨길 필드}
+
+        for project in set(self.snaps_reward_langs) | set(self.csnaps_reward_langs):
+            snaps = self.snaps_reward_langs.get(project, EMPTY)
+            csnaps = self.csnaps_reward_langs.get(project, EMPTY)
+            for metric in ('snapsPercent', 'snaps'):
+                self._exclude[(project, metric)] = snaps
+            for metric in ('cSnapsPercent', 'cSnaps'):
+                self._exclude[(project, metric)] = csnaps
+
+            for lang in snaps | csnaps:
+                # 언어별 프로젝트: 해당 언어가 리워드를 받는 metric만 표시
+                metrics = tuple(m for m, langs in ((METRIC_SNAPS, snaps), (METRIC_CSNAPS, csnaps)) if lang in langs)
+                self._lang_metrics[(project, lang)] = metrics or ALL_METRICS
+                # -en 프로젝트: 유저 언어가 리워드를 받는 metric은 제외
+                self._en_metrics[(project, lang)] = tuple(
+                    m for m, langs in ((METRIC_SNAPS, snaps), (METRIC_CSNAPS, csnaps)) if lang not in langs)
+                # api_user_data: snaps 우선 (snaps에 있으면 csnaps는 보지 않음)
+                if lang in snaps:
+                    self._lang_hidden[(project, lang)] = HIDE_CMS
+                    self._en_hidden[(project, lang)] = HIDE_MS
+                else:
+                    self._lang_hidden[(project, lang)] = HIDE_MS
+                    self._en_hidden[(project, lang)] = HIDE_CMS
+
+    def is_ended(self, project_name):
+        """종료된 프로젝트 여부 ("tria"는 tria-* 전체, "tria-ko"는 해당 언어만)"""
+        if project_name in self.ended_projects:
+            return True
+        return '-' in project_name and project_name.rsplit('-', 1)[0] in self.ended_projects
+
+    def exclude_langs(self, project_name, metric):
+        """-en 리더보드에서 제외할 언어 (해당 metric 리워드를 언어별 프로젝트에서 받는 언어)"""
+        return self._exclude.get((project_name, metric), EMPTY)
+
+    def lang_metrics(self, project_name, lang):
+        """언어별 프로젝트(예: superform-ko)에서 표시할 metric 목록"""
+        return self._lang_metrics.get((project_name, lang), ALL_METRICS)
+
+    def en_metrics(self, project_name, user_lang):
+        """-en 프로젝트에서 user_lang 유저에게 표시할 metric 목록 (언어 모르면 전체)"""
+        if not user_lang:
+            return ALL_METRICS
+        return self._en_metrics.get((project_name, user_lang), ALL_METRICS)
+
+    def hidden_fields(self, project_name, lang, user_langs=()):
+        """
+        api_user_data에서 숨길 ranking 필드
+        - 언어별 프로젝트: 프로젝트 언어 기준
+        - -en 프로젝트: 유저가 참여한 언어별 프로젝트의 언어 기준
+        """
+        if lang != 'en':
+            return self._lang_hidden.get((project_name, lang), ())
+        hidden = ()
+        for user_lang in user_langs:
+            hidden += self._en_hidden.get((project_name, user_lang), ())
+        return hidden
+
+
+def _check():
+    """문자열 / 리스트 / 쉼표가 섞인 리스트 설정이 같은 규칙으로 컴파일되는지 확인"""
+    configs = {
+        'string': {'snaps_reward_langs': {'p': 'ko, es'}, 'csnaps_reward_langs': {'p': 'zh'}},
+        'list': {'snaps_reward_langs': {'p': ['ko', 'es']}, 'csnaps_reward_langs': {'p': ['zh']}},
+        'mixed': {'snaps_reward_langs': {'p': ['ko,es']}, 'csnaps_reward_langs': {'p': ['zh']}},
+    }
+    for name, config in configs.items():
+        rules = CookieRules(config)
+        assert rules.exclude_langs('p', 'snapsPercent') == {'ko', 'es'}, name
+        assert rules.exclude_langs('p', 'cSnapsPercent') == {'zh'}, name
+        assert rules.lang_metrics('p', 'ko') == (METRIC_SNAPS,), name
+        assert rules.en_metrics('p', 'es') == (METRIC_CSNAPS,), name
+        assert rules.hidden_fields('p', 'ko') == HIDE_CMS, name
+        assert rules.hidden_fields('p', 'zh') == HIDE_MS, name
+        assert rules.hidden_fields('p', 'en', ['es']) == HIDE_MS, name
+        assert rules.exclude_langs('p', 'snaps') and 'k' not in rules.exclude_langs('p', 'snaps'), name
+        print(f"{name}: OK")
+
+
+if __name__ == '__main__':
+    _check()
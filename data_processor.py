@@ -1,12 +1,28 @@
 import os
 import orjson
 import sqlite3
+import query_profiler
 import json
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import glob
+import time
+import threading
 from collections import defaultdict
+from snapshot_compare import CompareResult
+from snapshot_store import SnapshotStore
+from ingest_stats import IngestTimer
+
+
+def _numeric_sql(col):
+    """
+    ALTER TABLE ... TEXT로 추가된 컬럼(snapsPercentRank 등)을 숫자로 읽는 SQL 식
+    pd.to_numeric(errors='coerce')와 같이 숫자가 아니면 NULL (CAST만 쓰면 0이 되므로 직접 판별)
+    """
+    return (f"(CASE WHEN typeof({col}) IN ('integer', 'real') THEN {col} "
+            f"WHEN trim({col}) <> '' AND trim({col}) NOT GLOB '*[^0-9.eE+-]*' "
+            f"THEN CAST(trim({col}) AS REAL) END)")
 
 class DataProcessor:
     def __init__(self, data_dir):
@@ -21,9 +37,24 @@ class DataProcessor:
         # 2. 최신 파일 정보 로드 (AttributeError 해결 지점)
         self.latest_file = self._load_latest_file_info()
 
+        # 3. 데이터 버전 (신규 스냅샷이 반영될 때마다 1씩 증가 - ETag/캐시 무효화 기준)
+        self.data_version = 1
+        self.data_updated_at = os.path.getmtime(self.db_path) if os.path.exists(self.db_path) else time.time()
+        self.last_load = IngestTimer().result()  # 마지막 load_data 호출의 단계별 소요 시간/파일/레코드 수 (/metrics용)
+        self.last_scan_seconds = 0.0  # 마지막 check_for_new_data 소요 시간
+
+        # 4. 유저 -> primaryLanguage 인덱스 (-en 프로젝트 언어 필터용)
+        #    처음 조회할 때 DB에서 한 번 구성하고, 이후에는 load_data에서 신규 스냅샷분만 갱신
+        self.user_languages = None
+        self._user_languages_lock = threading.Lock()
+        self._languages_through = 0  # 언어 인덱스에 반영된 snaps 마지막 rowid (reload_user_languages 증분 기준)
+
+        # 5. 최근 스냅샷 공유 파일 (적재 프로세스가 기록, 모든 프로세스가 mmap으로 읽어 비교에 사용)
+        self.snapshots = SnapshotStore(os.path.join(data_dir, '_snapshots'))
+
     def _init_db(self):
         """DB 연결 및 필요한 테이블/인덱스 생성"""
-        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
+        with query_profiler.connect(self.db_path, check_same_thread=False) as conn:
             cursor = conn.cursor()
             
             # WAL 모드 활성화 (쓰기 중에도 읽기 가능)
@@ -56,6 +87,8 @@ class DataProcessor:
             """)
             # 검색 및 조회를 위한 인덱스 최적화
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tf ON snaps (username, timeframe)")
+            # 대소문자 무시 핸들 조회용 (FederatedLookup의 username = ? COLLATE NOCASE)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tf_nocase ON snaps (username COLLATE NOCASE, timeframe)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_ts_tf ON snaps (timestamp, timeframe)")
             conn.commit()
 
@@ -63,7 +96,7 @@ class DataProcessor:
         """DB 메타데이터 테이블에서 마지막 로드된 파일명을 가져옵니다."""
         latest_info = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with query_profiler.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 for tf in self.timeframes:
                     cursor.execute("SELECT value FROM metadata WHERE key = ?", (f"latest_file_{tf}",))
@@ -75,14 +108,19 @@ class DataProcessor:
 
     def _save_latest_file_info(self, timeframe, filename):
         """마지막 로드된 파일명을 DB에 저장합니다."""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", 
                           (f"latest_file_{timeframe}", filename))
             conn.commit()
 
+    def _bump_data_version(self):
+        """신규 데이터 반영 후 데이터 버전 증가"""
+        self.data_version += 1
+        self.data_updated_at = time.time()
+
     def load_data(self, files_to_load=None):
-        """신규 JSON 파일을 DB에 인서트하고 구버전 파일을 삭제합니다."""
+        """신규 JSON 파일을 DB에 인서트하고 구버전 파일을 삭제합니다. (단계별 소요 시간은 self.last_load에 기록)"""
         if files_to_load is None:
             files_to_load = self.check_for_new_data()
 
@@ -90,7 +128,9 @@ class DataProcessor:
             return False
 
         new_data_found = False
-        with sqlite3.connect(self.db_path) as conn:
+        loaded = set()  # 이번에 적재한 (timeframe, timestamp) - 스냅샷 파일 다시 기록
+        timer = IngestTimer(scan_seconds=self.last_scan_seconds)
+        with query_profiler.connect(self.db_path) as conn:
             for timeframe, files in files_to_load.items():
                 if not files: continue
                 
@@ -102,68 +142,170 @@ class DataProcessor:
                         ts_str = f"{parts[0]}_{parts[1]}"
                         timestamp = datetime.strptime(ts_str, '%Y%m%d_%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
                         
-                        with open(file_path, 'rb') as f:
-                            raw_data = orjson.loads(f.read())
+                        with timer.stage('read'):
+                            with open(file_path, 'rb') as f:
+                                raw_bytes = f.read()
+                                landed_at = os.fstat(f.fileno()).st_mtime
+                        timer.file(len(raw_bytes), landed_at)
+                        with timer.stage('parse'):
+                            raw_data = orjson.loads(raw_bytes)
                         
-                        if 'result' in raw_data and 'data' in raw_data['result']:
-                            snaps = raw_data['result']['data']['json'].get('snaps', [])
-                            for snap in snaps:
-                                snap['timeframe'] = timeframe
-                                snap['timestamp'] = timestamp
-                                all_records.append(snap)
-                            
-                            # cSnaps 배열도 처리 (중복 username 제거)
-                            csnaps = raw_data['result']['data']['json'].get('cSnaps', [])
-                            if csnaps:  # cSnaps가 존재하고 비어있지 않을 때만 처리
-                                existing_usernames = {snap.get('username') for snap in all_records}
-                                for snap in csnaps:
-                                    if snap.get('username') not in existing_usernames:
-                                        snap['timeframe'] = timeframe
-                                        snap['timestamp'] = timestamp
-                                        all_records.append(snap)
-                                        existing_usernames.add(snap.get('username'))
+                        has_result = 'result' in raw_data and 'data' in raw_data['result']
+                        if has_result:
+                            with timer.stage('normalize'):
+                                snaps = raw_data['result']['data']['json'].get('snaps', [])
+                                for snap in snaps:
+                                    snap['timeframe'] = timeframe
+                                    snap['timestamp'] = timestamp
+                                    all_records.append(snap)
+                                loaded.add((timeframe, timestamp))
+                                
+                                # cSnaps 배열도 처리 (중복 username 제거)
+                                csnaps = raw_data['result']['data']['json'].get('cSnaps', [])
+                                if csnaps:  # cSnaps가 존재하고 비어있지 않을 때만 처리
+                                    existing_usernames = {snap.get('username') for snap in all_records}
+                                    for snap in csnaps:
+                                        if snap.get('username') not in existing_usernames:
+                                            snap['timeframe'] = timeframe
+                                            snap['timestamp'] = timestamp
+                                            all_records.append(snap)
+                                            existing_usernames.add(snap.get('username'))
                             
                             # 최신 파일 정보 갱신
-                            self.latest_file[timeframe] = filename
-                            self._save_latest_file_info(timeframe, filename)
+                            with timer.stage('metadata'):
+                                self.latest_file[timeframe] = filename
+                                self._save_latest_file_info(timeframe, filename)
                             new_data_found = True
                     except Exception as e:
                         print(f"Error parsing {file_path}: {e}")
 
                 if all_records:
-                    df = pd.DataFrame(all_records)
-                    
-                    # smartFollowersDetails 컬럼 제거 (용량 절약을 위해 개수만 저장)
-                    if 'smartFollowersDetails' in df.columns:
-                        df = df.drop('smartFollowersDetails', axis=1)
-                    
-                    # 복합 객체(list, dict)를 JSON 문자열로 변환 (최적화된 로직)
-                    # 첫 번째 행만 체크하여 컬럼별 타입 파악 (전체 apply 방지)
-                    if not df.empty:
-                        for col in df.columns:
-                            first_value = df[col].iloc[0] if len(df) > 0 else None
-                            if isinstance(first_value, (list, dict)):
-                                df[col] = df[col].apply(lambda x: orjson.dumps(x).decode('utf-8') if isinstance(x, (list, dict)) else x)
-
-                    # DB 스키마 자동 업데이트 (한 번만 체크)
-                    cursor = conn.cursor()
-                    cursor.execute("PRAGMA table_info(snaps)")
-                    existing_columns = {info[1] for info in cursor.fetchall()}
-                    new_columns = [col for col in df.columns if col not in existing_columns]
-                    
-                    for col in new_columns:
-                        cursor.execute(f"ALTER TABLE snaps ADD COLUMN '{col}' TEXT")
-                    
-                    # 배치 삽입 (method='multi'로 성능 향상)
-                    df.to_sql('snaps', conn, if_exists='append', index=False, method='multi', chunksize=1000)
+                    with timer.stage('normalize'):
+                        df = pd.DataFrame(all_records)
+                        
+                        # smartFollowersDetails 컬럼 제거 (용량 절약을 위해 개수만 저장)
+                        if 'smartFollowersDetails' in df.columns:
+                            df = df.drop('smartFollowersDetails', axis=1)
+                        
+                        # 복합 객체(list, dict)를 JSON 문자열로 변환 (최적화된 로직)
+                        # 첫 번째 행만 체크하여 컬럼별 타입 파악 (전체 apply 방지)
+                        if not df.empty:
+                            for col in df.columns:
+                                first_value = df[col].iloc[0] if len(df) > 0 else None
+                                if isinstance(first_value, (list, dict)):
+                                    df[col] = df[col].apply(lambda x: orjson.dumps(x).decode('utf-8') if isinstance(x, (list, dict)) else x)
+
+                    with timer.stage('insert'):
+                        # DB 스키마 자동 업데이트 (한 번만 체크)
+                        cursor = conn.cursor()
+                        cursor.execute("PRAGMA table_info(snaps)")
+                        existing_columns = {info[1] for info in cursor.fetchall()}
+                        new_columns = [col for col in df.columns if col not in existing_columns]
+                        
+                        for col in new_columns:
+                            cursor.execute(f"ALTER TABLE snaps ADD COLUMN '{col}' TEXT")
+                        
+                        # 배치 삽입 (method='multi'로 성능 향상)
+                        df.to_sql('snaps', conn, if_exists='append', index=False, method='multi', chunksize=1000)
+                    timer.add_rows(len(df))
                     print(f"[{timeframe}] DB Insert Complete: {len(df)} rows")
 
+                    # 언어 인덱스 갱신 (아직 구성 전이면 첫 조회 때 DB에서 통째로 읽음)
+                    if self.user_languages is not None and 'primaryLanguage' in df.columns:
+                        with timer.stage('metadata'):
+                            self._update_user_languages(zip(df['username'].tolist(), df['primaryLanguage'].tolist()))
+
+            with timer.stage('insert'):
+                conn.commit()
+            timer.mark_queryable()
+
         # 🚨 데이터 삽입이 완전히 끝난 후 파일 정리 실행
         if new_data_found:
-            self.cleanup_old_files()
-            
+            # 버전을 올리기 전에 기록해야 워커가 새 버전 페이지를 만들 때 파일이 있음
+            with timer.stage('snapshot'):
+                try:
+                    self.publish_snapshots(refresh=loaded)
+                except Exception as e:
+                    # 이전 내용이 남은 파일로 비교하지 않도록 이번에 적재한 스냅샷 파일은 지움 (SQL로 비교)
+                    # 지운 파일은 다음 publish_snapshots에서 다시 기록됨
+                    print(f"[스냅샷 파일] 기록 실패 - 이번에 적재한 스냅샷 {len(loaded)}개는 SQL로 비교: {e}")
+                    for tf, ts in loaded:
+                        self.snapshots.remove(tf, ts)
+            self._bump_data_version()
+            with timer.stage('cleanup'):
+                self.cleanup_old_files()
+        
+        self.last_load = timer.result()
         return new_data_found
 
+    def get_user_languages(self):
+        """{username: primaryLanguage} 인덱스 (유저별 가장 최근 스냅샷의 언어)"""
+        if self.user_languages is None:
+            with self._user_languages_lock:
+                if self.user_languages is None:
+                    self.user_languages, self._languages_through = self._load_user_languages()
+        return self.user_languages
+
+    def reload_user_languages(self):
+        """
+        다른 프로세스가 적재한 신규 스냅샷분만 DB에서 읽어 언어 인덱스에 반영 (읽는 중에도 이전 인덱스로 조회)
+        아직 구성 전이면 아무것도 하지 않음 (첫 조회 때 전체 구성)
+        """
+        with self._user_languages_lock:
+            if self.user_languages is None:
+                return None
+            since = self._languages_through
+        languages, through = self._load_user_languages(since)
+        with self._user_languages_lock:
+            if languages:
+                merged = dict(self.user_languages)
+                merged.update(languages)
+                self.user_languages = merged
+            self._languages_through = through
+        return self.user_languages
+
+    def get_user_language(self, username):
+        return self.get_user_languages().get(username)
+
+    def users_with_languages(self, langs):
+        """primaryLanguage가 langs에 속하는 유저 집합"""
+        langs = set(langs)
+        if not langs:
+            return frozenset()
+        return frozenset(u for u, lang in self.get_user_languages().items() if lang in langs)
+
+    def _load_user_languages(self, since=0):
+        """
+        {username: 언어}, 읽은 마지막 rowid - since 이후에 추가된 행만 읽음
+        snaps는 append만 하므로 rowid 기준이면 timeframe별 적재 순서와 관계없이 새 행을 빠짐없이 읽음
+        (load_data의 _update_user_languages와 같이 새로 적재된 행을 기존 인덱스 위에 덮어씀)
+        """
+        languages = {}
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
+            columns = {info[1] for info in conn.execute("PRAGMA table_info(snaps)")}
+            if 'primaryLanguage' not in columns:
+                return languages, since
+            through = conn.execute("SELECT MAX(rowid) FROM snaps").fetchone()[0] or since
+            cursor = conn.execute(
+                "SELECT username, primaryLanguage FROM snaps "
+                "WHERE rowid > ? AND rowid <= ? AND primaryLanguage IS NOT NULL AND primaryLanguage != '' "
+                "ORDER BY timestamp ASC", (since, through))
+            # 시간순으로 덮어써서 최신 언어만 남김
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                languages.update(rows)
+        return languages, through
+
+    def _update_user_languages(self, pairs):
+        # 요청 스레드는 dict를 읽기만 하므로 복사본을 만들어 통째로 교체
+        languages = dict(self.user_languages)
+        for username, lang in pairs:
+            if isinstance(lang, str) and lang:
+                languages[username] = lang
+        self.user_languages = languages
+
     # data_processor.py의 cleanup_old_files 메서드 수정
 
     def cleanup_old_files(self):
@@ -198,6 +340,7 @@ class DataProcessor:
 
     def check_for_new_data(self):
         """새로 생성된 JSON 파일이 있는지 체크합니다."""
+        scan_start = time.perf_counter()
         new_files = defaultdict(list)
         any_new = False
         for tf in self.timeframes:
@@ -210,13 +353,14 @@ class DataProcessor:
                 if os.path.basename(f) > last_loaded:
                     new_files[tf].append(f)
                     any_new = True
+        self.last_scan_seconds = time.perf_counter() - scan_start
         return new_files if any_new else {}
 
     # --- 데이터 조회 함수들 (main.py와 호환) ---
 
     def get_available_timestamps(self, timeframe='TOTAL'):
         query = "SELECT DISTINCT timestamp FROM snaps WHERE timeframe = ? ORDER BY timestamp ASC"
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             df = pd.read_sql(query, conn, params=(timeframe,))
         return df['timestamp'].tolist()
 
@@ -227,7 +371,7 @@ class DataProcessor:
                    profileImageUrl, timestamp, timeframe, primaryLanguage 
             FROM snaps WHERE timestamp = ? AND timeframe = ?
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             return pd.read_sql(query, conn, params=(timestamp, timeframe))
 
     def get_user_history(self, username, timeframe='TOTAL'):
@@ -236,7 +380,7 @@ class DataProcessor:
                    snapsPercent, cSnapsPercent
             FROM snaps WHERE username = ? AND timeframe = ? ORDER BY timestamp ASC
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             history = pd.read_sql(query, conn, params=(username, timeframe))
         if history.empty: return pd.DataFrame()
         history['timestamp'] = pd.to_datetime(history['timestamp'])
@@ -246,7 +390,7 @@ class DataProcessor:
         return history
 
     def get_all_usernames(self, timeframe='TOTAL'):
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT MAX(timestamp) FROM snaps WHERE timeframe = ?", (timeframe,))
             latest_ts = cursor.fetchone()[0]
@@ -268,7 +412,7 @@ class DataProcessor:
             priority_order.append('7D')
         priority_order.extend([tf for tf in timeframes if tf != '7D'])
         
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             for tf in priority_order:
                 cursor = conn.cursor()
                 cursor.execute("SELECT MAX(timestamp) FROM snaps WHERE timeframe = ?", (tf,))
@@ -287,7 +431,7 @@ class DataProcessor:
         return list(all_users.values())
 
     def get_user_info_by_timeframe(self, username, timeframe='TOTAL'):
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT MAX(timestamp) FROM snaps WHERE timeframe = ?", (timeframe,))
             latest_ts = cursor.fetchone()[0]
@@ -304,7 +448,7 @@ class DataProcessor:
 
     def get_user_info(self, username):
         query = "SELECT username, displayName, profileImageUrl, followers, smartFollowers FROM snaps WHERE username = ? ORDER BY timestamp DESC LIMIT 1"
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             df = pd.read_sql(query, conn, params=(username,))
             if not df.empty: return df.iloc[0].to_dict()
         return {'username': username, 'displayName': username}
@@ -312,7 +456,152 @@ class DataProcessor:
     def get_user_analysis(self, username):
         return {tf: self.get_user_history(username, tf) for tf in self.timeframes}
 
+    # --- 스냅샷 공유 파일 (snapshot_store) ---
+
+    def _snapshot_columns(self, conn, timestamp, timeframe):
+        """
+        스냅샷 1개를 username별로 묶은 컬럼 (compare_leaderboards SQL 버전의 한쪽 side 집계와 같은 값)
+        순위 없음/숫자 아님 -> 9999, 마쉐 없음 -> 0
+        """
+        existing_columns = {info[1] for info in conn.execute("PRAGMA table_info(snaps)")}
+        lang_col = 'MAX(primaryLanguage)' if 'primaryLanguage' in existing_columns else 'NULL'
+        rank_cols = [c if c in existing_columns else 'NULL' for c in ('snapsPercentRank', 'cSnapsPercentRank')]
+        query = f"""
+            SELECT username, MAX(displayName), MAX(profileImageUrl), {lang_col},
+                   CAST(COALESCE(MAX({_numeric_sql(rank_cols[0])}), 9999) AS INTEGER),
+                   CAST(COALESCE(MAX({_numeric_sql(rank_cols[1])}), 9999) AS INTEGER),
+                   CAST(COALESCE(MAX({_numeric_sql('snapsPercent')}), 0) AS REAL),
+                   CAST(COALESCE(MAX({_numeric_sql('cSnapsPercent')}), 0) AS REAL)
+            FROM snaps WHERE timestamp = ? AND timeframe = ? AND username IS NOT NULL
+            GROUP BY username ORDER BY username
+        """
+        rows = conn.execute(query, (timestamp, timeframe)).fetchall()
+        values = list(zip(*rows)) if rows else [()] * 8
+        return {
+            'username': values[0],
+            'displayName': values[1],
+            'profileImageUrl': values[2],
+            'primaryLanguage': values[3],
+            'snapsPercentRank': np.array(values[4], dtype=np.int64),
+            'cSnapsPercentRank': np.array(values[5], dtype=np.int64),
+            'snapsPercent': np.array(values[6], dtype=np.float64),
+            'cSnapsPercent': np.array(values[7], dtype=np.float64),
+        }
+
+    def publish_snapshots(self, refresh=()):
+        """
+        timeframe별 최근 snapshots.keep개 스냅샷을 파일로 기록 (없는 것 + refresh에 있는 (timeframe, timestamp))
+        범위를 벗어난 파일은 삭제 -> 기록한 파일 수
+        """
+        written = 0
+        with query_profiler.connect(self.db_path) as conn:
+            for tf in self.timeframes:
+                timestamps = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT timestamp FROM snaps WHERE timeframe = ? ORDER BY timestamp DESC LIMIT ?",
+                    (tf, self.snapshots.keep))]
+                for ts in timestamps:
+                    if (tf, ts) in refresh or not self.snapshots.exists(tf, ts):
+                        self.snapshots.publish(tf, ts, self._snapshot_columns(conn, ts, tf))
+                        written += 1
+                self.snapshots.prune(tf, timestamps)
+        return written
+
     def compare_leaderboards(self, timestamp1, timestamp2, timeframe='TOTAL', metric='snapsPercent'):
+        """
+        두 스냅샷 비교 - 두 스냅샷 모두 공유 파일에 있으면 NumPy로 처리 (SQLite 조회 없음),
+        하나라도 없으면(오래된 스냅샷) compare_leaderboards_sql
+        """
+        join = self.snapshots.join(timeframe, timestamp1, timestamp2)
+        if join is None:
+            return self.compare_leaderboards_sql(timestamp1, timestamp2, timeframe, metric)
+
+        if metric == 'snapsPercent':
+            rank_col, ms_col, diff_col = 'snapsPercentRank', 'snapsPercent', 'mindshare_change'
+            prev_ms_col, curr_ms_col = 'prev_mindshare', 'curr_mindshare'
+        else:
+            rank_col, ms_col, diff_col = 'cSnapsPercentRank', 'cSnapsPercent', 'c_mindshare_change'
+            prev_ms_col, curr_ms_col = 'prev_c_mindshare', 'curr_c_mindshare'
+
+        prev_rank = join.numbers('prev', rank_col, 9999)
+        curr_rank = join.numbers('curr', rank_col, 9999)
+        prev_ms = join.numbers('prev', ms_col, 0.0)
+        curr_ms = join.numbers('curr', ms_col, 0.0)
+        rank_change = prev_rank - curr_rank
+        rank_change[np.abs(rank_change) > 500] = 0
+        ms_change = np.where((prev_rank == 9999) | (curr_rank == 9999), 0.0, curr_ms - prev_ms)
+
+        # ORDER BY rank_change DESC, curr_rank ASC, username ASC (join 결과가 이미 username 순)
+        order = np.lexsort((curr_rank, -rank_change))
+        columns = {
+            'username': join.key_list(),
+            'displayName': join.strings('displayName', ''),
+            'profileImageUrl': join.strings('profileImageUrl', ''),
+            'prev_rank': prev_rank,
+            'curr_rank': curr_rank,
+            'rank_change': rank_change,
+            prev_ms_col: prev_ms,
+            curr_ms_col: curr_ms,
+            diff_col: ms_change,
+            'primaryLanguage': join.strings('primaryLanguage'),
+        }
+        order_list = order.tolist()
+        data = {c: v[order].tolist() if isinstance(v, np.ndarray) else [v[i] for i in order_list]
+                for c, v in columns.items()}
+        return CompareResult(columns, data)
+
+    def compare_leaderboards_sql(self, timestamp1, timestamp2, timeframe='TOTAL', metric='snapsPercent'):
+        """
+        두 스냅샷 비교 (SQL 버전)
+        - outer join / 결측 채우기(순위 9999, 마쉐 0) / 변동 보정 / 정렬을 모두 SQL에서 처리
+        - 컬럼과 값은 compare_leaderboards_pandas와 같고, 결과는 CompareResult (컬럼별 리스트)
+        """
+        if metric == 'snapsPercent':
+            rank_col, ms_col, diff_col = 'snapsPercentRank', 'snapsPercent', 'mindshare_change'
+            prev_ms_col, curr_ms_col = 'prev_mindshare', 'curr_mindshare'
+        else:
+            rank_col, ms_col, diff_col = 'cSnapsPercentRank', 'cSnapsPercent', 'c_mindshare_change'
+            prev_ms_col, curr_ms_col = 'prev_c_mindshare', 'curr_c_mindshare'
+
+        # 두 스냅샷을 UNION ALL 후 username으로 GROUP BY (= outer join, side 1(현재) 값 우선)
+        # 서브쿼리끼리 FULL OUTER JOIN 하면 인덱스 없이 중첩 스캔(O(n²))이 되므로 정렬 기반 집계 사용
+        query = f"""
+            WITH both_sides AS (
+                SELECT 0 AS side, username, displayName, profileImageUrl, primaryLanguage,
+                       {_numeric_sql(rank_col)} AS r, {_numeric_sql(ms_col)} AS m
+                FROM snaps WHERE timestamp = ? AND timeframe = ?
+                UNION ALL
+                SELECT 1 AS side, username, displayName, profileImageUrl, primaryLanguage,
+                       {_numeric_sql(rank_col)} AS r, {_numeric_sql(ms_col)} AS m
+                FROM snaps WHERE timestamp = ? AND timeframe = ?
+            ), merged AS (
+                SELECT username,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN displayName END),
+                                MAX(CASE WHEN side = 0 THEN displayName END), '') AS displayName,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN profileImageUrl END),
+                                MAX(CASE WHEN side = 0 THEN profileImageUrl END), '') AS profileImageUrl,
+                       CAST(COALESCE(MAX(CASE WHEN side = 0 THEN r END), 9999) AS INTEGER) AS prev_rank,
+                       CAST(COALESCE(MAX(CASE WHEN side = 1 THEN r END), 9999) AS INTEGER) AS curr_rank,
+                       CAST(COALESCE(MAX(CASE WHEN side = 0 THEN m END), 0) AS REAL) AS prev_ms,
+                       CAST(COALESCE(MAX(CASE WHEN side = 1 THEN m END), 0) AS REAL) AS curr_ms,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN primaryLanguage END),
+                                MAX(CASE WHEN side = 0 THEN primaryLanguage END)) AS primaryLanguage
+                FROM both_sides
+                GROUP BY username
+            )
+            SELECT username, displayName, profileImageUrl, prev_rank, curr_rank,
+                   CASE WHEN ABS(prev_rank - curr_rank) > 500 THEN 0 ELSE prev_rank - curr_rank END AS rank_change,
+                   prev_ms AS {prev_ms_col}, curr_ms AS {curr_ms_col},
+                   CASE WHEN prev_rank = 9999 OR curr_rank = 9999 THEN 0.0 ELSE curr_ms - prev_ms END AS {diff_col},
+                   primaryLanguage
+            FROM merged
+            ORDER BY rank_change DESC, curr_rank ASC, username ASC
+        """
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.execute(query, (timestamp1, timeframe, timestamp2, timeframe))
+            return CompareResult.from_cursor(cursor)
+
+    def compare_leaderboards_pandas(self, timestamp1, timestamp2, timeframe='TOTAL', metric='snapsPercent'):
+        """기존 pandas 구현 (benchmarks/parity_compare_leaderboards.py에서 SQL 버전과 결과 비교용)"""
         # 1. 컬럼 설정
         if metric == 'snapsPercent':
             rank_col, ms_col, diff_col = 'snapsPercentRank', 'snapsPercent', 'mindshare_change'
@@ -1,8 +1,11 @@
 import sqlite3
+import query_profiler
 import json
 import os
 import glob
+import time
 import pandas as pd
+from ingest_stats import IngestTimer
 from datetime import datetime
 
 class DataProcessorKaito:
@@ -21,10 +24,16 @@ class DataProcessorKaito:
         # 처리된 파일 추적 (최신 파일만 추적)
         self.latest_file = {}  # {project: {timeframe: filename}}
         self.load_latest_files()
+        
+        # 프로젝트별 데이터 버전 (신규 데이터 반영 시 증가 - ETag/캐시 무효화 기준)
+        self.data_versions = {}  # {project: version}
+        self.last_load = IngestTimer().result()  # 마지막 insert_data_batch 호출의 단계별 소요 시간/파일/레코드 수 (/metrics용)
+        self.data_updated_at = {}  # {project: epoch seconds}
+        self.started_at = os.path.getmtime(self.db_path) if os.path.exists(self.db_path) else time.time()
     
     def create_tables(self):
         """데이터베이스 테이블 생성"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             # WAL 모드 활성화 (쓰기 중에도 읽기 가능)
@@ -69,6 +78,12 @@ class DataProcessorKaito:
                 ON rankings(handle)
             ''')
             
+            # 대소문자 무시 핸들 조회용 (FederatedLookup의 handle = ? COLLATE NOCASE)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_handle_nocase
+                ON rankings(handle COLLATE NOCASE)
+            ''')
+            
             cursor.execute('''
                 CREATE INDEX IF NOT EXISTS idx_timestamp 
                 ON rankings(projectName, timeframe, timestamp)
@@ -79,7 +94,7 @@ class DataProcessorKaito:
     
     def load_latest_files(self):
         """최신 파일 정보 로드"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT projectName, timeframe, filename FROM latest_files')
             rows = cursor.fetchall()
@@ -91,7 +106,7 @@ class DataProcessorKaito:
     
     def save_latest_file(self, project_name, timeframe, filename):
         """최신 파일 정보 저장"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO latest_files (projectName, timeframe, filename)
@@ -104,6 +119,19 @@ class DataProcessorKaito:
             self.latest_file[project_name] = {}
         self.latest_file[project_name][timeframe] = filename
     
+    def get_data_version(self, project_name):
+        """프로젝트의 현재 데이터 버전"""
+        return self.data_versions.get(project_name, 1)
+    
+    def get_data_updated_at(self, project_name):
+        """프로젝트 데이터가 마지막으로 갱신된 시각 (epoch)"""
+        return self.data_updated_at.get(project_name, self.started_at)
+    
+    def _bump_data_version(self, project_name):
+        """신규 데이터 반영 후 프로젝트 데이터 버전 증가"""
+        self.data_versions[project_name] = self.data_versions.get(project_name, 1) + 1
+        self.data_updated_at[project_name] = time.time()
+    
     def scan_projects(self):
         """모든 Kaito 프로젝트 스캔"""
         projects = []
@@ -163,28 +191,37 @@ class DataProcessorKaito:
         
         return new_files
     
-    def load_json_file(self, filepath):
-        """JSON 파일 로드"""
+    def load_json_file(self, filepath, timer=None):
+        """JSON 파일 로드 (timer가 있으면 read / parse 시간과 파일 크기/생성 시각 기록)"""
+        timer = timer or IngestTimer()
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with timer.stage('read'):
+                with open(filepath, 'rb') as f:
+                    raw_bytes = f.read()
+                    landed_at = os.fstat(f.fileno()).st_mtime
+            timer.file(len(raw_bytes), landed_at)
+            with timer.stage('parse'):
+                return json.loads(raw_bytes.decode('utf-8'))
         except Exception as e:
             print(f"[Kaito] 파일 로드 실패: {filepath} - {e}")
             return None
     
-    def insert_data_batch(self, batch_items):
+    def insert_data_batch(self, batch_items, timer=None):
         """배치 데이터 삽입 (여러 프로젝트/timeframe의 데이터를 한 번에 처리)
         
         Args:
             batch_items: [(project_name, timeframe, timestamp, data), ...]
+            timer: 파일 스캔/읽기 단계를 기록한 IngestTimer (없으면 새로 만듦) - 결과는 self.last_load
         """
         if not batch_items:
             return
         
+        timer = timer or IngestTimer()
         # 모든 레코드를 한 번에 준비
         all_records = []
         files_to_save = {}  # {(project, timeframe): [filenames]}
         
+        normalize_start = time.perf_counter()
         for project_name, timeframe, timestamp, data in batch_items:
             if not data:
                 continue
@@ -211,9 +248,11 @@ class DataProcessorKaito:
                     item.get('follower', '')
                 ))
         
+        timer.add_time('normalize', time.perf_counter() - normalize_start)
+        
         # 한 번의 트랜잭션으로 모든 데이터 삽입
         if all_records:
-            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            with timer.stage('insert'), query_profiler.connect(self.db_path, timeout=30.0) as conn:
                 cursor = conn.cursor()
                 cursor.executemany('''
                     INSERT OR REPLACE INTO rankings 
@@ -221,20 +260,29 @@ class DataProcessorKaito:
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', all_records)
                 conn.commit()
+            timer.add_rows(len(all_records))
+        timer.mark_queryable()
         
         # 최신 파일 정보 저장 및 정리 (각 project/timeframe의 가장 최신 파일만)
         for (project_name, timeframe), filenames in files_to_save.items():
             # 가장 최신 파일을 찾음 (파일명이 타임스탬프라서 문자열 비교로 가능)
             latest_filename = max(filenames)
-            self.save_latest_file(project_name, timeframe, latest_filename)
-            self.cleanup_old_files(project_name, timeframe)
+            with timer.stage('metadata'):
+                self.save_latest_file(project_name, timeframe, latest_filename)
+            with timer.stage('cleanup'):
+                self.cleanup_old_files(project_name, timeframe)
+        
+        for project_name in {key[0] for key in files_to_save}:
+            self._bump_data_version(project_name)
+        
+        self.last_load = timer.result()
     
     def insert_data(self, project_name, timeframe, timestamp, data):
         """데이터 삽입 및 파일 정리 (단일 항목용 - 호환성 유지)"""
         if not data:
             return
         
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             for item in data:
@@ -265,6 +313,8 @@ class DataProcessorKaito:
         
         # 구버전 파일 정리
         self.cleanup_old_files(project_name, timeframe)
+        
+        self._bump_data_version(project_name)
     
     def cleanup_old_files(self, project_name, timeframe):
         """최신 파일보다 오래된 파일들 삭제"""
@@ -317,7 +367,7 @@ class DataProcessorKaito:
     
     def get_available_timestamps(self, project_name, timeframe):
         """사용 가능한 타임스탬프 목록"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT DISTINCT timestamp 
@@ -330,7 +380,7 @@ class DataProcessorKaito:
     
     def get_available_timeframes(self, project_name):
         """사용 가능한 timeframe 목록"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT DISTINCT timeframe 
@@ -346,7 +396,7 @@ class DataProcessorKaito:
     
     def compare_leaderboards(self, project_name, timestamp1, timestamp2, timeframe):
         """두 타임스탬프의 리더보드 비교"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             query = '''
                 SELECT 
                     COALESCE(t1.handle, t2.handle) as handle,
@@ -378,7 +428,7 @@ class DataProcessorKaito:
     
     def get_user_data(self, project_name, handle, timeframe):
         """특정 사용자의 시간별 데이터"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT timestamp, rank, displayName, imageId, mindshare, smartFollower, follower
@@ -402,7 +452,7 @@ class DataProcessorKaito:
     
     def get_user_info(self, project_name, handle):
         """사용자 최신 정보"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 SELECT displayName, imageId, rank, mindshare, smartFollower, follower
@@ -429,7 +479,7 @@ class DataProcessorKaito:
     
     def get_all_handles(self, project_name, timeframe=None):
         """모든 사용자 핸들 목록"""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
             if timeframe:
@@ -455,7 +505,7 @@ class DataProcessorKaito:
         - handle 기준으로 중복 제거
         - 7D timeframe의 displayName을 우선적으로 사용
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
             if timeframe:
@@ -1,12 +1,17 @@
 import os
 import orjson
 import sqlite3
+import query_profiler
 import json
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import glob
+import time
 from collections import defaultdict
+from snapshot_compare import CompareResult
+from snapshot_store import SnapshotStore
+from ingest_stats import IngestTimer
 
 class DataProcessorWallchain:
     def __init__(self, data_dir):
@@ -24,6 +29,15 @@ class DataProcessorWallchain:
         # 2. 최신 파일 정보 로드
         self.latest_file = self._load_latest_file_info()
 
+        # 3. 데이터 버전 (신규 스냅샷이 반영될 때마다 1씩 증가 - ETag/캐시 무효화 기준)
+        self.data_version = 1
+        self.data_updated_at = os.path.getmtime(self.db_path) if os.path.exists(self.db_path) else time.time()
+        self.last_load = IngestTimer().result()  # 마지막 load_data 호출의 단계별 소요 시간/파일/레코드 수 (/metrics용)
+        self.last_scan_seconds = 0.0  # 마지막 check_for_new_data 소요 시간
+
+        # 4. 최근 스냅샷 공유 파일 ('_' 폴더는 timeframe으로 감지되지 않음)
+        self.snapshots = SnapshotStore(os.path.join(data_dir, '_snapshots'))
+
     def _detect_timeframes(self):
         """data_dir 내의 실제 폴더를 스캔하여 timeframe 목록 생성"""
         timeframes = []
@@ -50,7 +64,7 @@ class DataProcessorWallchain:
 
     def _init_db(self):
         """DB 연결 및 필요한 테이블/인덱스 생성"""
-        with sqlite3.connect(self.db_path, check_same_thread=False) as conn:
+        with query_profiler.connect(self.db_path, check_same_thread=False) as conn:
             cursor = conn.cursor()
             
             # WAL 모드 활성화 (쓰기 중에도 읽기 가능)
@@ -86,6 +100,9 @@ class DataProcessorWallchain:
             """)
             # 검색 및 조회를 위한 인덱스 최적화
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tf_wall ON leaderboard (username, timeframe)")
+            # 대소문자 무시 핸들 조회용 (FederatedLookup의 username = ? COLLATE NOCASE)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_user_tf_wall_nocase "
+                           "ON leaderboard (username COLLATE NOCASE, timeframe)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_ts_tf_wall ON leaderboard (timestamp, timeframe)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_position ON leaderboard (position, timeframe, timestamp)")
             conn.commit()
@@ -94,7 +111,7 @@ class DataProcessorWallchain:
         """DB 메타데이터 테이블에서 마지막 로드된 파일명을 가져옵니다."""
         latest_info = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with query_profiler.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 for tf in self.timeframes:
                     cursor.execute("SELECT value FROM metadata WHERE key = ?", (f"latest_file_{tf}",))
@@ -106,14 +123,19 @@ class DataProcessorWallchain:
 
     def _save_latest_file_info(self, timeframe, filename):
         """마지막 로드된 파일명을 DB에 저장합니다."""
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", 
                           (f"latest_file_{timeframe}", filename))
             conn.commit()
 
+    def _bump_data_version(self):
+        """신규 데이터 반영 후 데이터 버전 증가"""
+        self.data_version += 1
+        self.data_updated_at = time.time()
+
     def load_data(self, files_to_load=None):
-        """신규 JSON 파일을 DB에 인서트하고 구버전 파일을 삭제합니다."""
+        """신규 JSON 파일을 DB에 인서트하고 구버전 파일을 삭제합니다. (단계별 소요 시간은 self.last_load에 기록)"""
         if files_to_load is None:
             files_to_load = self.check_for_new_data()
 
@@ -121,7 +143,9 @@ class DataProcessorWallchain:
             return False
 
         new_data_found = False
-        with sqlite3.connect(self.db_path) as conn:
+        loaded = set()  # 이번에 적재한 (timeframe, timestamp) - 스냅샷 파일 다시 기록
+        timer = IngestTimer(scan_seconds=self.last_scan_seconds)
+        with query_profiler.connect(self.db_path) as conn:
             for timeframe, files in files_to_load.items():
                 if not files: continue
                 
@@ -136,54 +160,82 @@ class DataProcessorWallchain:
                         ts_str = f"{parts[0]}_{parts[1]}"
                         timestamp = datetime.strptime(ts_str, '%Y%m%d_%H%M%S').strftime('%Y-%m-%d %H:%M:%S')
                         
-                        with open(file_path, 'rb') as f:
-                            raw_data = orjson.loads(f.read())
+                        with timer.stage('read'):
+                            with open(file_path, 'rb') as f:
+                                raw_bytes = f.read()
+                                landed_at = os.fstat(f.fileno()).st_mtime
+                        timer.file(len(raw_bytes), landed_at)
+                        with timer.stage('parse'):
+                            raw_data = orjson.loads(raw_bytes)
                         
                         # wallchain 데이터 구조 처리
                         if isinstance(raw_data, list):
-                            for page in raw_data:
-                                if 'entries' in page:
-                                    for entry in page['entries']:
-                                        record = {}
-                                        # xInfo 데이터 추출
-                                        if 'xInfo' in entry:
-                                            record.update(entry['xInfo'])
-                                        # 나머지 필드 추가
-                                        record['mindsharePercentage'] = entry.get('mindsharePercentage', 0)
-                                        record['relativeMindshare'] = entry.get('relativeMindshare', 0)
-                                        record['appUseMultiplier'] = entry.get('appUseMultiplier', 1.0)
-                                        record['position'] = entry.get('position', 0)
-                                        record['positionChange'] = entry.get('positionChange', 0)
-                                        # 정규화된 timeframe 사용 (epoch_2 -> epoch-2)
-                                        record['timeframe'] = normalized_tf
-                                        record['timestamp'] = timestamp
-                                        all_records.append(record)
+                            with timer.stage('normalize'):
+                                for page in raw_data:
+                                    if 'entries' in page:
+                                        for entry in page['entries']:
+                                            record = {}
+                                            # xInfo 데이터 추출
+                                            if 'xInfo' in entry:
+                                                record.update(entry['xInfo'])
+                                            # 나머지 필드 추가
+                                            record['mindsharePercentage'] = entry.get('mindsharePercentage', 0)
+                                            record['relativeMindshare'] = entry.get('relativeMindshare', 0)
+                                            record['appUseMultiplier'] = entry.get('appUseMultiplier', 1.0)
+                                            record['position'] = entry.get('position', 0)
+                                            record['positionChange'] = entry.get('positionChange', 0)
+                                            # 정규화된 timeframe 사용 (epoch_2 -> epoch-2)
+                                            record['timeframe'] = normalized_tf
+                                            record['timestamp'] = timestamp
+                                            all_records.append(record)
+                                loaded.add((normalized_tf, timestamp))
                             
                             # 최신 파일 정보를 정규화된 timeframe으로 갱신
-                            self.latest_file[normalized_tf] = filename
-                            self._save_latest_file_info(normalized_tf, filename)
+                            with timer.stage('metadata'):
+                                self.latest_file[normalized_tf] = filename
+                                self._save_latest_file_info(normalized_tf, filename)
                             new_data_found = True
                     except Exception as e:
                         print(f"Error parsing {file_path}: {e}")
 
                 if all_records:
-                    df = pd.DataFrame(all_records)
+                    with timer.stage('normalize'):
+                        df = pd.DataFrame(all_records)
                     
-                    # DB 스키마 자동 업데이트
-                    cursor = conn.cursor()
-                    cursor.execute("PRAGMA table_info(leaderboard)")
-                    existing_columns = [info[1] for info in cursor.fetchall()]
-                    for col in df.columns:
-                        if col not in existing_columns:
-                            cursor.execute(f"ALTER TABLE leaderboard ADD COLUMN {col} TEXT")
-                    
-                    df.to_sql('leaderboard', conn, if_exists='append', index=False)
+                    with timer.stage('insert'):
+                        # DB 스키마 자동 업데이트
+                        cursor = conn.cursor()
+                        cursor.execute("PRAGMA table_info(leaderboard)")
+                        existing_columns = [info[1] for info in cursor.fetchall()]
+                        for col in df.columns:
+                            if col not in existing_columns:
+                                cursor.execute(f"ALTER TABLE leaderboard ADD COLUMN {col} TEXT")
+                        
+                        df.to_sql('leaderboard', conn, if_exists='append', index=False)
+                    timer.add_rows(len(df))
                     print(f"[Wallchain - {normalized_tf}] DB Insert Complete.")
 
+            with timer.stage('insert'):
+                conn.commit()
+            timer.mark_queryable()
+
         # 데이터 삽입이 완전히 끝난 후 파일 정리 실행
         if new_data_found:
-            self.cleanup_old_files()
-            
+            # 버전을 올리기 전에 기록해야 워커가 새 버전 페이지를 만들 때 파일이 있음
+            with timer.stage('snapshot'):
+                try:
+                    self.publish_snapshots(refresh=loaded)
+                except Exception as e:
+                    # 이전 내용이 남은 파일로 비교하지 않도록 이번에 적재한 스냅샷 파일은 지움 (SQL로 비교)
+                    # 지운 파일은 다음 publish_snapshots에서 다시 기록됨
+                    print(f"[스냅샷 파일] 기록 실패 - 이번에 적재한 스냅샷 {len(loaded)}개는 SQL로 비교: {e}")
+                    for tf, ts in loaded:
+                        self.snapshots.remove(tf, ts)
+            self._bump_data_version()
+            with timer.stage('cleanup'):
+                self.cleanup_old_files()
+        
+        self.last_load = timer.result()
         return new_data_found
 
     def cleanup_old_files(self):
@@ -227,6 +279,7 @@ class DataProcessorWallchain:
 
     def check_for_new_data(self):
         """새로 생성된 JSON 파일이 있는지 체크합니다."""
+        scan_start = time.perf_counter()
         new_files = defaultdict(list)
         any_new = False
         
@@ -258,13 +311,14 @@ class DataProcessorWallchain:
                 if os.path.basename(f) > last_loaded:
                     new_files[tf].append(f)
                     any_new = True
+        self.last_scan_seconds = time.perf_counter() - scan_start
         return new_files if any_new else {}
 
     # --- 데이터 조회 함수들 ---
 
     def get_available_timestamps(self, timeframe='epoch-2'):
         query = "SELECT DISTINCT timestamp FROM leaderboard WHERE timeframe = ? ORDER BY timestamp ASC"
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             df = pd.read_sql(query, conn, params=(timeframe,))
         return df['timestamp'].tolist()
 
@@ -277,7 +331,7 @@ class DataProcessorWallchain:
             FROM leaderboard WHERE timestamp = ? AND timeframe = ?
             ORDER BY position ASC
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             return pd.read_sql(query, conn, params=(timestamp, timeframe))
 
     def get_user_history(self, username, timeframe='epoch-2'):
@@ -286,7 +340,7 @@ class DataProcessorWallchain:
                    mindsharePercentage, rank, score
             FROM leaderboard WHERE username = ? AND timeframe = ? ORDER BY timestamp ASC
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             history = pd.read_sql(query, conn, params=(username, timeframe))
         if history.empty: return pd.DataFrame()
         history['timestamp'] = pd.to_datetime(history['timestamp'])
@@ -296,7 +350,7 @@ class DataProcessorWallchain:
         return history
 
     def get_all_usernames(self, timeframe='epoch-2'):
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT MAX(timestamp) FROM leaderboard WHERE timeframe = ?", (timeframe,))
             latest_ts = cursor.fetchone()[0]
@@ -318,7 +372,7 @@ class DataProcessorWallchain:
             priority_order.append('epoch-2')
         priority_order.extend([tf for tf in self.timeframes if tf != 'epoch-2'])
         
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             for tf in priority_order:
                 cursor = conn.cursor()
                 cursor.execute("SELECT MAX(timestamp) FROM leaderboard WHERE timeframe = ?", (tf,))
@@ -337,7 +391,7 @@ class DataProcessorWallchain:
         return list(all_users.values())
 
     def get_user_info_by_timeframe(self, username, timeframe='epoch-2'):
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT MAX(timestamp) FROM leaderboard WHERE timeframe = ?", (timeframe,))
             latest_ts = cursor.fetchone()[0]
@@ -354,7 +408,7 @@ class DataProcessorWallchain:
 
     def get_user_info(self, username):
         query = "SELECT username, name, imageUrl, rank, score FROM leaderboard WHERE username = ? ORDER BY timestamp DESC LIMIT 1"
-        with sqlite3.connect(self.db_path) as conn:
+        with query_profiler.connect(self.db_path) as conn:
             df = pd.read_sql(query, conn, params=(username,))
             if not df.empty: return df.iloc[0].to_dict()
         return {'username': username, 'name': username}
@@ -362,7 +416,121 @@ class DataProcessorWallchain:
     def get_user_analysis(self, username):
         return {tf: self.get_user_history(username, tf) for tf in self.timeframes}
 
+    # --- 스냅샷 공유 파일 (snapshot_store) ---
+
+    def _snapshot_columns(self, conn, timestamp, timeframe):
+        """스냅샷 1개를 username별로 묶은 컬럼 (compare_leaderboards SQL 버전의 한쪽 side 집계와 같은 값)"""
+        rows = conn.execute("""
+            SELECT username, MAX(name), MAX(imageUrl),
+                   CAST(COALESCE(MAX(position), 9999) AS INTEGER), COALESCE(MAX(mindsharePercentage), 0)
+            FROM leaderboard WHERE timestamp = ? AND timeframe = ? AND username IS NOT NULL
+            GROUP BY username ORDER BY username
+        """, (timestamp, timeframe)).fetchall()
+        values = list(zip(*rows)) if rows else [()] * 5
+        return {
+            'username': values[0],
+            'name': values[1],
+            'imageUrl': values[2],
+            'position': np.array(values[3], dtype=np.int64),
+            'mindsharePercentage': np.array(values[4], dtype=np.float64),
+        }
+
+    def publish_snapshots(self, refresh=()):
+        """
+        timeframe별 최근 snapshots.keep개 스냅샷을 파일로 기록 (없는 것 + refresh에 있는 (timeframe, timestamp))
+        범위를 벗어난 파일은 삭제 -> 기록한 파일 수
+        """
+        written = 0
+        with query_profiler.connect(self.db_path) as conn:
+            for tf in self.timeframes:
+                timestamps = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT timestamp FROM leaderboard WHERE timeframe = ? ORDER BY timestamp DESC LIMIT ?",
+                    (tf, self.snapshots.keep))]
+                for ts in timestamps:
+                    if (tf, ts) in refresh or not self.snapshots.exists(tf, ts):
+                        self.snapshots.publish(tf, ts, self._snapshot_columns(conn, ts, tf))
+                        written += 1
+                self.snapshots.prune(tf, timestamps)
+        return written
+
     def compare_leaderboards(self, timestamp1, timestamp2, timeframe='epoch-2'):
+        """
+        두 스냅샷 비교 - 두 스냅샷 모두 공유 파일에 있으면 NumPy로 처리 (SQLite 조회 없음),
+        하나라도 없으면(오래된 스냅샷) compare_leaderboards_sql
+        """
+        join = self.snapshots.join(timeframe, timestamp1, timestamp2)
+        if join is None:
+            return self.compare_leaderboards_sql(timestamp1, timestamp2, timeframe)
+
+        prev_position = join.numbers('prev', 'position', 9999)
+        curr_position = join.numbers('curr', 'position', 9999)
+        prev_ms = join.numbers('prev', 'mindsharePercentage', 0.0)
+        curr_ms = join.numbers('curr', 'mindsharePercentage', 0.0)
+        position_change = prev_position - curr_position
+        position_change[np.abs(position_change) > 500] = 0
+        ms_change = np.where((prev_position == 9999) | (curr_position == 9999), 0.0, curr_ms - prev_ms)
+
+        # ORDER BY curr_position ASC, prev_position ASC, username ASC (join 결과가 이미 username 순)
+        order = np.lexsort((prev_position, curr_position))
+        columns = {
+            'username': join.key_list(),
+            'name': join.strings('name', ''),
+            'imageUrl': join.strings('imageUrl', ''),
+            'prev_position': prev_position,
+            'curr_position': curr_position,
+            'position_change': position_change,
+            'prev_mindshare': prev_ms,
+            'curr_mindshare': curr_ms,
+            'mindshare_change': ms_change,
+        }
+        order_list = order.tolist()
+        data = {c: v[order].tolist() if isinstance(v, np.ndarray) else [v[i] for i in order_list]
+                for c, v in columns.items()}
+        return CompareResult(columns, data)
+
+    def compare_leaderboards_sql(self, timestamp1, timestamp2, timeframe='epoch-2'):
+        """
+        두 스냅샷 비교 (SQL 버전)
+        - outer join / 결측 채우기(순위 9999, 마쉐 0) / 변동 보정 / 정렬을 모두 SQL에서 처리
+        - 컬럼과 값은 compare_leaderboards_pandas와 같고, 결과는 CompareResult (컬럼별 리스트)
+        """
+        # 두 스냅샷을 UNION ALL 후 username으로 GROUP BY (= outer join, side 1(현재) 값 우선)
+        # 서브쿼리끼리 FULL OUTER JOIN 하면 인덱스 없이 중첩 스캔(O(n²))이 되므로 정렬 기반 집계 사용
+        query = """
+            WITH both_sides AS (
+                SELECT 0 AS side, username, name, position, mindsharePercentage, imageUrl
+                FROM leaderboard WHERE timestamp = ? AND timeframe = ?
+                UNION ALL
+                SELECT 1 AS side, username, name, position, mindsharePercentage, imageUrl
+                FROM leaderboard WHERE timestamp = ? AND timeframe = ?
+            ), merged AS (
+                SELECT username,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN name END),
+                                MAX(CASE WHEN side = 0 THEN name END), '') AS name,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN imageUrl END),
+                                MAX(CASE WHEN side = 0 THEN imageUrl END), '') AS imageUrl,
+                       COALESCE(MAX(CASE WHEN side = 0 THEN position END), 9999) AS prev_position,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN position END), 9999) AS curr_position,
+                       COALESCE(MAX(CASE WHEN side = 0 THEN mindsharePercentage END), 0) AS prev_mindshare,
+                       COALESCE(MAX(CASE WHEN side = 1 THEN mindsharePercentage END), 0) AS curr_mindshare
+                FROM both_sides
+                GROUP BY username
+            )
+            SELECT username, name, imageUrl, prev_position, curr_position,
+                   CASE WHEN ABS(prev_position - curr_position) > 500 THEN 0
+                        ELSE prev_position - curr_position END AS position_change,
+                   prev_mindshare, curr_mindshare,
+                   CASE WHEN prev_position = 9999 OR curr_position = 9999 THEN 0.0
+                        ELSE curr_mindshare - prev_mindshare END AS mindshare_change
+            FROM merged
+            ORDER BY curr_position ASC, prev_position ASC, username ASC
+        """
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.execute(query, (timestamp1, timeframe, timestamp2, timeframe))
+            return CompareResult.from_cursor(cursor)
+
+    def compare_leaderboards_pandas(self, timestamp1, timestamp2, timeframe='epoch-2'):
+        """기존 pandas 구현 (benchmarks/parity_compare_leaderboards.py에서 SQL 버전과 결과 비교용)"""
         df1 = self.get_leaderboard_at_timestamp(timestamp1, timeframe)
         df2 = self.get_leaderboard_at_timestamp(timestamp2, timeframe)
         if df1.empty and df2.empty: return pd.DataFrame()
@@ -0,0 +1,225 @@
+"""
+유저 1명의 전 프로젝트 순위를 프로젝트 DB에서 바로 조회 (글로벌 DB 갱신을 기다리지 않음)
+
+- 프로젝트 DB들을 SQLite ATTACH 한도(기본 10개) 단위로 묶어서 붙이고,
+  프로젝트별 SELECT를 UNION ALL로 합쳐 묶음당 쿼리 1번으로 조회
+- 핸들은 글로벌 DB와 같이 대소문자 무시(COLLATE NOCASE)로 찾고, infoName은 저장된 핸들로 돌려줌
+- 프로젝트별 최신 타임스탬프는 데이터 버전이 바뀔 때만 다시 조회
+- 결과 형식은 GlobalDataManager.get_user_data와 동일
+"""
+import sqlite3
+import query_profiler
+import threading
+
+# ATTACH 한도를 확인할 수 없는 환경의 기본값 (SQLITE_MAX_ATTACHED 기본값)
+DEFAULT_ATTACH_LIMIT = 10
+MAX_CONNECTIONS_PER_THREAD = 32
+
+
+class FederatedLookup:
+    def __init__(self, sources):
+        """
+        sources: 현재 등록된 프로젝트 DB 목록을 돌려주는 함수
+                 [(kind, project_name, db_path, timeframes, data_version), ...]
+                 kind는 'cookie' / 'wallchain' / 'kaito' (kaito는 DB 1개에 모든 프로젝트)
+        """
+        self.sources = sources
+        self._local = threading.local()   # 스레드별 {묶음(db 경로 튜플): 연결}
+        self._latest = {}                 # {db_path: (data_version, {timeframe: 최신 타임스탬프})}
+        self._columns = {}                # {db_path: (data_version, 테이블 컬럼 집합)}
+        self._lock = threading.Lock()
+
+    # ---------- 연결 / 묶음 ----------
+
+    def _attach_limit(self, conn):
+        try:
+            return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        except AttributeError:  # Python 3.11 미만
+            return DEFAULT_ATTACH_LIMIT
+
+    def _connection(self, db_paths):
+        """db_paths를 ATTACH한 스레드 전용 연결 (묶음 구성이 같으면 재사용)"""
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(db_paths)
+        if conn is None:
+            if len(conns) >= MAX_CONNECTIONS_PER_THREAD:
+                # 프로젝트 목록이 바뀌어 더 이상 쓰지 않는 묶음 연결 정리
+                self.close()
+                conns = self._local.conns
+            conn = query_profiler.connect(':memory:', timeout=30.0)
+            for i, path in enumerate(db_paths):
+                conn.execute(f"ATTACH DATABASE ? AS p{i}", (path,))
+            conns[db_paths] = conn
+        return conn
+
+    def _batches(self, sources):
+        probe = sqlite3.connect(':memory:')
+        limit = self._attach_limit(probe)
+        probe.close()
+        for start in range(0, len(sources), limit):
+            yield sources[start:start + limit]
+
+    def close(self):
+        """현재 스레드의 연결 정리 (프로젝트 목록이 바뀌면 이전 묶음 연결은 쓰이지 않음)"""
+        for conn in getattr(self._local, 'conns', {}).values():
+            conn.close()
+        self._local.conns = {}
+
+    # ---------- 프로젝트별 메타데이터 ----------
+
+    def _table_columns(self, conn, alias, db_path, table, data_version):
+        """테이블 컬럼 집합 (신규 데이터 반영 시 ALTER로 컬럼이 늘 수 있으므로 데이터 버전별로 캐시)"""
+        cached = self._columns.get(db_path)
+        if cached is not None and cached[0] == data_version:
+            return cached[1]
+        columns = {row[1] for row in conn.execute(f"PRAGMA {alias}.table_info({table})")}
+        with self._lock:
+            self._columns[db_path] = (data_version, columns)
+        return columns
+
+    def _latest_timestamps(self, conn, alias, db_path, table, timeframes, data_version):
+        """timeframe별 최신 타임스탬프 (데이터 버전이 그대로면 캐시 사용)"""
+        cached = self._latest.get(db_path)
+        if cached is not None and cached[0] == data_version:
+            return cached[1]
+        latest = {}
+        for tf in timeframes:
+            row = conn.execute(f"SELECT MAX(timestamp) FROM {alias}.{table} WHERE timeframe = ?", (tf,)).fetchone()
+            if row and row[0]:
+                latest[tf] = row[0]
+        with self._lock:
+            self._latest[db_path] = (data_version, latest)
+        return latest
+
+    # ---------- 쿼리 생성 ----------
+
+    def _select(self, conn, alias, source, username):
+        """source 하나에 대한 SELECT와 파라미터 (조회할 게 없으면 None)"""
+        kind, project_name, db_path, timeframes, data_version = source
+
+        if kind == 'kaito':
+            # kaito는 (projectName, timeframe, timestamp) 인덱스로 프로젝트별 최신 타임스탬프를 바로 찾음
+            sql = f"""
+                SELECT 'kaito', 'kaito-' || r.projectName, r.timeframe, r.rank, NULL,
+                       CAST(RTRIM(r.mindshare, '%') AS REAL), NULL, NULL,
+                       r.displayName, r.imageId, NULL, r.smartFollower, r.follower, r.handle
+                FROM {alias}.rankings r
+                WHERE r.handle = ? COLLATE NOCASE
+                  AND r.timestamp = (SELECT MAX(timestamp) FROM {alias}.rankings
+                                     WHERE projectName = r.projectName AND timeframe = r.timeframe)
+            """
+            return sql, [username]
+
+        table = 'snaps' if kind == 'cookie' else 'leaderboard'
+        latest = self._latest_timestamps(conn, alias, db_path, table, timeframes, data_version)
+        if not latest:
+            return None
+        columns = self._table_columns(conn, alias, db_path, table, data_version)
+        col = lambda name: name if name in columns else 'NULL'
+        pairs = ', '.join(['(?, ?)'] * len(latest))
+        params = [project_name, username]
+        for tf, ts in latest.items():
+            params.extend((tf, ts))
+
+        if kind == 'cookie':
+            sql = f"""
+                SELECT 'cookie', ?, timeframe, CAST({col('snapsPercentRank')} AS INTEGER),
+                       CAST({col('cSnapsPercentRank')} AS INTEGER), {col('snapsPercent')}, {col('cSnapsPercent')}, NULL,
+                       displayName, profileImageUrl, NULL, {col('smartFollowers')}, {col('followers')}, username
+                FROM {alias}.snaps
+                WHERE username = ? COLLATE NOCASE AND (timeframe, timestamp) IN (VALUES {pairs})
+            """
+        else:
+            sql = f"""
+                SELECT 'wallchain', ?, timeframe, position, NULL, mindsharePercentage, NULL, {col('positionChange')},
+                       name, imageUrl, {col('score')}, NULL, NULL, username
+                FROM {alias}.leaderboard
+                WHERE username = ? COLLATE NOCASE AND (timeframe, timestamp) IN (VALUES {pairs})
+            """
+        return sql, params
+
+    def _rows(self, username):
+        sources = list(self.sources())
+        for batch in self._batches(sources):
+            conn = self._connection(tuple(s[2] for s in batch))
+            selects, params = [], []
+            for i, source in enumerate(batch):
+                try:
+                    query = self._select(conn, f"p{i}", source, username)
+                except sqlite3.Error as e:
+                    print(f"[FederatedLookup] {source[1]} 건너뜀: {e}")
+                    continue
+                if query:
+                    selects.append(query[0])
+                    params.extend(query[1])
+            if selects:
+                yield from conn.execute(' UNION ALL '.join(selects), params)
+
+    # ---------- 공개 API ----------
+
+    def get_user_data(self, username):
+        """GlobalDataManager.get_user_data와 같은 형식 (순위가 하나도 없으면 None)"""
+        groups = {'cookie': {}, 'wallchain': {}, 'kaito': {}}
+        user = {'infoName': username, 'displayName': None, 'imageUrl': None, 'wal_score': None,
+                'cookie_smart_follower': None, 'kaito_smart_follower': None, 'follower': None}
+        names = {}   # {kind: displayName}
+        found = False
+
+        for (kind, project_name, timeframe, ms_rank, cms_rank, ms, cms, position_change,
+             display_name, image, wal_score, smart_follower, follower, handle) in self._rows(username):
+            if not found:
+                user['infoName'] = handle  # 글로벌 DB와 같이 입력한 철자가 아니라 저장된 핸들
+            found = True
+            groups[kind].setdefault(project_name, []).append({
+                'timeframe': timeframe,
+                'msRank': ms_rank,
+                'cmsRank': cms_rank,
+                'ms': ms,
+                'cms': cms,
+                'positionChange': position_change
+            })
+            if display_name:
+                names.setdefault(kind, display_name)
+            # 이미지는 URL(wallchain/cookie) 우선, kaito 숫자 ID는 없을 때만
+            if image and (not user['imageUrl'] or (user['imageUrl'].isdigit() and not str(image).isdigit())):
+                user['imageUrl'] = image
+            if kind == 'wallchain' and wal_score is not None:
+                user['wal_score'] = wal_score
+            elif kind == 'cookie':
+                if smart_follower is not None:
+                    user['cookie_smart_follower'] = smart_follower
+                if follower is not None:
+                    user['follower'] = follower
+            elif kind == 'kaito':
+                smart = _to_int(smart_follower)
+                if smart is not None and smart > (user['kaito_smart_follower'] or 0):
+                    user['kaito_smart_follower'] = smart
+                if user['follower'] is None:
+                    user['follower'] = _to_int(follower)
+
+        if not found:
+            return None
+
+        # 표시 이름 우선순위: wallchain > cookie > kaito
+        user['displayName'] = names.get('wallchain') or names.get('cookie') or names.get('kaito')
+        for projects in groups.values():
+            for rankings in projects.values():
+                rankings.sort(key=lambda r: r['timeframe'])
+        return {
+            'user': user,
+            'cookie_projects': dict(sorted(groups['cookie'].items())),
+            'wallchain_projects': dict(sorted(groups['wallchain'].items())),
+            'kaito_projects': dict(sorted(groups['kaito'].items()))
+        }
+
+
+def _to_int(value):
+    """kaito 팔로워 문자열('1,234' / '-') -> int"""
+    if value is None or value == '-':
+        return None
+    try:
+        return int(str(value).replace(',', ''))
+    except ValueError:
+        return None
@@ -1,62 +1,186 @@
 import sqlite3
+import query_profiler
 import os
+import glob
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 import logging
 
 class GlobalDataManager:
-    def __init__(self, db_path='./data/global_rankings.db'):
-        self.db_path = db_path
+    """
+    글로벌 DB 관리 - 갱신마다 새 세대 DB 파일(global_rankings.000001.db ...)을 만들고 포인터만 교체
+    - 조회는 항상 완성된 세대 파일을 읽으므로 갱신 중에도 잠금 대기 없음
+    - 현재 세대 파일명은 <이름>.current 포인터 파일에 기록 (재시작 시 이어서 사용)
+    - 교체된 이전 세대는 진행 중인 조회가 끝나면 삭제
+      (retire_delay: 다른 프로세스가 아직 이전 세대를 읽을 수 있으므로 교체 후 이 시간(초) 동안은 유지)
+    - manage_files=False (멀티 프로세스 모드의 웹 워커): 세대 파일을 만들거나 지우지 않고,
+      리더가 포인터를 바꾸면 refresh()로 따라감
+    """
+
+    def __init__(self, db_path='./data/global_rankings.db', manage_files=True, retire_delay=0.0):
+        self.base_path = db_path
+        self.manage_files = manage_files
+        self.retire_delay = retire_delay
+        root, ext = os.path.splitext(db_path)
+        self._generation_root = root
+        self._generation_ext = ext or '.db'
+        self.pointer_path = root + '.current'
+        self._lock = threading.Lock()
+        self._readers = {}      # {세대 경로: 진행 중인 조회 수}
+        self._retired = {}      # {교체되어 조회가 끝나길 기다리는 이전 세대 경로: 교체 시각}
+        self._building = None   # 생성 중인 세대 경로
+        self.db_path = self._read_pointer()
         self.init_database()
+        if manage_files:
+            self._retire_stale_generations()
+    
+    # ---------- 세대 파일 / 포인터 ----------
+    
+    def _generation_path(self, number):
+        return f"{self._generation_root}.{number:06d}{self._generation_ext}"
+    
+    def _generation_files(self):
+        pattern = f"{glob.escape(self._generation_root)}.[0-9]*{self._generation_ext}"
+        return [p for p in glob.glob(pattern)
+                if p[len(self._generation_root) + 1:-len(self._generation_ext)].isdigit()]
+    
+    def _next_generation_path(self):
+        numbers = [int(p[len(self._generation_root) + 1:-len(self._generation_ext)])
+                   for p in self._generation_files()]
+        return self._generation_path(max(numbers, default=0) + 1)
+    
+    def _read_pointer(self):
+        """포인터 파일이 가리키는 현재 세대 (없으면 기존 단일 파일 global_rankings.db)"""
+        try:
+            with open(self.pointer_path, encoding='utf-8') as f:
+                name = f.read().strip()
+        except OSError:
+            return self.base_path
+        path = os.path.join(os.path.dirname(self.base_path), name)
+        return path if name and os.path.exists(path) else self.base_path
+    
+    def _write_pointer(self, path):
+        """포인터 파일 원자적 교체 (임시 파일 작성 후 rename)"""
+        tmp_path = self.pointer_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(os.path.basename(path))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.pointer_path)
+    
+    def _retire_stale_generations(self):
+        """시작 시 현재 세대가 아닌 세대 파일(이전 실행에서 남은 것) 정리"""
+        with self._lock:
+            self._retired.update((p, 0.0) for p in self._generation_files()
+                                 if os.path.abspath(p) != os.path.abspath(self.db_path))
+        self.collect_garbage()
+    
+    @contextmanager
+    def reading(self):
+        """현재 세대 경로를 잡고 조회 (조회가 끝날 때까지 해당 세대는 삭제되지 않음)"""
+        with self._lock:
+            path = self.db_path
+            self._readers[path] = self._readers.get(path, 0) + 1
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._readers[path] -= 1
+                if not self._readers[path]:
+                    del self._readers[path]
+                drained = path in self._retired and path not in self._readers
+            if drained:
+                self.collect_garbage()
+    
+    def refresh(self):
+        """포인터 파일을 다시 읽어 현재 세대 교체 (다른 프로세스가 갱신한 경우) -> 바뀌었으면 True"""
+        path = self._read_pointer()
+        with self._lock:
+            if path == self.db_path:
+                return False
+            self.db_path = path
+        return True
+    
+    def collect_garbage(self):
+        """조회가 모두 끝나고 retire_delay가 지난 이전 세대 파일 삭제 -> 삭제한 경로 목록"""
+        if not self.manage_files:
+            return []
+        now = time.time()
+        with self._lock:
+            removable = [p for p, retired_at in self._retired.items()
+                         if p not in self._readers and now - retired_at >= self.retire_delay]
+            for p in removable:
+                del self._retired[p]
+        for path in removable:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[GlobalDataManager] 이전 세대 삭제 실패 ({path + suffix}): {e}")
+            print(f"[GlobalDataManager] 이전 세대 삭제: {os.path.basename(path)}")
+        return removable
+    
+    # ---------- 스키마 ----------
+    
+    @staticmethod
+    def _create_tables(cursor):
+        # 유저 정보 테이블
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                infoName TEXT PRIMARY KEY,
+                displayName TEXT,
+                imageUrl TEXT,
+                wal_score INTEGER,
+                cookie_smart_follower INTEGER,
+                kaito_smart_follower INTEGER,
+                follower INTEGER
+            )
+        ''')
+                  
+        # 순위 정보 테이블
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rankings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                infoName TEXT,
+                projectName TEXT,
+                timeframe TEXT,
+                msRank INTEGER,
+                cmsRank INTEGER,
+                ms REAL,
+                cms REAL,
+                positionChange INTEGER,
+                UNIQUE(infoName, projectName, timeframe)
+            )
+        ''')
+    
+    @staticmethod
+    def _create_indexes(cursor):
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_rankings_infoName ON rankings(infoName)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_displayName ON users(displayName)')
     
     def init_database(self):
-        """글로벌 DB 초기화 및 테이블 생성"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        """글로벌 DB 초기화 및 테이블 생성 (현재 세대)"""
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             # WAL 모드 활성화 (동시 읽기/쓰기 지원)
             cursor.execute('PRAGMA journal_mode=WAL')
             cursor.execute('PRAGMA synchronous=NORMAL')
             
-            # 유저 정보 테이블
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    infoName TEXT PRIMARY KEY,
-                    displayName TEXT,
-                    imageUrl TEXT,
-                    wal_score INTEGER,
-                    cookie_smart_follower INTEGER,
-                    kaito_smart_follower INTEGER,
-                    follower INTEGER
-                )
-            ''')
-                      
-            # 순위 정보 테이블
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS rankings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    infoName TEXT,
-                    projectName TEXT,
-                    timeframe TEXT,
-                    msRank INTEGER,
-                    cmsRank INTEGER,
-                    ms REAL,
-                    cms REAL,
-                    positionChange INTEGER,
-                    UNIQUE(infoName, projectName, timeframe)
-                )
-            ''')
-            
-            # 인덱스 생성
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_rankings_infoName ON rankings(infoName)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_displayName ON users(displayName)')
+            self._create_tables(cursor)
+            self._create_indexes(cursor)
             
             conn.commit()
-            print("[GlobalDataManager] Database initialized")
+            print(f"[GlobalDataManager] Database initialized ({os.path.basename(self.db_path)})")
     
     def update_user(self, info_name, display_name=None, image_url=None, wal_score=None, 
                    cookie_smart_follower=None, kaito_smart_follower=None, follower=None):
         """유저 정보 업데이트 (wallchain > cookie > kaito 우선순위)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             # 기존 데이터 확인
@@ -109,7 +233,7 @@ class GlobalDataManager:
                       cms_rank=None, ms=None, cms=None, 
                       position_change=None):
         """순위 정보 업데이트"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
@@ -125,7 +249,7 @@ class GlobalDataManager:
     
     def search_users(self, query, limit=10):
         """유저 검색 (infoName, displayName 모두 검색) - SQLite 쿼리 기반 (한글 완벽 지원)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with self.reading() as path, query_profiler.connect(path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             # @ prefix 제거
@@ -163,7 +287,7 @@ class GlobalDataManager:
     
     def get_user_data(self, info_name):
         """특정 유저의 전체 데이터 가져오기"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with self.reading() as path, query_profiler.connect(path, timeout=30.0) as conn:
             cursor = conn.cursor()
             
             # 유저 기본 정보
@@ -239,39 +363,54 @@ class GlobalDataManager:
     
     def clear_all_rankings(self):
         """모든 순위 데이터 삭제 (갱신 전)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with query_profiler.connect(self.db_path, timeout=30.0) as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM rankings')
             conn.commit()
     
     def begin_batch_update(self):
-        """배치 업데이트 시작 - rankings 임시 테이블만 생성 (users는 직접 UPSERT)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        """배치 업데이트 시작 - 새 세대 DB 파일 생성 (인덱스 없이 테이블만, users는 현재 세대에서 이어받음)"""
+        if self._building and os.path.exists(self._building):
+            # 이전 갱신이 중간에 실패하고 남긴 파일
+            with self._lock:
+                self._retired[self._building] = 0.0  # 아무도 읽지 않은 파일이므로 바로 삭제
+            self.collect_garbage()
+        
+        path = self._next_generation_path()
+        with self.reading() as current_path, query_profiler.connect(path, timeout=30.0) as conn:
             cursor = conn.cursor()
+            # 생성 중인 세대는 아무도 읽지 않으므로 적재 동안은 동기화 생략 (실패 시 파일째 버림)
+            cursor.execute('PRAGMA synchronous=OFF')
+            self._create_tables(cursor)
             
-            # rankings 임시 테이블만 생성
-            cursor.execute('DROP TABLE IF EXISTS rankings_temp')
-            
+            # 기존 유저 정보 이어받기 (batch_insert_users는 이 위에 UPSERT)
+            cursor.execute('ATTACH DATABASE ? AS current_gen', (current_path,))
             cursor.execute('''
-                CREATE TABLE rankings_temp (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    infoName TEXT,
-                    projectName TEXT,
-                    timeframe TEXT,
-                    msRank INTEGER,
-                    cmsRank INTEGER,
-                    ms REAL,
-                    cms REAL,
-                    positionChange INTEGER,
-                    UNIQUE(infoName, projectName, timeframe)
-                )
+                INSERT INTO users (infoName, displayName, imageUrl, wal_score,
+                                  cookie_smart_follower, kaito_smart_follower, follower)
+                SELECT infoName, displayName, imageUrl, wal_score,
+                       cookie_smart_follower, kaito_smart_follower, follower
+                FROM current_gen.users
             ''')
-            
             conn.commit()
+            cursor.execute('DETACH DATABASE current_gen')
+        
+        self._building = path
+        print(f"[GlobalDataManager] 새 세대 생성 시작: {os.path.basename(path)}")
+    
+    def _connect_building(self):
+        """
+        생성 중인 세대 연결 (갱신 중이 아니면 현재 세대)
+        synchronous는 연결마다 적용되므로 생성 중인 세대는 연결할 때마다 OFF (교체 직전에 fsync)
+        """
+        conn = query_profiler.connect(self._building or self.db_path, timeout=30.0)
+        if self._building:
+            conn.execute('PRAGMA synchronous=OFF')
+        return conn
     
     def batch_insert_users(self, users_data):
         """유저 데이터 배치 삽입 (최초 생성 시 빠른 INSERT, 이후 UPSERT)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with self._connect_building() as conn:
             cursor = conn.cursor()
             
             # DB가 비어있는지 확인 (최초 생성 여부)
@@ -305,50 +444,43 @@ class GlobalDataManager:
             conn.commit()
     
     def batch_insert_rankings(self, rankings_data):
-        """순위 데이터 배치 삽입"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        """순위 데이터 배치 삽입 (새 세대의 rankings 테이블)"""
+        with self._connect_building() as conn:
             cursor = conn.cursor()
             cursor.executemany('''
-                INSERT OR REPLACE INTO rankings_temp 
+                INSERT OR REPLACE INTO rankings 
                 (infoName, projectName, timeframe, msRank, cmsRank, ms, cms, positionChange)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', rankings_data)
             conn.commit()
     
     def commit_batch_update(self):
-        """배치 업데이트 완료 - rankings만 임시 테이블로 교체 (users는 이미 UPSERT 완료)"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
-            cursor = conn.cursor()
-            
-            # 트랜잭션으로 한번에 교체
-            cursor.execute('BEGIN IMMEDIATE')
-            try:
-                # 기존 old 테이블 삭제 (이전 실패 시 남아있을 수 있음)
-                cursor.execute('DROP TABLE IF EXISTS rankings_old')
-                
-                # 현재 rankings 테이블이 존재하는지 확인
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='rankings'")
-                rankings_exists = cursor.fetchone() is not None
-                
-                # 현재 테이블이 있으면 old로 변경, 없으면 스킵
-                if rankings_exists:
-                    cursor.execute('ALTER TABLE rankings RENAME TO rankings_old')
-                
-                # 임시 테이블을 실제 테이블로 변경
-                cursor.execute('ALTER TABLE rankings_temp RENAME TO rankings')
-                
-                # 인덱스 재생성 (rankings만)
-                cursor.execute('CREATE INDEX IF NOT EXISTS idx_rankings_infoName ON rankings(infoName)')
-                
-                # old 테이블 삭제 (있는 경우에만)
-                if rankings_exists:
-                    cursor.execute('DROP TABLE rankings_old')
-                
+        """배치 업데이트 완료 - 새 세대에 인덱스 생성 후 포인터 교체 (이전 세대는 조회가 끝나면 삭제)"""
+        path = self._building
+        if path is None:
+            raise RuntimeError("begin_batch_update가 호출되지 않았습니다")
+        
+        try:
+            with self._connect_building() as conn:
+                cursor = conn.cursor()
+                # 적재가 끝난 뒤 인덱스 생성 (행마다 인덱스를 갱신하는 것보다 빠름)
+                self._create_indexes(cursor)
                 conn.commit()
-                # WAL 체크포인트 실행 - 변경사항을 메인 DB에 즉시 반영
-                cursor.execute('PRAGMA wal_checkpoint(PASSIVE)')
-                print("[GlobalDataManager] 배치 업데이트 완료 - rankings 교체 성공, users UPSERT 완료")
-            except Exception as e:
-                conn.rollback()
-                print(f"[GlobalDataManager] 배치 업데이트 실패: {e}")
-                raise
+                cursor.execute('PRAGMA journal_mode=WAL')
+            
+            # synchronous=OFF로 쓴 내용을 디스크에 내린 뒤 포인터 교체 (전원이 나가도 포인터가 깨진 세대를 가리키지 않도록)
+            with open(path, 'rb') as f:
+                os.fsync(f.fileno())
+            self._write_pointer(path)
+        except Exception as e:
+            print(f"[GlobalDataManager] 배치 업데이트 실패: {e}")
+            raise
+        
+        with self._lock:
+            previous = self.db_path
+            self.db_path = path
+            self._building = None
+            if previous != path:
+                self._retired[previous] = time.time()
+        self.collect_garbage()
+        print(f"[GlobalDataManager] 배치 업데이트 완료 - 세대 교체: {os.path.basename(previous)} -> {os.path.basename(path)}")
@@ -0,0 +1,156 @@
+"""
+글로벌 DB(users / rankings)를 메모리에 올린 유저 조회용 인덱스
+
+- 핸들(대소문자 무시) -> 유저 row 번호 해시맵
+- 순위는 유저별로 연속 배치된 컬럼 배열에 저장하고, 유저마다 cookie / wallchain / kaito 구간을 미리 나눠 둠
+- 글로벌 DB 갱신이 끝나면 새 인덱스를 만들어 통째로 교체 (요청 스레드는 읽기만 함)
+- get_user_data 결과 형식은 GlobalDataManager.get_user_data와 동일
+"""
+import sqlite3
+import query_profiler
+import sys
+import time
+from array import array
+
+KINDS = ('cookie', 'wallchain', 'kaito')
+USER_FIELDS = ('infoName', 'displayName', 'imageUrl', 'wal_score',
+               'cookie_smart_follower', 'kaito_smart_follower', 'follower')
+
+# COLLATE NOCASE와 같게 ASCII 대소문자만 무시
+_ASCII_FOLD = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def fold(name):
+    return name.translate(_ASCII_FOLD)
+
+
+def project_kind(project_name):
+    """프로젝트명으로 cookie(0) / wallchain(1) / kaito(2) 구분"""
+    if project_name.startswith('wallchain-'):
+        return 1
+    if project_name.startswith('kaito-'):
+        return 2
+    return 0
+
+
+class GlobalIndex:
+    """글로벌 DB 스냅샷의 불변 메모리 인덱스"""
+
+    def __init__(self, users=(), rankings=()):
+        """
+        users: users 테이블 row (rowid 순서) - (infoName, displayName, imageUrl, wal_score, ...)
+        rankings: (infoName, projectName, timeframe, msRank, cmsRank, ms, cms, positionChange)
+        """
+        self.built_at = time.time()
+        self._rows = {}     # {대소문자 무시 핸들: 유저 row 번호}
+        self._users = []    # [유저 정보 tuple] (같은 핸들이 대소문자만 다르게 여러 개면 SQLite처럼 먼저 나온 것만)
+        for row in users:
+            if not row or row[0] is None:
+                continue
+            key = fold(row[0])
+            if key in self._rows:
+                continue
+            self._rows[key] = len(self._users)
+            self._users.append(tuple(row[:len(USER_FIELDS)]) + (None,) * (len(USER_FIELDS) - len(row)))
+
+        # 순위를 (유저, 종류, 프로젝트, timeframe) 순으로 정렬 - 기존 ORDER BY projectName, timeframe과 같은 순서
+        keyed = []
+        for r in rankings:
+            row_id = self._rows.get(fold(r[0])) if r[0] else None
+            if row_id is None:
+                continue
+            keyed.append((row_id * 3 + project_kind(r[1]), r[1], r[2] or '', r))
+        keyed.sort(key=lambda k: k[:3])
+
+        # 프로젝트명 / timeframe은 문자열 목록 + 코드 배열로 저장
+        self._projects, project_codes = [], {}
+        self._timeframes, timeframe_codes = [], {}
+        self._project_col = array('I')
+        self._timeframe_col = array('I')
+        # 구간 시작 위치: 유저 u의 종류 k 순위는 [starts[3u+k], starts[3u+k+1])
+        counts = [0] * (len(self._users) * 3 + 1)
+        columns = ([], [], [], [], [])   # msRank, cmsRank, ms, cms, positionChange
+
+        for segment, project_name, _, r in keyed:
+            counts[segment + 1] += 1
+            code = project_codes.get(project_name)
+            if code is None:
+                code = project_codes[project_name] = len(self._projects)
+                self._projects.append(project_name)
+            self._project_col.append(code)
+            code = timeframe_codes.get(r[2])
+            if code is None:
+                code = timeframe_codes[r[2]] = len(self._timeframes)
+                self._timeframes.append(r[2])
+            self._timeframe_col.append(code)
+            for column, value in zip(columns, r[3:8]):
+                column.append(value)
+
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        self._starts = array('I', counts)
+        self._ms_rank, self._cms_rank, self._ms, self._cms, self._position_change = (tuple(c) for c in columns)
+        self._memory = None
+
+    @classmethod
+    def from_db(cls, db_path):
+        """글로벌 DB에서 인덱스 생성 (갱신 직후 호출)"""
+        with query_profiler.connect(db_path, timeout=30.0) as conn:
+            users = conn.execute('SELECT * FROM users ORDER BY rowid').fetchall()
+            rankings = conn.execute('''
+                SELECT infoName, projectName, timeframe, msRank, cmsRank, ms, cms, positionChange
+                FROM rankings
+            ''')
+            return cls(users, rankings)
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, info_name):
+        return fold(info_name) in self._rows
+
+    def get_user_data(self, info_name):
+        """특정 유저의 전체 데이터 (SQLite 조회 없이 메모리에서 조립)"""
+        row_id = self._rows.get(fold(info_name))
+        if row_id is None:
+            return None
+
+        result = {'user': dict(zip(USER_FIELDS, self._users[row_id]))}
+        for kind, name in enumerate(KINDS):
+            segment = row_id * 3 + kind
+            projects = {}
+            for i in range(self._starts[segment], self._starts[segment + 1]):
+                projects.setdefault(self._projects[self._project_col[i]], []).append({
+                    'timeframe': self._timeframes[self._timeframe_col[i]],
+                    'msRank': self._ms_rank[i],
+                    'cmsRank': self._cms_rank[i],
+                    'ms': self._ms[i],
+                    'cms': self._cms[i],
+                    'positionChange': self._position_change[i]
+                })
+            result[f'{name}_projects'] = projects
+        return result
+
+    def memory_usage(self):
+        """인덱스가 차지하는 대략적인 메모리 (bytes, 공유되는 작은 int 등은 중복 계산될 수 있음)"""
+        if self._memory is None:
+            size = sys.getsizeof
+            handles = size(self._rows) + sum(size(k) for k in self._rows)
+            users = size(self._users) + sum(size(row) + sum(size(v) for v in row if v is not None)
+                                            for row in self._users)
+            rankings = (size(self._starts) + size(self._project_col) + size(self._timeframe_col)
+                        + sum(size(s) for s in self._projects) + sum(size(s) for s in self._timeframes))
+            for column in (self._ms_rank, self._cms_rank, self._ms, self._cms, self._position_change):
+                rankings += size(column) + sum(size(v) for v in column if v is not None)
+            self._memory = {'handles': handles, 'users': users, 'rankings': rankings,
+                            'total': handles + users + rankings}
+        return self._memory
+
+    def stats(self):
+        return {
+            'users': len(self._users),
+            'rankings': len(self._project_col),
+            'projects': len(self._projects),
+            'built_at': self.built_at,
+            'memory_bytes': self.memory_usage()
+        }
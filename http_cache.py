@@ -0,0 +1,87 @@
+import os
+import time
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from bottle import request, response, HTTPResponse
+
+# 서버 시작마다 바뀌는 ID - 재시작 시 템플릿/설정 변경분이 반영되도록 ETag에 포함
+# (멀티 프로세스 모드에서는 슈퍼바이저가 시작 시각을 넘겨줘서 모든 워커의 ETag가 같음)
+BOOT_TIME = float(os.environ.get('SHARKAPP_BOOT_TIME') or time.time())
+BOOT_ID = '%x' % int(BOOT_TIME * 1000)
+
+# 페이지 언어가 쿠키(lang)로 결정되므로 브라우저는 매번 재검증(304), 공유 캐시(CDN)는
+# s-maxage 동안 보관. CDN이 쿠키별로 캐시를 나누지 못하면 0으로 둘 것 (기본값)
+CDN_S_MAXAGE = int(os.environ.get('SHARKAPP_CDN_S_MAXAGE', '0'))
+CDN_STALE_WHILE_REVALIDATE = int(os.environ.get('SHARKAPP_CDN_SWR', '60'))
+
+
+def make_etag(*parts):
+    """(라우트, 파라미터, 데이터 버전, 언어 ...) 조합으로 strong ETag 생성"""
+    key = '|'.join(str(p) for p in parts) + '|' + BOOT_ID
+    return '"%s"' % hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 비교 (weak 비교 - 압축 레이어가 붙인 W/ 접두사 무시)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    target = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def cache_control():
+    value = 'public, max-age=0, must-revalidate'
+    if CDN_S_MAXAGE > 0:
+        value += f', s-maxage={CDN_S_MAXAGE}, stale-while-revalidate={CDN_STALE_WHILE_REVALIDATE}'
+    return value
+
+
+def conditional_response(*etag_parts, last_modified=None):
+    """
+    ETag/Last-Modified/Cache-Control 헤더 설정 후, 클라이언트 캐시가 최신이면
+    HTTPResponse(304)를 raise 하여 라우트 본문(DB 조회, 템플릿 렌더링)을 건너뜀
+
+    last_modified: 데이터가 마지막으로 바뀐 시각 (epoch, None이면 생략)
+    """
+    etag = make_etag(*etag_parts)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control(),
+        'Vary': 'Cookie'
+    }
+    if last_modified:
+        last_modified = max(last_modified, BOOT_TIME)
+        headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, etag)
+    else:
+        # If-None-Match가 없을 때만 If-Modified-Since 사용 (RFC 7232)
+        not_modified = _not_modified_since(request.environ.get('HTTP_IF_MODIFIED_SINCE'), last_modified)
+
+    if not_modified:
+        raise HTTPResponse(status=304, **headers)
+
+    for key, value in headers.items():
+        response.set_header(key, value)
+    return etag
+
+
+def _not_modified_since(if_modified_since, last_modified):
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    # HTTP 날짜는 초 단위이므로 소수점 이하 버림
+    return int(last_modified) <= since
@@ -0,0 +1,129 @@
+"""
+신규 스냅샷 적재(ingest) 단계별 계측
+
+- IngestTimer: 적재 1회의 단계별 소요 시간(scan / read / parse / normalize / insert / metadata / snapshot / cleanup),
+  파일 수, 바이트, 레코드 수, 적재 지연(파일 생성 시각 -> DB 커밋으로 조회 가능해진 시각)
+- IngestLog: 최근 적재 기록 ring buffer (/admin/ingest 조회용)
+여러 스레드가 같은 IngestTimer에 기록할 수 있으므로(Kaito 병렬 읽기) 단계 시간은 스레드별 소요 시간의 합입니다.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+STAGES = ('scan', 'read', 'parse', 'normalize', 'insert', 'metadata', 'snapshot', 'cleanup')
+
+
+class IngestTimer:
+    def __init__(self, scan_seconds=0.0):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.queryable_at = None
+        self.stages = {'scan': scan_seconds} if scan_seconds else {}
+        self.files = 0
+        self.bytes = 0
+        self.rows = 0
+        self.oldest_landed = None  # 이번에 읽은 파일 중 가장 오래된 mtime
+        self.newest_landed = None
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def file(self, size, landed_at):
+        """읽은 파일 1개 (크기, 파일 mtime)"""
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            if self.oldest_landed is None or landed_at < self.oldest_landed:
+                self.oldest_landed = landed_at
+            if self.newest_landed is None or landed_at > self.newest_landed:
+                self.newest_landed = landed_at
+
+    def add_rows(self, rows):
+        with self._lock:
+            self.rows += rows
+
+    def mark_queryable(self):
+        """DB 커밋 완료 시점 (이후 조회에서 새 데이터가 보임)"""
+        self.queryable_at = time.time()
+
+    def result(self):
+        finished_at = time.time()
+        queryable_at = self.queryable_at or finished_at
+        return {
+            'started_at': self.started_at,
+            'finished_at': finished_at,
+            'files': self.files,
+            'bytes': self.bytes,
+            'rows': self.rows,
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            # 가장 오래 기다린 파일 / 가장 최근 파일 기준 지연 (초)
+            'lag_max': round(queryable_at - self.oldest_landed, 3) if self.oldest_landed is not None else None,
+            'lag_min': round(queryable_at - self.newest_landed, 3) if self.newest_landed is not None else None
+        }
+
+
+def _percentile(values, ratio):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+class IngestLog:
+    """최근 적재 기록 ring buffer (소스/프로젝트별 요약 포함)"""
+
+    def __init__(self, size=500):
+        self._lock = threading.Lock()
+        self._jobs = deque(maxlen=size)
+
+    def append(self, source, project, seconds, job):
+        entry = dict(job, source=source, project=project, seconds=round(seconds, 6))
+        with self._lock:
+            self._jobs.append(entry)
+        return entry
+
+    def recent(self, limit=50, source=None, project=None):
+        with self._lock:
+            jobs = list(self._jobs)
+        jobs = [j for j in jobs if (source is None or j['source'] == source)
+                and (project is None or j['project'] == project)]
+        return jobs[::-1][:limit]
+
+    def summary(self):
+        """소스별 적재 횟수 / 합계 / 단계별 시간 합 / 지연(마지막, p95, 최대) - ring buffer 범위 기준"""
+        with self._lock:
+            jobs = list(self._jobs)
+        result = {}
+        for job in jobs:
+            s = result.setdefault(job['source'], {
+                'jobs': 0, 'files': 0, 'bytes': 0, 'rows': 0, 'seconds': 0.0,
+                'stages': dict.fromkeys(STAGES, 0.0), 'last_finished_at': None, 'last_lag': None, '_lags': []
+            })
+            s['jobs'] += 1
+            s['files'] += job['files']
+            s['bytes'] += job['bytes']
+            s['rows'] += job['rows']
+            s['seconds'] += job['seconds']
+            for name, seconds in job['stages'].items():
+                s['stages'][name] = s['stages'].get(name, 0.0) + seconds
+            s['last_finished_at'] = job['finished_at']
+            if job['lag_max'] is not None:
+                s['last_lag'] = job['lag_max']
+                s['_lags'].append(job['lag_max'])
+        for s in result.values():
+            lags = s.pop('_lags')
+            s['lag_p95'] = _percentile(lags, 0.95)
+            s['lag_max'] = max(lags) if lags else None
+            s['stages'] = {name: round(seconds, 4) for name, seconds in s['stages'].items()}
+            s['seconds'] = round(s['seconds'], 4)
+        return result
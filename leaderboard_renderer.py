@@ -0,0 +1,156 @@
+"""
+리더보드 비교 테이블 행(<tr>) 렌더링 - Cookie / Wallchain / Kaito 공용
+
+행마다 Python 함수(분기 + f-string + getattr)를 호출하는 대신,
+상태(NEW/OUT/상승/하락), 표시 문자열, 정렬 키(data-order)를 컬럼 단위로 한 번에 계산하고
+미리 만든 문자열 컬럼을 행 포맷 하나에 채워서 마지막에 한 번만 join 합니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+MISSING_RANK = 9999  # compare_leaderboards에서 순위 밖(진입 전/이탈)을 나타내는 값
+
+BADGE_NEW = '<span class="badge bg-success" data-order="0">NEW</span>'
+BADGE_OUT = '<span class="badge bg-secondary" data-order="0">OUT</span>'
+MUTED = '<span class="text-muted" data-order="0">-</span>'
+
+# 행 HTML은 들여쓰기 없이 생성 (행 수가 많으면 공백만으로도 수십 MB가 됨)
+ROW_FMT = ('<tr><td><div class="d-flex align-items-center">%s</div></td>'
+           '<td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>\n')
+USER_FMT = ('%s<div><strong>%s</strong><br><small class="text-muted">{handle_prefix}%s</small>'
+            '<a href="{link_prefix}%s" class="user-link" title="유저 분석">🔍</a></div>')
+IMG_FMT = '<img src="%s" alt="%s" class="me-2" style="width:32px;height:32px;border-radius:50%%;">'
+IMG_OPTIONAL_FMT = ('<img src="%s" alt="%s" class="me-2" style="width:32px;height:32px;border-radius:50%%;"'
+                    ' onerror="this.style.display=\'none\'">')
+
+
+def _strings(values):
+    """Series/배열 -> 문자열 리스트 (None/NaN은 기존 f-string과 같이 'None'/'nan')"""
+    if isinstance(values, pd.Series):
+        values = values.tolist()
+    elif isinstance(values, np.ndarray):
+        values = values.tolist()
+    return list(map(str, values))
+
+
+def _numbers(values):
+    try:
+        # SQL 비교 결과(숫자 리스트)는 바로 변환
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+
+
+def format_fixed(values, decimals=4):
+    """숫자 배열을 고정 소수점 문자열 배열로 변환 (f'{x:.4f}'와 동일)"""
+    fmt = '%.' + str(decimals) + 'f'
+    out = np.empty(len(values), dtype=object)
+    out[:] = list(map(fmt.__mod__, _numbers(values).tolist()))
+    return out
+
+
+def rank_cells(ranks, missing=MISSING_RANK):
+    """순위 표시 문자열 (순위 밖이면 '-')"""
+    ranks = np.asarray(ranks)
+    out = np.full(len(ranks), '-', dtype=object)
+    present = ranks != missing
+    out[present] = list(map(str, ranks[present].astype(np.int64).tolist()))
+    return out
+
+
+def user_cells(display_names, usernames, image_urls, user_link_prefix, handle_prefix='@', optional_image=False):
+    """
+    사용자 셀 (프로필 이미지 + 이름 + 핸들 + 분석 링크)
+
+    optional_image=True면 image_urls가 빈 값인 행은 이미지 태그를 생략 (Kaito)
+    """
+    names = _strings(display_names)
+    handles = _strings(usernames)
+    urls = _strings(image_urls)
+
+    # 접두사는 호출마다 같으므로 포맷 문자열에 미리 넣어둠
+    user_fmt = USER_FMT.format(handle_prefix=handle_prefix.replace('%', '%%'),
+                               link_prefix=user_link_prefix.replace('%', '%%'))
+
+    if optional_image:
+        images = [IMG_OPTIONAL_FMT % (url, name) if url and url != 'None' else ''
+                  for url, name in zip(urls, names)]
+        return list(map(user_fmt.__mod__, zip(images, names, handles, handles)))
+
+    # 이미지 태그까지 포맷 하나로 처리
+    fmt = IMG_FMT + user_fmt[2:]
+    return list(map(fmt.__mod__, zip(urls, names, names, handles, handles)))
+
+
+def status_masks(prev_rank, curr_rank, missing=MISSING_RANK):
+    """(NEW, OUT, 양쪽 모두 순위권) 마스크"""
+    prev_rank = np.asarray(prev_rank)
+    curr_rank = np.asarray(curr_rank)
+    prev_in = prev_rank != missing
+    curr_in = curr_rank != missing
+    return ~prev_in & curr_in, prev_in & ~curr_in, prev_in & curr_in
+
+
+def rank_change_cells(prev_rank, curr_rank, missing=MISSING_RANK):
+    """순위 변화 셀 (NEW / OUT / ↑ n / ↓ n / -)"""
+    is_new, is_out, both = status_masks(prev_rank, curr_rank, missing)
+    out = np.full(len(is_new), MUTED, dtype=object)
+    out[is_new] = BADGE_NEW
+    out[is_out] = BADGE_OUT
+
+    change = np.zeros(len(is_new), dtype=np.int64)
+    change[both] = (np.asarray(prev_rank)[both] - np.asarray(curr_rank)[both]).astype(np.int64)
+    up = both & (change > 0)
+    down = both & (change < 0)
+    if up.any():
+        out[up] = [f'<span class="text-success" data-order="{c}">↑ {c}</span>' for c in change[up].tolist()]
+    if down.any():
+        out[down] = [f'<span class="text-danger" data-order="{c}">↓ {-c}</span>' for c in change[down].tolist()]
+    return out
+
+
+def value_change_cells(prev_rank, curr_rank, change, decimals=4, suffix='', missing=MISSING_RANK):
+    """
+    값(마쉐) 변화 셀 - NEW/OUT은 순위 변화와 같은 배지, 양쪽 순위권이면 +x.xxxx / -x.xxxx
+    change가 NaN인 행(값 파싱 실패)은 '-'로 표시
+    """
+    is_new, is_out, both = status_masks(prev_rank, curr_rank, missing)
+    change = _numbers(change)
+    out = np.full(len(is_new), MUTED, dtype=object)
+    out[is_new] = BADGE_NEW
+    out[is_out] = BADGE_OUT
+
+    up = both & (change > 0)
+    down = both & (change < 0)
+    if up.any():
+        out[up] = [f'<span class="text-success" data-order="{v}">+{v}{suffix}</span>'
+                   for v in format_fixed(change[up], decimals).tolist()]
+    if down.any():
+        out[down] = [f'<span class="text-danger" data-order="{v}">{v}{suffix}</span>'
+                     for v in format_fixed(change[down], decimals).tolist()]
+    return out
+
+
+def render_rows(users, prev_rank, curr_rank, prev_values, curr_values, change, decimals=4, suffix='',
+                missing=MISSING_RANK):
+    """
+    리더보드 비교 테이블의 <tr> 행들을 하나의 문자열로 생성
+
+    users: user_cells() 결과
+    prev_values / curr_values: 화면에 표시할 값 문자열 배열 (format_fixed() 등)
+    change: 값 변화량 (숫자)
+    """
+    if len(users) == 0:
+        return ''
+    prev_rank = np.asarray(prev_rank)
+    curr_rank = np.asarray(curr_rank)
+    columns = zip(users,
+                  rank_cells(prev_rank, missing).tolist(),
+                  rank_cells(curr_rank, missing).tolist(),
+                  rank_change_cells(prev_rank, curr_rank, missing).tolist(),
+                  _strings(prev_values),
+                  _strings(curr_values),
+                  value_change_cells(prev_rank, curr_rank, change, decimals, suffix, missing).tolist())
+    return ''.join(map(ROW_FMT.__mod__, columns))
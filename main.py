@@ -3,6 +3,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed  # 상단에 추
 import os
 import json
 import sqlite3
+import query_profiler
+import stack_sampler
+import memory_report
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -11,13 +14,31 @@ import plotly.io as pio
 import threading
 import time
 import signal
+import gc
+import hmac
 import sys
+import io
+import socket
 import requests
 from datetime import datetime
 from data_processor import DataProcessor
 from data_processor_wallchain import DataProcessorWallchain
 from data_processor_kaito import DataProcessorKaito
 from global_data_manager import GlobalDataManager
+from federated_lookup import FederatedLookup
+from global_index import GlobalIndex, fold as fold_handle
+from access_log_writer import AccessLogWriter
+from traffic_stats import TrafficStats
+from compression import CompressionMiddleware, negotiate_encoding, compress
+from http_cache import conditional_response
+from page_cache import PageCache
+from metrics import MetricsRegistry, MetricsMiddleware, JOB_BUCKETS, LAG_BUCKETS
+from ingest_stats import IngestTimer, IngestLog
+from navigation import NavigationModel
+from cookie_rules import CookieRules, ALL_METRICS, split_project
+from snapshot_compare import CompareResult
+from worker_sync import VersionPublisher, VersionWatcher
+import leaderboard_renderer
 import schedule
 
 app = Bottle()
@@ -34,28 +55,203 @@ base_kaito_dir = './data/kaito/'  # Kaito 데이터 디렉토리
 project_instances = {}  # Cookie 프로젝트
 wallchain_instances = {}  # Wallchain 프로젝트
 kaito_processor = None  # Kaito 통합 프로세서
-# main.py 파일 상단에 로그 파일 경로 설정
-LOG_FILE = 'access_log.txt'
-
-# 글로벌 데이터 관리자 초기화
-global_manager = GlobalDataManager()
-
-# main.py 파일 내 log_access 함수를 아래와 같이 수정
-PROJECT_CACHE = {"list": [], "grouped": {}, "last_updated": 0}
-WALLCHAIN_CACHE = {"list": [], "grouped": {}, "last_updated": 0}
-KAITO_CACHE = {"list": [], "last_updated": 0}
-CACHE_INTERVAL = 300  # 5분마다 갱신 (필요에 따라 조절)
-
-# 로그 버퍼 (메모리에 쌓아두고 주기적으로 쓰기)
-LOG_BUFFER = []
-LOG_BUFFER_SIZE = 5  # 5개 쌓이면 파일에 쓰기
-LOG_BUFFER_TIMEOUT = 5  # 5초마다 강제 저장
-LOG_LAST_FLUSH = time.time()
-LOG_LOCK = threading.Lock()
+# 실행 역할 (supervisor.py가 자식 프로세스에 지정)
+# - single: 한 프로세스에서 적재 + 요청 처리 (기본)
+# - leader: 적재 / 글로벌 갱신 / 스캔 등 쓰기 전담, 관리자 API만 제공
+# - worker: 요청 처리 전담 (쓰기 없음), 리더가 기록한 버전 파일로 신규 데이터 반영
+SERVE_ROLE = os.environ.get('SHARKAPP_ROLE', 'single')
+WORKER_INDEX = int(os.environ.get('SHARKAPP_WORKER_INDEX', '0'))
+VERSION_FILE = os.environ.get('SHARKAPP_VERSION_FILE', './data/versions.json')
+GENERATION_GRACE_SECONDS = 120  # 멀티 프로세스 모드에서 교체된 글로벌 DB 세대를 지우기 전 대기 시간 (워커 조회용)
+
+# main.py 파일 상단에 로그 파일 경로 설정 (워커는 로테이션이 겹치지 않도록 워커별 파일)
+LOG_FILE = 'access_log.txt' if SERVE_ROLE != 'worker' else f'access_log.w{WORKER_INDEX}.txt'
+
+# 글로벌 데이터 관리자 초기화 (워커는 세대 파일을 만들거나 지우지 않고 리더의 포인터를 따라감)
+global_manager = GlobalDataManager(manage_files=SERVE_ROLE != 'worker',
+                                   retire_delay=GENERATION_GRACE_SECONDS if SERVE_ROLE == 'leader' else 0.0)
+
+# 유저 전체 순위 조회 방식 - 'global': 글로벌 DB(주기적 갱신), 'live': 프로젝트 DB를 ATTACH해서 바로 조회
+# (/api/user-data/<username>?source=live|global 로 요청별 지정 가능)
+USER_LOOKUP_MODE = os.environ.get('SHARKAPP_USER_LOOKUP', 'global')
+
+def federated_sources():
+    """FederatedLookup이 조회할 프로젝트 DB 목록 (요청 시점의 등록 상태 그대로)"""
+    sources = [('cookie', name, dp.db_path, tuple(dp.timeframes), dp.data_version)
+               for name, dp in list(project_instances.items())]
+    sources += [('wallchain', name, dp.db_path, tuple(dp.timeframes), dp.data_version)
+                for name, dp in list(wallchain_instances.items())]
+    if kaito_processor:
+        sources.append(('kaito', 'kaito', kaito_processor.db_path, (), 0))
+    return sources
+
+federated_lookup = FederatedLookup(federated_sources)
+
+# 글로벌 DB를 메모리에 올린 유저 조회 인덱스 - 글로벌 DB 갱신 후 새로 만들어 통째로 교체
+GLOBAL_INDEX = None
+GLOBAL_INDEX_STATE = {"version": 0}  # 인덱스 교체 시 증가 (유저 데이터 응답 캐시 키에 포함)
+
+# /api/user-data 직렬화 응답 캐시 (원본 JSON + gzip 본문, 메모리 한도 + LRU)
+USER_DATA_CACHE_MAX_BYTES = int(os.environ.get('SHARKAPP_USER_DATA_CACHE_MB', '32')) * 1024 * 1024
+USER_DATA_CACHE = PageCache(max_bytes=USER_DATA_CACHE_MAX_BYTES)
+
+def reload_global_index():
+    """글로벌 DB에서 GLOBAL_INDEX 재생성 (실패하면 이전 인덱스 유지)"""
+    global GLOBAL_INDEX
+    start = time.time()
+    try:
+        with global_manager.reading() as db_path:
+            index = GlobalIndex.from_db(db_path)
+    except sqlite3.Error as e:
+        print(f"[글로벌 인덱스] 생성 실패: {e}")
+        return False
+    GLOBAL_INDEX = index
+    GLOBAL_INDEX_STATE["version"] += 1
+    USER_DATA_CACHE.clear()  # 이전 버전 응답 정리 (키에 버전이 있어 남아 있어도 다시 쓰이지 않음)
+    memory = index.memory_usage()['total']
+    print(f"[글로벌 인덱스] 교체 완료 ({time.time() - start:.2f}초) - 유저: {len(index):,}, "
+          f"메모리: {memory / 1024 / 1024:.1f} MB")
+    publish_versions()
+    return True
+
+# 프로젝트 목록(navbar) 버전 - 프로젝트 등록/변경 시 증가 (페이지 ETag에 포함)
+REGISTRY_STATE = {"version": 1, "updated_at": time.time()}
+REGISTRY_LOCK = threading.Lock()
+# navbar 프로젝트 메뉴 모델 (불변) - 프로젝트 등록/변경 시에만 새로 만들어 교체
+NAVIGATION = NavigationModel()
+
+# 렌더링된 페이지 캐시 (인덱스/리더보드) - 데이터 버전이 바뀌면 새 키로 저장됨
+PAGE_CACHE_MAX_BYTES = int(os.environ.get('SHARKAPP_PAGE_CACHE_MB', '128')) * 1024 * 1024
+PAGE_CACHE = PageCache(max_bytes=PAGE_CACHE_MAX_BYTES)
+PRERENDER_LANGS = ('ko', 'en')  # 신규 데이터 반영 후 미리 렌더링할 언어
+PRERENDER_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-prerender')
+PRERENDER_PENDING = set()  # 이미 예약된 (종류, 프로젝트) - 중복 예약 방지
+PRERENDER_LOCK = threading.Lock()
+
+# 접속 로그 writer (단일 백그라운드 스레드가 배치로 기록)
+LOG_BATCH_SIZE = 500  # 한 번에 기록할 최대 로그 수
+LOG_FLUSH_INTERVAL = 1.0  # 1초마다 강제 저장
+LOG_FSYNC_INTERVAL = 5.0  # 5초마다 fsync
+LOG_MAX_BYTES = 100 * 1024 * 1024  # 100MB 넘으면 로테이션 (날짜 변경 시에도 로테이션)
+access_log_writer = AccessLogWriter(LOG_FILE,
+                                    batch_size=LOG_BATCH_SIZE,
+                                    flush_interval=LOG_FLUSH_INTERVAL,
+                                    fsync_interval=LOG_FSYNC_INTERVAL,
+                                    max_bytes=LOG_MAX_BYTES)
+
+# 트래픽 집계 저장소 (로그 writer가 배치마다 집계 갱신)
+traffic_stats = TrafficStats()
+access_log_writer.add_sink(traffic_stats.process_batch)
+
+# Prometheus 메트릭 (/metrics) - 라우트별 응답 시간은 MetricsMiddleware, 나머지는 아래 함수/collector가 기록
+METRICS = MetricsRegistry()
+WAITRESS_DISPATCHER = None  # 서버 시작 시 Waitress 작업 큐 (요청 대기열 길이 조회용)
+
+# 최근 적재 기록 (단계별 소요 시간, /admin/ingest)
+INGEST_LOG = IngestLog(size=int(os.environ.get('SHARKAPP_INGEST_LOG_SIZE', '500')))
+
+def record_ingest(source, project, processor, seconds):
+    """신규 파일 적재 1회 기록 (processor.last_load의 단계별 시간/파일/바이트/레코드 수/지연 + 전체 소요 시간)"""
+    job = INGEST_LOG.append(source, project, seconds, processor.last_load)
+    METRICS.inc('sharkapp_ingest_files_total', job['files'], 'Snapshot files ingested', source=source)
+    METRICS.inc('sharkapp_ingest_rows_total', job['rows'], 'Rows inserted into project DBs', source=source)
+    METRICS.inc('sharkapp_ingest_bytes_total', job['bytes'], 'Snapshot file bytes read', source=source)
+    METRICS.inc('sharkapp_ingest_seconds_total', seconds, 'Time spent ingesting snapshot files', source=source)
+    METRICS.observe('sharkapp_ingest_duration_seconds', seconds, JOB_BUCKETS, 'Ingest duration per load', source=source)
+    for stage, stage_seconds in job['stages'].items():
+        METRICS.inc('sharkapp_ingest_stage_seconds_total', stage_seconds,
+                    'Time spent per ingest stage (summed over worker threads)', source=source, stage=stage)
+    METRICS.set('sharkapp_ingest_last_success_timestamp_seconds', job['finished_at'],
+                'Unix time of the last ingest that loaded new files', source=source)
+    if job['lag_max'] is not None:
+        # 파일 생성(mtime) -> DB 커밋까지 걸린 시간 - 가장 오래 기다린 파일 기준 (SLO 알림용)
+        METRICS.observe('sharkapp_ingest_lag_seconds', job['lag_max'], LAG_BUCKETS,
+                        'Time from snapshot file landing to queryable in the project DB', source=source)
+        METRICS.set('sharkapp_ingest_last_lag_seconds', job['lag_max'],
+                    'Landing-to-queryable lag of the last ingest (oldest file)', source=source)
+
+def collect_runtime_metrics():
+    """스크랩 시점의 캐시 적중률 / 글로벌 인덱스 / Waitress 큐 상태"""
+    samples = []
+    for name, cache in (('page', PAGE_CACHE), ('user_data', USER_DATA_CACHE)):
+        stats = cache.stats()
+        lookups = stats['hits'] + stats['misses']
+        labels = {'cache': name}
+        samples += [
+            ('sharkapp_cache_hits_total', 'counter', 'Cache hits', labels, stats['hits']),
+            ('sharkapp_cache_misses_total', 'counter', 'Cache misses', labels, stats['misses']),
+            ('sharkapp_cache_evictions_total', 'counter', 'Cache evictions', labels, stats['evictions']),
+            ('sharkapp_cache_hit_ratio', 'gauge', 'Cache hit ratio since start', labels,
+             stats['hits'] / lookups if lookups else 0.0),
+            ('sharkapp_cache_bytes', 'gauge', 'Bytes held by cache', labels, stats['bytes']),
+            ('sharkapp_cache_entries', 'gauge', 'Entries held by cache', labels, stats['entries']),
+        ]
+    if GLOBAL_INDEX is not None:
+        samples += [
+            ('sharkapp_global_index_users', 'gauge', 'Users in the in-memory global index', {}, len(GLOBAL_INDEX)),
+            ('sharkapp_global_index_bytes', 'gauge', 'Approximate global index memory', {},
+             GLOBAL_INDEX.memory_usage()['total']),
+        ]
+    samples += [
+        ('sharkapp_process_resident_memory_bytes', 'gauge', 'Resident set size', {}, memory_report.rss_bytes()),
+        ('sharkapp_memory_guard_sheds_total', 'counter', 'Times caches were dropped by the RSS guard', {},
+         MEMORY_GUARD.sheds),
+    ]
+    calls, seconds, slow = query_profiler.PROFILER.totals()
+    samples += [
+        ('sharkapp_sql_statements_total', 'counter', 'SQLite statements executed', {}, calls),
+        ('sharkapp_sql_seconds_total', 'counter', 'Time spent in SQLite statements (execute + fetch)', {}, seconds),
+        ('sharkapp_sql_slow_total', 'counter', 'SQLite statements slower than the slow query threshold', {}, slow),
+    ]
+    for source, instances in (('cookie', project_instances), ('wallchain', wallchain_instances)):
+        stores = [dp.snapshots.stats() for dp in list(instances.values())]
+        samples += [
+            ('sharkapp_snapshot_compares_total', 'counter', 'Leaderboard compares by data path',
+             {'source': source, 'path': 'store'}, sum(s['hits'] for s in stores)),
+            ('sharkapp_snapshot_compares_total', 'counter', 'Leaderboard compares by data path',
+             {'source': source, 'path': 'sql'}, sum(s['fallbacks'] for s in stores)),
+            ('sharkapp_snapshot_mapped_bytes', 'gauge', 'Shared snapshot file bytes mapped by this process',
+             {'source': source}, sum(s['mapped_bytes'] for s in stores)),
+        ]
+    if VERSION_PUBLISHER is not None:
+        samples.append(('sharkapp_version_file_seq', 'gauge', 'Version file sequence number (published by the leader)',
+                        {'role': SERVE_ROLE}, VERSION_PUBLISHER.seq))
+    if VERSION_WATCHER is not None:
+        samples += [
+            ('sharkapp_version_file_seq', 'gauge', 'Version file sequence number (applied by this worker)',
+             {'role': SERVE_ROLE}, VERSION_WATCHER.seq or 0),
+            ('sharkapp_version_file_errors_total', 'counter', 'Version file apply failures', {},
+             VERSION_WATCHER.errors),
+        ]
+    dispatcher = WAITRESS_DISPATCHER
+    if dispatcher is not None:
+        samples += [
+            ('sharkapp_waitress_queue_depth', 'gauge', 'Requests waiting for a Waitress worker thread', {},
+             len(dispatcher.queue)),
+            ('sharkapp_waitress_active_threads', 'gauge', 'Waitress worker threads busy with a request', {},
+             dispatcher.active_count),
+            ('sharkapp_waitress_threads', 'gauge', 'Waitress worker threads', {}, len(dispatcher.threads)),
+        ]
+    return samples
+
+METRICS.add_collector(collect_runtime_metrics)
+
+# 관리자 API 토큰 (미설정 시 로컬 접속만 허용)
+ADMIN_TOKEN = os.environ.get('SHARKAPP_ADMIN_TOKEN', '')
 
 # YAPS 캐시 (동일 사용자 2분간 캐시)
 YAPS_CACHE = {}  # {username: {'data': {...}, 'timestamp': time.time()}}
 YAPS_CACHE_DURATION = 120  # 2분 (초 단위)
+YAPS_CACHE_MAX_ENTRIES = 5000  # 넘으면 만료된 항목 정리 (조회된 유저가 계속 쌓이지 않도록)
+
+# 메모리 점검 - RSS가 한도(MB, 0이면 사용 안 함)를 넘으면 캐시를 비움 / tracemalloc은 관리자 API로 켜고 끔
+MEMORY_RSS_LIMIT_MB = int(os.environ.get('SHARKAPP_RSS_LIMIT_MB', '0'))
+MEMORY_GUARD = memory_report.MemoryGuard(MEMORY_RSS_LIMIT_MB * 1024 * 1024)
+MEMORY_GUARD.add_shedder('page_cache', lambda: PAGE_CACHE.clear())
+MEMORY_GUARD.add_shedder('user_data_cache', lambda: USER_DATA_CACHE.clear())
+MEMORY_GUARD.add_shedder('yaps_cache', lambda: YAPS_CACHE.clear())
+MEMORY_GUARD.add_shedder('lang_exclusions', lambda: LANG_EXCLUSIONS.clear())
+TRACE_SESSION = memory_report.TraceSession()
 
 # Kaito DB 쓰기 Lock (병렬 처리 시 동시 쓰기 방지)
 KAITO_DB_LOCK = threading.Lock()
@@ -73,52 +269,47 @@ COOKIE_INITIAL_LOAD_DONE = threading.Event()
 WALLCHAIN_INITIAL_LOAD_DONE = threading.Event()
 KAITO_INITIAL_LOAD_DONE = threading.Event()
 
-# Cookie 필터링 설정
-COOKIE_CONFIG = {}
+# Cookie 필터링 설정 (cookie_config.json을 컴파일한 조회 테이블, 파일 변경 시 통째로 교체)
+COOKIE_CONFIG_PATH = './data/cookie/cookie_config.json'
+COOKIE_CONFIG_CHECK_INTERVAL = 10  # 설정 파일 변경 확인 주기 (초)
+COOKIE_RULES = CookieRules()
+COOKIE_CONFIG_MTIME = None
 
 def load_cookie_config():
-    """cookie_config.json 로드"""
-    global COOKIE_CONFIG
+    """cookie_config.json 로드 후 CookieRules로 컴파일해서 교체 (실패하면 기존 규칙 유지)"""
+    global COOKIE_RULES, COOKIE_CONFIG_MTIME
     try:
-        with open('./data/cookie/cookie_config.json', 'r', encoding='utf-8') as f:
+        mtime = os.path.getmtime(COOKIE_CONFIG_PATH)
+        with open(COOKIE_CONFIG_PATH, 'r', encoding='utf-8') as f:
             raw_config = json.load(f)
         
-        # 언어 목록 정규화: "ko,es,pt" 같은 문자열을 ["ko", "es", "pt"]로 변환
-        def normalize_langs(lang_dict):
-            normalized = {}
-            for project, langs in lang_dict.items():
-                if isinstance(langs, list):
-                    # 리스트의 각 항목이 문자열이면 쉼표로 split
-                    expanded = []
-                    for item in langs:
-                        if isinstance(item, str) and ',' in item:
-                            expanded.extend([l.strip() for l in item.split(',')])
-                        else:
-                            expanded.append(item)
-                    normalized[project] = expanded
-                else:
-                    normalized[project] = langs
-            return normalized
-        
-        COOKIE_CONFIG = {
-            "snaps_reward_langs": normalize_langs(raw_config.get('snaps_reward_langs', {})),
-            "csnaps_reward_langs": normalize_langs(raw_config.get('csnaps_reward_langs', {})),
-            "default_snaps_exclude": raw_config.get('default_snaps_exclude', []),
-            "default_csnaps_exclude": raw_config.get('default_csnaps_exclude', []),
-            "ended_projects": raw_config.get('ended_projects', [])
-        }
+        COOKIE_RULES = CookieRules(raw_config, version=COOKIE_RULES.version + 1)
+        COOKIE_CONFIG_MTIME = mtime
+        LANG_EXCLUSIONS.clear()
         
         print("[Cookie Config] Loaded successfully")
-        print(f"  - snaps_reward_langs: {COOKIE_CONFIG.get('snaps_reward_langs', {})}")
-        print(f"  - csnaps_reward_langs: {COOKIE_CONFIG.get('csnaps_reward_langs', {})}")
+        print(f"  - snaps_reward_langs: {COOKIE_RULES.snaps_reward_langs}")
+        print(f"  - csnaps_reward_langs: {COOKIE_RULES.csnaps_reward_langs}")
+        return True
     except Exception as e:
         print(f"[Cookie Config] Failed to load: {e}")
-        COOKIE_CONFIG = {
-            "snaps_reward_langs": {},
-            "csnaps_reward_langs": {},
-            "default_snaps_exclude": [],
-            "default_csnaps_exclude": []
-        }
+        return False
+
+def start_cookie_config_watcher():
+    """cookie_config.json 수정 시각을 주기적으로 확인해서 바뀌면 다시 로드 (재시작 불필요)"""
+    def watch():
+        while True:
+            time.sleep(COOKIE_CONFIG_CHECK_INTERVAL)
+            try:
+                mtime = os.path.getmtime(COOKIE_CONFIG_PATH)
+            except OSError:
+                continue
+            if mtime != COOKIE_CONFIG_MTIME and load_cookie_config():
+                # 필터링 결과가 바뀌므로 모든 페이지 ETag/캐시 무효화
+                bump_registry_version()
+                print("[Cookie Config] 변경 감지 - 규칙 교체 완료")
+    
+    threading.Thread(target=watch, name='cookie-config-watcher', daemon=True).start()
 
 def should_exclude_lang(project_name, lang, metric):
     """
@@ -135,28 +326,30 @@ def should_exclude_lang(project_name, lang, metric):
     if not lang:
         return False
     
-    # metric에 따라 어떤 config를 확인할지 결정
-    if metric in ['snapsPercent', 'snaps']:
-        exclude_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(project_name, [])
-    elif metric in ['cSnapsPercent', 'cSnaps']:
-        exclude_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(project_name, [])
-    else:
-        return False
-    
-    return lang in exclude_langs
+    return lang in COOKIE_RULES.exclude_langs(project_name, metric)
+
+# -en 프로젝트 언어 필터로 제외할 유저 집합 캐시
+# {(프로젝트, metric): ((데이터 버전, 규칙 버전), frozenset(username))} - 스냅샷마다 한 번만 계산
+LANG_EXCLUSIONS = {}
+
+def get_excluded_users(dp, projectname, metric):
+    base_project_name = projectname.replace('-en', '')
+    key = (projectname, metric)
+    rules = COOKIE_RULES
+    versions = (dp.data_version, rules.version)
+    cached = LANG_EXCLUSIONS.get(key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    excluded = dp.users_with_languages(rules.exclude_langs(base_project_name, metric))
+    LANG_EXCLUSIONS[key] = (versions, excluded)
+    return excluded
 
 def flush_logs():
-    """버퍼에 쌓인 로그를 파일에 쓰기"""
-    global LOG_LAST_FLUSH
-    with LOG_LOCK:
-        if LOG_BUFFER:
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.writelines(LOG_BUFFER)
-                LOG_BUFFER.clear()
-                LOG_LAST_FLUSH = time.time()
-            except Exception as e:
-                print(f"[ERROR] 로그 파일 쓰기 실패: {e}")
+    """남은 로그를 모두 기록하고 로그 writer 종료 (서버 종료 시 호출)"""
+    access_log_writer.close()
+    stats = access_log_writer.stats()
+    if stats['dropped']:
+        print(f"[로그] 큐 초과로 버려진 로그: {stats['dropped']}건")
 
 def log_access(route_name, project_name, username=None):
     """
@@ -164,6 +357,10 @@ def log_access(route_name, project_name, username=None):
     (헤더: Cloudflare > X-Forwarded-For > X-Real-IP > REMOTE_ADDR 순으로 IP 확인)
     """
     
+    # 페이지 캐시 사전 렌더링 요청은 기록하지 않음
+    if request.environ.get('sharkapp.prerender'):
+        return
+    
     # 1. Cloudflare 사용 시 헤더 (HTTP_CF_CONNECTING_IP)를 최우선으로 확인합니다.
     ip_address = request.environ.get('HTTP_CF_CONNECTING_IP')
     
@@ -193,91 +390,176 @@ def log_access(route_name, project_name, username=None):
     # 로그 메시지 포맷: 시간 | IP | 라우트 이름 | 프로젝트 | 사용자명 | 세션 ID | REFERER
     log_message = f"{timestamp}|{ip_address}|{route_name}|{project_name}|{username or '-'}|{session_id}|{referer}\n"
     
-    # 버퍼에 추가
-    with LOG_LOCK:
-        LOG_BUFFER.append(log_message)
-        current_time = time.time()
-        # 버퍼가 꽉 차거나 타임아웃이 지나면 쓰기
-        if len(LOG_BUFFER) >= LOG_BUFFER_SIZE or (current_time - LOG_LAST_FLUSH) >= LOG_BUFFER_TIMEOUT:
-            threading.Thread(target=flush_logs, daemon=True).start()
+    # 로그 writer 큐에 추가 (파일 쓰기는 백그라운드 스레드가 처리)
+    access_log_writer.write(log_message)
         
-def get_cached_projects():
-    current_time = time.time()
-    
-    # 프로젝트가 등록되지 않았다면 실시간으로 반환
-    if not project_instances:
-        return []
-    
-    # 마지막 업데이트로부터 5분이 지나지 않았으면 저장된 리스트 반환
-    if PROJECT_CACHE["list"] and (current_time - PROJECT_CACHE["last_updated"] < CACHE_INTERVAL):
-        return PROJECT_CACHE["list"]
-    
-    # 5분이 지났거나 리스트가 없으면 새로 스캔
-    projects = sorted(project_instances.keys())
-    PROJECT_CACHE["list"] = projects
-    PROJECT_CACHE["last_updated"] = current_time
-    return projects
+def require_admin():
+    """관리자 API 접근 확인 (토큰 또는 로컬 접속만 허용, 아니면 403)"""
+    if ADMIN_TOKEN:
+        # 헤더 우선 (쿼리 문자열은 접근 로그/프록시 로그에 남음), 비교는 상수 시간
+        token = request.get_header('X-Admin-Token') or request.query.get('token') or ''
+        if hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return
+    else:
+        # 토큰이 없으면 프록시를 거치지 않은 로컬 접속만 허용
+        proxied = request.environ.get('HTTP_CF_CONNECTING_IP') or request.environ.get('HTTP_X_FORWARDED_FOR')
+        if not proxied and request.environ.get('REMOTE_ADDR') in ('127.0.0.1', '::1'):
+            return
+    abort(403, "Forbidden")
 
-def get_cached_wallchain_projects():
-    current_time = time.time()
-    
-    if not wallchain_instances:
-        return []
-    
-    if WALLCHAIN_CACHE["list"] and (current_time - WALLCHAIN_CACHE["last_updated"] < CACHE_INTERVAL):
-        return WALLCHAIN_CACHE["list"]
-    
-    # wallchain- 접두사를 제거하고 프로젝트 이름만 반환
-    projects = sorted([key.replace('wallchain-', '') for key in wallchain_instances.keys()])
-    WALLCHAIN_CACHE["list"] = projects
-    WALLCHAIN_CACHE["last_updated"] = current_time
-    return projects
+def bump_registry_version(kaito_projects=None, version=None, updated_at=None):
+    """
+    프로젝트 등록/목록 변경 시 호출 - navbar 모델을 새로 만들고 모든 페이지의 ETag가 바뀜
+    (새 모델로 교체한 뒤 버전을 올려서, 새 버전 키에 이전 navbar가 캐시되지 않도록 함)
+    version/updated_at: 워커가 리더의 값을 그대로 쓸 때 (워커끼리 ETag가 같도록)
+    """
+    global NAVIGATION
+    with REGISTRY_LOCK:
+        if kaito_projects is None:
+            kaito_projects = NAVIGATION.kaito_projects
+        if version is None:
+            version = REGISTRY_STATE["version"] + 1
+        NAVIGATION = NavigationModel(
+            version=version,
+            cookie_projects=list(project_instances),
+            wallchain_projects=[key.replace('wallchain-', '') for key in list(wallchain_instances)],
+            kaito_projects=kaito_projects
+        ).prerender(PRERENDER_LANGS)
+        REGISTRY_STATE["version"] = version
+        REGISTRY_STATE["updated_at"] = updated_at or time.time()
+    PAGE_CACHE.clear()  # navbar가 바뀌므로 모든 페이지 폐기
+    publish_versions()
+
+def check_not_modified(route_name, project_name, data_version, data_updated_at, *extra):
+    """
+    (라우트, 프로젝트, 쿼리 파라미터, 데이터 버전, 프로젝트 목록 버전, 언어)로 ETag를 만들고
+    클라이언트/CDN 캐시가 최신이면 DB 조회 전에 304로 응답
+    """
+    return conditional_response(route_name, project_name, request.query_string,
+                                data_version, REGISTRY_STATE["version"], get_language(), *extra,
+                                last_modified=max(data_updated_at, REGISTRY_STATE["updated_at"]))
+
+def default_page_paths(kind, project_name):
+    """신규 데이터 반영 후 미리 렌더링할 기본 페이지 (쿼리 파라미터 없는 인덱스/리더보드)"""
+    if kind == 'cookie':
+        return [f'/{project_name}/leaderboard', f'/{project_name}']
+    if kind == 'wallchain':
+        return [f'/wallchain/{project_name}/leaderboard', f'/wallchain/{project_name}']
+    return [f'/kaito/{project_name}/leaderboard', f'/kaito/{project_name}']
+
+def prerender_pages(kind, project_name):
+    """내부 WSGI 호출로 기본 페이지를 렌더링해 PAGE_CACHE를 채움 (prerender 스레드에서 실행)"""
+    with PRERENDER_LOCK:
+        PRERENDER_PENDING.discard((kind, project_name))
+    
+    rendered = 0
+    for path in default_page_paths(kind, project_name):
+        for lang in PRERENDER_LANGS:
+            if SHUTDOWN_FLAG.is_set():
+                return
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '8080', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'REMOTE_ADDR': '127.0.0.1', 'HTTP_COOKIE': f'lang={lang}',
+                'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+                'sharkapp.prerender': True  # 접속 로그 제외용
+            }
+            status = []
+            try:
+                body = app(environ, lambda s, h, exc_info=None: status.append(s))
+                for _ in body:
+                    pass
+                if hasattr(body, 'close'):
+                    body.close()
+                if status and status[0].startswith('200'):
+                    rendered += 1
+            except Exception as e:
+                print(f"[페이지 캐시] {path} ({lang}) 사전 렌더링 오류: {e}")
+    
+    if rendered:
+        print(f"[페이지 캐시] {kind}/{project_name}: {rendered}개 페이지 사전 렌더링")
+
+def on_data_updated(kind, project_name):
+    """신규 데이터 반영 후 호출 - 이전 버전 페이지 정리 및 기본 페이지 사전 렌더링 예약"""
+    PAGE_CACHE.invalidate((kind, project_name))
+    publish_versions()
+    with PRERENDER_LOCK:
+        if (kind, project_name) in PRERENDER_PENDING:
+            return
+        PRERENDER_PENDING.add((kind, project_name))
+    PRERENDER_EXECUTOR.submit(prerender_pages, kind, project_name)
+
+# ===================== MULTI-PROCESS (leader / worker) =====================
+
+def collect_version_state():
+    """리더 -> 워커로 전달할 상태 (프로젝트 등록 정보 / 데이터 버전 / Kaito 프로젝트 목록 / 글로벌 DB 세대)"""
+    kaito = {}
+    if kaito_processor:
+        kaito = {p: [kaito_processor.get_data_version(p), kaito_processor.get_data_updated_at(p)]
+                 for p in get_cached_kaito_projects()}
+    return {
+        'registry': REGISTRY_STATE["version"],
+        'registry_updated_at': REGISTRY_STATE["updated_at"],
+        'cookie': {name: {'project': dp.project_name, 'lang': dp.lang, 'path': dp.data_dir,
+                          'version': dp.data_version, 'updated_at': dp.data_updated_at}
+                   for name, dp in list(project_instances.items())},
+        'wallchain': {name: {'project': dp.project_name, 'path': dp.data_dir,
+                             'version': dp.data_version, 'updated_at': dp.data_updated_at}
+                      for name, dp in list(wallchain_instances.items())},
+        'kaito_projects': list(get_cached_kaito_projects()),
+        'kaito': kaito,
+        'global': os.path.basename(global_manager.db_path)
+    }
 
-def get_grouped_projects():
-    """Cookie 프로젝트를 이름별로 그룹화하여 반환"""
-    current_time = time.time()
-    
-    if not project_instances:
-        return {}
-    
-    if PROJECT_CACHE["grouped"] and (current_time - PROJECT_CACHE["last_updated"] < CACHE_INTERVAL):
-        return PROJECT_CACHE["grouped"]
-    
-    grouped = {}
-    for p in sorted(project_instances.keys()):
-        parts = p.rsplit('-', 1)
-        name = parts[0]
-        lang = parts[1] if len(parts) > 1 else 'global'
-        if name not in grouped:
-            grouped[name] = []
-        grouped[name].append({'full': p, 'lang': lang})
-    
-    PROJECT_CACHE["grouped"] = grouped
-    return grouped
+VERSION_PUBLISHER = VersionPublisher(VERSION_FILE, collect_version_state) if SERVE_ROLE == 'leader' else None
+VERSION_WATCHER = None  # 워커 시작 시 생성
+
+def publish_versions():
+    """리더: 프로젝트 등록/신규 데이터/글로벌 DB 교체 후 호출 (버전 파일 기록 예약, 다른 역할에서는 무시)"""
+    if VERSION_PUBLISHER is not None:
+        VERSION_PUBLISHER.publish()
+
+def apply_version_state(state):
+    """워커: 리더가 기록한 상태 반영 - 새 프로젝트 등록, 바뀐 프로젝트의 캐시 무효화, 글로벌 인덱스 다시 읽기"""
+    registered = False
+    for name, info in state.get('cookie', {}).items():
+        dp = project_instances.get(name)
+        if dp is None:
+            dp = register_cookie_project(name, info['project'], info['lang'], info['path'])
+            registered = True
+        if dp.data_version != info['version']:
+            dp.reload_user_languages()  # 리더는 load_data에서 갱신하므로 워커는 DB에서 다시 구성
+            dp.data_updated_at = info['updated_at']
+            dp.data_version = info['version']
+            on_data_updated('cookie', name)
+    
+    for name, info in state.get('wallchain', {}).items():
+        dp = wallchain_instances.get(name)
+        if dp is None:
+            dp = register_wallchain_project(name, info['project'], info['path'])
+            registered = True
+        if dp.data_version != info['version']:
+            dp.data_updated_at = info['updated_at']
+            dp.data_version = info['version']
+            on_data_updated('wallchain', name.replace('wallchain-', ''))
+    
+    # 프로젝트 목록 버전은 리더 값을 그대로 사용 (워커마다 ETag가 달라지지 않도록)
+    kaito_projects = tuple(state.get('kaito_projects', NAVIGATION.kaito_projects))
+    registry = state.get('registry', REGISTRY_STATE["version"])
+    if registered or kaito_projects != NAVIGATION.kaito_projects or registry != REGISTRY_STATE["version"]:
+        bump_registry_version(kaito_projects=kaito_projects, version=registry,
+                              updated_at=state.get('registry_updated_at'))
+    
+    if kaito_processor:
+        for project, (version, updated_at) in state.get('kaito', {}).items():
+            if kaito_processor.get_data_version(project) != version:
+                kaito_processor.data_updated_at[project] = updated_at
+                kaito_processor.data_versions[project] = version
+                on_data_updated('kaito', project)
+    
+    if state.get('global') != os.path.basename(global_manager.db_path) and global_manager.refresh():
+        reload_global_index()
 
-def get_grouped_wallchain_projects():
-    """Wallchain 프로젝트를 이름별로 그룹화하여 반환"""
-    current_time = time.time()
-    
-    if not wallchain_instances:
-        return {}
-    
-    if WALLCHAIN_CACHE["grouped"] and (current_time - WALLCHAIN_CACHE["last_updated"] < CACHE_INTERVAL):
-        return WALLCHAIN_CACHE["grouped"]
-    
-    grouped = {}
-    for key in sorted(wallchain_instances.keys()):
-        p = key.replace('wallchain-', '')
-        parts = p.rsplit('-', 1)
-        name = parts[0]
-        lang = parts[1] if len(parts) > 1 else 'global'
-        if name not in grouped:
-            grouped[name] = []
-        grouped[name].append({'full': p, 'lang': lang})
-    
-    WALLCHAIN_CACHE["grouped"] = grouped
-    return grouped
-        
 def get_data_processor(project_name):
     # 등록된 인스턴스가 있는지 확인 (없으면 에러)
     if project_name not in project_instances:
@@ -291,8 +573,13 @@ def start_data_loader_thread(project_name):
         # 최초 실행 시 모든 데이터 로드
         try:
             print(f"[{project_name}] 초기 데이터 로드 시작...")
+            load_start = time.time()
             processor.load_data()
+            record_ingest('cookie', project_name, processor, time.time() - load_start)
+            processor.publish_snapshots()  # 공유 스냅샷 파일이 없는 최근 스냅샷은 DB에서 만들어 둠
+            processor.get_user_languages()  # 언어 인덱스 미리 구성 (첫 요청에서 DB 스캔하지 않도록)
             print(f"[{project_name}] ✅ 초기 데이터 로드 완료")
+            on_data_updated('cookie', project_name)
             
             # 모든 Cookie 프로젝트의 초기 로드가 완료되었는지 확인
             all_loaded = all(p in project_instances for p in project_instances)
@@ -309,17 +596,29 @@ def start_data_loader_thread(project_name):
                 new_files = processor.check_for_new_data()
                 if new_files:
                     print(f"[{project_name}] 신규 데이터 발견, 로드 중...")
+                    load_start = time.time()
                     processor.load_data(files_to_load=new_files)
+                    record_ingest('cookie', project_name, processor, time.time() - load_start)
                     print(f"[{project_name}] ✅ 신규 데이터 로드 완료")
+                    on_data_updated('cookie', project_name)
                     GLOBAL_UPDATE_TRIGGER.set()  # 글로벌 DB 갱신 트리거
             except Exception as e:
                 print(f"[{project_name}] 데이터 로드 오류: {e}")
 
-    thread = threading.Thread(target=project_periodic_loader, daemon=True)
+    thread = threading.Thread(target=project_periodic_loader, name=f'cookie-loader-{project_name}', daemon=True)
     thread.start()
     print(f"[{project_name}] 데이터 로더 스레드 시작")
 
-def init_projects_on_startup():
+def register_cookie_project(project_id, project_name, lang, lang_path):
+    """Cookie 프로젝트 DataProcessor 생성 및 등록 (navbar 갱신은 호출한 쪽에서)"""
+    dp = DataProcessor(lang_path)
+    dp.project_display_title = f"{project_name} ({lang.upper()})"
+    dp.project_name = f"{project_name}"
+    dp.lang = f"{lang}"
+    project_instances[project_id] = dp
+    return dp
+
+def init_projects_on_startup(start_loaders=True):
     if not os.path.exists(base_data_dir):
         os.makedirs(base_data_dir)
     
@@ -335,23 +634,19 @@ def init_projects_on_startup():
             
             if os.path.isdir(lang_path) and not lang.startswith('_'):
                 project_id = f"{project_name}-{lang}" 
-                friendly_name = f"{project_name} ({lang.upper()})"
                 
                 # 1. DataProcessor 생성 (내부에서 DB 연결 및 테이블 생성됨)
-                dp = DataProcessor(lang_path)
-                
                 # 2. 초기 데이터 로드는 백그라운드 스레드에서 처리
                 # (웹서버를 먼저 시작하고 데이터는 나중에 로드)
-                
-                dp.project_display_title = friendly_name 
-                dp.project_name = f"{project_name}"
-                dp.lang = f"{lang}"
-                
-                project_instances[project_id] = dp
+                dp = register_cookie_project(project_id, project_name, lang, lang_path)
                 
                 # 3. 백그라운드 스레드 시작 (초기 데이터 로드 + 주기적으로 신규 파일 체크)
-                start_data_loader_thread(project_id)
-                print(f"🚀 Registered: {project_id} as '{friendly_name}' (데이터 로드 중...)")
+                if start_loaders:
+                    start_data_loader_thread(project_id)
+                print(f"🚀 Registered: {project_id} as '{dp.project_display_title}' (데이터 로드 중...)")
+    
+    # 등록된 프로젝트로 navbar 모델 갱신
+    bump_registry_version()
 
 def start_wallchain_loader_thread(project_name):
     def wallchain_periodic_loader():
@@ -360,8 +655,12 @@ def start_wallchain_loader_thread(project_name):
         # 최초 실행 시 모든 데이터 로드
         try:
             print(f"[Wallchain - {project_name}] 초기 데이터 로드 시작...")
+            load_start = time.time()
             processor.load_data()
+            record_ingest('wallchain', project_name, processor, time.time() - load_start)
+            processor.publish_snapshots()  # 공유 스냅샷 파일이 없는 최근 스냅샷은 DB에서 만들어 둠
             print(f"[Wallchain - {project_name}] ✅ 초기 데이터 로드 완료")
+            on_data_updated('wallchain', project_name.replace('wallchain-', ''))
             
             # 모든 Wallchain 프로젝트의 초기 로드가 완료되었는지 확인
             all_loaded = all(p in wallchain_instances for p in wallchain_instances)
@@ -378,17 +677,28 @@ def start_wallchain_loader_thread(project_name):
                 new_files = processor.check_for_new_data()
                 if new_files:
                     print(f"[Wallchain - {project_name}] 신규 데이터 발견, 로드 중...")
+                    load_start = time.time()
                     processor.load_data(files_to_load=new_files)
+                    record_ingest('wallchain', project_name, processor, time.time() - load_start)
                     print(f"[Wallchain - {project_name}] ✅ 신규 데이터 로드 완료")
+                    on_data_updated('wallchain', project_name.replace('wallchain-', ''))
                     GLOBAL_UPDATE_TRIGGER.set()  # 글로벌 DB 갱신 트리거
             except Exception as e:
                 print(f"[Wallchain - {project_name}] 데이터 로드 오류: {e}")
 
-    thread = threading.Thread(target=wallchain_periodic_loader, daemon=True)
+    thread = threading.Thread(target=wallchain_periodic_loader, name=f'wallchain-loader-{project_name}', daemon=True)
     thread.start()
     print(f"[Wallchain - {project_name}] 데이터 로더 스레드 시작")
 
-def init_wallchain_on_startup():
+def register_wallchain_project(project_id, project_name, global_path):
+    """Wallchain 프로젝트 DataProcessorWallchain 생성 및 등록 (navbar 갱신은 호출한 쪽에서)"""
+    dp = DataProcessorWallchain(global_path)
+    dp.project_display_title = f"Wallchain: {project_name.upper()}"
+    dp.project_name = f"{project_name}"
+    wallchain_instances[project_id] = dp
+    return dp
+
+def init_wallchain_on_startup(start_loaders=True):
     if not os.path.exists(base_wallchain_dir):
         os.makedirs(base_wallchain_dir)
     
@@ -403,19 +713,17 @@ def init_wallchain_on_startup():
         global_path = os.path.join(project_path, 'global')
         if os.path.isdir(global_path):
             project_id = f"wallchain-{project_name}"
-            friendly_name = f"Wallchain: {project_name.upper()}"
             
             # DataProcessorWallchain 생성
-            dp = DataProcessorWallchain(global_path)
-            
-            dp.project_display_title = friendly_name 
-            dp.project_name = f"{project_name}"
-            
-            wallchain_instances[project_id] = dp
+            dp = register_wallchain_project(project_id, project_name, global_path)
             
             # 백그라운드 스레드 시작
-            start_wallchain_loader_thread(project_id)
-            print(f"🌊 Registered: {project_id} as '{friendly_name}' (데이터 로드 중...)")
+            if start_loaders:
+                start_wallchain_loader_thread(project_id)
+            print(f"🌊 Registered: {project_id} as '{dp.project_display_title}' (데이터 로드 중...)")
+    
+    # 등록된 프로젝트로 navbar 모델 갱신
+    bump_registry_version()
 
 def scan_for_new_projects():
     """주기적으로 새로운 프로젝트를 스캔하여 등록"""
@@ -439,24 +747,17 @@ def scan_for_new_projects():
                                 
                                 # 아직 등록되지 않은 프로젝트인 경우
                                 if project_id not in project_instances:
-                                    friendly_name = f"{project_name} ({lang.upper()})"
                                     print(f"\n🆕 새로운 Cookie 프로젝트 발견: {project_id}")
                                     
                                     # DataProcessor 생성
-                                    dp = DataProcessor(lang_path)
-                                    dp.project_display_title = friendly_name 
-                                    dp.project_name = f"{project_name}"
-                                    dp.lang = f"{lang}"
-                                    
-                                    project_instances[project_id] = dp
+                                    dp = register_cookie_project(project_id, project_name, lang, lang_path)
                                     
                                     # 백그라운드 스레드 시작
                                     start_data_loader_thread(project_id)
-                                    print(f"🚀 Registered: {project_id} as '{friendly_name}' (데이터 로드 중...)")
+                                    print(f"🚀 Registered: {project_id} as '{dp.project_display_title}' (데이터 로드 중...)")
                                     
-                                    # 캐시 무효화
-                                    PROJECT_CACHE["list"] = []
-                                    PROJECT_CACHE["grouped"] = {}
+                                    # navbar 모델 갱신
+                                    bump_registry_version()
                 
                 # Wallchain 프로젝트 스캔
                 if os.path.exists(base_wallchain_dir):
@@ -471,49 +772,37 @@ def scan_for_new_projects():
                             
                             # 아직 등록되지 않은 프로젝트인 경우
                             if project_id not in wallchain_instances:
-                                friendly_name = f"Wallchain: {project_name.upper()}"
                                 print(f"\n🆕 새로운 Wallchain 프로젝트 발견: {project_id}")
                                 
                                 # DataProcessorWallchain 생성
-                                dp = DataProcessorWallchain(global_path)
-                                dp.project_display_title = friendly_name 
-                                dp.project_name = f"{project_name}"
-                                
-                                wallchain_instances[project_id] = dp
+                                dp = register_wallchain_project(project_id, project_name, global_path)
                                 
                                 # 백그라운드 스레드 시작
                                 start_wallchain_loader_thread(project_id)
-                                print(f"🌊 Registered: {project_id} as '{friendly_name}' (데이터 로드 중...)")
+                                print(f"🌊 Registered: {project_id} as '{dp.project_display_title}' (데이터 로드 중...)")
                                 
-                                # 캐시 무효화
-                                WALLCHAIN_CACHE["list"] = []
-                                WALLCHAIN_CACHE["grouped"] = {}
+                                # navbar 모델 갱신
+                                bump_registry_version()
                 
             except Exception as e:
                 print(f"[프로젝트 스캐너] 오류: {e}")
     
-    thread = threading.Thread(target=periodic_scanner, daemon=True)
+    thread = threading.Thread(target=periodic_scanner, name='project-scanner', daemon=True)
     thread.start()
     print("[프로젝트 스캐너] 5분마다 새 프로젝트 탐색 시작")
 
 # ===================== KAITO FUNCTIONS =====================
 
 def get_cached_kaito_projects():
-    """Kaito 프로젝트 목록 캐시 (5분마다 자동 갱신)"""
-    current_time = time.time()
-    
-    if not kaito_processor:
-        return []
-    
-    if KAITO_CACHE["list"] and (current_time - KAITO_CACHE["last_updated"] < CACHE_INTERVAL):
-        return KAITO_CACHE["list"]
-    
-    # 캐시 갱신
-    projects = kaito_processor.scan_projects()
-    KAITO_CACHE["list"] = projects
-    KAITO_CACHE["last_updated"] = current_time
-    print(f"[Kaito 캐시 갱신] {len(projects)}개 프로젝트 - {datetime.now().strftime('%H:%M:%S')}")
-    return projects
+    """Kaito 프로젝트 목록 (디렉토리 스캔은 로더 스레드가 담당, 요청 스레드는 navbar 모델만 읽음)"""
+    return NAVIGATION.kaito_projects
+
+def refresh_kaito_projects(projects):
+    """로더 스레드에서 스캔한 Kaito 프로젝트 목록 반영 (변경 시에만 navbar 모델 갱신)"""
+    projects = tuple(projects)
+    if projects != NAVIGATION.kaito_projects:
+        bump_registry_version(kaito_projects=projects)
+        print(f"[Kaito 목록 갱신] {len(projects)}개 프로젝트 - {datetime.now().strftime('%H:%M:%S')}")
 
 def init_kaito_on_startup():
     """Kaito 프로세서 초기화"""
@@ -521,21 +810,23 @@ def init_kaito_on_startup():
     
     print("\n🎯 [Kaito 초기화] 통합 DB 프로세서 생성...")
     kaito_processor = DataProcessorKaito()
+    refresh_kaito_projects(kaito_processor.scan_projects())
     print("✅ [Kaito] 통합 DB 생성 완료")
 
 def start_kaito_data_loader():
     """Kaito 데이터 로더 스레드 (병렬 처리로 최적화)"""
     
-    def load_project_timeframe(project, timeframe):
-        """단일 프로젝트/timeframe 조합 처리 (병렬 실행용)"""
+    def load_project_timeframe(project, timeframe, timer):
+        """단일 프로젝트/timeframe 조합 처리 (병렬 실행용, 스캔/읽기 시간은 timer에 기록)"""
         try:
-            new_files = kaito_processor.check_new_files(project, timeframe)
+            with timer.stage('scan'):
+                new_files = kaito_processor.check_new_files(project, timeframe)
             
             if new_files:
                 # 배치 데이터 수집 (병렬 처리 - Lock 없음)
                 batch_data = []
                 for filepath in new_files:
-                    data = kaito_processor.load_json_file(filepath)
+                    data = kaito_processor.load_json_file(filepath, timer)
                     if data:
                         filename = os.path.basename(filepath)
                         timestamp_str = filename.replace('.json', '').replace('_', '-')
@@ -554,16 +845,20 @@ def start_kaito_data_loader():
         # 최초 한 번 전체 로드 (병렬 처리)
         try:
             print("[Kaito] 초기 데이터 로드 시작 (병렬 처리)...")
-            projects = kaito_processor.scan_projects()
+            load_start = time.time()
+            timer = IngestTimer()
+            with timer.stage('scan'):
+                projects = kaito_processor.scan_projects()
+            refresh_kaito_projects(projects)
             timeframes = ['7D', '30D', '90D', '180D', '360D']
             
             # 프로젝트 × timeframe 조합 생성
             tasks = [(p, tf) for p in projects for tf in timeframes]
             
             # ThreadPoolExecutor로 병렬 처리 (최대 5개 워커)
-            with ThreadPoolExecutor(max_workers=5) as executor:
+            with ThreadPoolExecutor(max_workers=5, thread_name_prefix='kaito-read') as executor:
                 # future와 task 정보를 매핑
-                future_to_task = {executor.submit(load_project_timeframe, p, tf): (p, tf) for p, tf in tasks}
+                future_to_task = {executor.submit(load_project_timeframe, p, tf, timer): (p, tf) for p, tf in tasks}
                 
                 # 결과 수집 (배치로 모음)
                 all_batch_data = []
@@ -594,8 +889,11 @@ def start_kaito_data_loader():
                 if all_batch_data:
                     print(f"[Kaito] DB 삽입 시작... (총 {len(all_batch_data)}개 항목)")
                     with KAITO_DB_LOCK:
-                        kaito_processor.insert_data_batch(all_batch_data)
+                        kaito_processor.insert_data_batch(all_batch_data, timer)
+                    record_ingest('kaito', 'kaito', kaito_processor, time.time() - load_start)
                     print(f"[Kaito] DB 삽입 완료")
+                    for updated_project in sorted({item[0] for item in all_batch_data}):
+                        on_data_updated('kaito', updated_project)
             
             print("[Kaito] ✅ 초기 데이터 로드 완료")
             KAITO_INITIAL_LOAD_DONE.set()
@@ -619,14 +917,18 @@ def start_kaito_data_loader():
                 if SHUTDOWN_FLAG.is_set():
                     break
                 
-                projects = kaito_processor.scan_projects()
+                load_start = time.time()
+                timer = IngestTimer()
+                with timer.stage('scan'):
+                    projects = kaito_processor.scan_projects()
+                refresh_kaito_projects(projects)
                 timeframes = ['7D', '30D', '90D', '180D', '360D']
                 tasks = [(p, tf) for p in projects for tf in timeframes]
                 
                 new_data_found = False
-                with ThreadPoolExecutor(max_workers=5) as executor:
+                with ThreadPoolExecutor(max_workers=5, thread_name_prefix='kaito-read') as executor:
                     # future와 task 정보를 매핑
-                    future_to_task = {executor.submit(load_project_timeframe, p, tf): (p, tf) for p, tf in tasks}
+                    future_to_task = {executor.submit(load_project_timeframe, p, tf, timer): (p, tf) for p, tf in tasks}
                     
                     # 결과 수집 (배치로 모음)
                     all_batch_data = []
@@ -660,12 +962,14 @@ def start_kaito_data_loader():
                     if all_batch_data:
                         print(f"[Kaito] DB 삽입 시작... (총 {len(all_batch_data)}개 항목)")
                         with KAITO_DB_LOCK:
-                            kaito_processor.insert_data_batch(all_batch_data)
+                            kaito_processor.insert_data_batch(all_batch_data, timer)
+                        record_ingest('kaito', 'kaito', kaito_processor, time.time() - load_start)
                         print(f"[Kaito] DB 삽입 완료")
+                        for updated_project in sorted({item[0] for item in all_batch_data}):
+                            on_data_updated('kaito', updated_project)
                 
                 if new_data_found:
                     print("[Kaito] ✅ 신규 데이터 로드 완료\n")
-                    KAITO_CACHE["list"] = []
                     GLOBAL_UPDATE_TRIGGER.set()  # 글로벌 DB 갱신 트리거
                     
             except Exception as e:
@@ -674,7 +978,7 @@ def start_kaito_data_loader():
         
         print("[Kaito] 데이터 로더 스레드 종료")
     
-    thread = threading.Thread(target=kaito_periodic_loader, daemon=True)
+    thread = threading.Thread(target=kaito_periodic_loader, name='kaito-loader', daemon=True)
     thread.start()
 
 # ===================== END KAITO FUNCTIONS =====================
@@ -683,21 +987,13 @@ def start_kaito_data_loader():
 def render_error(error_message, project_name=None):
     try:
         project = project_name or "unknown"
-        all_projects = get_cached_projects()
-        all_wallchain_projects = get_cached_wallchain_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
         lang = get_language()  # 현재 설정된 언어 가져오기
         return template('error.html',
                        current_project=project,
                        project=project,
                        current_page="",
                        lang=lang,
-                       all_projects=all_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        error_message=error_message,
                        project_instances=project_instances,
                        json=json)
@@ -792,354 +1088,334 @@ def favicon():
 
 # ===================== GLOBAL DATA MANAGEMENT =====================
 
+# 글로벌 DB 갱신 시 프로젝트별 수집 작업 동시 실행 수 (SQLite 조회는 GIL을 놓으므로 스레드로 충분)
+GLOBAL_COLLECT_WORKERS = int(os.environ.get('SHARKAPP_GLOBAL_WORKERS', str(min(8, os.cpu_count() or 1))))
+
+def collect_cookie_rankings(project_name, dp):
+    """Cookie 프로젝트 1개의 timeframe별 최신 스냅샷 행 수집 -> [(timeframe, latest_ts, rows), ...]"""
+    parts = []
+    with query_profiler.connect(dp.db_path, timeout=30.0) as conn:
+        cursor = conn.cursor()
+        for timeframe in dp.timeframes:
+            # 최신 타임스탬프의 데이터 가져오기
+            cursor.execute(
+                "SELECT MAX(timestamp) FROM snaps WHERE timeframe = ?",
+                (timeframe,)
+            )
+            latest_ts = cursor.fetchone()[0]
+            
+            if not latest_ts:
+                print(f"[Cookie] {project_name}/{timeframe} - 데이터 없음")
+                continue
+            
+            # 해당 타임스탬프의 모든 유저 데이터
+            cursor.execute('''
+                SELECT username, displayName, profileImageUrl, 
+                       snapsPercentRank, cSnapsPercentRank, snapsPercent, cSnapsPercent,
+                       followers, smartFollowers
+                FROM snaps 
+                WHERE timestamp = ? AND timeframe = ?
+            ''', (latest_ts, timeframe))
+            
+            rows = cursor.fetchall()
+            print(f"[Cookie] {project_name}/{timeframe} - {len(rows)}개 레코드 발견 (timestamp: {latest_ts})")
+            parts.append((timeframe, latest_ts, rows))
+    return parts
+
+def merge_cookie_rankings(users_batch, rankings_batch, project_name, parts):
+    """collect_cookie_rankings 결과를 users_batch/rankings_batch에 병합 (최신 타임스탬프 우선)"""
+    for timeframe, latest_ts, rows in parts:
+        for row in rows:
+            try:
+                username = row[0]
+                if not username or username.strip() == '':
+                    continue
+                    
+                display_name = row[1]
+                image_url = row[2]
+                ms_rank = row[3]  # rank -> ms_rank
+                cms_rank = row[4]  # cSnapsPercentRank -> cms_rank
+                ms_percent = row[5]  # snapsPercent -> ms_percent
+                cms_percent = row[6]  # cSnapsPercent -> cms_percent
+                followers = row[7] if len(row) > 7 else None
+                smart_followers = row[8] if len(row) > 8 else None
+                
+                # 유저 정보 수집 (타임스탬프 비교로 최신 데이터만 반영)
+                if username in users_batch:
+                    # 이미 있으면 타임스탬프 비교
+                    existing = users_batch[username]
+                    existing_timestamp = existing[7] if len(existing) > 7 else None
+                    
+                    # 타임스탬프 비교: 더 최신 데이터면 모든 정보 업데이트 (팔로워도 최신값으로)
+                    if existing_timestamp is None or latest_ts > existing_timestamp:
+                        users_batch[username] = (username, 
+                                                display_name if display_name else existing[1],
+                                                image_url if image_url else existing[2], 
+                                                existing[3],  # wal_score 유지
+                                                smart_followers if smart_followers is not None else existing[4],
+                                                existing[5],  # kaito_smart_follower 유지
+                                                followers if followers is not None else existing[6],
+                                                latest_ts)  # 타임스탬프 저장
+                else:
+                    # 없으면 새로 추가 (타임스탬프 포함)
+                    users_batch[username] = (username, display_name, image_url, None,
+                                            smart_followers, None, followers, latest_ts)
+                
+                # 순위 정보 수집
+                rankings_batch.append((
+                    username, project_name, timeframe, 
+                    ms_rank, cms_rank, ms_percent, cms_percent, None
+                ))
+            except Exception as e:
+                print(f"[Cookie 오류] {project_name}/{timeframe} row 처리 실패: {e}")
+
+def collect_wallchain_rankings(project_name, dp):
+    """Wallchain 프로젝트 1개의 timeframe별 최신 스냅샷 행 수집 -> [(timeframe, latest_ts, rows), ...]"""
+    parts = []
+    with query_profiler.connect(dp.db_path, timeout=30.0) as conn:
+        cursor = conn.cursor()
+        for timeframe in dp.timeframes:
+            # 최신 타임스탬프의 데이터 가져오기
+            cursor.execute(
+                "SELECT MAX(timestamp) FROM leaderboard WHERE timeframe = ?",
+                (timeframe,)
+            )
+            latest_ts = cursor.fetchone()[0]
+            
+            if not latest_ts:
+                print(f"[Wallchain] {project_name}/{timeframe} - 데이터 없음")
+                continue
+            
+            # 해당 타임스탬프의 모든 유저 데이터
+            cursor.execute('''
+                SELECT username, name, imageUrl, score, 
+                       position, positionChange, mindsharePercentage
+                FROM leaderboard 
+                WHERE timestamp = ? AND timeframe = ?
+            ''', (latest_ts, timeframe))
+            
+            rows = cursor.fetchall()
+            print(f"[Wallchain] {project_name}/{timeframe} - {len(rows)}개 레코드 발견 (timestamp: {latest_ts})")
+            parts.append((timeframe, latest_ts, rows))
+    return parts
+
+def merge_wallchain_rankings(users_batch, rankings_batch, project_name, parts):
+    """collect_wallchain_rankings 결과 병합 (wal_score는 항상 wallchain 값, 기본 정보는 최신 타임스탬프 우선)"""
+    for timeframe, latest_ts, rows in parts:
+        for row in rows:
+            try:
+                username = row[0]  # wallchain의 username (실제 X 핸들, infoName으로 사용)
+                if not username or username.strip() == '':
+                    continue
+                    
+                display_name = row[1]  # wallchain의 name (표시 이름)
+                image_url = row[2]
+                score = row[3]
+                position = row[4]
+                position_change = row[5]
+                mindshare_percentage = row[6]
+                
+                # 유저 정보 수집 (wallchain은 wal_score와 기본정보 업데이트, 타임스탬프 비교)
+                if username in users_batch:
+                    # 이미 있으면 타임스탬프 비교
+                    existing = users_batch[username]
+                    existing_timestamp = existing[7] if len(existing) > 7 else None
+                    
+                    # 타임스탬프 비교: 더 최신 데이터면 기본 정보 업데이트
+                    if existing_timestamp is None or latest_ts > existing_timestamp:
+                        users_batch[username] = (username, 
+                                                display_name if display_name else existing[1],
+                                                image_url if image_url else existing[2], 
+                                                score,  # wal_score 업데이트
+                                                existing[4],  # cookie_smart_follower 유지
+                                                existing[5],  # kaito_smart_follower 유지
+                                                existing[6],  # follower 유지
+                                                latest_ts)  # 타임스탬프 저장
+                    else:
+                        # 오래된 데이터면 팔로워는 유지, wal_score만 업데이트
+                        users_batch[username] = (existing[0], existing[1], existing[2], 
+                                                score,  # wal_score는 업데이트 (wallchain 우선)
+                                                existing[4], existing[5], existing[6], existing_timestamp)
+                else:
+                    # 없으면 새로 추가 (팔로워 정보 없음, 타임스탬프 포함)
+                    users_batch[username] = (username, display_name, image_url, score,
+                                            None, None, None, latest_ts)
+                
+                # 순위 정보 수집
+                rankings_batch.append((
+                    username, project_name, timeframe,
+                    position, None, mindshare_percentage, None, position_change
+                ))
+            except Exception as e:
+                print(f"[Wallchain 오류] {project_name}/{timeframe} row 처리 실패: {e}")
+
+def collect_kaito_rankings(project_name, processor):
+    """
+    Kaito DB의 프로젝트별 최신 데이터 수집 + 문자열 파싱
+    -> [(handle, display_name, image_url, smart_follower, follower, project_name, timeframe, rank, mindshare), ...]
+    """
+    with query_profiler.connect(processor.db_path, timeout=30.0) as conn:
+        cursor = conn.cursor()
+        
+        # 한 번의 쿼리로 모든 최신 데이터 가져오기 (JOIN 사용)
+        print(f"[Kaito] 최신 데이터 쿼리 실행 중...")
+        query_start = time.time()
+        cursor.execute('''
+            SELECT r.handle, r.displayName, r.imageId, r.rank, r.mindshare, 
+                   r.smartFollower, r.follower, r.projectName, r.timeframe
+            FROM rankings r
+            INNER JOIN (
+                SELECT projectName, timeframe, MAX(timestamp) as latest_ts
+                FROM rankings
+                GROUP BY projectName, timeframe
+            ) latest
+            ON r.projectName = latest.projectName 
+               AND r.timeframe = latest.timeframe 
+               AND r.timestamp = latest.latest_ts
+        ''')
+        all_rows = cursor.fetchall()
+    
+    query_time = time.time() - query_start
+    unique_projects = set(row[7] for row in all_rows)
+    print(f"[Kaito] 쿼리 완료 ({query_time:.2f}초) - 프로젝트: {len(unique_projects)}개, 레코드: {len(all_rows):,}개")
+    
+    parsed = []
+    error_count = 0
+    process_start = time.time()
+    for row in all_rows:
+        try:
+            handle = row[0]
+            
+            # handle 검증 (비어있으면 스킵)
+            if not handle or handle.strip() == '':
+                error_count += 1
+                continue
+            
+            image_id = row[2]
+            mindshare_str = row[4]
+            smart_follower_str = row[5]
+            follower_str = row[6]
+            
+            # mindshare를 숫자로 변환 (간결하게)
+            mindshare_value = float(mindshare_str.rstrip('%')) if mindshare_str else 0.0
+            
+            # 팔로워 수를 정수로 변환 (간결하게)
+            smart_follower = None
+            if smart_follower_str and smart_follower_str != '-':
+                try:
+                    smart_follower = int(smart_follower_str.replace(',', ''))
+                except:
+                    pass
+            
+            follower = None
+            if follower_str and follower_str != '-':
+                try:
+                    follower = int(follower_str.replace(',', ''))
+                except:
+                    pass
+            
+            # kaito- prefix 추가 (글로벌 DB용), 이미지 URL 생성
+            parsed.append((handle, row[1], image_id if image_id else "", smart_follower, follower,
+                           f"kaito-{row[7]}", row[8], row[3], mindshare_value))
+        except Exception as e:
+            error_count += 1
+            if error_count <= 5:  # 처음 5개 에러만 출력
+                print(f"[Kaito 경고] row 처리 실패: {e}")
+    
+    print(f"[Kaito] 처리 완료 ({time.time() - process_start:.2f}초) - 성공: {len(parsed):,}, 실패: {error_count}")
+    return parsed
+
+def merge_kaito_rankings(users_batch, rankings_batch, project_name, parsed):
+    """collect_kaito_rankings 결과 병합 (이미지는 wallchain/cookie URL 우선, kaito 스마트 팔로워는 최댓값)"""
+    for (handle, display_name, image_url, smart_follower, follower,
+         kaito_project_name, timeframe, rank, mindshare_value) in parsed:
+        # 유저 정보 수집
+        if handle in users_batch:
+            existing = users_batch[handle]
+            
+            # 이미지는 숫자 ID가 아닌 경우만 유지 (wallchain/cookie 우선)
+            final_image = existing[2] if existing[2] and not existing[2].isdigit() else image_url
+            
+            # kaito_smart_follower는 이전 값보다 큰 경우에만 업데이트
+            existing_kaito_smart = existing[5] if existing[5] is not None else 0
+            new_kaito_smart = smart_follower if smart_follower is not None else 0
+            final_kaito_smart = max(existing_kaito_smart, new_kaito_smart) if new_kaito_smart > 0 or existing_kaito_smart > 0 else None
+            
+            # 일반 팔로워는 최신 값 우선
+            final_follower = follower if follower is not None else existing[6]
+            
+            users_batch[handle] = (handle, existing[1], final_image, existing[3],
+                                  existing[4], final_kaito_smart, final_follower)
+        else:
+            users_batch[handle] = (handle, display_name, image_url, None,
+                                  None, smart_follower, follower)
+        
+        # 순위 정보 수집
+        rankings_batch.append((
+            handle, kaito_project_name, timeframe,
+            rank, None, mindshare_value, None, None
+        ))
+
+# {소스: (수집 함수, 병합 함수, 로그 라벨)}
+GLOBAL_SOURCES = {
+    'cookie': (collect_cookie_rankings, merge_cookie_rankings, 'Cookie'),
+    'wallchain': (collect_wallchain_rankings, merge_wallchain_rankings, 'Wallchain'),
+    'kaito': (collect_kaito_rankings, merge_kaito_rankings, 'Kaito')
+}
+
 def update_global_rankings():
     """글로벌 DB 갱신 - 모든 프로젝트의 최신 순위 정보 수집"""
     print(f"\n{'='*60}")
     print(f"[글로벌 DB 갱신 시작] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}")
     
+    update_start = time.time()
     try:
         # 배치 업데이트 시작 (임시 테이블 생성)
         global_manager.begin_batch_update()
         
-        # 메모리에 데이터 수집
+        # 1) 수집: 프로젝트별 작업을 스레드 풀에서 동시에 실행 (DB 조회 + 파싱, 결과는 프로젝트별로 따로 보관)
+        tasks = [('cookie', name, dp) for name, dp in list(project_instances.items())]
+        tasks += [('wallchain', name, dp) for name, dp in list(wallchain_instances.items())]
+        if kaito_processor:
+            tasks.append(('kaito', 'kaito', kaito_processor))
+        else:
+            print(f"[Kaito] kaito_processor가 초기화되지 않음")
+        
+        collect_start = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, GLOBAL_COLLECT_WORKERS), thread_name_prefix='global-collect') as executor:
+            futures = [executor.submit(GLOBAL_SOURCES[kind][0], name, source) for kind, name, source in tasks]
+        print(f"[글로벌 DB] 수집 완료 ({time.time() - collect_start:.2f}초, 작업 {len(tasks)}개, 워커 {GLOBAL_COLLECT_WORKERS}개)")
+        
+        # 2) 병합: 기존과 같은 순서(Cookie -> Wallchain -> Kaito, 등록 순)로 병합해서 우선순위 규칙 유지
+        #    (wallchain > cookie > kaito 이미지, 최신 타임스탬프 우선)
         users_batch = {}  # {infoName: (infoName, displayName, imageUrl, wal_score, cookie_smart, kaito_smart, follower, timestamp)}
         rankings_batch = []  # [(infoName, projectName, timeframe, ...)]
+        totals = {kind: [0, 0] for kind in GLOBAL_SOURCES}  # {소스: [유저, 순위]}
         
-        # Cookie 프로젝트 데이터 수집
-        cookie_total_users = 0
-        cookie_total_rankings = 0
-        for project_name, dp in list(project_instances.items()):
+        for (kind, name, _), future in zip(tasks, futures):
+            _, merge, label = GLOBAL_SOURCES[kind]
             try:
-                print(f"[Cookie] {project_name} 처리 중...")
-                project_users_before = len(users_batch)
-                project_rankings_before = len(rankings_batch)
-                
-                for timeframe in dp.timeframes:
-                    # 최신 타임스탬프의 데이터 가져오기
-                    with sqlite3.connect(dp.db_path, timeout=30.0) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "SELECT MAX(timestamp) FROM snaps WHERE timeframe = ?",
-                            (timeframe,)
-                        )
-                        latest_ts = cursor.fetchone()[0]
-                        
-                        if not latest_ts:
-                            print(f"[Cookie] {project_name}/{timeframe} - 데이터 없음")
-                            continue
-                        
-                        # 해당 타임스탬프의 모든 유저 데이터
-                        cursor.execute('''
-                            SELECT username, displayName, profileImageUrl, 
-                                   snapsPercentRank, cSnapsPercentRank, snapsPercent, cSnapsPercent,
-                                   followers, smartFollowers
-                            FROM snaps 
-                            WHERE timestamp = ? AND timeframe = ?
-                        ''', (latest_ts, timeframe))
-                        
-                        rows = cursor.fetchall()
-                        print(f"[Cookie] {project_name}/{timeframe} - {len(rows)}개 레코드 발견 (timestamp: {latest_ts})")
-                        
-                        for row in rows:
-                            try:
-                                username = row[0]
-                                if not username or username.strip() == '':
-                                    continue
-                                    
-                                display_name = row[1]
-                                image_url = row[2]
-                                ms_rank = row[3]  # rank -> ms_rank
-                                cms_rank = row[4]  # cSnapsPercentRank -> cms_rank
-                                ms_percent = row[5]  # snapsPercent -> ms_percent
-                                cms_percent = row[6]  # cSnapsPercent -> cms_percent
-                                followers = row[7] if len(row) > 7 else None
-                                smart_followers = row[8] if len(row) > 8 else None
-                                
-                                # 유저 정보 수집 (타임스탬프 비교로 최신 데이터만 반영)
-                                if username in users_batch:
-                                    # 이미 있으면 타임스탬프 비교
-                                    existing = users_batch[username]
-                                    existing_timestamp = existing[7] if len(existing) > 7 else None
-                                    
-                                    # 타임스탬프 비교: 더 최신 데이터면 모든 정보 업데이트
-                                    if existing_timestamp is None or latest_ts > existing_timestamp:
-                                        # 최신 데이터로 모든 정보 업데이트 (팔로워도 최신값으로)
-                                        users_batch[username] = (username, 
-                                                                display_name if display_name else existing[1],
-                                                                image_url if image_url else existing[2], 
-                                                                existing[3],  # wal_score 유지
-                                                                smart_followers if smart_followers is not None else existing[4],
-                                                                existing[5],  # kaito_smart_follower 유지
-                                                                followers if followers is not None else existing[6],
-                                                                latest_ts)  # 타임스탬프 저장
-                                    else:
-                                        # 오래된 데이터면 아무것도 변경하지 않음
-                                        pass
-                                else:
-                                    # 없으면 새로 추가 (타임스탬프 포함)
-                                    users_batch[username] = (username, display_name, image_url, None,
-                                                            smart_followers, None, followers, latest_ts)
-                                
-                                # 순위 정보 수집
-                                rankings_batch.append((
-                                    username, project_name, timeframe, 
-                                    ms_rank, cms_rank, ms_percent, cms_percent, None
-                                ))
-                            except Exception as e:
-                                print(f"[Cookie 오류] {project_name}/{timeframe} row 처리 실패: {e}")
-                
-                project_users_added = len(users_batch) - project_users_before
-                project_rankings_added = len(rankings_batch) - project_rankings_before
-                cookie_total_users += project_users_added
-                cookie_total_rankings += project_rankings_added
-                print(f"[Cookie] {project_name} 완료 ✓ (유저: +{project_users_added}, 순위: +{project_rankings_added})")
+                partial = future.result()
+                users_before = len(users_batch)
+                rankings_before = len(rankings_batch)
+                merge(users_batch, rankings_batch, name, partial)
                 
+                users_added = len(users_batch) - users_before
+                rankings_added = len(rankings_batch) - rankings_before
+                totals[kind][0] += users_added
+                totals[kind][1] += rankings_added
+                print(f"[{label}] {name} 완료 ✓ (유저: +{users_added}, 순위: +{rankings_added})")
             except Exception as e:
-                print(f"[Cookie] {project_name} 오류: {e}")
+                print(f"[{label}] {name} 오류: {e}")
                 import traceback
                 traceback.print_exc()
         
+        cookie_total_users, cookie_total_rankings = totals['cookie']
+        wallchain_total_users, wallchain_total_rankings = totals['wallchain']
+        kaito_total_users, kaito_total_rankings = totals['kaito']
         print(f"[Cookie 총계] 유저: {cookie_total_users}, 순위: {cookie_total_rankings}")
-        
-        # Wallchain 프로젝트 데이터 수집
-        wallchain_total_users = 0
-        wallchain_total_rankings = 0
-        for project_name, dp in list(wallchain_instances.items()):
-            try:
-                print(f"[Wallchain] {project_name} 처리 중...")
-                project_users_before = len(users_batch)
-                project_rankings_before = len(rankings_batch)
-                
-                for timeframe in dp.timeframes:
-                    # 최신 타임스탬프의 데이터 가져오기
-                    with sqlite3.connect(dp.db_path, timeout=30.0) as conn:
-                        cursor = conn.cursor()
-                        cursor.execute(
-                            "SELECT MAX(timestamp) FROM leaderboard WHERE timeframe = ?",
-                            (timeframe,)
-                        )
-                        latest_ts = cursor.fetchone()[0]
-                        
-                        if not latest_ts:
-                            print(f"[Wallchain] {project_name}/{timeframe} - 데이터 없음")
-                            continue
-                        
-                        # 해당 타임스탬프의 모든 유저 데이터
-                        cursor.execute('''
-                            SELECT username, name, imageUrl, score, 
-                                   position, positionChange, mindsharePercentage
-                            FROM leaderboard 
-                            WHERE timestamp = ? AND timeframe = ?
-                        ''', (latest_ts, timeframe))
-                        
-                        rows = cursor.fetchall()
-                        print(f"[Wallchain] {project_name}/{timeframe} - {len(rows)}개 레코드 발견 (timestamp: {latest_ts})")
-                        
-                        for row in rows:
-                            try:
-                                username = row[0]  # wallchain의 username (실제 X 핸들, infoName으로 사용)
-                                if not username or username.strip() == '':
-                                    continue
-                                    
-                                display_name = row[1]  # wallchain의 name (표시 이름)
-                                image_url = row[2]
-                                score = row[3]
-                                position = row[4]
-                                position_change = row[5]
-                                mindshare_percentage = row[6]
-                                
-                                # 유저 정보 수집 (wallchain은 wal_score와 기본정보 업데이트, 타임스탬프 비교)
-                                if username in users_batch:
-                                    # 이미 있으면 타임스탬프 비교
-                                    existing = users_batch[username]
-                                    existing_timestamp = existing[7] if len(existing) > 7 else None
-                                    
-                                    # 타임스탬프 비교: 더 최신 데이터면 기본 정보 업데이트
-                                    if existing_timestamp is None or latest_ts > existing_timestamp:
-                                        # 최신 데이터로 기본 정보 업데이트
-                                        users_batch[username] = (username, 
-                                                                display_name if display_name else existing[1],
-                                                                image_url if image_url else existing[2], 
-                                                                score,  # wal_score 업데이트
-                                                                existing[4],  # cookie_smart_follower 유지
-                                                                existing[5],  # kaito_smart_follower 유지
-                                                                existing[6],  # follower 유지
-                                                                latest_ts)  # 타임스탬프 저장
-                                    else:
-                                        # 오래된 데이터면 팔로워는 유지, wal_score만 업데이트
-                                        users_batch[username] = (existing[0], existing[1], existing[2], 
-                                                                score,  # wal_score는 업데이트 (wallchain 우선)
-                                                                existing[4], existing[5], existing[6], existing_timestamp)
-                                else:
-                                    # 없으면 새로 추가 (팔로워 정보 없음, 타임스탬프 포함)
-                                    users_batch[username] = (username, display_name, image_url, score,
-                                                            None, None, None, latest_ts)
-                                
-                                # 순위 정보 수집
-                                rankings_batch.append((
-                                    username, project_name, timeframe,
-                                    position, None, mindshare_percentage, None, position_change
-                                ))
-                            except Exception as e:
-                                print(f"[Wallchain 오류] {project_name}/{timeframe} row 처리 실패: {e}")
-                
-                project_users_added = len(users_batch) - project_users_before
-                project_rankings_added = len(rankings_batch) - project_rankings_before
-                wallchain_total_users += project_users_added
-                wallchain_total_rankings += project_rankings_added
-                print(f"[Wallchain] {project_name} 완료 ✓ (유저: +{project_users_added}, 순위: +{project_rankings_added})")
-                
-            except Exception as e:
-                print(f"[Wallchain] {project_name} 오류: {e}")
-                import traceback
-                traceback.print_exc()
-        
         print(f"[Wallchain 총계] 유저: {wallchain_total_users}, 순위: {wallchain_total_rankings}")
-        
-        # Kaito 프로젝트 데이터 수집
-        kaito_total_users = 0
-        kaito_total_rankings = 0
-        if kaito_processor:
-            try:
-                print(f"[Kaito] 데이터 수집 중...")
-                kaito_users_before = len(users_batch)
-                kaito_rankings_before = len(rankings_batch)
-                
-                # Kaito DB에서 최신 데이터 가져오기 (최적화된 단일 쿼리)
-                with sqlite3.connect('./data/kaito/kaito_projects.db', timeout=30.0) as conn:
-                    cursor = conn.cursor()
-                    
-                    # 한 번의 쿼리로 모든 최신 데이터 가져오기 (JOIN 사용)
-                    print(f"[Kaito] 최신 데이터 쿼리 실행 중...")
-                    query_start = time.time()
-                    cursor.execute('''
-                        SELECT r.handle, r.displayName, r.imageId, r.rank, r.mindshare, 
-                               r.smartFollower, r.follower, r.projectName, r.timeframe
-                        FROM rankings r
-                        INNER JOIN (
-                            SELECT projectName, timeframe, MAX(timestamp) as latest_ts
-                            FROM rankings
-                            GROUP BY projectName, timeframe
-                        ) latest
-                        ON r.projectName = latest.projectName 
-                           AND r.timeframe = latest.timeframe 
-                           AND r.timestamp = latest.latest_ts
-                    ''')
-                    
-                    all_rows = cursor.fetchall()
-                    query_time = time.time() - query_start
-                    
-                    # 고유 프로젝트 수 계산
-                    unique_projects = set(row[7] for row in all_rows)
-                    print(f"[Kaito] 쿼리 완료 ({query_time:.2f}초) - 프로젝트: {len(unique_projects)}개, 레코드: {len(all_rows):,}개")
-                    
-                    # 청크 단위로 빠르게 처리
-                    success_count = 0
-                    error_count = 0
-                    chunk_size = 5000  # 5000개씩 처리
-                    total_chunks = (len(all_rows) + chunk_size - 1) // chunk_size
-                    
-                    process_start = time.time()
-                    for chunk_idx in range(total_chunks):
-                        chunk_start_idx = chunk_idx * chunk_size
-                        chunk_end_idx = min(chunk_start_idx + chunk_size, len(all_rows))
-                        chunk = all_rows[chunk_start_idx:chunk_end_idx]
-                        
-                        if chunk_idx % 5 == 0 or chunk_idx == total_chunks - 1:  # 5청크마다 또는 마지막
-                            elapsed = time.time() - process_start
-                            progress = (chunk_idx + 1) / total_chunks * 100
-                            print(f"[Kaito] 처리 중... {chunk_idx+1}/{total_chunks} ({progress:.1f}%) - {success_count:,}개 완료 ({elapsed:.2f}초)")
-                        
-                        for row in chunk:
-                            try:
-                                handle = row[0]
-                                
-                                # handle 검증 (비어있으면 스킵)
-                                if not handle or handle.strip() == '':
-                                    error_count += 1
-                                    continue
-                                
-                                display_name = row[1]
-                                image_id = row[2]
-                                rank = row[3]
-                                mindshare_str = row[4]
-                                smart_follower_str = row[5]
-                                follower_str = row[6]
-                                project_name_raw = row[7]
-                                timeframe = row[8]
-                                
-                                # kaito- prefix 추가 (글로벌 DB용)
-                                project_name = f"kaito-{project_name_raw}"
-                                
-                                # mindshare를 숫자로 변환 (간결하게)
-                                mindshare_value = float(mindshare_str.rstrip('%')) if mindshare_str else 0.0
-                                
-                                # 팔로워 수를 정수로 변환 (간결하게)
-                                smart_follower = None
-                                if smart_follower_str and smart_follower_str != '-':
-                                    try:
-                                        smart_follower = int(smart_follower_str.replace(',', ''))
-                                    except:
-                                        pass
-                                
-                                follower = None
-                                if follower_str and follower_str != '-':
-                                    try:
-                                        follower = int(follower_str.replace(',', ''))
-                                    except:
-                                        pass
-                                
-                                # 이미지 URL 생성
-                                image_url = image_id if image_id else ""
-                                
-                                # 유저 정보 수집
-                                if handle in users_batch:
-                                    existing = users_batch[handle]
-                                    
-                                    # 이미지는 숫자 ID가 아닌 경우만 유지 (wallchain/cookie 우선)
-                                    final_image = existing[2] if existing[2] and not existing[2].isdigit() else image_url
-                                    
-                                    # kaito_smart_follower는 이전 값보다 큰 경우에만 업데이트
-                                    existing_kaito_smart = existing[5] if existing[5] is not None else 0
-                                    new_kaito_smart = smart_follower if smart_follower is not None else 0
-                                    final_kaito_smart = max(existing_kaito_smart, new_kaito_smart) if new_kaito_smart > 0 or existing_kaito_smart > 0 else None
-                                    
-                                    # 일반 팔로워는 최신 값 우선
-                                    final_follower = follower if follower is not None else existing[6]
-                                    
-                                    users_batch[handle] = (handle, existing[1], final_image, existing[3],
-                                                          existing[4], final_kaito_smart, final_follower)
-                                else:
-                                    users_batch[handle] = (handle, display_name, image_url, None,
-                                                          None, smart_follower, follower)
-                                
-                                # 순위 정보 수집
-                                rankings_batch.append((
-                                    handle, project_name, timeframe,
-                                    rank, None, mindshare_value, None, None
-                                ))
-                                success_count += 1
-                                
-                            except Exception as e:
-                                error_count += 1
-                                if error_count <= 5:  # 처음 5개 에러만 출력
-                                    print(f"[Kaito 경고] row 처리 실패: {e}")
-                    
-                    process_time = time.time() - process_start
-                    print(f"[Kaito] 처리 완료 ({process_time:.2f}초) - 성공: {success_count:,}, 실패: {error_count}")
-                
-                kaito_total_users = len(users_batch) - kaito_users_before
-                kaito_total_rankings = len(rankings_batch) - kaito_rankings_before
-                print(f"[Kaito] 데이터 수집 완료 ✓ (유저: +{kaito_total_users}, 순위: +{kaito_total_rankings})")
-                
-            except Exception as e:
-                print(f"[Kaito] 데이터 수집 오류: {e}")
-                import traceback
-                traceback.print_exc()
-        else:
-            print(f"[Kaito] kaito_processor가 초기화되지 않음")
-        
         print(f"[Kaito 총계] 유저: {kaito_total_users}, 순위: {kaito_total_rankings}")
         
         # 프로젝트 수 계산
@@ -1176,7 +1452,7 @@ def update_global_rankings():
                 collected_keys.add((infoName, projectName, timeframe))
             
             # DB에서 갱신되지 않은 row 찾아서 ms, cms를 0으로
-            with sqlite3.connect('./data/global_rankings.db', timeout=30.0) as conn:
+            with global_manager.reading() as db_path, query_profiler.connect(db_path, timeout=30.0) as conn:
                 cursor = conn.cursor()
                 
                 # 모든 rankings의 key 가져오기
@@ -1200,11 +1476,21 @@ def update_global_rankings():
         except Exception as e:
             print(f"[글로벌 DB] OUT OF RANK 처리 오류: {e}")
         
+        # 갱신된 DB로 메모리 인덱스 교체
+        reload_global_index()
+        
+        METRICS.observe('sharkapp_global_update_duration_seconds', time.time() - update_start, JOB_BUCKETS,
+                        'Global DB update duration (collect, merge, write, index reload)')
+        METRICS.set('sharkapp_global_update_last_success_timestamp_seconds', time.time(),
+                    'Unix time of the last successful global DB update')
+        METRICS.set('sharkapp_global_rankings', len(rankings_batch), 'Rankings written by the last global DB update')
+        
         print(f"\n{'='*60}")
         print(f"[글로벌 DB 갱신 완료] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}\n")
         
     except Exception as e:
+        METRICS.inc('sharkapp_global_update_failures_total', 1, 'Failed global DB updates')
         print(f"[글로벌 DB 갱신 실패] {e}")
         import traceback
         traceback.print_exc()
@@ -1221,6 +1507,8 @@ def schedule_global_updates():
     
     # DB가 비어있으면 즉시 갱신, 아니면 5분 후 갱신
     def initial_update():
+        # 기존 글로벌 DB가 있으면 갱신 전까지 그 데이터로 메모리 인덱스 사용
+        reload_global_index()
         try:
             # 프로젝트 초기 데이터 로드가 완료될 때까지 대기
             print("[글로벌 DB] 프로젝트 초기 데이터 로드 완료 대기 중...")
@@ -1247,7 +1535,7 @@ def schedule_global_updates():
             print(f"[글로벌 DB] 초기 데이터 로드 상태:")
             print(f"  Cookie:    {cookie_status} ({len(project_instances)}개 프로젝트)")
             print(f"  Wallchain: {wallchain_status} ({len(wallchain_instances)}개 프로젝트)")
-            kaito_count = len(get_cached_kaito_projects()) if kaito_processor else 0
+            kaito_count = len(get_cached_kaito_projects())
             print(f"  Kaito:     {kaito_status} ({kaito_count}개 프로젝트)")
             
             if not project_instances and not wallchain_instances and not kaito_processor:
@@ -1256,7 +1544,7 @@ def schedule_global_updates():
             
             # 데이터베이스에 데이터가 있는지 확인
             try:
-                conn = sqlite3.connect('./data/global_rankings.db', timeout=30.0)
+                conn = query_profiler.connect(global_manager.db_path, timeout=30.0)
                 cursor = conn.cursor()
                 cursor.execute('SELECT COUNT(*) FROM users')
                 count = cursor.fetchone()[0]
@@ -1280,7 +1568,7 @@ def schedule_global_updates():
                 print("[글로벌 DB] 오류 발생했지만 갱신 시도...")
                 update_global_rankings()
     
-    threading.Thread(target=initial_update, daemon=True).start()
+    threading.Thread(target=initial_update, name='global-initial-update', daemon=True).start()
     
     # 스케줄러 실행
     def run_scheduler():
@@ -1293,6 +1581,9 @@ def schedule_global_updates():
             # 정기 스케줄 확인
             schedule.run_pending()
             
+            # 유예 시간이 지난 이전 글로벌 DB 세대 삭제 (멀티 프로세스 모드)
+            global_manager.collect_garbage()
+            
             # 트리거 확인 (쿨다운 적용)
             if GLOBAL_UPDATE_TRIGGER.is_set():
                 current_time = time.time()
@@ -1315,7 +1606,7 @@ def schedule_global_updates():
             
             time.sleep(30)
     
-    threading.Thread(target=run_scheduler, daemon=True).start()
+    threading.Thread(target=run_scheduler, name='global-scheduler', daemon=True).start()
     print("[글로벌 DB 스케줄러] 설정 완료 ✓")
 
 @app.route('/ref')
@@ -1377,21 +1668,13 @@ def user_lookup_page():
     log_access('user_lookup', 'global_search')
     lang = get_language()
     
-    all_projects = get_cached_projects()
-    all_wallchain_projects = get_cached_wallchain_projects()
-    grouped_projects = get_grouped_projects()
-    grouped_wallchain = get_grouped_wallchain_projects()
     
     # 현재 페이지를 'SEARCH'로 설정하여 네비게이션에서 표시
     return template('user_lookup.html',
                    lang=lang,
                    current_page='user_lookup',
                    project='GLOBAL',
-                   all_projects=all_projects,
-                   all_wallchain_projects=all_wallchain_projects,
-                   grouped_projects=grouped_projects,
-                   grouped_wallchain=grouped_wallchain,
-                   kaito_projects=get_cached_kaito_projects(),
+                   navigation=NAVIGATION,
                    t={})
 
 @app.route('/api/user-search')
@@ -1447,6 +1730,9 @@ def fetch_yaps_data(username):
                 'yaps_l12m': data.get('yaps_l12m')
             }
             # 캐시 저장
+            if len(YAPS_CACHE) >= YAPS_CACHE_MAX_ENTRIES:
+                for key in [k for k, v in list(YAPS_CACHE.items()) if current_time - v['timestamp'] >= YAPS_CACHE_DURATION]:
+                    YAPS_CACHE.pop(key, None)
             YAPS_CACHE[username] = {'data': result, 'timestamp': current_time}
             # print(f"[YAPS API Call] {username} - cached for 5min")
             return result
@@ -1464,13 +1750,62 @@ def api_yaps(username):
     try:
         yaps_data = fetch_yaps_data(username)
         if yaps_data:
-            return json.dumps(yaps_data, ensure_ascii=False)   // YAPS 데이터 반환
+            return json.dumps(yaps_data, ensure_ascii=False)   # YAPS 데이터 반환
         else:
-            return json.dumps({'error': 'YAPS data not available'}, ensure_ascii=False) // YAPS 데이터 없음
+            return json.dumps({'error': 'YAPS data not available'}, ensure_ascii=False) # YAPS 데이터 없음
     except Exception as e:
         print(f"[API Error] yaps: {e}")
         return json.dumps({'error': str(e)}, ensure_ascii=False)
 
+def filter_user_cookie_projects(data, rules):
+    """api_user_data 응답의 Cookie 프로젝트 필터링 (종료 프로젝트 제거 + 언어별 리워드 필드 숨김)"""
+    # 0단계: ended_projects 필터링 (전체 프로젝트 또는 특정 언어 제거)
+    # - "tria": 모든 tria-* 제거 (tria-en, tria-ko 등)
+    # - "tria-ko": tria-ko만 제거, tria-en은 유지
+    projects = {name: rankings for name, rankings in data['cookie_projects'].items()
+                if not rules.is_ended(name)}
+    
+    # 1단계: 사용자의 언어별 프로젝트 참여 정보 수집 ({base_project: (languages)})
+    user_lang_projects = {}
+    for project_full_name in projects:
+        base_project_name, project_lang = split_project(project_full_name)
+        # en이 아닌 언어별 프로젝트만 기록
+        if project_lang and project_lang != 'en':
+            user_lang_projects.setdefault(base_project_name, []).append(project_lang)
+    
+    # 2단계: 필터링 적용 (숨길 필드는 컴파일된 규칙에서 바로 조회)
+    filtered_cookie_projects = {}
+    for project_full_name, rankings in projects.items():
+        base_project_name, project_lang = split_project(project_full_name)
+        hidden = ()
+        if project_lang:
+            hidden = rules.hidden_fields(base_project_name, project_lang,
+                                         user_lang_projects.get(base_project_name, ()))
+        if not hidden:
+            filtered_cookie_projects[project_full_name] = rankings
+            continue
+        
+        filtered_rankings = []
+        for ranking in rankings:
+            filtered_ranking = ranking.copy()
+            for field in hidden:
+                filtered_ranking[field] = None
+            filtered_rankings.append(filtered_ranking)
+        filtered_cookie_projects[project_full_name] = filtered_rankings
+    
+    data['cookie_projects'] = filtered_cookie_projects
+    return data
+
+def user_data_json(data, rules):
+    """유저 데이터 -> 최종 응답 JSON 문자열"""
+    if not data:
+        return json.dumps({'error': 'User not found'}, ensure_ascii=False)
+    
+    # 🔥 Cookie 프로젝트 필터링 적용
+    if 'cookie_projects' in data and data['cookie_projects']:
+        filter_user_cookie_projects(data, rules)
+    return json.dumps(data, ensure_ascii=False)
+
 @app.route('/api/user-data/<username>')
 def api_user_data(username):
     """특정 유저의 전체 데이터 API"""
@@ -1480,115 +1815,224 @@ def api_user_data(username):
     log_access('user_lookup', "GLOBAL-API", username)
     
     try:
-        data = global_manager.get_user_data(username)
-        
-        if not data:
-            return json.dumps({'error': 'User not found'}, ensure_ascii=False)
-        
-        # 🔥 Cookie 프로젝트 필터링 적용
-        if 'cookie_projects' in data and data['cookie_projects']:
-            # 0단계: ended_projects 필터링 (전체 프로젝트 또는 특정 언어 제거)
-            ended_projects = COOKIE_CONFIG.get('ended_projects', [])
-            if ended_projects:
-                # ended_projects에 있는 프로젝트 제거
-                # - "tria": 모든 tria-* 제거 (tria-en, tria-ko 등)
-                # - "tria-ko": tria-ko만 제거, tria-en은 유지
-                filtered_projects = {}
-                for project_name, rankings in data['cookie_projects'].items():
-                    # 정확히 일치하는 경우 제거 (예: "tria-ko")
-                    if project_name in ended_projects:
-                        continue
-                    
-                    # 베이스 프로젝트 이름으로 전체 제거 (예: "tria")
-                    if '-' in project_name:
-                        base_project_name = project_name.rsplit('-', 1)[0]
-                        if base_project_name in ended_projects:
-                            continue
-                    else:
-                        # 언어 없는 프로젝트 (드물지만 처리)
-                        if project_name in ended_projects:
-                            continue
-                    
-                    filtered_projects[project_name] = rankings
-                
-                data['cookie_projects'] = filtered_projects
-            
-            # 1단계: 사용자의 언어별 프로젝트 참여 정보 수집
-            user_lang_projects = {}  # {base_project: [languages]}
-            
-            for project_full_name in data['cookie_projects'].keys():
-                if '-' in project_full_name:
-                    parts = project_full_name.rsplit('-', 1)
-                    base_project_name = parts[0]
-                    project_lang = parts[1]
-                    
-                    # en이 아닌 언어별 프로젝트만 기록
-                    if project_lang != 'en':
-                        if base_project_name not in user_lang_projects:
-                            user_lang_projects[base_project_name] = []
-                        user_lang_projects[base_project_name].append(project_lang)
-            
-            # 2단계: 필터링 적용
-            filtered_cookie_projects = {}
-            
-            for project_full_name, rankings in data['cookie_projects'].items():
-                # 프로젝트 이름과 언어 분리
-                if '-' in project_full_name:
-                    parts = project_full_name.rsplit('-', 1)
-                    base_project_name = parts[0]
-                    project_lang = parts[1]
-                else:
-                    # 언어 없는 프로젝트는 그대로 유지
-                    filtered_cookie_projects[project_full_name] = rankings
-                    continue
-                
-                # snaps_reward_langs와 csnaps_reward_langs 확인
-                snaps_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(base_project_name, [])
-                csnaps_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(base_project_name, [])
-                
-                # 각 ranking 데이터 필터링
-                filtered_rankings = []
-                for ranking in rankings:
-                    filtered_ranking = ranking.copy()
-                    
-                    # -en 프로젝트인 경우
-                    if project_lang == 'en':
-                        # 사용자의 언어별 프로젝트 참여 정보로 언어 파악
-                        user_langs = user_lang_projects.get(base_project_name, [])
-                        
-                        for user_lang in user_langs:
-                            # 사용자 언어가 snaps_reward_langs에 있으면 MS 숨기기 (CMS만 표시)
-                            if user_lang in snaps_langs:
-                                filtered_ranking['ms'] = None
-                                filtered_ranking['msRank'] = None
-                            # 사용자 언어가 csnaps_reward_langs에 있으면 CMS 숨기기 (MS만 표시)
-                            elif user_lang in csnaps_langs:
-                                filtered_ranking['cms'] = None
-                                filtered_ranking['cmsRank'] = None
-                    else:
-                        # 언어별 프로젝트 (예: superform-ko, spaace-ko)
-                        # 해당 언어가 snaps_reward_langs에 있으면 ms만 보여주기 (cms 숨기기)
-                        if project_lang in snaps_langs:
-                            filtered_ranking['cms'] = None
-                            filtered_ranking['cmsRank'] = None
-                        # 해당 언어가 csnaps_reward_langs에 있으면 cms만 보여주기 (ms 숨기기)
-                        elif project_lang in csnaps_langs:
-                            filtered_ranking['ms'] = None
-                            filtered_ranking['msRank'] = None
-                    
-                    filtered_rankings.append(filtered_ranking)
-                
-                filtered_cookie_projects[project_full_name] = filtered_rankings
-            
-            data['cookie_projects'] = filtered_cookie_projects
-        
-        return json.dumps(data, ensure_ascii=False)
+        rules = COOKIE_RULES
+        if request.query.get('source', USER_LOOKUP_MODE) == 'live':
+            # 프로젝트 DB에서 바로 조회 (글로벌 DB 갱신 전 신규 데이터도 반영) - 캐시하지 않음
+            return user_data_json(federated_lookup.get_user_data(username), rules)
+        
+        # 직렬화된 응답 캐시 (글로벌 인덱스 버전 + Cookie 규칙 버전 + 대소문자 무시 핸들)
+        key = (GLOBAL_INDEX_STATE['version'], rules.version, fold_handle(username))
+        use_gzip = negotiate_encoding(request.get_header('Accept-Encoding', '')) == 'gzip'
+        response.set_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            body = USER_DATA_CACHE.get(key + ('gzip',))
+            if body is not None:
+                response.set_header('Content-Encoding', 'gzip')
+                return body
+        
+        body = USER_DATA_CACHE.get(key + ('identity',))
+        if body is None:
+            if GLOBAL_INDEX is not None:
+                # 메모리 인덱스에서 조회 (SQLite 조회 없음)
+                data = GLOBAL_INDEX.get_user_data(username)
+            else:
+                data = global_manager.get_user_data(username)
+            if not data:
+                return user_data_json(data, rules)
+            body = USER_DATA_CACHE.put(key + ('identity',), user_data_json(data, rules))
+        
+        # 압축 레이어와 같은 기준(1KB 이상)으로 gzip 본문도 한 번만 만들어 보관
+        if use_gzip and len(body) >= COMPRESSION_MIN_SIZE:
+            response.set_header('Content-Encoding', 'gzip')
+            return USER_DATA_CACHE.put(key + ('gzip',), compress(body, 'gzip', COMPRESSION_LEVEL))
+        return body
     except Exception as e:
         print(f"[API Error] user-data: {e}")
         return json.dumps({'error': str(e)}, ensure_ascii=False)
 
 # ===================== END GLOBAL ROUTES =====================
 
+# ===================== ADMIN ROUTES =====================
+
+@app.route('/admin/traffic')
+def admin_traffic():
+    """트래픽 집계 조회 API (라우트/프로젝트별 조회수, 고유 세션, 많이 조회된 유저)"""
+    require_admin()
+    response.content_type = 'application/json; charset=utf-8'
+    
+    try:
+        minutes = int(request.query.get('minutes', 60))
+        top = int(request.query.get('top', 20))
+    except ValueError:
+        abort(400, "minutes/top must be integers")
+    
+    result = traffic_stats.query(minutes=max(1, minutes),
+                                 project=request.query.get('project') or None,
+                                 route=request.query.get('route') or None,
+                                 top=max(1, min(top, 500)))
+    result['log_writer'] = access_log_writer.stats()
+    result['page_cache'] = PAGE_CACHE.stats()
+    result['global_index'] = GLOBAL_INDEX.stats() if GLOBAL_INDEX is not None else None
+    result['user_data_cache'] = USER_DATA_CACHE.stats()
+    return json.dumps(result, ensure_ascii=False)
+
+def memory_usage_report(include_frames=False):
+    """캐시/프로세서별 대략적인 메모리 사용량 (bytes, 한도 도달 시 truncated=True)"""
+    def sized(obj, entries=None):
+        size, truncated = memory_report.deep_sizeof(obj)
+        result = {'bytes': size, 'truncated': truncated}
+        if entries is not None:
+            result['entries'] = entries
+        return result
+    
+    caches = {
+        # 페이지/응답 캐시는 본문 바이트를 직접 집계
+        'page_cache': dict(PAGE_CACHE.stats()),
+        'user_data_cache': dict(USER_DATA_CACHE.stats()),
+        'yaps_cache': sized(YAPS_CACHE, len(YAPS_CACHE)),
+        'lang_exclusions': sized(LANG_EXCLUSIONS, len(LANG_EXCLUSIONS)),
+        'global_index': GLOBAL_INDEX.memory_usage() if GLOBAL_INDEX is not None else None,
+        'traffic_stats': sized(traffic_stats),
+        'ingest_log': sized(INGEST_LOG),
+        'query_profiler': sized(query_profiler.PROFILER),
+        'metrics': sized(METRICS),
+    }
+    processors = {name: sized(dp) for name, dp in list(project_instances.items())}
+    processors.update({name: sized(dp) for name, dp in list(wallchain_instances.items())})
+    if kaito_processor:
+        processors['kaito'] = sized(kaito_processor)
+    
+    rss = memory_report.rss_bytes()
+    result = {
+        'rss_bytes': rss,
+        'threads': threading.active_count(),
+        'gc_counts': gc.get_count(),
+        'caches': caches,
+        'processors': processors,
+        'log_writer': access_log_writer.stats(),
+        'guard': MEMORY_GUARD.stats(),
+        'tracemalloc': TRACE_SESSION.running
+    }
+    if include_frames:
+        result['dataframes'] = memory_report.live_dataframes()
+    return result
+
+@app.route('/admin/memory')
+def admin_memory():
+    """
+    메모리 점검 API
+    - 기본: RSS, 캐시/프로세서별 추정 크기 (?frames=1 이면 살아 있는 DataFrame까지 - gc 전체 순회)
+    - ?action=trace-start&nframes=25 / trace-stop: tracemalloc 켜고 끄기
+    - ?action=snapshot&top=20: 할당 상위 N개 + 이전 스냅샷 대비 증가량 + 스레드 진입점별 할당량
+    - ?action=shed: 캐시 즉시 비우기 (RSS 가드와 같은 처리)
+    """
+    require_admin()
+    response.content_type = 'application/json; charset=utf-8'
+    response.set_header('Cache-Control', 'no-store')
+    
+    try:
+        top = int(request.query.get('top', 20))
+        nframes = int(request.query.get('nframes', 25))
+    except ValueError:
+        abort(400, "top/nframes must be integers")
+    
+    action = request.query.get('action', 'report')
+    if action == 'trace-start':
+        TRACE_SESSION.start(nframes)
+        result = {'tracemalloc': True, 'nframes': nframes}
+    elif action == 'trace-stop':
+        TRACE_SESSION.stop()
+        result = {'tracemalloc': False}
+    elif action == 'snapshot':
+        result = TRACE_SESSION.snapshot(top=max(1, min(top, 200)))
+        if result is None:
+            abort(409, "tracemalloc is not running (use action=trace-start)")
+    elif action == 'shed':
+        result = MEMORY_GUARD.shed(reason='admin')
+    elif action == 'report':
+        result = memory_usage_report(include_frames=request.query.get('frames') == '1')
+    else:
+        abort(400, "unknown action")
+    return json.dumps(result, ensure_ascii=False, default=str)
+
+@app.route('/admin/ingest')
+def admin_ingest():
+    """최근 적재 기록 조회 API (단계별 소요 시간, 파일/바이트/레코드 수, 파일 생성 -> 조회 가능까지 지연)"""
+    require_admin()
+    response.content_type = 'application/json; charset=utf-8'
+    
+    try:
+        limit = int(request.query.get('limit', 50))
+    except ValueError:
+        abort(400, "limit must be an integer")
+    
+    return json.dumps({
+        'summary': INGEST_LOG.summary(),
+        'jobs': INGEST_LOG.recent(limit=max(1, min(limit, 500)),
+                                  source=request.query.get('source') or None,
+                                  project=request.query.get('project') or None)
+    }, ensure_ascii=False)
+
+@app.route('/admin/queries')
+def admin_queries():
+    """SQL 프로파일 조회 API (정규화 SQL별 누적/평균/최대 시간, 느린 쿼리 실행 계획, ?reset=1로 초기화)"""
+    require_admin()
+    response.content_type = 'application/json; charset=utf-8'
+    
+    try:
+        top = int(request.query.get('top', 20))
+    except ValueError:
+        abort(400, "top must be an integer")
+    
+    profiler = query_profiler.PROFILER
+    result = profiler.report(top=max(1, min(top, 500)), sort=request.query.get('sort', 'total'))
+    if request.query.get('reset') == '1':
+        profiler.reset()
+    return json.dumps(result, ensure_ascii=False)
+
+@app.route('/admin/profile')
+def admin_profile():
+    """
+    전체 스레드 스택 샘플링 (Waitress 워커 + 로더/스케줄러/글로벌 갱신 스레드)
+    ?seconds=10&interval_ms=10&format=folded|json&idle=1&thread=<이름 일부>
+    folded: flamegraph.pl / speedscope에 바로 넣을 수 있는 collapsed stack 텍스트
+    """
+    require_admin()
+    
+    try:
+        seconds = float(request.query.get('seconds', 10))
+        interval_ms = float(request.query.get('interval_ms', 10))
+        top = int(request.query.get('top', 30))
+    except ValueError:
+        abort(400, "seconds/interval_ms/top must be numbers")
+    
+    try:
+        result = stack_sampler.sample(seconds, interval_ms / 1000.0,
+                                      include_idle=request.query.get('idle') == '1',
+                                      thread_filter=request.query.get('thread') or None)
+    except stack_sampler.SamplerBusy:
+        abort(409, "Profiler is already running")
+    
+    response.set_header('Cache-Control', 'no-store')
+    if request.query.get('format') == 'json':
+        response.content_type = 'application/json; charset=utf-8'
+        return json.dumps(stack_sampler.summarize(result, top=max(1, min(top, 500))), ensure_ascii=False)
+    
+    response.content_type = 'text/plain; charset=utf-8'
+    filename = datetime.fromtimestamp(result['started_at']).strftime('profile_%Y%m%d_%H%M%S.folded')
+    response.set_header('Content-Disposition', f'inline; filename="{filename}"')
+    return stack_sampler.collapsed(result['stacks'])
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 스크랩용 메트릭 (text exposition format, 관리자 토큰은 X-Admin-Token 헤더로 전달)"""
+    require_admin()
+    response.content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    response.set_header('Cache-Control', 'no-store')
+    return METRICS.render()
+
+# ===================== END ADMIN ROUTES =====================
+
 @app.route('/leaderboard')
 @app.route('/leaderboard/')
 @app.route('/compare')
@@ -1627,8 +2071,12 @@ def project_index(projectname):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
         # return render_error("존재하지 않는 프로젝트", projectname)
+    dp = get_data_processor(projectname)
+    page_key = check_not_modified('cookie_index', projectname, dp.data_version, dp.data_updated_at)
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
     try:
-        dp = get_data_processor(projectname)
         timeframe = request.query.get('timeframe', 'TOTAL')
         display_project_name = dp.project_name
         # {'ko': '🇰🇷', 'en': '🌐', 'zh': '🇨🇳'}
@@ -1636,24 +2084,16 @@ def project_index(projectname):
         display_project_name = get_flag(dp.lang) +" " + display_project_name
         # 모든 사용자 목록 - 7D, 14D, 30D, TOTAL에서 중복 제거하여 가져옴
         all_users = dp.get_all_usernames_from_multiple_timeframes(['7D', '14D', '30D', 'TOTAL'])
-        all_projects = get_cached_projects()
-        all_wallchain_projects = get_cached_wallchain_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
-        return template('index.html', 
+        return PAGE_CACHE.put(page_key, template('index.html', 
                        current_project=projectname,
                        display_project_name=display_project_name,
                        lang=lang,
                        current_page="",
                        project=projectname,
-                       all_projects=all_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        all_users=all_users,
                        timeframe=timeframe,
-                       timeframes=dp.timeframes)
+                       timeframes=dp.timeframes), tag=('cookie', projectname))
     except ValueError as e:
         return render_error(str(e), projectname)
 
@@ -1667,9 +2107,12 @@ def project_leaderboard(projectname):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
         # return render_error("존재하지 않는 프로젝트", projectname)
+    dp = get_data_processor(projectname)
+    page_key = check_not_modified('cookie_lb', projectname, dp.data_version, dp.data_updated_at)
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
     try:
-        dp = get_data_processor(projectname)
-
         timeframe = request.query.get('timeframe', 'TOTAL')
         timestamp1 = request.query.get('timestamp1', '')
         timestamp2 = request.query.get('timestamp2', '')
@@ -1722,52 +2165,29 @@ def project_leaderboard(projectname):
         if not timestamp2 or timestamp2 not in timestamps:
             timestamp2 = timestamps[-1] if timestamps else ''
         
-        # 리더보드 분석 결과
-        compare_data = pd.DataFrame()
+        # 리더보드 분석 결과 (SQL에서 비교/정렬까지 끝낸 컬럼별 결과)
+        compare_data = CompareResult()
         
         if timestamp1 and timestamp2:
             # ⭐ 수정: metric 파라미터 전달 ⭐
             compare_data = dp.compare_leaderboards(timestamp1, timestamp2, timeframe, metric)
             
             # 🔥 en 폴더인 경우 언어 필터링 적용
+            # 최신 스냅샷과 비교할 때는 제외 유저 집합을 언어 인덱스(유저별 최신 언어)로 스냅샷마다 한 번만 계산,
+            # 과거 구간끼리 비교할 때는 그 구간의 언어(비교 결과의 primaryLanguage)로 필터링
             if not compare_data.empty and '-en' in projectname:
-                # projectname에서 실제 프로젝트 이름 추출 (예: 'superform-en' -> 'superform')
-                base_project_name = projectname.replace('-en', '')
-                
-                # primaryLanguage 컬럼이 있는지 확인 (없으면 DB에서 다시 조회 필요)
-                if 'primaryLanguage' not in compare_data.columns:
-                    # username 기준으로 primaryLanguage 조회
-                    with sqlite3.connect(dp.db_path) as conn:
-                        usernames = compare_data['username'].tolist()
-                        placeholders = ','.join(['?'] * len(usernames))
-                        query = f"SELECT DISTINCT username, primaryLanguage FROM snaps WHERE username IN ({placeholders})"
-                        lang_df = pd.read_sql(query, conn, params=usernames)
-                        compare_data = compare_data.merge(lang_df, on='username', how='left')
-                
-                # 🚀 최적화: 제외할 언어 목록을 미리 계산하고 벡터화 연산 사용
-                if 'primaryLanguage' in compare_data.columns:
-                    # metric에 따라 제외할 언어 목록 가져오기
-                    if metric in ['snapsPercent', 'snaps']:
-                        exclude_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(base_project_name, [])
-                    elif metric in ['cSnapsPercent', 'cSnaps']:
-                        exclude_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(base_project_name, [])
-                    else:
-                        exclude_langs = []
-                    
-                    # 벡터화 연산: isin()을 사용하여 한 번에 필터링 (1,706번 함수 호출 → 1번 연산)
+                if timestamp2 == timestamps[-1] or 'primaryLanguage' not in compare_data:
+                    excluded_users = get_excluded_users(dp, projectname, metric)
+                    if excluded_users:
+                        compare_data = compare_data.exclude('username', excluded_users)
+                else:
+                    exclude_langs = COOKIE_RULES.exclude_langs(projectname.replace('-en', ''), metric)
                     if exclude_langs:
-                        compare_data = compare_data[~compare_data['primaryLanguage'].isin(exclude_langs)]
+                        compare_data = compare_data.exclude('primaryLanguage', exclude_langs)
         
         # 데이터 테이블을 HTML로 변환
         if not compare_data.empty:
             # 변화량에 화살표 추가하고 스타일 적용
-            compare_data['rank_change_display'] = compare_data['rank_change'].apply(
-                lambda x: f"{x}" if x > 0 else (f"{x}" )
-            )
-            compare_data['mindshare_change_display'] = compare_data[mindshare_change_col].apply( 
-                lambda x: f"{x:.4f}" if x > 0 else (f"{x:.4f}" )
-            )
-            
             if lang == 'ko':
                 # HTML 테이블 생성
                 table_html = f"""
@@ -1803,63 +2223,14 @@ def project_leaderboard(projectname):
                     <tbody>
                 """
             
-            # 🚀 최적화: 루프 대신 벡터화 연산 + 리스트 컴프리헨션 사용
-            def generate_row_html(row):
-                prev_rank = row.prev_rank
-                curr_rank = row.curr_rank
-                prev_mindshare_value = getattr(row, prev_mindshare_col)
-                curr_mindshare_value = getattr(row, curr_mindshare_col)
-                mindshare_change_value = getattr(row, mindshare_change_col)
-                
-                # 순위 변화 및 마쉐 변화 HTML 생성
-                if prev_rank == 9999 and curr_rank != 9999:
-                    rank_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                    mindshare_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                elif prev_rank != 9999 and curr_rank == 9999:
-                    rank_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                    mindshare_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                elif prev_rank != 9999 and curr_rank != 9999:
-                    change = prev_rank - curr_rank
-                    if change > 0:
-                        rank_change_html = f'<span class="text-success" data-order="{change}">↑ {change}</span>'
-                    elif change < 0:
-                        rank_change_html = f'<span class="text-danger" data-order="{change}">↓ {abs(change)}</span>'
-                    else:
-                        rank_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    
-                    # 마쉐 변화
-                    if mindshare_change_value > 0:
-                        mindshare_change_html = f'<span class="text-success" data-order="{mindshare_change_value:.4f}">+{mindshare_change_value:.4f}</span>'
-                    elif mindshare_change_value < 0:
-                        mindshare_change_html = f'<span class="text-danger" data-order="{mindshare_change_value:.4f}">{mindshare_change_value:.4f}</span>'
-                    else:
-                        mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
-                else:
-                    rank_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
-                
-                return f"""
-                    <tr>
-                        <td>
-                            <div class="d-flex align-items-center">
-                                <img src="{row.profileImageUrl}" alt="{row.displayName}" class="me-2" style="width:32px;height:32px;border-radius:50%;">
-                                <div>
-                                    <strong>{row.displayName}</strong><br>
-                                    <small class="text-muted">@{row.username}</small><a href="/cookie/{projectname}/user/{row.username}" class="user-link" title="유저 분석">🔍</a>
-                                </div>
-                            </div>
-                        </td>
-                        <td>{int(prev_rank) if prev_rank != 9999 else '-'}</td>
-                        <td>{int(curr_rank) if curr_rank != 9999 else '-'}</td>
-                        <td>{rank_change_html}</td>
-                        <td>{prev_mindshare_value:.4f}</td>
-                        <td>{curr_mindshare_value:.4f}</td>
-                        <td>{mindshare_change_html}</td>
-                    </tr>"""
-            
-            # 리스트 컴프리헨션으로 한 번에 생성 후 join (훨씬 빠름)
-            rows_html = [generate_row_html(row) for row in compare_data.itertuples()]
-            table_html += ''.join(rows_html)
+            # 🚀 최적화: 행 단위 함수 호출 대신 컬럼 단위로 셀을 만들고 한 번에 join
+            users = leaderboard_renderer.user_cells(compare_data['displayName'], compare_data['username'],
+                                                    compare_data['profileImageUrl'], f"/cookie/{projectname}/user/")
+            table_html += leaderboard_renderer.render_rows(
+                users, compare_data['prev_rank'], compare_data['curr_rank'],
+                leaderboard_renderer.format_fixed(compare_data[prev_mindshare_col]),
+                leaderboard_renderer.format_fixed(compare_data[curr_mindshare_col]),
+                compare_data[mindshare_change_col])
             
             table_html += """
                 </tbody>
@@ -1882,10 +2253,6 @@ def project_leaderboard(projectname):
         timestamp1_display = formatted_timestamps.get(timestamp1, timestamp1)
         timestamp2_display = formatted_timestamps.get(timestamp2, timestamp2)
         
-        all_projects = get_cached_projects()
-        all_wallchain_projects = get_cached_wallchain_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
         display_project_name = dp.project_name
         # {'ko': '🇰🇷', 'en': '🌐', 'zh': '🇨🇳'}
 
@@ -1897,42 +2264,22 @@ def project_leaderboard(projectname):
         
         # -en 프로젝트는 모든 metric 표시
         if projectname.endswith('-en'):
-            available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-            available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
+            available_metrics = list(ALL_METRICS)
         else:
-            # 언어별 프로젝트: 해당 언어가 리워드를 받는 metric만 표시
-            lang = dp.lang
-            
-            # snaps_reward_langs에 있으면 snaps 표시
-            snaps_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(base_project_name, [])
-            if lang in snaps_langs:
-                available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-            
-            # csnaps_reward_langs에 있으면 csnaps 표시
-            csnaps_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(base_project_name, [])
-            if lang in csnaps_langs:
-                available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
-            
-            # 아무것도 없으면 모든 metric 표시 (기본값)
-            if not available_metrics:
-                available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-                available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
+            # 언어별 프로젝트: 해당 언어가 리워드를 받는 metric만 표시 (없으면 전체)
+            available_metrics = list(COOKIE_RULES.lang_metrics(base_project_name, dp.lang))
         
         # 현재 선택된 metric이 사용 불가능한 경우 첫 번째 사용 가능한 metric으로 변경
         if available_metrics and metric not in [m['value'] for m in available_metrics]:
             return redirect(f'/cookie/{projectname}/leaderboard?timeframe={timeframe}&metric={available_metrics[0]["value"]}', code=302)
         
-        return template('leaderboard.html', 
+        return PAGE_CACHE.put(page_key, template('leaderboard.html', 
                        project=projectname,
                        lang=lang,
                        display_project_name=display_project_name,
                        current_project=projectname,
                        current_page="leaderboard",
-                       all_projects=all_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        timeframe=timeframe,
                        timeframes=dp.timeframes,
                        timestamps=json.dumps(timestamps),
@@ -1945,7 +2292,7 @@ def project_leaderboard(projectname):
                        timestamp1_display=timestamp1_display,
                        timestamp2_display=timestamp2_display,
                        available_metrics=available_metrics,
-                       table_html=table_html)
+                       table_html=table_html), tag=('cookie', projectname))
     except ValueError as e:
         return render_error(str(e), projectname)
 
@@ -1962,10 +2309,9 @@ def project_user_analysis(projectname,username):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
         # return render_error("존재하지 않는 프로젝트", projectname)
+    dp = project_instances[projectname]
+    check_not_modified('cookie_user', projectname, dp.data_version, dp.data_updated_at, username)
     try:
-        # print(projectname)
-        dp = project_instances[projectname]
-        # print(dp)
         # user_info = dp.get_user_info(username)
         
         # URL 쿼리 파라미터에서 metric 가져오기
@@ -1976,50 +2322,19 @@ def project_user_analysis(projectname,username):
         available_metrics = []
         
         if projectname.endswith('-en'):
-            # -en 프로젝트: 사용자의 primaryLanguage 확인하여 필터링
-            with sqlite3.connect(dp.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT primaryLanguage FROM snaps WHERE username = ? LIMIT 1", (username,))
-                result = cursor.fetchone()
-                user_lang = result[0] if result else None
-            
-            if user_lang:
-                # snaps 체크: user_lang이 snaps_reward_langs에 없으면 표시
-                snaps_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(base_project_name, [])
-                if user_lang not in snaps_langs:
-                    available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-                
-                # csnaps 체크: user_lang이 csnaps_reward_langs에 없으면 표시
-                csnaps_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(base_project_name, [])
-                if user_lang not in csnaps_langs:
-                    available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
-            else:
-                # primaryLanguage 없으면 모든 metric 표시
-                available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-                available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
+            # -en 프로젝트: 사용자의 primaryLanguage 확인하여 필터링 (언어 인덱스 조회, DB 접근 없음)
+            user_lang = dp.get_user_language(username)
+            
+            # 유저 언어가 리워드를 받는 metric은 제외 (primaryLanguage 없으면 모든 metric 표시)
+            available_metrics = list(COOKIE_RULES.en_metrics(base_project_name, user_lang))
             
             # 사용 가능한 metric이 없으면 404
             if not available_metrics:
                 # print(f"[Filter] User {username} (lang: {user_lang}) excluded from all metrics in {projectname}")
                 return render_error("이 사용자는 해당 프로젝트의 글로벌 리더보드에 표시되지 않습니다.", projectname)
         else:
-            # 언어별 프로젝트: 해당 언어가 리워드를 받는 metric만 표시
-            lang = dp.lang
-            
-            # snaps_reward_langs에 있으면 snaps 표시
-            snaps_langs = COOKIE_CONFIG.get('snaps_reward_langs', {}).get(base_project_name, [])
-            if lang in snaps_langs:
-                available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-            
-            # csnaps_reward_langs에 있으면 csnaps 표시
-            csnaps_langs = COOKIE_CONFIG.get('csnaps_reward_langs', {}).get(base_project_name, [])
-            if lang in csnaps_langs:
-                available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
-            
-            # 아무것도 없으면 모든 metric 표시 (기본값)
-            if not available_metrics:
-                available_metrics.append({'value': 'snapsPercent', 'label': 'Mindshare'})
-                available_metrics.append({'value': 'cSnapsPercent', 'label': 'cMindshare'})
+            # 언어별 프로젝트: 해당 언어가 리워드를 받는 metric만 표시 (없으면 전체)
+            available_metrics = list(COOKIE_RULES.lang_metrics(base_project_name, dp.lang))
         
         # 현재 선택된 metric이 사용 불가능한 경우 첫 번째 사용 가능한 metric으로 변경
         if available_metrics and metric not in [m['value'] for m in available_metrics]:
@@ -2217,10 +2532,6 @@ def project_user_analysis(projectname,username):
                                     )
         try:
             all_users = dp.get_all_users()
-            all_projects = get_cached_projects()
-            all_wallchain_projects = get_cached_wallchain_projects()
-            grouped_projects = get_grouped_projects()
-            grouped_wallchain = get_grouped_wallchain_projects()
             
             display_project_name = dp.project_name
             # {'ko': '🇰🇷', 'en': '🌐', 'zh': '🇨🇳'}
@@ -2229,21 +2540,13 @@ def project_user_analysis(projectname,username):
         except AttributeError:
             # 안전을 위해 DataProcessor에 해당 메서드가 없을 경우 빈 리스트로 처리
             all_users = []
-            all_projects = []
-            all_wallchain_projects = []
-            grouped_projects = {}
-            grouped_wallchain = {}
         return template('user.html', 
                        project=projectname,
                        display_project_name=display_project_name,
                        lang=lang,
                        current_project=projectname,
                        current_page="user",
-                       all_projects=all_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        username=username,
                        user_chart=user_chart,
                        user_info=user_info,
@@ -2330,8 +2633,12 @@ def wallchain_index(projectname):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
     
+    dp = wallchain_instances[full_project_name]
+    page_key = check_not_modified('wall_index', projectname, dp.data_version, dp.data_updated_at)
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
     try:
-        dp = wallchain_instances[full_project_name]
         
         # timeframe 요청값 가져오기
         requested_timeframe = request.query.get('timeframe', '')
@@ -2380,26 +2687,18 @@ def wallchain_index(projectname):
         
         available_timeframes.sort(key=sort_timeframes)
         
-        all_wallchain_projects = get_cached_wallchain_projects()
-        all_cookie_projects = get_cached_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
         
-        return template('index_wall.html', 
+        return PAGE_CACHE.put(page_key, template('index_wall.html', 
                        current_project=full_project_name,
                        display_project_name=dp.project_display_title,
                        lang=lang,
                        current_page="",
                        project=projectname,
                        is_wallchain=True,
-                       all_projects=all_cookie_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        all_users=all_users,
                        timeframe=timeframe,
-                       timeframes=available_timeframes)
+                       timeframes=available_timeframes), tag=('wallchain', projectname))
     except ValueError as e:
         return render_error(str(e), projectname)
 
@@ -2413,8 +2712,12 @@ def wallchain_leaderboard(projectname):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
     
+    dp = wallchain_instances[full_project_name]
+    page_key = check_not_modified('wall_lb', projectname, dp.data_version, dp.data_updated_at)
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
     try:
-        dp = wallchain_instances[full_project_name]
         
         # timeframe 요청값 가져오기
         requested_timeframe = request.query.get('timeframe', '')
@@ -2466,19 +2769,12 @@ def wallchain_leaderboard(projectname):
         if not timestamp2 or timestamp2 not in timestamps:
             timestamp2 = timestamps[-1] if timestamps else ''
             
-        compare_data = pd.DataFrame()
+        compare_data = CompareResult()
         
         if timestamp1 and timestamp2:
             compare_data = dp.compare_leaderboards(timestamp1, timestamp2, timeframe)
         
         if not compare_data.empty:
-            compare_data['position_change_display'] = compare_data['position_change'].apply(
-                lambda x: f"{x}" if x > 0 else (f"{x}")
-            )
-            compare_data['mindshare_change_display'] = compare_data['mindshare_change'].apply(
-                lambda x: f"{x:.4f}" if x > 0 else (f"{x:.4f}")
-            )
-            
             if lang == 'ko':
                 # HTML 테이블 생성
                 table_html = """
@@ -2514,61 +2810,14 @@ def wallchain_leaderboard(projectname):
                     <tbody>
                 """
             
-            # 🚀 최적화: 루프 대신 리스트 컴프리헨션 사용
-            def generate_wallchain_row_html(row):
-                prev_position = row.prev_position
-                curr_position = row.curr_position
-                
-                # 순위 변화 및 마쉐 변화 HTML 생성
-                if prev_position == 9999 and curr_position != 9999:
-                    position_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                    mindshare_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                elif prev_position != 9999 and curr_position == 9999:
-                    position_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                    mindshare_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                elif prev_position != 9999 and curr_position != 9999:
-                    change = prev_position - curr_position
-                    if change > 0:
-                        position_change_html = f'<span class="text-success" data-order="{change}">↑ {change}</span>'
-                    elif change < 0:
-                        position_change_html = f'<span class="text-danger" data-order="{change}">↓ {abs(change)}</span>'
-                    else:
-                        position_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    
-                    # 마쉐 변화
-                    ms_change = row.mindshare_change
-                    if ms_change > 0:
-                        mindshare_change_html = f'<span class="text-success" data-order="{ms_change:.4f}">+{ms_change:.4f}</span>'
-                    elif ms_change < 0:
-                        mindshare_change_html = f'<span class="text-danger" data-order="{ms_change:.4f}">{ms_change:.4f}</span>'
-                    else:
-                        mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
-                else:
-                    position_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    mindshare_change_html = '<span class="text-muted" data-order="0">-</span>'
-                
-                return f"""
-                    <tr>
-                        <td>
-                            <div class="d-flex align-items-center">
-                                <img src="{row.imageUrl}" alt="{row.name}" class="me-2" style="width:32px;height:32px;border-radius:50%;">
-                                <div>
-                                    <strong>{row.name}</strong><br>
-                                    <small class="text-muted">@{row.username}</small><a href="/wallchain/{projectname}/user/{row.username}" class="user-link" title="유저 분석">🔍</a>
-                                </div>
-                            </div>
-                        </td>
-                        <td>{int(prev_position) if prev_position != 9999 else '-'}</td>
-                        <td>{int(curr_position) if curr_position != 9999 else '-'}</td>
-                        <td>{position_change_html}</td>
-                        <td>{row.prev_mindshare:.4f}</td>
-                        <td>{row.curr_mindshare:.4f}</td>
-                        <td>{mindshare_change_html}</td>
-                    </tr>"""
-            
-            # 리스트 컴프리헨션으로 한 번에 생성 후 join
-            rows_html = [generate_wallchain_row_html(row) for row in compare_data.itertuples()]
-            table_html += ''.join(rows_html)
+            # 🚀 최적화: 행 단위 함수 호출 대신 컬럼 단위로 셀을 만들고 한 번에 join
+            users = leaderboard_renderer.user_cells(compare_data['name'], compare_data['username'],
+                                                    compare_data['imageUrl'], f"/wallchain/{projectname}/user/")
+            table_html += leaderboard_renderer.render_rows(
+                users, compare_data['prev_position'], compare_data['curr_position'],
+                leaderboard_renderer.format_fixed(compare_data['prev_mindshare']),
+                leaderboard_renderer.format_fixed(compare_data['curr_mindshare']),
+                compare_data['mindshare_change'])
             
             table_html += """
                 </tbody>
@@ -2607,23 +2856,15 @@ def wallchain_leaderboard(projectname):
         
         available_timeframes.sort(key=sort_timeframes)
         
-        all_wallchain_projects = get_cached_wallchain_projects()
-        all_cookie_projects = get_cached_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
         
-        return template('leaderboard_wall.html', 
+        return PAGE_CACHE.put(page_key, template('leaderboard_wall.html', 
                        project=projectname,
                        lang=lang,
                        display_project_name=dp.project_display_title,
                        current_project=full_project_name,
                        current_page="leaderboard",
                        is_wallchain=True,
-                       all_projects=all_cookie_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        timeframe=timeframe,
                        timeframes=available_timeframes,
                        timestamps=json.dumps(timestamps),
@@ -2632,7 +2873,7 @@ def wallchain_leaderboard(projectname):
                        timestamp2=timestamp2,
                        timestamp1_display=timestamp1_display,
                        timestamp2_display=timestamp2_display,
-                       table_html=table_html)
+                       table_html=table_html), tag=('wallchain', projectname))
     except ValueError as e:
         return render_error(str(e), projectname)
 
@@ -2646,8 +2887,9 @@ def wallchain_user_analysis(projectname, username):
         log_access('invalid_access', projectname)
         return redirect(f'/spaace-en/leaderboard', code=302)
     
+    dp = wallchain_instances[full_project_name]
+    check_not_modified('wall_user', projectname, dp.data_version, dp.data_updated_at, username)
     try:
-        dp = wallchain_instances[full_project_name]
         
         # 사용 가능한 timeframe 중 실제 데이터가 있는 것을 선택
         timeframe = None
@@ -2834,10 +3076,6 @@ def wallchain_user_analysis(projectname, username):
             )
         
         all_users = dp.get_all_usernames(timeframe=timeframe)
-        all_wallchain_projects = get_cached_wallchain_projects()
-        all_cookie_projects = get_cached_projects()
-        grouped_projects = get_grouped_projects()
-        grouped_wallchain = get_grouped_wallchain_projects()
         
         return template('user_wall.html', 
                        project=projectname,
@@ -2846,11 +3084,7 @@ def wallchain_user_analysis(projectname, username):
                        current_project=full_project_name,
                        current_page="user",
                        is_wallchain=True,
-                       all_projects=all_cookie_projects,
-                       all_wallchain_projects=all_wallchain_projects,
-                       grouped_projects=grouped_projects,
-                       grouped_wallchain=grouped_wallchain,
-                       kaito_projects=get_cached_kaito_projects(),
+                       navigation=NAVIGATION,
                        username=username,
                        user_chart=user_chart,
                        user_info=user_info,
@@ -2880,6 +3114,12 @@ def kaito_index_route(projectname):
     if projectname not in available_projects:
         return render_error(f"프로젝트 '{projectname}'를 찾을 수 없습니다", projectname)
     
+    page_key = check_not_modified('kaito_index', projectname, kaito_processor.get_data_version(projectname),
+                                  kaito_processor.get_data_updated_at(projectname))
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
+    
     # 모든 timeframe에서 unique한 사용자 목록 가져오기
     all_users = []
     try:
@@ -2888,8 +3128,6 @@ def kaito_index_route(projectname):
         print(f"[ERROR] Failed to get users for {projectname}: {e}")
     
     # Navbar variables
-    grouped_projects = get_grouped_projects()
-    grouped_wallchain = get_grouped_wallchain_projects()
     
     lang = request.get_cookie('lang', 'ko')
     t = {
@@ -2899,17 +3137,15 @@ def kaito_index_route(projectname):
         'click_to_copy': '클릭하여 주소 복사 🦈' if lang == 'ko' else 'Click to copy address🦈'
     }
     
-    return template('index_kaito', 
+    return PAGE_CACHE.put(page_key, template('index_kaito', 
                    projectname=projectname,
                    project=projectname,
                    all_users=all_users,
-                   kaito_projects=available_projects,
                    current_page='user',
                    is_kaito=True,
                    lang=lang,
                    t=t,
-                   grouped_projects=grouped_projects,
-                   grouped_wallchain=grouped_wallchain)
+                   navigation=NAVIGATION), tag=('kaito', projectname))
 
 
 @app.route('/kaito/<projectname>/leaderboard')
@@ -2929,6 +3165,12 @@ def kaito_leaderboard_route(projectname):
     if projectname not in available_projects:
         return render_error(f"프로젝트 '{projectname}'를 찾을 수 없습니다", projectname)
     
+    page_key = check_not_modified('kaito_lb', projectname, kaito_processor.get_data_version(projectname),
+                                  kaito_processor.get_data_updated_at(projectname))
+    cached_page = PAGE_CACHE.get(page_key)
+    if cached_page is not None:
+        return cached_page
+    
     # 사용 가능한 timeframes
     available_timeframes = kaito_processor.get_available_timeframes(projectname)
     if not available_timeframes:
@@ -2995,70 +3237,21 @@ def kaito_leaderboard_route(projectname):
                         <tbody>
                     """
                 
-                # 🚀 최적화: 루프 대신 리스트 컴프리헨션 사용
-                def generate_kaito_row_html(row):
-                    prev_rank = row.prev_rank
-                    curr_rank = row.curr_rank
-                    
-                    # 순위 변화 계산 및 표시
-                    if prev_rank == 9999 and curr_rank != 9999:
-                        rank_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                        ms_change_html = '<span class="badge bg-success" data-order="0">NEW</span>'
-                    elif prev_rank != 9999 and curr_rank == 9999:
-                        rank_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                        ms_change_html = '<span class="badge bg-secondary" data-order="0">OUT</span>'
-                    elif prev_rank != 9999 and curr_rank != 9999:
-                        change = prev_rank - curr_rank
-                        if change > 0:
-                            rank_change_html = f'<span class="text-success" data-order="{change}">↑ {change}</span>'
-                        elif change < 0:
-                            rank_change_html = f'<span class="text-danger" data-order="{change}">↓ {abs(change)}</span>'
-                        else:
-                            rank_change_html = '<span class="text-muted" data-order="0">-</span>'
-                        
-                        # Mindshare 변화 계산
-                        try:
-                            prev_ms = float(row.prev_mindshare.rstrip('%'))
-                            curr_ms = float(row.curr_mindshare.rstrip('%'))
-                            ms_change = curr_ms - prev_ms
-                            if ms_change > 0:
-                                ms_change_html = f'<span class="text-success" data-order="{ms_change:.2f}">+{ms_change:.2f}%</span>'
-                            elif ms_change < 0:
-                                ms_change_html = f'<span class="text-danger" data-order="{ms_change:.2f}">{ms_change:.2f}%</span>'
-                            else:
-                                ms_change_html = '<span class="text-muted" data-order="0">-</span>'
-                        except:
-                            ms_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    else:
-                        rank_change_html = '<span class="text-muted" data-order="0">-</span>'
-                        ms_change_html = '<span class="text-muted" data-order="0">-</span>'
-                    
-                    # 프로필 이미지 URL (서버 프록시 사용)
-                    image_url = f"/kaito-img/{row.imageId}" if row.imageId else ""
-                    image_tag = f'<img src="{image_url}" alt="{row.displayName}" class="me-2" style="width:32px;height:32px;border-radius:50%;" onerror="this.style.display=\'none\'">' if image_url else ""
-                    
-                    return f"""
-                        <tr>
-                            <td>
-                                <div class="d-flex align-items-center">
-                                    {image_tag}
-                                    <div>
-                                        <strong>{row.displayName}</strong><br>
-                                        <small class="text-muted">{row.handle}</small><a href="/kaito/{projectname}/user/{row.handle}" class="user-link" title="유저 분석">🔍</a>
-                                    </div>
-                                </div>
-                            </td>
-                            <td>{prev_rank if prev_rank != 9999 else '-'}</td>
-                            <td>{curr_rank if curr_rank != 9999 else '-'}</td>
-                            <td>{rank_change_html}</td>
-                            <td>{row.prev_mindshare}</td>
-                            <td>{row.curr_mindshare}</td>
-                            <td>{ms_change_html}</td>
-                        </tr>"""
-                
-                # 리스트 컴프리헨션으로 한 번에 생성 후 join
-                rows_html = [generate_kaito_row_html(row) for row in df.itertuples()]
-                table_html += ''.join(rows_html)
+                # 🚀 최적화: 행 단위 함수 호출 대신 컬럼 단위로 셀을 만들고 한 번에 join
+                # 프로필 이미지는 서버 프록시(/kaito-img) 사용, imageId가 없으면 이미지 생략
+                image_ids = df['imageId'].fillna('').astype(str)
+                image_urls = ('/kaito-img/' + image_ids).where(image_ids != '', '')
+                users = leaderboard_renderer.user_cells(df['displayName'], df['handle'], image_urls,
+                                                        f"/kaito/{projectname}/user/", handle_prefix='',
+                                                        optional_image=True)
+                # mindshare는 '1.23%' 형식 문자열 - 변화량은 숫자로 변환해서 계산 (변환 실패 시 '-')
+                prev_ms = pd.to_numeric(df['prev_mindshare'].astype(str).str.rstrip('%'), errors='coerce')
+                curr_ms = pd.to_numeric(df['curr_mindshare'].astype(str).str.rstrip('%'), errors='coerce')
+                table_html += leaderboard_renderer.render_rows(
+                    users, df['prev_rank'], df['curr_rank'],
+                    df['prev_mindshare'].astype(str).to_numpy(dtype=object),
+                    df['curr_mindshare'].astype(str).to_numpy(dtype=object),
+                    curr_ms - prev_ms, decimals=2, suffix='%')
                 
                 table_html += """
                     </tbody>
@@ -3085,12 +3278,10 @@ def kaito_leaderboard_route(projectname):
     timestamp2_display = formatted_timestamps.get(timestamp2, timestamp2)
     
     # Navbar variables
-    grouped_projects = get_grouped_projects()
-    grouped_wallchain = get_grouped_wallchain_projects()
     
     lang = request.get_cookie('lang', 'ko')
     
-    return template('leaderboard_kaito',
+    return PAGE_CACHE.put(page_key, template('leaderboard_kaito',
                    projectname=projectname,
                    project=projectname,
                    display_project_name=f"{projectname}",
@@ -3104,12 +3295,10 @@ def kaito_leaderboard_route(projectname):
                    timestamps=json.dumps(available_timestamps),
                    formatted_timestamps=json.dumps(formatted_timestamps),
                    table_html=table_html,
-                   kaito_projects=available_projects,
                    current_page='leaderboard',
                    is_kaito=True,
                    lang=lang,
-                   grouped_projects=grouped_projects,
-                   grouped_wallchain=grouped_wallchain)
+                   navigation=NAVIGATION), tag=('kaito', projectname))
 
 
 @app.route('/kaito/<projectname>/user/<handle>')
@@ -3125,6 +3314,10 @@ def kaito_user_route(projectname, handle):
     if projectname not in available_projects:
         return render_error(f"프로젝트 '{projectname}'를 찾을 수 없습니다", projectname)
     
+    # YAPS 값은 외부 API 캐시 주기(2분)마다 바뀔 수 있으므로 시간 구간도 ETag에 포함
+    check_not_modified('kaito_user', projectname, kaito_processor.get_data_version(projectname),
+                       kaito_processor.get_data_updated_at(projectname), handle, int(time.time() // YAPS_CACHE_DURATION))
+    
     # 사용자 기본 정보 가져오기
     user_info = kaito_processor.get_user_info(projectname, handle)
     if not user_info:
@@ -3328,8 +3521,6 @@ def kaito_user_route(projectname, handle):
         )
     
     # Navbar variables
-    grouped_projects = get_grouped_projects()
-    grouped_wallchain = get_grouped_wallchain_projects()
     
     lang = request.get_cookie('lang', 'ko')
     t = {
@@ -3352,13 +3543,11 @@ def kaito_user_route(projectname, handle):
                    user_info_by_timeframe=user_info_by_timeframe,
                    timeframes=available_timeframes,
                    user_chart=user_chart,
-                   kaito_projects=available_projects,
                    current_page='user',
                    is_kaito=True,
                    lang=lang,
                    t=t,
-                   grouped_projects=grouped_projects,
-                   grouped_wallchain=grouped_wallchain)
+                   navigation=NAVIGATION)
 
 # ===================== END KAITO ROUTES =====================
         
@@ -3384,10 +3573,49 @@ def handle_404(error):
     return render_error(f"프로젝트 '{requested_project}'를 찾을 수 없습니다",requested_project)
 
 
+# 응답 압축 설정 (1KB 이상의 텍스트/JSON 응답만 압축)
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_LEVEL = 6
+
+def build_wsgi_app():
+    """
+    Waitress에 넘길 WSGI 앱 구성 (Bottle 앱 + 압축 레이어, /static 파일은 시작 시 사전 압축)
+    가장 바깥의 메트릭 레이어가 압축까지 포함한 응답 시간과 실제 전송 크기를 기록
+    """
+    return MetricsMiddleware(CompressionMiddleware(app,
+                                                   min_size=COMPRESSION_MIN_SIZE,
+                                                   level=COMPRESSION_LEVEL,
+                                                   static_root='./static'),
+                             METRICS)
+
+def waitress_settings(threads=None, connection_limit=None, request_lookahead=None):
+    """
+    Waitress 서버 설정 - 환경변수로 덮어쓰기 가능 (benchmarks.loadtest로 측정한 값을 적용할 때)
+    SHARKAPP_THREADS (기본: CPU 코어 수 * 2, 최소 4, 최대 16) / SHARKAPP_CONNECTION_LIMIT (기본 100)
+    SHARKAPP_REQUEST_LOOKAHEAD (기본 10)
+    """
+    default_threads = max(4, min(16, (os.cpu_count() or 1) * 2))
+    return {
+        'threads': threads or int(os.environ.get('SHARKAPP_THREADS', default_threads)),
+        'connection_limit': connection_limit or int(os.environ.get('SHARKAPP_CONNECTION_LIMIT', '100')),
+        'channel_timeout': 60,  # 요청 타임아웃 60초
+        'cleanup_interval': 10,  # 연결 정리 주기
+        # 큐 깊이 경고 임계값 증가 (기본값: 4)
+        'channel_request_lookahead': (request_lookahead if request_lookahead is not None
+                                      else int(os.environ.get('SHARKAPP_REQUEST_LOOKAHEAD', '10')))
+    }
+
 # 애플리케이션 실행 (Waitress 사용)
-from waitress import serve
+from waitress.server import create_server
                 
 if __name__ == '__main__':
+    # 멀티 프로세스 모드 (SHARKAPP_WORKERS=N) - 이 프로세스는 슈퍼바이저가 되어 리더 1개 + 워커 N개 실행
+    if SERVE_ROLE == 'single' and int(os.environ.get('SHARKAPP_WORKERS', '0')) > 0:
+        import supervisor
+        supervisor.run(int(os.environ['SHARKAPP_WORKERS']), port=8080,
+                       admin_port=int(os.environ.get('SHARKAPP_ADMIN_PORT', '8081')))
+        sys.exit(0)
+    
     # Infofi is dead
     # Ctrl+C 시그널 핸들러 등록
     def signal_handler(sig, frame):
@@ -3405,58 +3633,89 @@ if __name__ == '__main__':
     signal.signal(signal.SIGTERM, signal_handler)
     
     print("\n" + "="*60)
-    print("🦈 SHARKAPP 서버 시작 중...")
+    role_label = {'leader': ' (리더)', 'worker': f' (워커 {WORKER_INDEX})'}.get(SERVE_ROLE, '')
+    print(f"🦈 SHARKAPP 서버 시작 중...{role_label}")
     print("="*60)
     
-    # Cookie 설정 로드
+    # Cookie 설정 로드 (이후 파일 변경 시 자동으로 다시 로드)
     load_cookie_config()
+    start_cookie_config_watcher()
     
-    # 1. 백그라운드 스레드에서 Cookie 프로젝트 초기화
-    init_thread = threading.Thread(target=init_projects_on_startup, daemon=True)
-    init_thread.start()
-    print("📂 Cookie 프로젝트 초기화를 백그라운드에서 진행합니다...")
-    
-    # 2. 백그라운드 스레드에서 Wallchain 프로젝트 초기화
-    wallchain_init_thread = threading.Thread(target=init_wallchain_on_startup, daemon=True)
-    wallchain_init_thread.start()
-    print("🌊 Wallchain 프로젝트 초기화를 백그라운드에서 진행합니다...")
-    
-    # 3. Kaito 프로젝트 초기화 및 데이터 로더 시작
-    try:
-        init_kaito_on_startup()
-        start_kaito_data_loader()
-        print("🎯 Kaito 프로젝트 초기화 및 데이터 로더 시작...")
-    except Exception as e:
-        print(f"⚠️ Kaito 초기화 오류: {e}")
-    
-    # 4. 새 프로젝트 스캔 스레드 시작
-    scan_for_new_projects()
+    # 접속 로그 writer 시작
+    access_log_writer.start()
     
-    # 5. 글로벌 DB 갱신 스케줄러 시작
-    schedule_global_updates()
-    print("🔄 글로벌 DB 갱신 스케줄러가 시작되었습니다...")
+    # RSS 한도 감시 (SHARKAPP_RSS_LIMIT_MB) / 시작부터 할당 추적 (SHARKAPP_TRACEMALLOC=프레임 수)
+    MEMORY_GUARD.start()
+    if int(os.environ.get('SHARKAPP_TRACEMALLOC', '0')) > 0:
+        TRACE_SESSION.start(int(os.environ['SHARKAPP_TRACEMALLOC']))
     
-    print("\n" + "="*60)
-    print("🌐 Waitress Server Running on http://0.0.0.0:8080")
-    print("📊 데이터는 백그라운드에서 로드 중입니다...")
-    print("="*60 + "\n")
+    if SERVE_ROLE == 'worker':
+        # 워커: 프로젝트 등록만 하고 (적재/스캔/글로벌 갱신은 리더 담당) 버전 파일로 신규 데이터 반영
+        init_projects_on_startup(start_loaders=False)
+        init_wallchain_on_startup(start_loaders=False)
+        try:
+            init_kaito_on_startup()
+        except Exception as e:
+            print(f"⚠️ Kaito 초기화 오류: {e}")
+        reload_global_index()
+        VERSION_WATCHER = VersionWatcher(VERSION_FILE, apply_version_state)
+        VERSION_WATCHER.check()
+        VERSION_WATCHER.start()
+    else:
+        # 1. 백그라운드 스레드에서 Cookie 프로젝트 초기화
+        init_thread = threading.Thread(target=init_projects_on_startup, name='cookie-init', daemon=True)
+        init_thread.start()
+        print("📂 Cookie 프로젝트 초기화를 백그라운드에서 진행합니다...")
+        
+        # 2. 백그라운드 스레드에서 Wallchain 프로젝트 초기화
+        wallchain_init_thread = threading.Thread(target=init_wallchain_on_startup, name='wallchain-init', daemon=True)
+        wallchain_init_thread.start()
+        print("🌊 Wallchain 프로젝트 초기화를 백그라운드에서 진행합니다...")
+        
+        # 3. Kaito 프로젝트 초기화 및 데이터 로더 시작
+        try:
+            init_kaito_on_startup()
+            start_kaito_data_loader()
+            print("🎯 Kaito 프로젝트 초기화 및 데이터 로더 시작...")
+        except Exception as e:
+            print(f"⚠️ Kaito 초기화 오류: {e}")
+        
+        # 4. 새 프로젝트 스캔 스레드 시작
+        scan_for_new_projects()
+        
+        # 5. 글로벌 DB 갱신 스케줄러 시작
+        schedule_global_updates()
+        print("🔄 글로벌 DB 갱신 스케줄러가 시작되었습니다...")
+        
+        # 6. (리더) 워커에 알릴 버전 파일 기록 시작
+        if VERSION_PUBLISHER is not None:
+            VERSION_PUBLISHER.write()
+            VERSION_PUBLISHER.start()
     
     try:
-        # Waitress 최적화 설정
-        # threads: CPU 코어 수 * 2 (최소 4, 최대 16)
-        import multiprocessing
-        optimal_threads = max(4, min(16, multiprocessing.cpu_count() * 2))
-        
-        print(f"⚡ Waitress threads: {optimal_threads}")
-        print("⚠️  Ctrl+C를 눌러 종료하세요\n")
-        
-        serve(app, 
-              host='0.0.0.0', 
-              port=8080, 
-              threads=optimal_threads,
-              channel_timeout=60,  # 요청 타임아웃 60초
-              cleanup_interval=10,  # 연결 정리 주기
-              channel_request_lookahead=10)  # 큐 깊이 경고 임계값 증가 (기본값: 4)
+        # Waitress 최적화 설정 (스레드 수/연결 수는 waitress_settings 참고)
+        settings = waitress_settings()
+        
+        if SERVE_ROLE == 'leader':
+            # 리더는 요청을 받지 않고 관리자 API(/admin/*, /metrics)용으로만 로컬 포트 사용
+            admin_port = int(os.environ.get('SHARKAPP_ADMIN_PORT', '8081'))
+            server = create_server(build_wsgi_app(), host='127.0.0.1', port=admin_port, threads=4)
+        elif SERVE_ROLE == 'worker':
+            # 슈퍼바이저가 만든 리스닝 소켓을 모든 워커가 공유
+            listen_socket = socket.socket(fileno=int(os.environ['SHARKAPP_LISTEN_FD']))
+            server = create_server(build_wsgi_app(), sockets=[listen_socket], **settings)
+        else:
+            print("\n" + "="*60)
+            print("🌐 Waitress Server Running on http://0.0.0.0:8080")
+            print("📊 데이터는 백그라운드에서 로드 중입니다...")
+            print("="*60 + "\n")
+            print(f"⚡ Waitress threads: {settings['threads']}, connection_limit: {settings['connection_limit']}")
+            print("⚠️  Ctrl+C를 눌러 종료하세요\n")
+            server = create_server(build_wsgi_app(), host='0.0.0.0', port=8080, **settings)
+        
+        WAITRESS_DISPATCHER = server.task_dispatcher  # /metrics 요청 대기열 길이
+        server.print_listen("Serving on http://{}:{}" + role_label)
+        server.run()
     except KeyboardInterrupt:
         print("\n[시스템] KeyboardInterrupt 감지")
         SHUTDOWN_FLAG.set()
@@ -0,0 +1,269 @@
+"""
+메모리 사용량 점검 (관리자 API / RSS 한도 초과 시 캐시 비우기)
+
+- rss_bytes(): 현재 프로세스 RSS (/proc/self/status, 없으면 최대 RSS)
+- deep_sizeof(): 컨테이너를 따라가며 대략적인 크기 합산 (DataFrame은 memory_usage(deep=True))
+- live_dataframes(): 현재 살아 있는 pandas DataFrame 수/크기 (요청 처리 중 만들어진 프레임 포함)
+- TraceSession: tracemalloc 시작/중지, 이전 스냅샷 대비 증가량 top-N, 스레드 진입점별 할당량 top-N
+- MemoryGuard: RSS가 한도를 넘으면 등록된 캐시를 비우고 gc + malloc_trim
+"""
+import ctypes
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEEP_SIZEOF_LIMIT = 500000  # deep_sizeof가 따라갈 최대 객체 수 (큰 캐시에서 요청이 오래 걸리지 않도록)
+
+
+def rss_bytes():
+    """현재 RSS (bytes) - /proc을 읽을 수 없으면 최대 RSS로 대체"""
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return 0
+
+
+def deep_sizeof(obj, limit=DEEP_SIZEOF_LIMIT):
+    """
+    obj와 obj가 참조하는 dict/list/tuple/set/객체 속성의 크기 합 -> (bytes, 한도 도달 여부)
+    (공유 객체는 한 번만 계산, 모듈/클래스/함수는 따라가지 않음)
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    skip = (type, type(sys), type(deep_sizeof), type(len), threading.Thread)
+    while stack:
+        if len(seen) >= limit:
+            return total, True
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, skip):
+            continue
+        seen.add(id(o))
+        memory_usage = getattr(o, 'memory_usage', None)
+        if memory_usage is not None and type(o).__name__ in ('DataFrame', 'Series'):
+            try:
+                usage = memory_usage(deep=True)
+                total += int(usage.sum() if hasattr(usage, 'sum') else usage)
+                continue
+            except Exception:
+                pass
+        try:
+            total += sys.getsizeof(o)
+        except TypeError:
+            continue
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)) or type(o).__name__ in ('deque', 'OrderedDict'):
+            stack.extend(o)
+        elif isinstance(o, (str, bytes, bytearray, int, float, bool)) or o is None:
+            continue
+        else:
+            attrs = getattr(o, '__dict__', None)
+            if attrs is not None:
+                stack.append(attrs)
+            for slot in getattr(type(o), '__slots__', ()):
+                value = getattr(o, slot, None)
+                if value is not None:
+                    stack.append(value)
+    return total, False
+
+
+def live_dataframes(top=10):
+    """gc가 추적 중인 pandas DataFrame 개수/총 크기/큰 순 top-N (shape, bytes)"""
+    try:
+        import pandas as pd
+    except ImportError:
+        return None
+    frames = []
+    for o in gc.get_objects():
+        if isinstance(o, pd.DataFrame):
+            try:
+                frames.append((int(o.memory_usage(deep=True).sum()), o.shape))
+            except Exception:
+                continue
+    frames.sort(key=lambda f: -f[0])
+    return {
+        'count': len(frames),
+        'bytes': sum(f[0] for f in frames),
+        'largest': [{'bytes': size, 'shape': list(shape)} for size, shape in frames[:top]]
+    }
+
+
+def malloc_trim():
+    """glibc에 해제된 힙 메모리를 OS로 반환하도록 요청 (glibc가 아니면 무시)"""
+    try:
+        return bool(ctypes.CDLL('libc.so.6').malloc_trim(0))
+    except (OSError, AttributeError):
+        return False
+
+
+def _thread_root(traceback):
+    """
+    할당 traceback에서 스레드 진입점 (threading 내부 프레임 다음 첫 프레임, '파일:줄')
+    traceback이 nframe 제한으로 잘렸으면 None
+    """
+    if traceback.total_nframe is not None and traceback.total_nframe > len(traceback):
+        return None
+    for frame in traceback:  # 가장 바깥 프레임부터
+        if os.path.basename(frame.filename) != 'threading.py':
+            return f'{frame.filename}:{frame.lineno}'
+    return None
+
+
+class TraceSession:
+    """tracemalloc 제어 (관리자 API에서 시작/스냅샷/중지) - 켜져 있는 동안 할당마다 오버헤드가 있음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._previous = None
+        self.started_at = None
+
+    @property
+    def running(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, nframes=25):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, min(int(nframes), 100)))
+                self.started_at = time.time()
+            self._previous = None
+
+    def stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+            self.started_at = None
+
+    def snapshot(self, top=20):
+        """
+        현재 할당 상위 N개(파일:줄) + 이전 스냅샷 대비 증가 상위 N개 + 스레드 진입점별 할당량
+        (첫 호출은 비교 대상이 없어 diff가 비어 있음)
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            previous, self._previous = self._previous, snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [{'location': str(s.traceback[-1]), 'bytes': s.size, 'count': s.count}
+                 for s in snapshot.statistics('lineno')[:top]]
+        diff = []
+        if previous is not None:
+            diff = [{'location': str(s.traceback[-1]), 'bytes': s.size, 'size_diff': s.size_diff,
+                     'count_diff': s.count_diff}
+                    for s in snapshot.compare_to(previous, 'lineno')[:top]]
+
+        threads = {}
+        truncated = 0
+        for stat in snapshot.statistics('traceback'):
+            root = _thread_root(stat.traceback)
+            if root is None:
+                truncated += stat.size
+                continue
+            entry = threads.setdefault(root, [0, 0])
+            entry[0] += stat.size
+            entry[1] += stat.count
+        threads = sorted(threads.items(), key=lambda t: -t[1][0])[:top]
+
+        return {
+            'started_at': self.started_at,
+            'nframes': tracemalloc.get_traceback_limit(),
+            'traced_bytes': current,
+            'traced_peak_bytes': peak,
+            'top': lines,
+            'diff': diff,
+            'threads': [{'entry': root, 'bytes': size, 'count': count} for root, (size, count) in threads],
+            # traceback이 nframes보다 깊어 스레드 진입점을 알 수 없는 할당 (nframes를 늘려서 다시 시작)
+            'threads_unknown_bytes': truncated
+        }
+
+
+class MemoryGuard:
+    """RSS가 limit_bytes를 넘으면 등록된 캐시 정리 함수 호출 (cooldown 동안은 다시 실행하지 않음)"""
+
+    def __init__(self, limit_bytes, interval=15.0, cooldown=60.0):
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.cooldown = cooldown
+        self._shedders = []  # [(이름, 함수)]
+        self._thread = None
+        self.last_shed_at = None
+        self.sheds = 0
+        self.last_result = None
+
+    def add_shedder(self, name, func):
+        self._shedders.append((name, func))
+
+    def shed(self, reason='manual'):
+        """등록된 캐시 모두 비우기 -> {'before': RSS, 'after': RSS, 'cleared': [...]}"""
+        before = rss_bytes()
+        cleared = []
+        for name, func in self._shedders:
+            try:
+                func()
+                cleared.append(name)
+            except Exception as e:
+                print(f"[메모리 가드] {name} 정리 실패: {e}")
+        gc.collect()
+        malloc_trim()
+        after = rss_bytes()
+        self.sheds += 1
+        self.last_shed_at = time.time()
+        self.last_result = {'reason': reason, 'time': self.last_shed_at, 'before': before, 'after': after,
+                            'cleared': cleared}
+        print(f"[메모리 가드] 캐시 정리 ({reason}): RSS {before / 1024 / 1024:.0f} MB -> {after / 1024 / 1024:.0f} MB")
+        return self.last_result
+
+    def check(self):
+        if not self.limit_bytes:
+            return False
+        rss = rss_bytes()
+        if rss <= self.limit_bytes:
+            return False
+        if self.last_shed_at and time.time() - self.last_shed_at < self.cooldown:
+            return False
+        self.shed(reason=f'rss {rss / 1024 / 1024:.0f} MB > {self.limit_bytes / 1024 / 1024:.0f} MB')
+        return True
+
+    def start(self):
+        if not self.limit_bytes or self._thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.check()
+                except Exception as e:
+                    print(f"[메모리 가드] 오류: {e}")
+
+        self._thread = threading.Thread(target=run, name='memory-guard', daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        return {
+            'limit_bytes': self.limit_bytes,
+            'sheds': self.sheds,
+            'last_shed': self.last_result
+        }
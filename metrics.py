@@ -0,0 +1,199 @@
+"""
+Prometheus 텍스트 형식 메트릭 (외부 의존성 없음)
+
+- MetricsRegistry: counter / gauge / histogram 저장 + 스크랩 시점에 값을 채우는 collector 함수
+- MetricsMiddleware: WSGI 앱을 감싸서 라우트별 응답 시간 히스토그램, 상태 코드, 응답 크기, 처리 중 요청 수 기록
+  (라우트 라벨은 URL이 아닌 Bottle 라우트 규칙/핸들러 이름이므로 프로젝트/유저 수와 무관하게 개수가 고정)
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# 응답 시간 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 응답 크기 버킷 (bytes)
+SIZE_BUCKETS = (512, 2048, 8192, 32768, 131072, 524288, 2097152)
+# 글로벌 DB 갱신 / 적재 소요 시간 버킷 (초)
+JOB_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# 스냅샷 파일 생성 -> 조회 가능까지 지연 버킷 (초, 로더 주기 30초 기준)
+LAG_BUCKETS = (10.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}        # {이름: (type, help)}
+        self._values = {}      # {이름: {라벨 tuple: 값 또는 _Histogram}}
+        self._collectors = []  # 스크랩 시 호출 -> [(이름, type, help, 라벨 dict, 값), ...]
+
+    def _series(self, name, kind, help_text):
+        if name not in self._meta:
+            self._meta[name] = (kind, help_text)
+            self._values[name] = {}
+        return self._values[name]
+
+    def inc(self, name, value=1, help_text='', **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series(name, 'counter', help_text)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, help_text='', **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series(name, 'gauge', help_text)[key] = value
+
+    def add(self, name, value, help_text='', **labels):
+        """gauge 증감 (처리 중 요청 수 등)"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series(name, 'gauge', help_text)
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, help_text='', **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series(name, 'histogram', help_text)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def add_collector(self, collector):
+        """스크랩할 때마다 호출할 함수 등록 (캐시 통계, Waitress 큐 길이 등 다른 모듈의 현재 값)"""
+        self._collectors.append(collector)
+
+    def snapshot(self, name):
+        """{라벨 tuple: 값} 복사본 (히스토그램은 (count, sum))"""
+        with self._lock:
+            series = self._values.get(name, {})
+            return {k: (v.count, v.total) if isinstance(v, _Histogram) else v for k, v in series.items()}
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._meta):
+                kind, help_text = self._meta[name]
+                lines.append(f'# HELP {name} {help_text or name}')
+                lines.append(f'# TYPE {name} {kind}')
+                for key, value in sorted(self._values[name].items()):
+                    if kind == 'histogram':
+                        cumulative = 0
+                        for bound, count in zip(value.buckets + (float('inf'),), value.counts):
+                            cumulative += count
+                            lines.append(f'{name}_bucket{_label_text(key + (("le", _number(bound)),))} {cumulative}')
+                        lines.append(f'{name}_sum{_label_text(key)} {_number(value.total)}')
+                        lines.append(f'{name}_count{_label_text(key)} {value.count}')
+                    else:
+                        lines.append(f'{name}{_label_text(key)} {_number(value)}')
+
+        collected = {}
+        for collector in self._collectors:
+            try:
+                for name, kind, help_text, labels, value in collector():
+                    collected.setdefault(name, (kind, help_text, []))[2].append((labels, value))
+            except Exception as e:
+                lines.append(f'# collector error: {type(e).__name__}: {e}')
+        for name in sorted(collected):
+            kind, help_text, samples = collected[name]
+            lines.append(f'# HELP {name} {help_text or name}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                lines.append(f'{name}{_label_text(tuple(sorted(labels.items())))} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def route_label(environ):
+    """Bottle이 매칭한 라우트 -> (핸들러 이름, 라우트 규칙), 매칭 전에 끝난 요청(정적 파일 등)은 별도 이름"""
+    route = environ.get('bottle.route')
+    if route is not None:
+        return getattr(route.callback, '__name__', 'unknown'), route.rule
+    path = environ.get('PATH_INFO', '')
+    if '/static/' in path or path.startswith('/static'):
+        return 'static', '/static'
+    return 'unmatched', 'unmatched'
+
+
+class MetricsMiddleware:
+    """WSGI 앱의 라우트별 응답 시간/상태 코드/응답 크기/처리 중 요청 수 기록 (응답 본문 전송 완료 시점까지 측정)"""
+
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    def __call__(self, environ, start_response):
+        registry = self.registry
+        registry.add('sharkapp_http_requests_in_flight', 1, 'Requests currently being processed')
+        start = time.perf_counter()
+        state = {'status': '000'}
+
+        def capture_start_response(status, headers, exc_info=None):
+            state['status'] = status[:3]
+            return start_response(status, headers, exc_info)
+
+        try:
+            result = self.app(environ, capture_start_response)
+        except BaseException:
+            state['status'] = '500'
+            self._finish(environ, state, start, 0)
+            raise
+        return self._iterate(result, environ, state, start)
+
+    def _iterate(self, result, environ, state, start):
+        size = 0
+        try:
+            for chunk in result:
+                size += len(chunk)
+                yield chunk
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+            self._finish(environ, state, start, size)
+
+    def _finish(self, environ, state, start, size):
+        registry = self.registry
+        handler, rule = route_label(environ)
+        elapsed = time.perf_counter() - start
+        method = environ.get('REQUEST_METHOD', 'GET')
+        registry.add('sharkapp_http_requests_in_flight', -1, 'Requests currently being processed')
+        registry.observe('sharkapp_http_request_duration_seconds', elapsed, LATENCY_BUCKETS,
+                         'Request latency by route (until the body is fully sent)',
+                         handler=handler, route=rule, method=method)
+        registry.inc('sharkapp_http_requests_total', 1, 'Requests by route and status code',
+                     handler=handler, route=rule, method=method, status=state['status'])
+        registry.observe('sharkapp_http_response_bytes', size, SIZE_BUCKETS,
+                         'Response body size by route (after compression)', handler=handler, route=rule)
@@ -0,0 +1,55 @@
+from types import MappingProxyType
+from bottle import template
+
+def group_by_name(project_ids):
+    """'name-lang' 형식 프로젝트를 이름별로 그룹화 ({name: ({'full': ..., 'lang': ...}, ...)})"""
+    grouped = {}
+    for p in sorted(project_ids):
+        parts = p.rsplit('-', 1)
+        name = parts[0]
+        lang = parts[1] if len(parts) > 1 else 'global'
+        grouped.setdefault(name, []).append({'full': p, 'lang': lang})
+    return MappingProxyType({name: tuple(items) for name, items in grouped.items()})
+
+
+class NavigationModel:
+    """
+    navbar 프로젝트 메뉴용 불변 스냅샷
+    - 프로젝트 등록/목록 변경 시에만 새로 만들어 통째로 교체 (요청 스레드는 읽기만 함)
+    - 메뉴/Kaito 모달 HTML 조각은 언어별로 한 번만 렌더링해서 재사용
+    """
+
+    def __init__(self, version=0, cookie_projects=(), wallchain_projects=(), kaito_projects=()):
+        self.version = version
+        self.cookie_projects = tuple(sorted(cookie_projects))
+        self.wallchain_projects = tuple(sorted(wallchain_projects))  # wallchain- 접두사 제외
+        self.kaito_projects = tuple(kaito_projects)
+        self.grouped_projects = group_by_name(self.cookie_projects)
+        self.grouped_wallchain = group_by_name(self.wallchain_projects)
+        self._fragments = {}  # {(템플릿, 언어): html}
+
+    def menu_html(self, lang):
+        return self._fragment('_navbar_menu.html', lang)
+
+    def kaito_modal_html(self, lang):
+        return self._fragment('_navbar_kaito_modal.html', lang)
+
+    def prerender(self, langs):
+        """교체 전에 미리 렌더링 (요청 스레드에서 렌더링하지 않도록)"""
+        for lang in langs:
+            self.menu_html(lang)
+            self.kaito_modal_html(lang)
+        return self
+
+    def _fragment(self, name, lang):
+        key = (name, lang)
+        html = self._fragments.get(key)
+        if html is None:
+            # 동시에 두 번 렌더링되어도 결과가 같으므로 락 없이 저장
+            html = template(name,
+                            lang=lang,
+                            grouped_projects=self.grouped_projects,
+                            grouped_wallchain=self.grouped_wallchain,
+                            kaito_projects=self.kaito_projects)
+            self._fragments[key] = html
+        return html
@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+
+class PageCache:
+    """
+    렌더링된 페이지 캐시 (메모리 한도 + LRU 제거)
+    - 키는 페이지 ETag (라우트, 프로젝트, 쿼리, 데이터 버전, 언어 조합) 이므로
+      데이터 버전이 바뀌면 자연스럽게 새 키가 됨
+    - tag(예: ('cookie', 프로젝트))로 묶어서 신규 데이터 반영 시 이전 페이지를 즉시 정리
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # {key: (tag, body)}
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, body, tag=None):
+        """페이지 저장 후 그대로 반환 (라우트에서 return PAGE_CACHE.put(...) 형태로 사용)"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if len(body) > self.max_bytes // 4:
+            # 한 페이지가 캐시 대부분을 차지하지 않도록 너무 큰 페이지는 저장하지 않음
+            return body
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = (tag, body)
+            self.size += len(body)
+
+            while self.size > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return body
+
+    def invalidate(self, tag):
+        """tag에 속한 페이지 모두 삭제 (신규 데이터 반영 시)"""
+        with self._lock:
+            keys = [k for k, (t, _) in self._entries.items() if t == tag]
+            for key in keys:
+                self.size -= len(self._entries.pop(key)[1])
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
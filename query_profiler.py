@@ -0,0 +1,229 @@
+"""
+SQLite 쿼리 프로파일러 - 모든 프로세서/글로벌 DB/main의 쿼리 실행 시간을 정규화된 SQL 기준으로 집계
+
+- connect(): sqlite3.connect 대신 사용 (같은 인자, 같은 사용법 - with 문 / pandas read_sql / to_sql 모두 지원)
+- 문장별 실행 시간(execute + fetch)을 리터럴을 ?로 바꾼 SQL 텍스트 기준으로 합산
+- 느린 쿼리(SLOW_QUERY_MS 이상)는 EXPLAIN QUERY PLAN 결과와 함께 로그 출력 + 최근 목록 보관
+- 커서를 직접 순회(for row in cursor)하며 읽는 시간은 포함되지 않음 (fetchall/fetchone/fetchmany만 측정)
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+QUERY_PROFILE_ENABLED = os.environ.get('SHARKAPP_QUERY_PROFILE', '1') != '0'
+SLOW_QUERY_MS = float(os.environ.get('SHARKAPP_SLOW_QUERY_MS', '200'))
+SLOW_LOG_SIZE = 200          # 최근 느린 쿼리 보관 개수
+SLOW_LOG_INTERVAL = 60.0     # 같은 SQL의 느린 쿼리 로그 출력 최소 간격 (초)
+NORMALIZE_CACHE_SIZE = 4096  # 원본 SQL -> 정규화 SQL 캐시 크기
+SQL_PREVIEW_CHARS = 300
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+
+def normalize_sql(sql):
+    """리터럴(문자열/숫자)을 ?로, IN (?, ?, ...) 목록을 하나로, 공백을 한 칸으로"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?, ...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryProfiler:
+    """정규화 SQL별 호출 수 / 누적 시간 / 최대 시간 / 읽은 row 수 / 느린 횟수 집계 (스레드 안전)"""
+
+    def __init__(self, slow_ms=SLOW_QUERY_MS):
+        self.slow_seconds = slow_ms / 1000.0
+        self._lock = threading.Lock()
+        self._normalized = {}
+        self._reset_state()
+
+    def _reset_state(self):
+        self.started_at = time.time()
+        self._entries = {}   # {정규화 SQL: [calls, total, max, rows, slow, databases, plan, last_logged]}
+        self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+
+    def reset(self):
+        with self._lock:
+            self._reset_state()
+
+    def key(self, sql):
+        key = self._normalized.get(sql)
+        if key is None:
+            key = normalize_sql(sql)
+            if len(self._normalized) >= NORMALIZE_CACHE_SIZE:
+                self._normalized.clear()
+            self._normalized[sql] = key
+        return key
+
+    def record(self, key, database, seconds, call_seconds, rows=0, calls=0):
+        """seconds: 이번 측정 구간, call_seconds: 이 문장의 지금까지 누적 시간 (최대값 비교용)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [0, 0.0, 0.0, 0, 0, set(), None, 0.0]
+            entry[0] += calls
+            entry[1] += seconds
+            if call_seconds > entry[2]:
+                entry[2] = call_seconds
+            entry[3] += rows
+            if len(entry[5]) < 8:
+                entry[5].add(database)
+
+    def slow(self, cursor, key, database, sql, parameters, seconds):
+        """느린 쿼리 1건 기록 (같은 SQL은 SLOW_LOG_INTERVAL마다 한 번만 실행 계획 조회/로그 출력)"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[4] += 1
+            if now - entry[7] < SLOW_LOG_INTERVAL:
+                return
+            entry[7] = now
+
+        plan = explain(cursor.connection, sql, parameters)
+        with self._lock:
+            entry[6] = plan
+            self.slow_log.append({
+                'time': now, 'ms': round(seconds * 1000, 1), 'database': database,
+                'sql': key[:SQL_PREVIEW_CHARS], 'plan': plan
+            })
+        print(f"[슬로우 쿼리] {seconds * 1000:.0f}ms ({database}) {key[:SQL_PREVIEW_CHARS]}")
+        for line in plan or ():
+            print(f"    {line}")
+
+    def report(self, top=20, sort='total'):
+        """느린 순 상위 N개 (sort: total / avg / max / calls / rows / slow)"""
+        with self._lock:
+            rows = [{
+                'sql': key,
+                'calls': e[0],
+                'total_ms': round(e[1] * 1000, 2),
+                'avg_ms': round(e[1] * 1000 / e[0], 3) if e[0] else 0.0,
+                'max_ms': round(e[2] * 1000, 2),
+                'rows': e[3],
+                'slow': e[4],
+                'databases': sorted(e[5]),
+                'plan': e[6]
+            } for key, e in self._entries.items()]
+            slow_log = list(self.slow_log)
+        sort_key = {'total': 'total_ms', 'avg': 'avg_ms', 'max': 'max_ms'}.get(sort, sort)
+        if rows and sort_key not in rows[0]:
+            sort_key = 'total_ms'
+        rows.sort(key=lambda r: -r[sort_key])
+        return {
+            'since': self.started_at,
+            'slow_query_ms': self.slow_seconds * 1000,
+            'statements': len(rows),
+            'calls': sum(r['calls'] for r in rows),
+            'total_ms': round(sum(r['total_ms'] for r in rows), 2),
+            'top': rows[:top],
+            'slow_log': slow_log[::-1]
+        }
+
+    def totals(self):
+        """(호출 수, 누적 초, 느린 쿼리 수) - /metrics용"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return (sum(e[0] for e in entries), sum(e[1] for e in entries), sum(e[4] for e in entries))
+
+
+PROFILER = QueryProfiler()
+
+
+def explain(conn, sql, parameters):
+    """EXPLAIN QUERY PLAN 결과 (detail 컬럼 목록, 실행 계획이 없는 문장/executemany는 None)"""
+    if parameters is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # 프로파일링 커서를 거치지 않도록 기본 Cursor 사용
+        rows = sqlite3.Cursor(conn).execute('EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+        return [row[-1] for row in rows]
+    except sqlite3.Error as e:
+        return [f'EXPLAIN 실패: {e}']
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    _q_key = None
+
+    def _begin(self, sql, parameters, seconds, rows=0):
+        database = self.connection.profile_db
+        self._q_sql, self._q_params, self._q_elapsed, self._q_slow = sql, parameters, seconds, False
+        self._q_key = PROFILER.key(sql)
+        PROFILER.record(self._q_key, database, seconds, seconds, rows=rows, calls=1)
+        self._check_slow()
+
+    def _fetched(self, seconds, rows):
+        if self._q_key is None:
+            return
+        self._q_elapsed += seconds
+        PROFILER.record(self._q_key, self.connection.profile_db, seconds, self._q_elapsed, rows=rows)
+        self._check_slow()
+
+    def _check_slow(self):
+        if not self._q_slow and self._q_elapsed >= PROFILER.slow_seconds:
+            self._q_slow = True
+            PROFILER.slow(self, self._q_key, self.connection.profile_db, self._q_sql, self._q_params, self._q_elapsed)
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._begin(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            # 파라미터가 여러 벌이라 실행 계획은 조회하지 않음 (params=None)
+            self._begin(sql, None, time.perf_counter() - start, rows=max(self.rowcount, 0))
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(time.perf_counter() - start, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(time.perf_counter() - start, len(rows))
+        return rows
+
+
+class ProfiledConnection(sqlite3.Connection):
+    profile_db = ''
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute는 cursor()를 거치지 않으므로 직접 연결
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(database, **kwargs):
+    """sqlite3.connect와 같은 인자 - 프로파일링이 켜져 있으면 쿼리 시간을 PROFILER에 기록하는 연결 반환"""
+    if not QUERY_PROFILE_ENABLED:
+        return sqlite3.connect(database, **kwargs)
+    conn = sqlite3.connect(database, factory=ProfiledConnection, **kwargs)
+    conn.profile_db = os.path.relpath(database) if database != ':memory:' else database
+    return conn
@@ -0,0 +1,60 @@
+"""
+스냅샷 비교(compare_leaderboards) 결과 컨테이너
+
+비교(outer join, 결측 채우기, 변동 보정, 정렬)는 SQL에서 끝내고,
+결과는 커서에서 fetchmany 단위로 받아 컬럼별 리스트로만 쌓습니다.
+요청 경로에서 DataFrame 두 개 + merge 결과 + 중간 컬럼들을 만들지 않으므로 메모리 사용이 작습니다.
+"""
+
+FETCH_SIZE = 5000
+
+
+class CompareResult:
+    """
+    컬럼 단위 비교 결과 (읽기 전용)
+    - result['username'] 처럼 컬럼 리스트 조회, len(result), result.empty 지원
+    - leaderboard_renderer 함수들은 리스트를 그대로 받음
+    """
+
+    __slots__ = ('columns', '_data')
+
+    def __init__(self, columns=(), data=None):
+        self.columns = tuple(columns)
+        self._data = data if data is not None else {c: [] for c in self.columns}
+
+    @classmethod
+    def from_cursor(cls, cursor, fetch_size=FETCH_SIZE):
+        """실행된 커서에서 결과를 나눠 받아 컬럼별로 적재"""
+        columns = [d[0] for d in cursor.description]
+        lists = [[] for _ in columns]
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for values, col in zip(zip(*rows), lists):
+                col.extend(values)
+        return cls(columns, dict(zip(columns, lists)))
+
+    def __len__(self):
+        return len(self._data[self.columns[0]]) if self.columns else 0
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __contains__(self, column):
+        return column in self._data
+
+    def __getitem__(self, column):
+        return self._data[column]
+
+    def exclude(self, column, values):
+        """column 값이 values에 속하는 행을 제외한 새 결과 (순서 유지)"""
+        values = set(values)
+        keep = [i for i, v in enumerate(self._data[column]) if v not in values]
+        if len(keep) == len(self):
+            return self
+        return CompareResult(self.columns, {c: [col[i] for i in keep] for c, col in self._data.items()})
+
+    def to_dict(self):
+        return {c: list(self._data[c]) for c in self.columns}
@@ -0,0 +1,281 @@
+"""
+리더보드 스냅샷 공유 파일 (멀티 프로세스 모드에서 워커들이 같은 메모리를 읽음)
+
+적재 프로세스(리더)가 (timeframe, timestamp) 스냅샷마다 컬럼형 파일을 한 번 기록하고(임시 파일 작성 후 rename),
+각 프로세스는 파일을 mmap으로 열어 NumPy 배열로 바로 읽습니다 (복사 없음).
+페이지 캐시를 모든 워커가 공유하므로 워커 수가 늘어도 스냅샷 메모리는 늘지 않고,
+스냅샷 비교(compare_leaderboards)는 SQLite 조회 없이 두 파일의 username outer join으로 처리합니다.
+
+파일 형식: MAGIC(8) + 헤더 길이(uint32) + 헤더 JSON + 8바이트 정렬된 컬럼 데이터
+- 숫자 컬럼: int64 / float64
+- 문자열 컬럼: 고정 길이 UTF-8 bytes('S') + NULL 여부(uint8)
+- 행은 key(username) 기준으로 정렬, 중복 없음 (정렬된 배열끼리 searchsorted로 join)
+"""
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+MAGIC = b'SHKSNAP1'
+SNAPSHOT_KEEP = 12  # timeframe별로 유지할 최근 스냅샷 수 (기본 비교 구간 timestamps[-10] 포함)
+OPEN_CACHE_SIZE = 32  # 프로세스별로 열어 둘 스냅샷 파일 수
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def write_snapshot(path, columns, meta=None):
+    """
+    columns: {이름: 값} -> path에 원자적으로 기록
+    값이 숫자 ndarray면 그대로, 그 외(str/None 리스트)는 고정 길이 bytes + NULL 여부로 저장
+    """
+    arrays = []
+    rows = None
+    for name, values in columns.items():
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+            data = values.astype('<i8' if values.dtype.kind in 'iu' else '<f8', copy=False)
+            nulls = None
+        else:
+            values = list(values)
+            nulls = np.fromiter((v is None for v in values), dtype=np.uint8, count=len(values))
+            data = np.array([b'' if v is None else v.encode('utf-8') for v in values])
+            if data.dtype.kind != 'S':  # 행이 없으면 float 배열이 됨
+                data = data.astype('S1')
+        if rows is None:
+            rows = len(data)
+        elif len(data) != rows:
+            raise ValueError(f"column {name}: {len(data)} rows != {rows}")
+        arrays.append((name, np.ascontiguousarray(data), nulls))
+
+    header = {'rows': rows or 0, 'meta': meta or {}, 'columns': {}}
+    blobs = []
+    offset = 0
+    for name, data, nulls in arrays:
+        entry = {'dtype': data.dtype.str, 'offset': offset, 'nulls': None}
+        blobs.append((offset, data))
+        offset = _align(offset + data.nbytes)
+        if nulls is not None:
+            entry['nulls'] = offset
+            blobs.append((offset, nulls))
+            offset = _align(offset + nulls.nbytes)
+        header['columns'][name] = entry
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+            for blob_offset, data in blobs:
+                f.seek(data_start + blob_offset)
+                f.write(data.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Snapshot:
+    """mmap으로 연 스냅샷 파일 (읽기 전용, 컬럼은 파일을 그대로 가리키는 NumPy 배열)"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._mmap is None or self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"not a snapshot file: {path}")
+        (header_len,) = struct.unpack_from('<I', self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start:header_start + header_len])
+        data_start = _align(header_start + header_len)
+
+        self.path = path
+        self.rows = header['rows']
+        self.meta = header['meta']
+        self.nbytes = size
+        self._columns = {}
+        self._nulls = {}
+        for name, entry in header['columns'].items():
+            self._columns[name] = np.frombuffer(self._mmap, dtype=np.dtype(entry['dtype']), count=self.rows,
+                                                offset=data_start + entry['offset'])
+            if entry['nulls'] is not None:
+                self._nulls[name] = np.frombuffer(self._mmap, dtype=np.uint8, count=self.rows,
+                                                  offset=data_start + entry['nulls'])
+
+    def __len__(self):
+        return self.rows
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def valid(self, name):
+        """NULL이 아닌 행 (bool 배열)"""
+        nulls = self._nulls.get(name)
+        return np.ones(self.rows, dtype=bool) if nulls is None else nulls == 0
+
+
+def _locate(sorted_keys, keys):
+    """keys 각각의 sorted_keys 내 위치와 존재 여부"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=np.intp), np.zeros(len(keys), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return idx, sorted_keys[idx] == keys
+
+
+class SnapshotJoin:
+    """
+    두 스냅샷의 key outer join (SQL의 UNION ALL + GROUP BY username과 같은 결과)
+    결과 행은 key 오름차순, 각 컬럼은 한쪽에만 있는 유저를 missing 값으로 채움
+    """
+
+    def __init__(self, prev, curr, key='username'):
+        self.prev = prev
+        self.curr = curr
+        self.key = key
+        self.keys = np.union1d(prev[key], curr[key])
+        self.prev_idx, self.prev_has = _locate(prev[key], self.keys)
+        self.curr_idx, self.curr_has = _locate(curr[key], self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key_list(self):
+        return [k.decode('utf-8') for k in self.keys.tolist()]
+
+    def numbers(self, side, name, missing):
+        """side('prev' / 'curr') 스냅샷의 숫자 컬럼 - 그 스냅샷에 없는 유저는 missing"""
+        snap, idx, has = self._side(side)
+        if len(snap) == 0:
+            return np.full(len(self.keys), missing, dtype=snap[name].dtype)
+        return np.where(has, snap[name][idx], missing)
+
+    def strings(self, name, default=None):
+        """현재 값 우선, 없으면(유저 없음 / NULL) 이전 값, 둘 다 없으면 default (COALESCE(curr, prev, default))"""
+        out = [default] * len(self.keys)
+        for side in ('prev', 'curr'):  # 현재 값이 나중에 덮어씀
+            snap, idx, has = self._side(side)
+            if len(snap) == 0:
+                continue
+            rows = np.flatnonzero(has & snap.valid(name)[idx])
+            for row, value in zip(rows.tolist(), snap[name][idx[rows]].tolist()):
+                out[row] = value.decode('utf-8')
+        return out
+
+    def _side(self, side):
+        if side == 'prev':
+            return self.prev, self.prev_idx, self.prev_has
+        return self.curr, self.curr_idx, self.curr_has
+
+
+def _file_name(value):
+    return re.sub(r'[^0-9A-Za-z_.-]', '_', value)
+
+
+class SnapshotStore:
+    """
+    프로젝트(data_dir)별 스냅샷 파일 저장소 - root/<timeframe>/<timestamp>.snap
+    publish / prune은 적재 프로세스에서만, open은 모든 프로세스에서 호출
+    """
+
+    def __init__(self, root, keep=SNAPSHOT_KEEP, cache_size=OPEN_CACHE_SIZE):
+        self.root = root
+        self.keep = keep
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._open = OrderedDict()  # path -> (파일 시그니처, Snapshot)
+        self.hits = 0  # 스냅샷 파일로 처리한 비교 수
+        self.fallbacks = 0  # 파일이 없어 SQL로 처리한 비교 수
+        self.published = 0
+
+    def path(self, timeframe, timestamp):
+        return os.path.join(self.root, _file_name(timeframe), _file_name(timestamp) + '.snap')
+
+    def exists(self, timeframe, timestamp):
+        return os.path.exists(self.path(timeframe, timestamp))
+
+    def publish(self, timeframe, timestamp, columns, meta=None):
+        write_snapshot(self.path(timeframe, timestamp), columns,
+                       dict(meta or {}, timeframe=timeframe, timestamp=timestamp))
+        self.published += 1
+
+    def remove(self, timeframe, timestamp):
+        """스냅샷 파일 삭제 (없으면 무시) - 이후 이 스냅샷 비교는 SQL로 처리, 다음 publish에서 다시 기록"""
+        try:
+            os.remove(self.path(timeframe, timestamp))
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"[스냅샷 파일] {timeframe}/{timestamp} 삭제 실패: {e}")
+            return False
+
+    def prune(self, timeframe, keep_timestamps):
+        """keep_timestamps 이외의 스냅샷 파일 삭제 (이미 열어 둔 프로세스는 mmap이 유지되므로 계속 읽을 수 있음)"""
+        folder = os.path.join(self.root, _file_name(timeframe))
+        if not os.path.isdir(folder):
+            return 0
+        keep = {_file_name(ts) + '.snap' for ts in keep_timestamps}
+        removed = 0
+        for name in os.listdir(folder):
+            if name.endswith('.snap') and name not in keep:
+                try:
+                    os.remove(os.path.join(folder, name))
+                    removed += 1
+                except OSError as e:
+                    print(f"[스냅샷 파일] {name} 삭제 실패: {e}")
+        return removed
+
+    def open(self, timeframe, timestamp):
+        """스냅샷 파일 열기 (없거나 읽을 수 없으면 None) - 다시 기록된 파일은 시그니처로 감지해서 새로 엶"""
+        path = self.path(timeframe, timestamp)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._open.get(path)
+            if cached is not None and cached[0] == signature:
+                self._open.move_to_end(path)
+                return cached[1]
+        try:
+            snapshot = Snapshot(path)
+        except (OSError, ValueError) as e:
+            print(f"[스냅샷 파일] {path} 읽기 실패: {e}")
+            return None
+        with self._lock:
+            self._open[path] = (signature, snapshot)
+            self._open.move_to_end(path)
+            while len(self._open) > self.cache_size:
+                self._open.popitem(last=False)
+        return snapshot
+
+    def join(self, timeframe, timestamp1, timestamp2, key='username'):
+        """두 스냅샷 파일이 모두 있으면 SnapshotJoin, 하나라도 없으면 None (호출한 쪽에서 SQL로 처리)"""
+        prev = self.open(timeframe, timestamp1)
+        curr = self.open(timeframe, timestamp2) if prev is not None else None
+        if curr is None:
+            self.fallbacks += 1
+            return None
+        self.hits += 1
+        return SnapshotJoin(prev, curr, key)
+
+    def stats(self):
+        with self._lock:
+            mapped = sum(s.nbytes for _, s in self._open.values())
+            open_files = len(self._open)
+        return {'hits': self.hits, 'fallbacks': self.fallbacks, 'published': self.published,
+                'open_files': open_files, 'mapped_bytes': mapped}
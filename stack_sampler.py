@@ -0,0 +1,137 @@
+"""
+실행 중인 프로세스의 전체 스레드 스택 샘플러 (재시작/외부 프로파일러 없이 핫 경로 확인용)
+
+별도 스레드가 interval마다 sys._current_frames()로 모든 스레드의 스택을 읽어 횟수를 셉니다.
+결과는 collapsed stack 형식("스레드;바깥 함수;...;안쪽 함수 횟수")으로 내보내며
+flamegraph.pl / speedscope / inferno에 그대로 넣을 수 있습니다.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+
+# 대기 중인 스레드의 맨 안쪽 프레임 (idle 제외 옵션에서 사용) - (파일명, 함수명)
+IDLE_LEAVES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('asyncore.py', 'poll'),
+    ('wasyncore.py', 'poll'),
+    ('socket.py', 'accept'),
+    ('socket.py', 'readinto'),
+}
+
+_RUN_LOCK = threading.Lock()  # 동시에 한 번만 샘플링
+
+
+class SamplerBusy(Exception):
+    pass
+
+
+def _frame_label(code, labels):
+    label = labels.get(code)
+    if label is None:
+        label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+def _thread_label(name):
+    # collapsed 형식 구분자(;)와 공백은 다른 문자로
+    return name.replace(';', ':').replace(' ', '_')
+
+
+def sample(seconds, interval=0.01, include_idle=False, thread_filter=None):
+    """
+    seconds 동안 interval 간격으로 모든 스레드 스택 샘플링 (호출한 스레드와 샘플러 스레드는 제외)
+    -> {'stacks': Counter({collapsed stack: 횟수}), 'samples': 샘플링 횟수, 'threads': {스레드: 횟수}, ...}
+    이미 다른 요청이 샘플링 중이면 SamplerBusy
+    """
+    seconds = max(0.0, min(float(seconds), MAX_SECONDS))
+    interval = max(MIN_INTERVAL, float(interval))
+    if not _RUN_LOCK.acquire(blocking=False):
+        raise SamplerBusy()
+
+    stacks = Counter()
+    threads = Counter()
+    state = {'samples': 0, 'overhead': 0.0}
+    exclude = {threading.get_ident()}
+    labels = {}  # {code 객체: "함수 (파일:줄)"}
+
+    def run():
+        exclude.add(threading.get_ident())
+        deadline = time.perf_counter() + seconds
+        while True:
+            start = time.perf_counter()
+            if start >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in exclude:
+                    continue
+                name = names.get(ident, f'thread-{ident}')
+                if thread_filter and thread_filter not in name:
+                    continue
+                code = frame.f_code
+                if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                parts = []
+                while frame is not None:
+                    parts.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                parts.append(_thread_label(name))
+                stacks[';'.join(reversed(parts))] += 1
+                threads[name] += 1
+            state['samples'] += 1
+            elapsed = time.perf_counter() - start
+            state['overhead'] += elapsed
+            time.sleep(max(0.0, interval - elapsed))
+
+    started = time.time()
+    try:
+        sampler = threading.Thread(target=run, name='stack-sampler', daemon=True)
+        sampler.start()
+        sampler.join()
+    finally:
+        _RUN_LOCK.release()
+
+    return {
+        'started_at': started,
+        'seconds': seconds,
+        'interval': interval,
+        'samples': state['samples'],
+        'overhead_sec': state['overhead'],
+        'threads': dict(threads.most_common()),
+        'stacks': stacks
+    }
+
+
+def collapsed(stacks):
+    """flamegraph 입력 형식 텍스트 (많이 나온 스택부터)"""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+def summarize(result, top=30):
+    """함수별 self(맨 안쪽에서 실행 중) / total(스택에 포함) 샘플 수 상위 N개"""
+    self_counts, total_counts = Counter(), Counter()
+    for stack, count in result['stacks'].items():
+        frames = stack.split(';')[1:]
+        if not frames:
+            continue
+        self_counts[frames[-1]] += count
+        for frame in set(frames):
+            total_counts[frame] += count
+    return {
+        'started_at': result['started_at'],
+        'seconds': result['seconds'],
+        'interval': result['interval'],
+        'samples': result['samples'],
+        'overhead_sec': round(result['overhead_sec'], 4),
+        'threads': result['threads'],
+        'self': self_counts.most_common(top),
+        'total': total_counts.most_common(top)
+    }
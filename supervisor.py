@@ -0,0 +1,136 @@
+"""
+멀티 프로세스 서버 실행 (SHARKAPP_WORKERS=N python main.py 또는 python supervisor.py --workers N)
+
+- 슈퍼바이저: 리스닝 소켓을 한 번 만들고 리더 1개 + 웹 워커 N개를 자식 프로세스로 실행, 죽으면 다시 실행
+- 리더 (SHARKAPP_ROLE=leader): 데이터 적재 / 글로벌 DB 갱신 / 프로젝트 스캔 등 데이터 쓰기와 백그라운드 작업,
+  관리자 API만 127.0.0.1:SHARKAPP_ADMIN_PORT 로 제공 (/admin/ingest 등 적재 상태는 리더에서 확인)
+- 워커 (SHARKAPP_ROLE=worker): 물려받은 소켓으로 요청 처리, 버전 파일(worker_sync)로 신규 데이터를 알게 되면
+  캐시 무효화 / 글로벌 인덱스 다시 읽기, 리더보드 비교는 리더가 기록한 스냅샷 파일(snapshot_store)을 mmap으로 공유
+- 접속 로그는 프로세스별 파일(access_log.w<i>.txt), 트래픽 통계는 모든 프로세스가 각자 traffic_stats.db에 기록
+  (HLL 레지스터를 DB 값과 합쳐서 저장하므로 여러 프로세스가 같이 써도 됨)
+요청 처리가 프로세스별 GIL로 나뉘므로 처리량이 코어 수만큼 늘어납니다 (커널이 accept를 워커들에 분산).
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+RESTART_BACKOFF_MAX = 60.0  # 시작 직후 계속 죽는 프로세스의 재시작 간격 상한 (초)
+STABLE_SECONDS = 30.0  # 이 시간 이상 살아 있었으면 재시작 간격 초기화
+
+
+class Child:
+    def __init__(self, name, env, pass_fds=()):
+        self.name = name
+        self.env = env
+        self.pass_fds = pass_fds
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.backoff = 1.0
+        self.next_start = 0.0
+
+    def start(self):
+        env = dict(os.environ, **self.env)
+        self.process = subprocess.Popen([sys.executable, MAIN_SCRIPT], env=env, pass_fds=self.pass_fds)
+        self.started_at = time.time()
+        print(f"[슈퍼바이저] {self.name} 시작 (pid {self.process.pid})")
+
+    def poll(self):
+        """종료됐으면 재시작 예약 / 예약 시각이 지났으면 재시작"""
+        now = time.time()
+        if self.process is None:
+            if now >= self.next_start:
+                self.restarts += 1
+                self.start()
+            return
+        code = self.process.poll()
+        if code is None:
+            return
+        lived = now - self.started_at
+        self.backoff = 1.0 if lived >= STABLE_SECONDS else min(self.backoff * 2, RESTART_BACKOFF_MAX)
+        self.next_start = now + self.backoff
+        self.process = None
+        print(f"[슈퍼바이저] {self.name} 종료 (exit {code}, {lived:.0f}초 실행) - {self.backoff:.0f}초 후 재시작")
+
+    def stop(self, sig=signal.SIGTERM):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(sig)
+
+    def wait(self, timeout):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"[슈퍼바이저] {self.name} 강제 종료")
+            self.process.kill()
+            self.process.wait()
+
+
+def listen_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run(workers, host='0.0.0.0', port=8080, admin_port=8081):
+    sock = listen_socket(host, port)
+    fd = sock.fileno()
+    boot_time = repr(time.time())  # 모든 자식이 같은 ETag를 만들도록 (http_cache.BOOT_TIME)
+    children = [Child('leader', {'SHARKAPP_ROLE': 'leader', 'SHARKAPP_ADMIN_PORT': str(admin_port),
+                                 'SHARKAPP_BOOT_TIME': boot_time})]
+    children += [Child(f'worker-{i}', {'SHARKAPP_ROLE': 'worker', 'SHARKAPP_WORKER_INDEX': str(i),
+                                       'SHARKAPP_LISTEN_FD': str(fd), 'SHARKAPP_BOOT_TIME': boot_time},
+                       pass_fds=(fd,))
+                 for i in range(workers)]
+
+    stopping = []
+
+    def on_signal(sig, frame):
+        stopping.append(sig)
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    print(f"[슈퍼바이저] http://{host}:{port} - 워커 {workers}개 + 리더 (관리자 API 127.0.0.1:{admin_port})")
+    for child in children:
+        child.start()
+    while not stopping:
+        time.sleep(1.0)
+        for child in children:
+            child.poll()
+
+    print("[슈퍼바이저] 종료 신호 - 자식 프로세스 종료 중...")
+    for child in children:
+        child.stop()
+    for child in children:
+        child.wait(timeout=15)
+    sock.close()
+    print("[슈퍼바이저] 종료 완료")
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)  # 리더 몫으로 코어 하나 남김
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SHARKAPP 멀티 프로세스 서버')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='웹 워커 프로세스 수')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--admin-port', type=int, default=int(os.environ.get('SHARKAPP_ADMIN_PORT', '8081')),
+                        help='리더의 관리자 API 포트 (127.0.0.1)')
+    args = parser.parse_args()
+    run(args.workers, args.host, args.port, args.admin_port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+import sqlite3
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from collections import defaultdict
+
+class HyperLogLog:
+    """고유 세션 수 추정용 HyperLogLog (p=12 -> 4096 레지스터, 오차 약 1.6%)"""
+
+    def __init__(self, p=12, registers=None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+
+    def add(self, value):
+        x = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        idx = x >> (64 - self.p)
+        w = (x << self.p) & 0xFFFFFFFFFFFFFFFF
+        # 앞에서부터 0의 개수 + 1 (w가 0이면 최대값)
+        rank = (64 - self.p + 1) if w == 0 else (64 - w.bit_length() + 1)
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other):
+        regs = self.registers
+        for i, r in enumerate(other.registers):
+            if r > regs[i]:
+                regs[i] = r
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # 작은 범위 보정 (linear counting)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+
+class TrafficStats:
+    """
+    접속 로그 집계 저장소 (SQLite)
+    - 분 단위 (minute, route, project) 조회수
+    - 일 단위 (day, route, project) 고유 세션 수 (HyperLogLog)
+    - 일 단위 (day, project, username) 조회된 유저 top-N
+    """
+
+    def __init__(self, db_path='./data/traffic_stats.db', retention_days=30):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._hll_cache = {}  # {(day, route, project): HyperLogLog} - writer 스레드 전용
+        self._lock = threading.Lock()
+        self._last_prune = 0
+        self.processed = 0
+        self.parse_errors = 0
+        self.init_database()
+
+    def init_database(self):
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS route_hits (
+                    minute TEXT,
+                    route TEXT,
+                    project TEXT,
+                    hits INTEGER,
+                    PRIMARY KEY (minute, route, project)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS session_hll (
+                    day TEXT,
+                    route TEXT,
+                    project TEXT,
+                    registers BLOB,
+                    PRIMARY KEY (day, route, project)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_views (
+                    day TEXT,
+                    project TEXT,
+                    username TEXT,
+                    views INTEGER,
+                    PRIMARY KEY (day, project, username)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_route_hits_project ON route_hits(project, minute)')
+            conn.commit()
+
+    @staticmethod
+    def parse_line(line):
+        """시간 | IP | 라우트 | 프로젝트 | 사용자명 | 세션 ID | REFERER 형식 파싱"""
+        fields = line.rstrip('\n').split('|', 5)
+        if len(fields) < 6:
+            return None
+        timestamp, _ip, route_name, project, username, rest = fields
+        # 세션 ID(User-Agent 포함)에 '|'가 있을 수 있으므로 referer는 오른쪽에서 분리
+        session_id = rest.rsplit('|', 1)[0]
+        return timestamp, route_name, project, username, session_id
+
+    def process_batch(self, lines):
+        """로그 writer 스레드에서 호출 - 배치 단위로 집계 후 한 번에 반영"""
+        hits = defaultdict(int)
+        views = defaultdict(int)
+        touched_hll = set()
+
+        for line in lines:
+            parsed = self.parse_line(line)
+            if not parsed:
+                self.parse_errors += 1
+                continue
+            timestamp, route_name, project, username, session_id = parsed
+            minute = timestamp[:16]
+            day = timestamp[:10]
+
+            hits[(minute, route_name, project)] += 1
+
+            key = (day, route_name, project)
+            hll = self._hll_cache.get(key)
+            if hll is None:
+                hll = self._load_hll(key)
+                self._hll_cache[key] = hll
+            hll.add(session_id)
+            touched_hll.add(key)
+
+            if username and username != '-':
+                views[(day, project, username)] += 1
+
+        if not hits:
+            return
+
+        with self._lock, sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.cursor()
+            # 여러 프로세스가 같은 DB에 기록할 수 있으므로(멀티 프로세스 모드) 저장된 HLL과 합친 뒤 교체
+            cursor.execute('BEGIN IMMEDIATE')
+            for key in touched_hll:
+                cursor.execute('SELECT registers FROM session_hll WHERE day = ? AND route = ? AND project = ?', key)
+                row = cursor.fetchone()
+                if row:
+                    self._hll_cache[key].merge(HyperLogLog(registers=row[0]))
+            cursor.executemany('''
+                INSERT INTO route_hits (minute, route, project, hits) VALUES (?, ?, ?, ?)
+                ON CONFLICT(minute, route, project) DO UPDATE SET hits = hits + excluded.hits
+            ''', [(k[0], k[1], k[2], v) for k, v in hits.items()])
+            cursor.executemany('''
+                INSERT OR REPLACE INTO session_hll (day, route, project, registers) VALUES (?, ?, ?, ?)
+            ''', [(k[0], k[1], k[2], self._hll_cache[k].to_bytes()) for k in touched_hll])
+            if views:
+                cursor.executemany('''
+                    INSERT INTO user_views (day, project, username, views) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(day, project, username) DO UPDATE SET views = views + excluded.views
+                ''', [(k[0], k[1], k[2], v) for k, v in views.items()])
+            conn.commit()
+
+        self.processed += len(lines)
+        self._maybe_prune()
+
+    def _load_hll(self, key):
+        """재시작 후에도 같은 날의 고유 세션 집계를 이어가도록 DB에서 로드"""
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT registers FROM session_hll WHERE day = ? AND route = ? AND project = ?', key)
+            row = cursor.fetchone()
+        return HyperLogLog(registers=row[0]) if row else HyperLogLog()
+
+    def _maybe_prune(self):
+        """보관 기간이 지난 집계 삭제 (1시간마다) 및 지난 날짜의 HLL 캐시 정리"""
+        current_time = time.time()
+        if current_time - self._last_prune < 3600:
+            return
+        self._last_prune = current_time
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        for key in [k for k in self._hll_cache if k[0] < today]:
+            del self._hll_cache[key]
+
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        with self._lock, sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM route_hits WHERE minute < ?', (cutoff,))
+            cursor.execute('DELETE FROM session_hll WHERE day < ?', (cutoff,))
+            cursor.execute('DELETE FROM user_views WHERE day < ?', (cutoff,))
+            conn.commit()
+
+    def query(self, minutes=60, project=None, route=None, top=20):
+        """최근 N분간 트래픽 요약 (/admin/traffic 용)"""
+        now = datetime.now()
+        since_minute = (now - timedelta(minutes=minutes)).strftime('%Y-%m-%d %H:%M')
+        since_day = since_minute[:10]
+
+        filters = ''
+        params = [since_minute]
+        if project:
+            filters += ' AND project = ?'
+            params.append(project)
+        if route:
+            filters += ' AND route = ?'
+            params.append(route)
+
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f'''
+                SELECT route, project, SUM(hits) AS total
+                FROM route_hits WHERE minute >= ?{filters}
+                GROUP BY route, project ORDER BY total DESC LIMIT ?
+            ''', params + [top])
+            hot = [{'route': r[0], 'project': r[1], 'hits': r[2]} for r in cursor.fetchall()]
+
+            cursor.execute(f'''
+                SELECT minute, SUM(hits) FROM route_hits WHERE minute >= ?{filters}
+                GROUP BY minute ORDER BY minute
+            ''', params)
+            per_minute = [{'minute': r[0], 'hits': r[1]} for r in cursor.fetchall()]
+
+            # 고유 세션 수: 기간에 걸친 날짜들의 HLL 병합
+            hll_params = [since_day] + params[1:]
+            cursor.execute(f'''
+                SELECT registers FROM session_hll WHERE day >= ?{filters}
+            ''', hll_params)
+            merged = HyperLogLog()
+            for (registers,) in cursor.fetchall():
+                merged.merge(HyperLogLog(registers=registers))
+
+            user_filters = ' AND project = ?' if project else ''
+            user_params = [since_day] + ([project] if project else [])
+            cursor.execute(f'''
+                SELECT project, username, SUM(views) AS total
+                FROM user_views WHERE day >= ?{user_filters}
+                GROUP BY project, username ORDER BY total DESC LIMIT ?
+            ''', user_params + [top])
+            top_users = [{'project': r[0], 'username': r[1], 'views': r[2]} for r in cursor.fetchall()]
+
+        return {
+            'since': since_minute,
+            'minutes': minutes,
+            'total_hits': sum(m['hits'] for m in per_minute),
+            'unique_sessions_since_day': since_day,
+            'unique_sessions': merged.count(),
+            'hot_routes': hot,
+            'per_minute': per_minute,
+            'top_users': top_users
+        }
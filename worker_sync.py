@@ -0,0 +1,109 @@
+"""
+멀티 프로세스 모드에서 리더(적재/글로벌 갱신 담당) -> 웹 워커로 데이터 버전 전달
+
+리더는 데이터가 바뀔 때마다 버전 파일(JSON)을 원자적으로 교체하고(임시 파일 작성 후 rename),
+워커는 파일의 (inode, mtime, 크기)를 짧은 주기로 확인해서 바뀌었을 때만 읽어 캐시를 무효화합니다.
+워커 쪽 비용은 주기마다 stat 한 번이고, 리더가 재시작해도 파일을 다시 쓰기만 하면 됩니다.
+"""
+import json
+import os
+import threading
+import time
+
+
+class VersionPublisher:
+    """publish() 요청을 모아서(min_interval) 버전 파일 기록 - 로더 스레드는 기다리지 않음"""
+
+    def __init__(self, path, collect, min_interval=0.2):
+        self.path = path
+        self.collect = collect  # 현재 상태 dict를 돌려주는 함수
+        self.min_interval = min_interval
+        self.seq = 0
+        self.published_at = None
+        self._pending = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        self._pending.set()
+
+    def write(self):
+        """즉시 기록 (시작 시 / 백그라운드 스레드)"""
+        state = self.collect()
+        self.seq += 1
+        self.published_at = time.time()
+        state.update(seq=self.seq, published_at=self.published_at, leader_pid=os.getpid())
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                self._pending.wait()
+                time.sleep(self.min_interval)  # 연달아 들어온 갱신을 한 번에 기록
+                self._pending.clear()
+                try:
+                    self.write()
+                except Exception as e:
+                    print(f"[버전 파일] 기록 실패: {e}")
+
+        self._thread = threading.Thread(target=run, name='version-publisher', daemon=True)
+        self._thread.start()
+
+
+class VersionWatcher:
+    """버전 파일이 바뀌면 apply(state) 호출 (워커 프로세스)"""
+
+    def __init__(self, path, apply, interval=0.5):
+        self.path = path
+        self.apply = apply
+        self.interval = interval
+        self.seq = None
+        self.applied_at = None
+        self.errors = 0
+        self._signature = None
+        self._thread = None
+
+    def check(self):
+        """변경이 있으면 읽어서 반영 -> 반영했으면 True (파일이 없거나 쓰는 중이면 다음 주기에 다시 확인)"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if signature == self._signature:
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.apply(state)
+        self._signature = signature  # 반영에 실패하면 다음 주기에 다시 시도
+        self.seq = state.get('seq')
+        self.applied_at = time.time()
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.check()
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[버전 파일] 반영 실패: {e}")
+                time.sleep(self.interval)
+
+        self._thread = threading.Thread(target=run, name='version-watcher', daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        return {'path': self.path, 'seq': self.seq, 'applied_at': self.applied_at, 'errors': self.errors}